@@ -1,9 +1,9 @@
 """Agent management API endpoints."""
 
 import uuid
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi import APIRouter, Depends, Header, Query, Request, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
@@ -26,8 +26,10 @@ from app.schemas.agent import (
 )
 from app.schemas.base import PaginationMetadata
 from app.api.responses import build_error_responses
+from app.exceptions import ValidationError
 from app.runtime.supervisor.application.service import SupervisorRuntimeService
 from app.services.agent_service import AgentService
+from app.streaming.sse_handler import parse_last_event_id
 
 from app.schemas.agent_run import SupervisorRunRequest, SupervisorRunResponse
 
@@ -148,6 +150,11 @@ async def run_supervisor_agent(
     payload: SupervisorRunRequest,
     request: Request,
     project_id: uuid.UUID = Query(..., description="Project ID"),
+    last_event_id: Optional[str] = Header(
+        default=None,
+        alias="Last-Event-ID",
+        description="Resume a dropped stream after this event id instead of starting a new run",
+    ),
     runtime_service: SupervisorRuntimeService = Depends(get_supervisor_runtime_service),
 ) -> Union[SupervisorRunResponse, StreamingResponse]:
     """Run the supervisor agent.
@@ -234,7 +241,14 @@ async def run_supervisor_agent(
 
     Notes:
     - Completion can be detected via the 'disconnected' SSE or by seeing domain events `workflow_completed`/`workflow_failed`.
-    - For reconnection, carry over `correlation_id`/`request_id` if supported by your integration.
+    - Reconnection: every `event` SSE has an `id: <stream_id>:<seq>`. Repeat the request with the last
+      received id in the `Last-Event-ID` header (or use `GET /run/streams/{stream_id}`) to continue the
+      same run after that event; the `connected` event then includes `resumed_from` and `missed_events`.
+      Finished streams stay resumable for `STREAM_RESUME_TTL_SECONDS`.
+    - Compact format (`stream_format: "compact"`): the `connected` event is replaced by one run header
+      (`event: h`) whose `codes`/`deltas` tables describe the terse items; each following SSE carries a JSON
+      array of items (`{"t": code, "c": text, ...}` for content deltas, `{"t": code, "d": data}` otherwise)
+      with the id of the batch's last event. Intended for service-to-service consumers.
     """
 
     request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
@@ -252,6 +266,19 @@ async def run_supervisor_agent(
     if payload.mcp_url is None:
         payload = payload.model_copy(update={"mcp_url": settings.mcp_service_url})
 
+    if payload.stream and last_event_id:
+        resume_from = parse_last_event_id(last_event_id)
+        if resume_from is None:
+            raise ValidationError("Invalid Last-Event-ID", details={"last_event_id": last_event_id})
+        return await runtime_service.resume_stream(
+            project_id,
+            resume_from[0],
+            resume_from[1],
+            request,
+            stream_format=payload.stream_format,
+            coalesce_deltas=payload.stream_coalesce_deltas,
+        )
+
     if payload.stream:
         sse_response = await runtime_service.stream(
             payload,
@@ -269,6 +296,37 @@ async def run_supervisor_agent(
     return response
 
 
+@router.get(
+    "/run/streams/{stream_id}",
+    responses=build_error_responses([400, 404], {404: "Stream not found or expired"}),
+)
+async def resume_supervisor_stream(
+    stream_id: str,
+    request: Request,
+    project_id: uuid.UUID = Query(..., description="Project ID"),
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    after_seq: Optional[int] = Query(
+        default=None, ge=-1, description="Resume after this sequence number (when not using Last-Event-ID)"
+    ),
+    stream_format: Literal["json", "compact"] = Query(default="json", description="SSE wire format"),
+    runtime_service: SupervisorRuntimeService = Depends(get_supervisor_runtime_service),
+) -> StreamingResponse:
+    """Resume a supervisor SSE stream (EventSource-compatible).
+
+    Replays the events after `Last-Event-ID` (or `after_seq`; default: from the oldest buffered
+    event) and then follows the live run.
+    """
+    last_seq = after_seq if after_seq is not None else -1
+    if last_event_id:
+        parsed = parse_last_event_id(last_event_id)
+        if parsed is None or parsed[0] != stream_id:
+            raise ValidationError("Invalid Last-Event-ID", details={"last_event_id": last_event_id})
+        last_seq = parsed[1]
+    return await runtime_service.resume_stream(
+        project_id, stream_id, last_seq, request, stream_format=stream_format
+    )
+
+
 @router.post(
     "/run/{run_id}/cancel",
     status_code=status.HTTP_202_ACCEPTED,
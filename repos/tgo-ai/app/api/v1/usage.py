@@ -0,0 +1,26 @@
+"""Usage telemetry endpoints."""
+
+import uuid
+
+from fastapi import APIRouter, Query
+
+from app.api.responses import build_error_responses
+from app.services.usage_telemetry import usage_telemetry
+
+router = APIRouter()
+
+
+@router.get(
+    "/latency",
+    response_model=dict,
+    responses=build_error_responses([]),
+    summary="Tool, collection and agent latency percentiles",
+    description=(
+        "p50/p95 durations (ms), call counts and error rates per tool, RAG collection and agent, "
+        "over the most recent calls handled by this instance."
+    ),
+)
+async def get_usage_latency(
+    project_id: uuid.UUID = Query(..., description="Project ID"),
+) -> dict:
+    return usage_telemetry.latency_summary(str(project_id))
@@ -167,6 +167,75 @@ class Settings(BaseSettings):
         default=True, description="Enable ReDoc documentation"
     )
 
+    # Streaming Configuration
+    stream_buffer_size: int = Field(
+        default=1024,
+        ge=1,
+        description="Events retained per stream; producers wait when a client falls this far behind",
+    )
+    stream_batch_max_events: int = Field(
+        default=64, ge=1, description="Maximum events written in one SSE frame batch"
+    )
+    stream_heartbeat_seconds: float = Field(
+        default=15.0, gt=0, description="Idle interval before an SSE heartbeat comment is sent"
+    )
+    stream_disconnect_poll_seconds: float = Field(
+        default=1.0, gt=0, description="How often the SSE disconnect watcher polls the client"
+    )
+    stream_stall_timeout_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="Detach a client that keeps producers blocked without reading for this long",
+    )
+    stream_resume_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        description="How long a finished stream can still be resumed with Last-Event-ID",
+    )
+    stream_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis URL for mirroring streams so any replica can resume them (optional)",
+    )
+
+    # Multi-replica run registry
+    run_registry_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis URL for the cluster-wide run registry and cancel routing (defaults to stream_redis_url)",
+    )
+    run_lease_seconds: int = Field(
+        default=30,
+        ge=3,
+        description="Lease on a replica's registered runs; renewed while the replica is alive",
+    )
+    node_id: Optional[str] = Field(
+        default=None,
+        description="Replica id used for cancel routing (defaults to hostname-pid-random)",
+    )
+
+    # Usage telemetry (write-behind)
+    usage_telemetry_enabled: bool = Field(
+        default=True, description="Record tool, collection and agent usage"
+    )
+    usage_flush_interval_seconds: float = Field(
+        default=5.0, gt=0, description="Interval between usage telemetry flushes"
+    )
+    usage_flush_batch_size: int = Field(
+        default=500, ge=1, description="Rows per bulk insert when flushing usage telemetry"
+    )
+    usage_buffer_max_events: int = Field(
+        default=10000,
+        ge=1,
+        description="Buffered usage events per kind; the oldest are dropped beyond this",
+    )
+    usage_latency_window_size: int = Field(
+        default=1024, ge=1, description="Recent durations kept per tool/collection/agent for p50/p95"
+    )
+    usage_latency_window_idle_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Latency windows without events for this long are dropped at the next flush",
+    )
+
     # Embedding sync retry scheduler configuration
     embedding_sync_retry_enabled: bool = Field(
         default=True, description="Enable periodic retry for embedding config sync"
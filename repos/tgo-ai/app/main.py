@@ -16,6 +16,8 @@ from app.api import api_router
 from app.config import settings
 from app.database import close_db
 from app.exceptions import TGOAIServiceException
+from app.runtime.supervisor.application.run_registry import close_run_registry
+from app.streaming.stream_store import close_stream_store
 
 
 request_logger = logging.getLogger("app.requests")
@@ -30,6 +32,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     from app.tasks.embedding_sync_retry import start_embedding_sync_retry_loop
     stop_event = asyncio.Event()
     task = asyncio.create_task(start_embedding_sync_retry_loop(stop_event))
+    from app.tasks.usage_flush import start_usage_flush_loop
+    usage_task = asyncio.create_task(start_usage_flush_loop(stop_event))
 
     try:
         yield
@@ -40,6 +44,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             await asyncio.wait_for(task, timeout=5)
         except Exception:
             task.cancel()
+        try:
+            await asyncio.wait_for(usage_task, timeout=5)
+        except Exception:
+            usage_task.cancel()
+        await close_run_registry()
+        await close_stream_store()
         await close_db()
 
 
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy import JSON
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -339,6 +339,17 @@ class AgentUsageRecord(BaseModel):
         comment="Type of aggregation: hourly, daily, weekly, monthly",
     )
 
+    __table_args__ = (
+        # One rollup row per agent and period; usage flushes upsert into it
+        UniqueConstraint(
+            "project_id",
+            "agent_id",
+            "aggregation_type",
+            "period_start",
+            name="uq_ai_agent_usage_records_period",
+        ),
+    )
+
     # Relationships
     project: Mapped["Project"] = relationship(
         "Project",
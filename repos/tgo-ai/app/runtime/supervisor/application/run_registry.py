@@ -0,0 +1,234 @@
+"""Cluster-wide registry of running supervisor team executions.
+
+A team run executes on the replica that received the stream request, and its
+agno ``Team`` only exists there. When a run registry Redis URL is configured,
+every run is also recorded as ``tgo:ai:run:<run_id>`` -> ``{node, project_id,
+...}`` under a lease that the owning replica renews every third of
+``run_lease_seconds``. A cancel request that lands on another replica looks up
+the owner and publishes it on the owner's channel
+``tgo:ai:run-cancel:<node_id>``; the owner's listener cancels the local run.
+Leases of a crashed replica lapse, so its runs drop out of the registry on
+their own.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+RUN_KEY_PREFIX = "tgo:ai:run:"
+CANCEL_CHANNEL_PREFIX = "tgo:ai:run-cancel:"
+_LISTEN_RETRY_SECONDS = 1.0
+
+# (run_id, project_id, reason) -> whether a cancel signal was sent
+CancelHandler = Callable[[str, str, Optional[str]], Awaitable[bool]]
+
+
+def _default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class RedisRunRegistry:
+    """Records runs owned by this replica in Redis and routes cancels to owners."""
+
+    def __init__(self, redis_url: str, node_id: str, lease_seconds: int):
+        # Imported lazily: only needed when a run registry Redis URL is configured
+        import redis.asyncio as redis_asyncio
+
+        self._redis = redis_asyncio.from_url(redis_url, decode_responses=True)
+        self.node_id = node_id
+        self._lease = max(3, lease_seconds)
+        self._owned: Dict[str, str] = {}
+        self._registering: Dict[str, asyncio.Task] = {}
+        self._cancel_handler: Optional[CancelHandler] = None
+        self._start_lock = asyncio.Lock()
+        self._pubsub = None
+        self._tasks: set = set()
+
+    @staticmethod
+    def _key(run_id: str) -> str:
+        return f"{RUN_KEY_PREFIX}{run_id}"
+
+    @property
+    def cancel_channel(self) -> str:
+        return f"{CANCEL_CHANNEL_PREFIX}{self.node_id}"
+
+    def set_cancel_handler(self, handler: CancelHandler) -> None:
+        """Set the callback that cancels a run owned by this replica."""
+        self._cancel_handler = handler
+
+    async def register(self, run_id: str, project_id: str, team_id: str, request_id: str) -> None:
+        """Record ``run_id`` as owned by this replica."""
+        self._owned[run_id] = project_id
+        try:
+            await self._ensure_started()
+            key = self._key(run_id)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hset(key, mapping={
+                "node": self.node_id,
+                "project_id": project_id,
+                "team_id": team_id,
+                "request_id": request_id,
+            })
+            pipe.expire(key, self._lease)
+            await pipe.execute()
+        except Exception as e:
+            # Local cancellation keeps working; only cross-replica cancel is lost
+            logger.warning("Failed to register run in Redis", run_id=run_id, error=str(e))
+
+    def register_soon(self, run_id: str, project_id: str, team_id: str, request_id: str) -> None:
+        """Start :meth:`register` in the background (for synchronous event handlers).
+
+        :meth:`unregister` waits for it, so a run that ends quickly cannot
+        leave its lease behind.
+        """
+        task = asyncio.create_task(self.register(run_id, project_id, team_id, request_id))
+        self._registering[run_id] = task
+        task.add_done_callback(lambda _: self._registering.pop(run_id, None))
+
+    async def unregister(self, run_id: str) -> None:
+        pending = self._registering.get(run_id)
+        if pending is not None:
+            await asyncio.shield(pending)
+        if self._owned.pop(run_id, None) is None:
+            return
+        try:
+            key = self._key(run_id)
+            if await self._redis.hget(key, "node") == self.node_id:
+                await self._redis.delete(key)
+        except Exception as e:
+            logger.warning("Failed to unregister run in Redis", run_id=run_id, error=str(e))
+
+    async def request_cancel(self, run_id: str, project_id: str, reason: Optional[str] = None) -> bool:
+        """Forward a cancel to the replica that owns ``run_id``.
+
+        Returns True if the owner is alive and received the request.
+        """
+        owner = await self._redis.hgetall(self._key(run_id))
+        if not owner:
+            logger.info("Cancel requested for unknown run_id", run_id=run_id)
+            return False
+        if owner.get("project_id") != project_id:
+            logger.warning(
+                "Cancel forbidden: project mismatch",
+                run_id=run_id,
+                expected_project_id=owner.get("project_id"),
+                got_project_id=project_id,
+            )
+            return False
+        node = owner.get("node")
+        if not node or node == self.node_id:
+            # Our own lease for a run that already finished here
+            return False
+
+        message = json.dumps({"run_id": run_id, "project_id": project_id, "reason": reason})
+        receivers = await self._redis.publish(f"{CANCEL_CHANNEL_PREFIX}{node}", message)
+        logger.info("Forwarded cancel to owning replica", run_id=run_id, node=node, delivered=receivers > 0)
+        return receivers > 0
+
+    async def _ensure_started(self) -> None:
+        """Subscribe to this replica's cancel channel and start lease renewal (first run only)."""
+        if self._pubsub is not None:
+            return
+        async with self._start_lock:
+            if self._pubsub is not None:
+                return
+            pubsub = self._redis.pubsub()
+            # Subscribed before the first run is published, so no cancel can be missed
+            await pubsub.subscribe(self.cancel_channel)
+            self._pubsub = pubsub
+            for coro in (self._listen(), self._renew_leases()):
+                task = asyncio.create_task(coro)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    await self._handle_cancel(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Run cancel listener failed; resubscribing", error=str(e))
+                await asyncio.sleep(_LISTEN_RETRY_SECONDS)
+                try:
+                    await self._pubsub.subscribe(self.cancel_channel)
+                except Exception:
+                    pass
+
+    async def _handle_cancel(self, data: Optional[str]) -> None:
+        try:
+            request = json.loads(data or "{}")
+            run_id = request["run_id"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed run cancel message", data=data)
+            return
+        if self._cancel_handler is None or run_id not in self._owned:
+            return
+        try:
+            await self._cancel_handler(run_id, str(request.get("project_id")), request.get("reason"))
+        except Exception as e:  # pragma: no cover - defensive
+            logger.exception("Forwarded cancel failed", run_id=run_id, error=str(e))
+
+    async def _renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            if not self._owned:
+                continue
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for run_id in list(self._owned):
+                    pipe.expire(self._key(run_id), self._lease)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning("Failed to renew run leases", runs=len(self._owned), error=str(e))
+
+    async def close(self) -> None:
+        if self._registering:
+            await asyncio.gather(*self._registering.values(), return_exceptions=True)
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        try:
+            if self._owned:
+                await self._redis.delete(*(self._key(run_id) for run_id in self._owned))
+            if self._pubsub is not None:
+                await self._pubsub.aclose()
+        except Exception:
+            pass
+        await self._redis.aclose()
+
+
+_run_registry: Optional[RedisRunRegistry] = None
+
+
+def get_run_registry() -> Optional[RedisRunRegistry]:
+    """The shared run registry, or None when no run registry Redis URL is configured."""
+    global _run_registry
+    redis_url = settings.run_registry_redis_url or settings.stream_redis_url
+    if _run_registry is None and redis_url:
+        _run_registry = RedisRunRegistry(
+            redis_url,
+            node_id=settings.node_id or _default_node_id(),
+            lease_seconds=settings.run_lease_seconds,
+        )
+    return _run_registry
+
+
+async def close_run_registry() -> None:
+    """Close the shared run registry (application shutdown)."""
+    global _run_registry
+    if _run_registry is not None:
+        await _run_registry.close()
+        _run_registry = None
@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.exceptions import NotFoundError
 
 from app.models.internal import Team as InternalTeam
 from app.models.streaming import (
@@ -23,6 +24,7 @@ from app.models.streaming import (
     TeamRunCompletedData,
     TeamRunErrorData,
 )
+from app.runtime.supervisor.application.run_registry import get_run_registry
 from app.runtime.supervisor.infrastructure.services import AIServiceClient
 from app.runtime.supervisor.models.coordination import CoordinationContext, CoordinationRequest
 from app.runtime.supervisor.streaming.workflow_events import (
@@ -33,8 +35,10 @@ from app.runtime.supervisor.teams import AgnoTeamBuilder, AgnoTeamRunner, TeamRu
 from app.runtime.tools.executor.service import ToolsRuntimeService
 from app.schemas.agent_run import SupervisorRunRequest, SupervisorRunResponse
 from app.services.team_service import TeamService
-from app.streaming.event_emitter import cleanup_event_emitter, get_event_emitter
+from app.streaming.event_emitter import cleanup_event_emitter, find_event_emitter, get_event_emitter
+from app.streaming.compact import encoder_for_format
 from app.streaming.sse_handler import create_sse_response
+from app.streaming.stream_store import get_stream_store
 
 
 @dataclass
@@ -77,6 +81,10 @@ class SupervisorRuntimeService:
         # Run registry (run_id -> RunRegistryEntry) with async lock for safety
         self._runs: Dict[str, RunRegistryEntry] = {}
         self._runs_lock = asyncio.Lock()
+        # Cluster-wide registry (optional): routes cancels to the replica running the team
+        self._run_registry = get_run_registry()
+        if self._run_registry is not None:
+            self._run_registry.set_cancel_handler(self._cancel_local)
 
     # ------------------------------------------------------------------
     # Public API
@@ -117,7 +125,11 @@ class SupervisorRuntimeService:
         correlation_id = str(uuid.uuid4())
 
         event_emitter = get_event_emitter(request_id, correlation_id)
+        event_emitter.project_id = str(project_id)
         event_emitter.enable_streaming()
+        stream_store = get_stream_store()
+        if stream_store is not None:
+            stream_store.mirror(event_emitter)
         workflow_events = create_workflow_events(event_emitter)
 
         # Typed holder for the Team instance used by this stream
@@ -149,6 +161,8 @@ class SupervisorRuntimeService:
                 )
                 # Register synchronously to avoid race with client-side cancel immediately after STARTED
                 self._runs[data.run_id] = entry
+                if self._run_registry is not None:
+                    self._run_registry.register_soon(data.run_id, entry.project_id, entry.team_id, request_id)
                 self._logger.debug(
                     "Registered running team execution (sync)",
                     run_id=data.run_id,
@@ -214,9 +228,6 @@ class SupervisorRuntimeService:
                     team_result.total_time,
                     len(team_result.agent_results),
                 )
-
-                # Give SSE handler time to process the completed event before cleanup
-                await asyncio.sleep(0.1)
             except Exception as exc:  # pragma: no cover - streaming error path
                 self._logger.exception(
                     "Coordination workflow failed during streaming",
@@ -235,7 +246,37 @@ class SupervisorRuntimeService:
                 cleanup_event_emitter(request_id, correlation_id)
 
         asyncio.create_task(coordination_task())
-        return create_sse_response(event_emitter, http_request)
+        return create_sse_response(
+            event_emitter,
+            http_request,
+            compact_encoder=encoder_for_format(payload.stream_format, payload.stream_coalesce_deltas),
+        )
+
+    async def resume_stream(
+        self,
+        project_id: uuid.UUID,
+        stream_id: str,
+        last_seq: int,
+        http_request,
+        stream_format: str = "json",
+        coalesce_deltas: bool = True,
+    ):
+        """Continue a stream after the event with sequence number ``last_seq`` (Last-Event-ID)."""
+        from_seq = last_seq + 1
+        compact_encoder = encoder_for_format(stream_format, coalesce_deltas)
+        emitter = find_event_emitter(stream_id)
+        if emitter is not None and emitter.project_id == str(project_id):
+            self._logger.info("Resuming stream from local buffer", stream_id=stream_id, from_seq=from_seq)
+            return create_sse_response(emitter, http_request, from_seq=from_seq, compact_encoder=compact_encoder)
+
+        stream_store = get_stream_store()
+        if stream_store is not None:
+            emitter = await stream_store.attach(str(project_id), stream_id, from_seq)
+            if emitter is not None:
+                self._logger.info("Resuming stream from Redis", stream_id=stream_id, from_seq=from_seq)
+                return create_sse_response(emitter, http_request, from_seq=from_seq, compact_encoder=compact_encoder)
+
+        raise NotFoundError("Stream", details={"stream_id": stream_id})
 
 
     # ------------------------------------------------------------------
@@ -243,20 +284,33 @@ class SupervisorRuntimeService:
     async def cancel(self, run_id: str, project_id: uuid.UUID, reason: Optional[str] = None) -> bool:
         """Cancel a running team execution by run_id.
 
+        Runs owned by another replica are cancelled through the run registry.
         Returns True if a cancellation signal was sent, False if not found or not permitted.
         """
+        async with self._runs_lock:
+            is_local = run_id in self._runs
+        if not is_local and self._run_registry is not None:
+            try:
+                return await self._run_registry.request_cancel(run_id, str(project_id), reason)
+            except Exception as exc:
+                self._logger.warning("Cancel forwarding failed", run_id=run_id, error=str(exc))
+                return False
+        return await self._cancel_local(run_id, str(project_id), reason)
+
+    async def _cancel_local(self, run_id: str, project_id: str, reason: Optional[str] = None) -> bool:
+        """Cancel a team execution running in this process."""
         # Validate ownership and fetch entry under lock
         async with self._runs_lock:
             entry = self._runs.get(run_id)
         if entry is None:
             self._logger.info("Cancel requested for unknown run_id", run_id=run_id)
             return False
-        if str(project_id) != entry.project_id:
+        if project_id != entry.project_id:
             self._logger.warning(
                 "Cancel forbidden: project mismatch",
                 run_id=run_id,
                 expected_project_id=entry.project_id,
-                got_project_id=str(project_id),
+                got_project_id=project_id,
             )
             return False
 
@@ -299,6 +353,8 @@ class SupervisorRuntimeService:
                     team_id=entry.team_id,
                     request_id=entry.request_id,
                 )
+        if self._run_registry is not None:
+            await self._run_registry.unregister(run_id)
 
     # ------------------------------------------------------------------
     # Helpers
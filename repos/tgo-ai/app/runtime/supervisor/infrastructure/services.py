@@ -857,6 +857,7 @@ class AgentServiceClient:
                         error = final_response.error
                         if final_response.content:
                             content_chunks.append(final_response.content)
+                await workflow_events.drain()
 
             self.logger.debug(
                 "Agent streaming completed",
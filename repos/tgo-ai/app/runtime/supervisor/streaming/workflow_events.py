@@ -40,6 +40,10 @@ class WorkflowEventEmitter:
     def __init__(self, event_emitter: StreamingEventEmitter):
         self.emitter = event_emitter
     
+    async def drain(self) -> None:
+        """Wait while stream subscribers are too far behind (producer backpressure)."""
+        await self.emitter.drain()
+    
     def emit_workflow_started(self, request: CoordinationRequest) -> None:
         """Emit workflow started event."""
         data = WorkflowStartedData(
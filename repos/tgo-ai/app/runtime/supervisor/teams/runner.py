@@ -33,6 +33,7 @@ from app.models.internal import CoordinationContext
 from app.schemas.agent_run import SupervisorRunResponse, SupervisorMetadata, AgentExecutionResult
 from app.runtime.supervisor.streaming.workflow_events import WorkflowEventEmitter
 from app.core.logging import get_logger
+from app.services.usage_telemetry import usage_telemetry
 
 from .builder import BuiltTeam
 
@@ -55,6 +56,7 @@ class MemberStreamState:
     role: Optional[str]
     run_id: str
     chunk_index: int = 0
+    started_at: float = 0.0
 
 
 @dataclass
@@ -64,6 +66,7 @@ class StreamCollector:
     team_id: str
     team_name: str
     session_id: Optional[str]
+    project_id: Optional[str] = None
     team_run_id: Optional[str] = None
     team_run_event: Optional[TeamRunCompletedEvent] = None
     final_member_event: Optional[AgentRunCompletedEvent] = None
@@ -83,6 +86,7 @@ class AgnoTeamRunner:
         output = await built_team.team.arun(context.message)
         total_time = time.time() - start_time
 
+        self._record_member_usage(output.member_responses, context)
         agent_results = self._convert_member_responses(output.member_responses, context)
         final_content = output.get_content_as_string() if output.content is not None else ""
 
@@ -115,7 +119,13 @@ class AgnoTeamRunner:
         team_name = context.team.name or "Supervisor Coordination Team"
         session_id = context.session_id
 
-        collector = StreamCollector(team_id=team_id, team_name=team_name, session_id=session_id, started_at=start_time)
+        collector = StreamCollector(
+            team_id=team_id,
+            team_name=team_name,
+            session_id=session_id,
+            project_id=context.project_id,
+            started_at=start_time,
+        )
 
         async for event in built_team.team.arun(
             context.message,
@@ -133,6 +143,7 @@ class AgnoTeamRunner:
                 context=context,
                 workflow_events=workflow_events,
             )
+            await workflow_events.drain()
 
         total_time = time.time() - start_time
 
@@ -172,6 +183,53 @@ class AgnoTeamRunner:
             results.append(self._run_output_to_execution_result(response, context))
         return results
 
+    @staticmethod
+    def _elapsed_ms(metrics: Any) -> Optional[int]:
+        """Duration in ms from agno run/tool metrics, if reported."""
+        if metrics is None:
+            return None
+        seconds = getattr(metrics, "duration", None)
+        if seconds is None:
+            seconds = getattr(metrics, "total_elapsed_time", None)
+        return int(float(seconds) * 1000) if seconds is not None else None
+
+    def _record_member_usage(self, member_responses: Optional[List[Any]], context: CoordinationContext) -> None:
+        """Usage telemetry for the members of a non-streaming team run."""
+        for response in member_responses or []:
+            agent_id = getattr(response, "agent_id", None)
+            if agent_id is None:
+                continue
+            usage_telemetry.record_agent(
+                project_id=context.project_id,
+                agent_id=str(agent_id),
+                duration_ms=self._elapsed_ms(getattr(response, "metrics", None)),
+                success=getattr(response, "status", None) != RunStatus.error,
+            )
+            for tool in getattr(response, "tools", None) or []:
+                self._record_tool_usage(tool, context.project_id, str(agent_id), context.session_id, context.user_id)
+
+    def _record_tool_usage(
+        self,
+        tool: Any,
+        project_id: Optional[str],
+        agent_id: str,
+        session_id: Optional[str],
+        user_id: Optional[str],
+    ) -> None:
+        duration_ms = self._elapsed_ms(getattr(tool, "metrics", None))
+        failed = bool(getattr(tool, "tool_call_error", False))
+        usage_telemetry.record_tool(
+            project_id=project_id,
+            agent_id=agent_id,
+            tool_name=f"agent:{getattr(tool, 'tool_name', None) or 'tool'}",
+            started_at=float(getattr(tool, "created_at", None) or time.time()),
+            duration_ms=duration_ms or 0,
+            status="error" if failed else "success",
+            error_message=self._ensure_text(getattr(tool, "result", None)) if failed else None,
+            session_id=session_id,
+            user_id=user_id,
+        )
+
     @staticmethod
     def _ensure_text(value: Optional[Any]) -> str:
         if value is None:
@@ -375,6 +433,7 @@ class AgnoTeamRunner:
     ) -> None:
         state = self._ensure_member_state(event, collector, built_team)
         state.chunk_index = 0
+        state.started_at = time.time()
 
         workflow_events.emit_team_member_started(
             team_id=collector.team_id,
@@ -441,6 +500,8 @@ class AgnoTeamRunner:
     ) -> None:
         state = self._ensure_member_state(event, collector, built_team)
         tool_name, tool_call_id, tool_input, tool_output = self._extract_tool_details(event)
+        if getattr(event, "tool", None) is not None:
+            self._record_tool_usage(event.tool, collector.project_id, state.member_id, collector.session_id, None)
 
         workflow_events.emit_team_member_tool_call_completed(
             team_id=collector.team_id,
@@ -531,6 +592,12 @@ class AgnoTeamRunner:
             self._ensure_text(getattr(event, "error", None) or getattr(event, "content", None))
             or "Agent execution failed"
         )
+        usage_telemetry.record_agent(
+            project_id=collector.project_id,
+            agent_id=state.member_id,
+            duration_ms=int((time.time() - state.started_at) * 1000) if state.started_at else None,
+            success=False,
+        )
 
         workflow_events.emit_team_member_failed(
             team_id=collector.team_id,
@@ -558,6 +625,15 @@ class AgnoTeamRunner:
 
         response_length = len(final_chunk) if final_chunk else None
 
+        duration_ms = self._elapsed_ms(getattr(event, "metrics", None))
+        if duration_ms is None and state.started_at:
+            duration_ms = int((time.time() - state.started_at) * 1000)
+        usage_telemetry.record_agent(
+            project_id=collector.project_id,
+            agent_id=state.member_id,
+            duration_ms=duration_ms,
+        )
+
         workflow_events.emit_team_member_completed(
             team_id=collector.team_id,
             team_name=collector.team_name,
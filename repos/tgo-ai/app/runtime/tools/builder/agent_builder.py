@@ -756,7 +756,12 @@ class AgentBuilder:
         tools: List[Any] = []
 
         try:
-            tools.extend(await self._build_rag_tools(config.rag))
+            tools.extend(await self._build_rag_tools(
+                config.rag,
+                agent_id=str(internal_agent.id) if internal_agent else None,
+                session_id=session_id,
+                user_id=user_id,
+            ))
         except Exception as exc:  # noqa: BLE001
             self._logger.warning(
                 "RAG tool setup failed, continuing without RAG tools",
@@ -950,7 +955,13 @@ class AgentBuilder:
         )
         return Skills(loaders=loaders)
 
-    async def _build_rag_tools(self, rag_config: Optional[RagConfig]) -> List[Any]:
+    async def _build_rag_tools(
+        self,
+        rag_config: Optional[RagConfig],
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Any]:
         if not rag_config or not rag_config.rag_url or not rag_config.collections:
             return []
 
@@ -962,6 +973,9 @@ class AgentBuilder:
                     collection,
                     project_id=rag_config.project_id,
                     filters=rag_config.filters,
+                    agent_id=agent_id,
+                    session_id=session_id,
+                    user_id=user_id,
                 )
                 tools.append(tool)
             except Exception as exc:  # noqa: BLE001
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import time
 from builtins import ExceptionGroup
 from functools import wraps
 from typing import Any, Dict, List, Optional
@@ -13,9 +14,20 @@ from agno.tools import Function
 from mcp import ClientSession, McpError, Tool
 from mcp.client.streamable_http import streamablehttp_client
 
+from app.services.usage_telemetry import usage_telemetry
 
-async def create_rag_tool(rag_url: str, collection_id: str, project_id: Optional[str], filters: Optional[Dict[str, Any]] = None) -> Function:
-    """根据集合信息生成RAG查询工具."""
+
+async def create_rag_tool(
+    rag_url: str,
+    collection_id: str,
+    project_id: Optional[str],
+    filters: Optional[Dict[str, Any]] = None,
+    *,
+    agent_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Function:
+    """根据集合信息生成RAG查询工具 (agent/session/user are recorded in usage telemetry)."""
 
     if not project_id:
         raise ValueError("project_id is required to create RAG tools")
@@ -44,6 +56,17 @@ async def create_rag_tool(rag_url: str, collection_id: str, project_id: Optional
     async def search_collection(query: str) -> str:
         search_endpoint = f"{url}/v1/collections/{collection_id}/documents/search"
         payload = {"query": query, "limit": 10, "filters": filters}
+        started_at = time.time()
+        start = time.perf_counter()
+        usage = {
+            "project_id": str(project_id),
+            "agent_id": agent_id,
+            "collection_id": collection_id,
+            "query_text": query,
+            "started_at": started_at,
+            "session_id": session_id,
+            "user_id": user_id,
+        }
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.post(
@@ -54,9 +77,23 @@ async def create_rag_tool(rag_url: str, collection_id: str, project_id: Optional
                     search_response.raise_for_status()
                     data = await search_response.json()
         except Exception as exc:  # noqa: BLE001 - 需要返回错误信息
+            usage_telemetry.record_collection(
+                duration_ms=int((time.perf_counter() - start) * 1000),
+                status="error",
+                error_message=str(exc),
+                **usage,
+            )
             return f"<error>{exc}</error>"
 
         documents = data.get("results", [])
+        scores = [float(doc["relevance_score"]) for doc in documents if doc.get("relevance_score") is not None]
+        usage_telemetry.record_collection(
+            duration_ms=int((time.perf_counter() - start) * 1000),
+            documents_retrieved=len(documents),
+            max_relevance_score=max(scores) if scores else None,
+            avg_relevance_score=round(sum(scores) / len(scores), 4) if scores else None,
+            **usage,
+        )
         if not documents:
             return "<documents />"
 
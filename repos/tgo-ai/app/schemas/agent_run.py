@@ -83,6 +83,17 @@ class SupervisorRunRequest(BaseSchema):
         default=False,
         description="Enable streaming response with real-time events",
     )
+    stream_format: Literal["json", "compact"] = Field(
+        default="json",
+        description=(
+            "SSE wire format when streaming: 'json' sends a full StreamingEvent per SSE; 'compact' sends a "
+            "run header once, then batched frames of terse event codes with minimal content deltas"
+        ),
+    )
+    stream_coalesce_deltas: bool = Field(
+        default=True,
+        description="Compact format only: merge consecutive content deltas of the same run/member per frame",
+    )
     mcp_url: Optional[str] = Field(
         default=None,
         description="URL of the MCP server for tool integration",
@@ -1,4 +1,5 @@
 import json
+import time
 import uuid
 import httpx
 from typing import Any, Dict, List, Optional
@@ -8,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tool import Tool, ToolType, ToolSourceType
 from app.services.rag_service import rag_service_client
 from app.services.api_service import api_service_client
+from app.services.usage_telemetry import usage_telemetry
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 from app.core.logging import get_logger
@@ -89,6 +91,13 @@ class ToolExecutor:
             except json.JSONDecodeError:
                 return f"<error>Invalid JSON arguments for tool '{tool_name}'</error>"
 
+        started_at = time.time()
+        start = time.perf_counter()
+        result = await self._execute(tool_name, tool_type, info, args)
+        self._record_usage(tool_name, tool_type, info, args, result, started_at, time.perf_counter() - start)
+        return result
+
+    async def _execute(self, tool_name: str, tool_type: str, info: Dict[str, Any], args: Any) -> str:
         try:
             if tool_type == "rag":
                 return await self._execute_rag(info["id"], args)
@@ -110,6 +119,37 @@ class ToolExecutor:
             logger.error(f"Error executing tool {tool_name}: {str(e)}", exc_info=True)
             return f"<error>{str(e)}</error>"
 
+    def _record_usage(
+        self,
+        tool_name: str,
+        tool_type: str,
+        info: Dict[str, Any],
+        args: Any,
+        result: str,
+        started_at: float,
+        elapsed: float,
+    ) -> None:
+        failed = isinstance(result, str) and result.startswith("<error>")
+        common = {
+            "project_id": str(self.project_id),
+            "agent_id": self._context.get("agent_id"),
+            "started_at": started_at,
+            "duration_ms": int(elapsed * 1000),
+            "status": "error" if failed else "success",
+            "error_message": result.removeprefix("<error>").removesuffix("</error>") if failed else None,
+            "session_id": self._context.get("session_id"),
+            "user_id": self._context.get("visitor_id"),
+        }
+        if tool_type == "rag":
+            usage_telemetry.record_collection(
+                collection_id=info["id"],
+                query_text=args.get("query") if isinstance(args, dict) else None,
+                documents_retrieved=0 if failed else result.count("<document "),
+                **common,
+            )
+        else:
+            usage_telemetry.record_tool(tool_name=f"{tool_type}:{tool_name}", **common)
+
     async def _execute_rag(self, collection_id: str, args: Dict[str, Any]) -> str:
         query = args.get("query")
         if not query:
@@ -0,0 +1,413 @@
+"""Write-behind usage telemetry for tools, RAG collections and agents.
+
+Runtime hooks (``ToolExecutor``, the RAG search tools and ``AgnoTeamRunner``)
+call the ``record_*`` methods of the shared ``usage_telemetry`` instance. A
+call only appends a small event to a bounded in-memory buffer; when the buffer
+is full the oldest events are dropped and counted.
+
+``flush()`` runs periodically from ``app.tasks.usage_flush`` and:
+
+- bulk-inserts tool and collection events as ``ToolUsageRecord`` /
+  ``CollectionUsageRecord`` rows;
+- rolls agent events up into hourly and daily ``AgentUsageRecord`` rows;
+- feeds per tool / collection / agent latency windows, from which
+  ``latency_summary()`` reports p50 and p95. Windows without events for
+  ``usage_latency_window_idle_seconds`` are dropped, so tools, collections
+  and agents that are no longer used do not accumulate.
+
+Usage rows reference an agent, so events without a known agent id are kept
+in the latency windows only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.database import AsyncSessionLocal
+from app.models.agent import Agent
+from app.models.usage import AgentUsageRecord, CollectionUsageRecord, ToolUsageRecord
+
+logger = get_logger("services.usage_telemetry")
+
+_PERIODS = {"hourly": timedelta(hours=1), "daily": timedelta(days=1)}
+
+
+@dataclass(slots=True)
+class ToolUsageEvent:
+    project_id: Optional[str]
+    agent_id: Optional[str]
+    tool_name: str
+    started_at: float
+    duration_ms: int
+    status: str
+    error_message: Optional[str] = None
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CollectionUsageEvent:
+    project_id: Optional[str]
+    agent_id: Optional[str]
+    collection_id: str
+    query_text: Optional[str]
+    started_at: float
+    duration_ms: int
+    status: str
+    documents_retrieved: int = 0
+    max_relevance_score: Optional[float] = None
+    avg_relevance_score: Optional[float] = None
+    error_message: Optional[str] = None
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class AgentUsageEvent:
+    project_id: Optional[str]
+    agent_id: Optional[str]
+    finished_at: float
+    duration_ms: Optional[int]
+    success: bool
+
+
+class _LatencyWindow:
+    """The most recent durations of one tool, collection or agent."""
+
+    __slots__ = ("samples", "count", "errors", "last_seen")
+
+    def __init__(self, size: int) -> None:
+        self.samples: Deque[int] = deque(maxlen=size)
+        self.count = 0
+        self.errors = 0
+        self.last_seen = 0.0
+
+    def add(self, duration_ms: Optional[int], ok: bool) -> None:
+        self.last_seen = time.monotonic()
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        if duration_ms is not None:
+            self.samples.append(duration_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+        }
+
+
+def _percentile(ordered: List[int], q: float) -> Optional[int]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _as_uuid(value: Optional[str]) -> Optional[uuid.UUID]:
+    if not value:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _utc(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+def _period_start(ts: float, aggregation: str) -> datetime:
+    dt = _utc(ts).replace(minute=0, second=0, microsecond=0)
+    return dt.replace(hour=0) if aggregation == "daily" else dt
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class _AgentRollup:
+    __slots__ = ("requests", "successes", "timed", "total_ms", "last_at")
+
+    def __init__(self) -> None:
+        self.requests = self.successes = self.timed = self.total_ms = 0
+        self.last_at = 0.0
+
+    def add(self, event: AgentUsageEvent) -> None:
+        self.requests += 1
+        self.successes += 1 if event.success else 0
+        if event.duration_ms is not None:
+            self.timed += 1
+            self.total_ms += event.duration_ms
+        self.last_at = max(self.last_at, event.finished_at)
+
+
+class UsageTelemetry:
+    """In-memory usage buffers with batched persistence and latency windows."""
+
+    def __init__(self, max_buffered: Optional[int] = None, window_size: Optional[int] = None) -> None:
+        size = max(1, max_buffered or settings.usage_buffer_max_events)
+        self._tools: Deque[ToolUsageEvent] = deque(maxlen=size)
+        self._collections: Deque[CollectionUsageEvent] = deque(maxlen=size)
+        self._agents: Deque[AgentUsageEvent] = deque(maxlen=size)
+        self._window_size = max(1, window_size or settings.usage_latency_window_size)
+        self._windows: Dict[Tuple[str, str, str], _LatencyWindow] = {}
+        self._flush_lock = asyncio.Lock()
+        self.dropped = 0
+
+    # ------------------------------------------------------------------
+    # Hot path: append only
+    def _append(self, buffer: Deque[Any], event: Any) -> None:
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(event)
+
+    def record_tool(
+        self,
+        *,
+        project_id: Optional[str],
+        agent_id: Optional[str],
+        tool_name: str,
+        started_at: float,
+        duration_ms: int,
+        status: str = "success",
+        error_message: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        if settings.usage_telemetry_enabled:
+            self._append(self._tools, ToolUsageEvent(
+                project_id, agent_id, tool_name, started_at, duration_ms, status,
+                error_message, session_id, user_id,
+            ))
+
+    def record_collection(
+        self,
+        *,
+        project_id: Optional[str],
+        agent_id: Optional[str],
+        collection_id: str,
+        query_text: Optional[str],
+        started_at: float,
+        duration_ms: int,
+        status: str = "success",
+        documents_retrieved: int = 0,
+        max_relevance_score: Optional[float] = None,
+        avg_relevance_score: Optional[float] = None,
+        error_message: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        if settings.usage_telemetry_enabled:
+            self._append(self._collections, CollectionUsageEvent(
+                project_id, agent_id, collection_id, query_text, started_at, duration_ms, status,
+                documents_retrieved, max_relevance_score, avg_relevance_score,
+                error_message, session_id, user_id,
+            ))
+
+    def record_agent(
+        self,
+        *,
+        project_id: Optional[str],
+        agent_id: Optional[str],
+        duration_ms: Optional[int],
+        success: bool = True,
+    ) -> None:
+        if settings.usage_telemetry_enabled:
+            self._append(self._agents, AgentUsageEvent(project_id, agent_id, time.time(), duration_ms, success))
+
+    # ------------------------------------------------------------------
+    # Reporting
+    @property
+    def buffered(self) -> int:
+        return len(self._tools) + len(self._collections) + len(self._agents)
+
+    def latency_summary(self, project_id: Optional[str] = None) -> Dict[str, Any]:
+        """p50/p95 per tool, collection and agent over the recent latency windows."""
+        result: Dict[str, Any] = {"tools": {}, "collections": {}, "agents": {}}
+        for (project, kind, name), window in self._windows.items():
+            if project_id is None or project == project_id:
+                result[kind][name] = window.summary()
+        result["buffered_events"] = self.buffered
+        result["dropped_events"] = self.dropped
+        return result
+
+    def _observe(self, kind: str, project_id: Optional[str], name: Optional[str],
+                 duration_ms: Optional[int], ok: bool) -> None:
+        key = (project_id or "", kind, name or "unknown")
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _LatencyWindow(self._window_size)
+        window.add(duration_ms, ok)
+
+    def _prune_windows(self) -> None:
+        cutoff = time.monotonic() - settings.usage_latency_window_idle_seconds
+        for key in [key for key, window in self._windows.items() if window.last_seen < cutoff]:
+            del self._windows[key]
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    async def flush(self) -> int:
+        """Persist everything buffered so far; returns the number of events processed."""
+        async with self._flush_lock:
+            tools, self._tools = list(self._tools), deque(maxlen=self._tools.maxlen)
+            collections, self._collections = list(self._collections), deque(maxlen=self._collections.maxlen)
+            agents, self._agents = list(self._agents), deque(maxlen=self._agents.maxlen)
+            self._prune_windows()
+            if not (tools or collections or agents):
+                return 0
+
+            for t in tools:
+                self._observe("tools", t.project_id, t.tool_name, t.duration_ms, t.status == "success")
+            for c in collections:
+                self._observe("collections", c.project_id, c.collection_id, c.duration_ms, c.status == "success")
+            for a in agents:
+                self._observe("agents", a.project_id, a.agent_id, a.duration_ms, a.success)
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    known_agents = await self._known_agents(session, [*tools, *collections, *agents])
+                    await self._insert_tool_rows(session, tools, known_agents)
+                    await self._insert_collection_rows(session, collections, known_agents)
+                    await self._rollup_agents(session, agents, known_agents)
+                    await session.commit()
+            except Exception as e:
+                # Telemetry must never back up into the runtime: drop the batch
+                logger.warning(
+                    "Usage telemetry flush failed; batch dropped",
+                    tools=len(tools),
+                    collections=len(collections),
+                    agents=len(agents),
+                    error=str(e),
+                )
+            return len(tools) + len(collections) + len(agents)
+
+    @staticmethod
+    async def _known_agents(session: AsyncSession, events: List[Any]) -> set:
+        ids = {agent_id for e in events if (agent_id := _as_uuid(e.agent_id)) is not None}
+        if not ids:
+            return set()
+        res = await session.execute(select(Agent.id).where(Agent.id.in_(ids)))
+        return set(res.scalars().all())
+
+    @staticmethod
+    def _owner(event: Any, known_agents: set) -> Optional[Tuple[uuid.UUID, uuid.UUID]]:
+        project_id = _as_uuid(event.project_id)
+        agent_id = _as_uuid(event.agent_id)
+        if project_id is None or agent_id not in known_agents:
+            return None
+        return project_id, agent_id
+
+    async def _insert_tool_rows(self, session: AsyncSession, events: List[ToolUsageEvent], known_agents: set) -> None:
+        rows = []
+        for e in events:
+            owner = self._owner(e, known_agents)
+            if owner is None:
+                continue
+            rows.append({
+                "project_id": owner[0],
+                "agent_id": owner[1],
+                "tool_name": e.tool_name[:355],
+                "session_id": e.session_id,
+                "user_id": e.user_id,
+                "execution_status": e.status,
+                "error_message": e.error_message,
+                "execution_duration_ms": e.duration_ms,
+                "started_at": _utc(e.started_at),
+                "completed_at": _utc(e.started_at + e.duration_ms / 1000),
+            })
+        for chunk in _chunks(rows, settings.usage_flush_batch_size):
+            await session.execute(insert(ToolUsageRecord), chunk)
+
+    async def _insert_collection_rows(
+        self, session: AsyncSession, events: List[CollectionUsageEvent], known_agents: set
+    ) -> None:
+        rows = []
+        for e in events:
+            owner = self._owner(e, known_agents)
+            if owner is None:
+                continue
+            rows.append({
+                "project_id": owner[0],
+                "agent_id": owner[1],
+                "collection_id": e.collection_id[:36],
+                "session_id": e.session_id,
+                "user_id": e.user_id,
+                "query_text": e.query_text,
+                "documents_retrieved": e.documents_retrieved,
+                "max_relevance_score": e.max_relevance_score,
+                "avg_relevance_score": e.avg_relevance_score,
+                "query_duration_ms": e.duration_ms,
+                "query_status": e.status,
+                "error_message": e.error_message,
+                "started_at": _utc(e.started_at),
+                "completed_at": _utc(e.started_at + e.duration_ms / 1000),
+            })
+        for chunk in _chunks(rows, settings.usage_flush_batch_size):
+            await session.execute(insert(CollectionUsageRecord), chunk)
+
+    async def _rollup_agents(self, session: AsyncSession, events: List[AgentUsageEvent], known_agents: set) -> None:
+        buckets: Dict[Tuple[uuid.UUID, uuid.UUID, str, datetime], _AgentRollup] = {}
+        for e in events:
+            owner = self._owner(e, known_agents)
+            if owner is None:
+                continue
+            for aggregation in _PERIODS:
+                key = (*owner, aggregation, _period_start(e.finished_at, aggregation))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = _AgentRollup()
+                bucket.add(e)
+
+        record = AgentUsageRecord
+        table = record.__table__
+        for (project_id, agent_id, aggregation, period_start), b in buckets.items():
+            stmt = pg_insert(record).values(
+                project_id=project_id,
+                agent_id=agent_id,
+                request_count=b.requests,
+                success_count=b.successes,
+                failure_count=b.requests - b.successes,
+                avg_response_time_ms=b.total_ms // b.timed if b.timed else None,
+                last_request_time=_utc(b.last_at),
+                period_start=period_start,
+                period_end=period_start + _PERIODS[aggregation],
+                aggregation_type=aggregation,
+            )
+            avg = table.c.avg_response_time_ms
+            if b.timed:
+                # Weight the stored average by the requests it already covers
+                weight = case((avg.is_(None), 0), else_=table.c.request_count)
+                avg = (func.coalesce(avg, 0) * weight + b.total_ms) / (weight + b.timed)
+            # Concurrent flushes (other processes) add to the same row atomically
+            await session.execute(stmt.on_conflict_do_update(
+                constraint="uq_ai_agent_usage_records_period",
+                set_={
+                    "request_count": table.c.request_count + stmt.excluded.request_count,
+                    "success_count": table.c.success_count + stmt.excluded.success_count,
+                    "failure_count": table.c.failure_count + stmt.excluded.failure_count,
+                    "avg_response_time_ms": avg,
+                    "last_request_time": func.greatest(
+                        table.c.last_request_time, stmt.excluded.last_request_time
+                    ),
+                    "updated_at": func.now(),
+                },
+            ))
+
+# Shared by all runtime hooks in this process
+usage_telemetry = UsageTelemetry()
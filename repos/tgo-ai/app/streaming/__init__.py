@@ -5,12 +5,13 @@ This module provides the core streaming functionality for real-time
 coordination workflow events.
 """
 
-from .event_emitter import EventEmitter, StreamingEventEmitter
+from .event_emitter import EventEmitter, EventSubscription, StreamingEventEmitter
 from .sse_handler import SSEHandler, SSEResponse
 from .stream_manager import StreamManager, StreamingSession
 
 __all__ = [
     "EventEmitter",
+    "EventSubscription",
     "StreamingEventEmitter", 
     "SSEHandler",
     "SSEResponse",
@@ -0,0 +1,178 @@
+"""
+Compact SSE wire format for supervisor streams (``stream_format="compact"``).
+
+The default format sends every event as a full ``StreamingEvent`` JSON
+document, which for single-token deltas is many times larger than the token.
+The compact format sends:
+
+- One run header per connection::
+
+      event: h
+      data: {"v":1,"sid":...,"rid":...,"cid":...,"codes":{...},"deltas":{...}}
+
+  ``codes`` maps short event codes to event types and ``deltas`` maps the
+  short field names of content-delta items to their ``data`` field names, so
+  decoders need no hard-coded tables.
+
+- One SSE message per batch of events; its ``id`` is the sequence id of the
+  last event in the batch (usable as ``Last-Event-ID``)::
+
+      id: <stream_id>:<seq>
+      data: [{"t":"trc","r":"run-1","c":"Hel"},{"t":"trs","d":{...}}]
+
+  Content deltas carry only the text and the ids needed to route it
+  (consecutive deltas of the same run/member are merged when coalescing is
+  enabled); other events carry ``d`` (event data without null fields) and,
+  when not default, ``s`` (severity) and ``m`` (metadata).
+
+Items are serialized with orjson.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from app.models.streaming import EventSeverity, EventType
+
+COMPACT_FORMAT_VERSION = 1
+
+_TERMINAL_EVENT_TYPES = {EventType.WORKFLOW_COMPLETED.value, EventType.WORKFLOW_FAILED.value}
+
+
+def _build_codes() -> Dict[str, str]:
+    """event type -> code: initials of the words, numbered on collisions (declaration order)."""
+    codes: Dict[str, str] = {}
+    used: set = set()
+    for event_type in EventType:
+        base = "".join(word[0] for word in event_type.value.split("_"))
+        code, n = base, 2
+        while code in used:
+            code, n = f"{base}{n}", n + 1
+        used.add(code)
+        codes[event_type.value] = code
+    return codes
+
+
+EVENT_CODES: Dict[str, str] = _build_codes()
+
+# Content-delta events: short item key -> data field
+DELTA_FIELDS: Dict[str, Dict[str, str]] = {
+    EventType.TEAM_RUN_CONTENT.value: {
+        "c": "content",
+        "r": "run_id",
+        "rc": "reasoning_content",
+        "i": "is_intermediate",
+    },
+    EventType.TEAM_MEMBER_CONTENT.value: {
+        "c": "content_chunk",
+        "r": "run_id",
+        "m": "member_id",
+    },
+    EventType.AGENT_CONTENT_CHUNK.value: {
+        "c": "content_chunk",
+        "x": "execution_id",
+        "a": "agent_id",
+    },
+}
+
+_HEADER_DELTAS = {EVENT_CODES[event_type]: fields for event_type, fields in DELTA_FIELDS.items()}
+_HEADER_CODES = {code: event_type for event_type, code in EVENT_CODES.items()}
+
+
+def _event_parts(event: Any) -> Tuple[str, Any, str, Dict[str, Any]]:
+    """(event type, data, severity, metadata) of a StreamingEvent or its serialized dict."""
+    if isinstance(event, dict):
+        return (
+            str(event.get("event_type")),
+            event.get("data") or {},
+            str(event.get("severity") or EventSeverity.INFO.value),
+            event.get("metadata") or {},
+        )
+    # StreamingEvent is configured with use_enum_values
+    return str(event.event_type), event.data, str(event.severity), event.metadata
+
+
+def _data_dict(data: Any) -> Dict[str, Any]:
+    if isinstance(data, dict):
+        return {k: v for k, v in data.items() if v is not None}
+    return data.model_dump(mode="json", exclude_none=True)
+
+
+class CompactStreamEncoder:
+    """Encodes emitter batches into compact SSE messages."""
+
+    def __init__(self, coalesce_deltas: bool = True):
+        self._coalesce = coalesce_deltas
+
+    def header(self, stream_id: str, request_id: str, correlation_id: str, **extra: Any) -> str:
+        """The run header (sent instead of the ``connected`` event); ``extra`` carries resume info."""
+        body = orjson.dumps({
+            "v": COMPACT_FORMAT_VERSION,
+            "sid": stream_id,
+            "rid": request_id,
+            "cid": correlation_id,
+            "codes": _HEADER_CODES,
+            "deltas": _HEADER_DELTAS,
+            **extra,
+        })
+        return f"event: h\ndata: {body.decode()}\n\n"
+
+    def encode_batch(self, stream_id: str, batch: Sequence[Tuple[int, Any]]) -> Tuple[str, bool]:
+        """Encode a batch as one SSE message; returns (message, saw terminal event).
+
+        Events after a terminal workflow event are not sent.
+        """
+        items: List[Dict[str, Any]] = []
+        last_seq = batch[0][0]
+        terminal = False
+        for seq, event in batch:
+            last_seq = seq
+            event_type, data, severity, metadata = _event_parts(event)
+            item = self._encode_event(event_type, data, severity, metadata)
+            if not (self._coalesce and self._merge(items, item)):
+                items.append(item)
+            if event_type in _TERMINAL_EVENT_TYPES:
+                terminal = True
+                break
+        body = orjson.dumps(items, default=str).decode()
+        return f"id: {stream_id}:{last_seq}\ndata: {body}\n\n", terminal
+
+    @staticmethod
+    def _encode_event(event_type: str, data: Any, severity: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        code = EVENT_CODES.get(event_type, event_type)
+        fields = DELTA_FIELDS.get(event_type)
+        if fields is not None:
+            item: Dict[str, Any] = {"t": code}
+            get = data.get if isinstance(data, dict) else lambda name: getattr(data, name, None)
+            for key, name in fields.items():
+                value = get(name)
+                if value is not None and value is not False:
+                    item[key] = value
+            return item
+
+        item = {"t": code, "d": _data_dict(data)}
+        if severity != EventSeverity.INFO.value:
+            item["s"] = severity
+        if metadata:
+            item["m"] = metadata
+        return item
+
+    @staticmethod
+    def _merge(items: List[Dict[str, Any]], item: Dict[str, Any]) -> bool:
+        """Append ``item``'s text to the previous item if it is a delta of the same stream."""
+        if not items or "c" not in item or item.keys() - {"t", "c", "r", "m", "x", "a"}:
+            return False
+        prev = items[-1]
+        if "c" not in prev or prev.keys() != item.keys():
+            return False
+        if any(prev[k] != item[k] for k in item if k != "c"):
+            return False
+        prev["c"] += item["c"]
+        return True
+
+
+def encoder_for_format(stream_format: Optional[str], coalesce_deltas: bool = True) -> Optional[CompactStreamEncoder]:
+    """The compact encoder for ``stream_format="compact"``; None for the default JSON format."""
+    if stream_format == "compact":
+        return CompactStreamEncoder(coalesce_deltas=coalesce_deltas)
+    return None
@@ -1,13 +1,23 @@
 """
 Event emitter for streaming coordination workflow events.
+
+Events are kept in a bounded ring buffer with monotonically increasing
+sequence numbers. Streaming consumers read through an ``EventSubscription``
+cursor; events are only discarded once every subscriber has read them, and
+producers ``await drain()`` to wait while the slowest subscriber is more than
+``stream_buffer_size`` events behind, so clients never lose events and
+memory per stream stays bounded. Finished emitters are kept for
+``stream_resume_ttl_seconds`` so dropped clients can resume (Last-Event-ID).
 """
 
 import asyncio
-import json
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
-from uuid import uuid4
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
+from app.config import settings
 from app.core.logging import get_logger
 from app.models.streaming import StreamingEvent, EventType, EventSeverity, BaseEventData
 
@@ -18,11 +28,15 @@ logger = get_logger(__name__)
 class EventEmitter:
     """Base event emitter for coordination workflow events."""
     
-    def __init__(self, request_id: str, correlation_id: str):
+    def __init__(self, request_id: str, correlation_id: str, buffer_size: Optional[int] = None):
         self.request_id = request_id
         self.correlation_id = correlation_id
         self.listeners: Dict[EventType, List[Callable]] = {}
-        self._event_buffer: List[StreamingEvent] = []
+        self._buffer_size = max(1, buffer_size or settings.stream_buffer_size)
+        # Ring buffer of recent events; _first_seq is the sequence number of _event_buffer[0]
+        self._event_buffer: Deque[StreamingEvent] = deque()
+        self._first_seq = 0
+        self._next_seq = 0
         self.logger = logger.bind(
             request_id=request_id,
             correlation_id=correlation_id
@@ -56,8 +70,7 @@ class EventEmitter:
             metadata=metadata or {}
         )
         
-        # Add to buffer
-        self._event_buffer.append(event)
+        self._append(event)
         
         # Notify listeners
         if event_type in self.listeners:
@@ -73,40 +86,141 @@ class EventEmitter:
         
         return event
     
+    def _append(self, event: StreamingEvent) -> int:
+        """Store an event in the ring buffer and return its sequence number."""
+        seq = self._next_seq
+        self._event_buffer.append(event)
+        self._next_seq += 1
+        self._trim()
+        return seq
+    
+    def _trim(self) -> None:
+        """Drop the oldest events beyond the buffer size."""
+        while len(self._event_buffer) > self._buffer_size:
+            self._event_buffer.popleft()
+            self._first_seq += 1
+    
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent event (-1 if none was emitted)."""
+        return self._next_seq - 1
+    
     def get_events(self) -> List[StreamingEvent]:
-        """Get all events from the buffer."""
-        return self._event_buffer.copy()
+        """Get the events still held in the buffer."""
+        return list(self._event_buffer)
     
     def clear_events(self) -> None:
         """Clear the event buffer."""
         self._event_buffer.clear()
+        self._first_seq = self._next_seq
+
+
+class EventSubscription:
+    """A consumer's read cursor into a ``StreamingEventEmitter``."""
+    
+    def __init__(self, emitter: "StreamingEventEmitter", cursor: int):
+        self._emitter = emitter
+        self.cursor = cursor  # Sequence number of the next event to read
+        self.closed = False
+        self.evicted = False
+        self.last_read_at = time.monotonic()
+        self._wakeup = asyncio.Event()
+    
+    @property
+    def lag(self) -> int:
+        """Number of emitted events this subscriber has not read yet."""
+        return self._emitter._next_seq - self.cursor
+    
+    @property
+    def finished(self) -> bool:
+        """True once the subscription is closed or the emitter is closed and fully read."""
+        return self.closed or (self._emitter.is_closed() and self.lag == 0)
+    
+    async def next_batch(
+        self,
+        max_events: int,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[int, StreamingEvent]]:
+        """Wait for unread events and return up to ``max_events`` (seq, event) pairs.
+        
+        Returns an empty list when ``timeout`` elapses without events or the
+        subscription is finished.
+        """
+        while True:
+            self._wakeup.clear()
+            batch = self._emitter._read(self, max_events)
+            if batch or self.finished:
+                return batch
+            try:
+                if timeout is None:
+                    await self._wakeup.wait()
+                else:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return []
+    
+    def notify(self) -> None:
+        self._wakeup.set()
+    
+    def close(self) -> None:
+        """Stop reading; buffered events are no longer held for this subscriber."""
+        if self.closed:
+            return
+        self.closed = True
+        self._wakeup.set()
+        self._emitter._unsubscribe(self)
 
 
 class StreamingEventEmitter(EventEmitter):
     """Event emitter with streaming capabilities."""
     
-    def __init__(self, request_id: str, correlation_id: str):
-        super().__init__(request_id, correlation_id)
+    def __init__(self, request_id: str, correlation_id: str, buffer_size: Optional[int] = None):
+        super().__init__(request_id, correlation_id, buffer_size)
+        # Identifies the stream in SSE event ids ("<stream_id>:<seq>") for resuming
+        self.stream_id = correlation_id
+        self.project_id: Optional[str] = None
         self._streaming_enabled = False
-        self._stream_queue: Optional[asyncio.Queue] = None
+        self._closed = False
+        self._subscriptions: List[EventSubscription] = []
         self._active_streams: List[Any] = []
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._producer_waits = 0
+        self._producer_wait_seconds = 0.0
+        self._evictions = 0
     
     def enable_streaming(self) -> None:
         """Enable streaming mode."""
         self._streaming_enabled = True
-        self._stream_queue = asyncio.Queue()
     
     def disable_streaming(self) -> None:
         """Disable streaming mode."""
         self._streaming_enabled = False
-        self._stream_queue = None
+        self._notify_subscribers()
     
     def is_streaming_enabled(self) -> bool:
         """Check if streaming is enabled."""
         return self._streaming_enabled
     
+    def close(self) -> None:
+        """Mark the stream finished; subscribers still receive the events they have not read."""
+        self._closed = True
+        self._streaming_enabled = False
+        self._writable.set()
+        self._notify_subscribers()
+    
+    def is_closed(self) -> bool:
+        return self._closed
+    
+    def subscribe(self, from_seq: Optional[int] = None) -> EventSubscription:
+        """Create a read cursor starting at ``from_seq`` (default: oldest buffered event)."""
+        cursor = self._first_seq if from_seq is None else min(max(from_seq, self._first_seq), self._next_seq)
+        subscription = EventSubscription(self, cursor)
+        self._subscriptions.append(subscription)
+        return subscription
+    
     def add_stream(self, stream: Any) -> None:
-        """Add a stream to receive events."""
+        """Add a stream with a ``send_event(event)`` method to receive events."""
         if stream not in self._active_streams:
             self._active_streams.append(stream)
     
@@ -128,20 +242,12 @@ class StreamingEventEmitter(EventEmitter):
         return event
     
     def _send_to_streams(self, event: StreamingEvent) -> None:
-        """Send event to all active streams."""
-        if self._stream_queue:
-            try:
-                self._stream_queue.put_nowait(event)
-            except asyncio.QueueFull:
-                self.logger.warning("Stream queue is full, dropping event")
+        """Wake subscribers and push the event to active streams."""
+        self._notify_subscribers()
         
-        # Send to active streams
         for stream in self._active_streams[:]:  # Copy to avoid modification during iteration
             try:
-                if hasattr(stream, 'send_event'):
-                    stream.send_event(event)
-                elif hasattr(stream, 'put_nowait'):
-                    stream.put_nowait(event)
+                stream.send_event(event)
             except Exception as e:
                 self.logger.error(
                     "Failed to send event to stream",
@@ -150,31 +256,111 @@ class StreamingEventEmitter(EventEmitter):
                 # Remove failed stream
                 self._active_streams.remove(stream)
     
-    async def get_next_event(self, timeout: Optional[float] = None) -> Optional[StreamingEvent]:
-        """Get the next event from the stream queue."""
-        if not self._stream_queue:
-            return None
+    def _append_replayed(self, seq: int, payload: Dict[str, Any]) -> None:
+        """Append an already-serialized event with a known sequence number (stream replay)."""
+        if seq > self._next_seq and not self._event_buffer:
+            # The oldest entries were already trimmed from the store
+            self._first_seq = self._next_seq = seq
+        self._append(payload)  # type: ignore[arg-type]
+        self._notify_subscribers()
+    
+    def _notify_subscribers(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.notify()
+    
+    def _min_cursor(self) -> int:
+        return min((s.cursor for s in self._subscriptions), default=self._next_seq)
+    
+    def _trim(self) -> None:
+        """Drop the oldest events beyond the buffer size that every subscriber has read."""
+        floor = self._min_cursor()
+        while len(self._event_buffer) > self._buffer_size and self._first_seq < floor:
+            self._event_buffer.popleft()
+            self._first_seq += 1
+    
+    def _read(self, subscription: EventSubscription, max_events: int) -> List[Tuple[int, StreamingEvent]]:
+        if subscription.closed:
+            return []
+        # Late subscribers start at the oldest event still buffered
+        start = max(subscription.cursor, self._first_seq)
+        offset = start - self._first_seq
+        events = list(islice(self._event_buffer, offset, offset + max_events))
+        if not events:
+            return []
+        subscription.cursor = start + len(events)
+        subscription.last_read_at = time.monotonic()
+        self._trim()
+        if self.max_lag() <= self._buffer_size:
+            self._writable.set()
+        return [(start + i, event) for i, event in enumerate(events)]
+    
+    def _unsubscribe(self, subscription: EventSubscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        self._trim()
+        if self.max_lag() <= self._buffer_size:
+            self._writable.set()
+    
+    def max_lag(self) -> int:
+        """Unread events of the slowest subscriber."""
+        return self._next_seq - self._min_cursor()
+    
+    async def drain(self) -> None:
+        """Wait until every subscriber is within ``buffer_size`` events of the newest event.
+        
+        Producers await this between emits so a slow client slows the run down
+        instead of losing events. A subscriber that reads nothing for
+        ``stream_stall_timeout_seconds`` while producers wait is detached.
+        """
+        if self._closed or self.max_lag() <= self._buffer_size:
+            return
         
+        started = time.monotonic()
+        self._producer_waits += 1
+        stall_timeout = settings.stream_stall_timeout_seconds
         try:
-            if timeout:
-                return await asyncio.wait_for(self._stream_queue.get(), timeout=timeout)
-            else:
-                return await self._stream_queue.get()
-        except asyncio.TimeoutError:
-            return None
+            while not self._closed and self.max_lag() > self._buffer_size:
+                self._writable.clear()
+                try:
+                    await asyncio.wait_for(self._writable.wait(), timeout=stall_timeout)
+                except asyncio.TimeoutError:
+                    self._evict_stalled(stall_timeout)
+        finally:
+            self._producer_wait_seconds += time.monotonic() - started
+    
+    def _evict_stalled(self, stall_timeout: float) -> None:
+        now = time.monotonic()
+        for subscription in self._subscriptions[:]:
+            if subscription.lag > self._buffer_size and now - subscription.last_read_at >= stall_timeout:
+                self.logger.warning(
+                    "Detaching stalled stream subscriber",
+                    lag=subscription.lag,
+                    idle_seconds=round(now - subscription.last_read_at, 1),
+                )
+                self._evictions += 1
+                subscription.evicted = True
+                subscription.close()
     
     def get_stream_stats(self) -> Dict[str, Any]:
         """Get streaming statistics."""
         return {
             "streaming_enabled": self._streaming_enabled,
-            "active_streams": len(self._active_streams),
-            "queue_size": self._stream_queue.qsize() if self._stream_queue else 0,
-            "total_events": len(self._event_buffer)
+            "closed": self._closed,
+            "active_streams": len(self._subscriptions) + len(self._active_streams),
+            "buffered_events": len(self._event_buffer),
+            "buffer_size": self._buffer_size,
+            "max_lag": self.max_lag(),
+            "total_events": self._next_seq,
+            "producer_waits": self._producer_waits,
+            "producer_wait_seconds": round(self._producer_wait_seconds, 3),
+            "evicted_subscribers": self._evictions,
         }
 
 
 # Global event emitter registry
 _event_emitters: Dict[str, StreamingEventEmitter] = {}
+# Closed emitters kept for Last-Event-ID resumes: stream_id -> (closed_at, emitter)
+_finished_emitters: "OrderedDict[str, Tuple[float, StreamingEventEmitter]]" = OrderedDict()
 
 
 def get_event_emitter(request_id: str, correlation_id: str) -> StreamingEventEmitter:
@@ -187,15 +373,36 @@ def get_event_emitter(request_id: str, correlation_id: str) -> StreamingEventEmi
     return _event_emitters[key]
 
 
+def find_event_emitter(stream_id: str) -> Optional[StreamingEventEmitter]:
+    """Find a running or recently finished emitter by stream id."""
+    _purge_finished_emitters()
+    for emitter in _event_emitters.values():
+        if emitter.stream_id == stream_id:
+            return emitter
+    finished = _finished_emitters.get(stream_id)
+    return finished[1] if finished else None
+
+
 def cleanup_event_emitter(request_id: str, correlation_id: str) -> None:
     """Clean up an event emitter."""
     key = f"{request_id}:{correlation_id}"
     
-    if key in _event_emitters:
-        emitter = _event_emitters[key]
-        emitter.disable_streaming()
-        emitter.clear_events()
-        del _event_emitters[key]
+    emitter = _event_emitters.pop(key, None)
+    if emitter is not None:
+        # Connected subscribers keep their reference and read the remaining events
+        emitter.close()
+        if settings.stream_resume_ttl_seconds > 0:
+            _finished_emitters[emitter.stream_id] = (time.monotonic(), emitter)
+        _purge_finished_emitters()
+
+
+def _purge_finished_emitters() -> None:
+    deadline = time.monotonic() - settings.stream_resume_ttl_seconds
+    while _finished_emitters:
+        stream_id, (closed_at, _) = next(iter(_finished_emitters.items()))
+        if closed_at > deadline:
+            break
+        del _finished_emitters[stream_id]
 
 
 def get_active_emitters() -> Dict[str, StreamingEventEmitter]:
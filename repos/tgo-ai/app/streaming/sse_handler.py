@@ -1,21 +1,39 @@
 """
 Server-Sent Events (SSE) handler for streaming coordination events.
+
+Domain events carry an SSE ``id`` of the form ``<stream_id>:<seq>``. A client
+that reconnects with that value in ``Last-Event-ID`` continues after ``seq``
+(see ``parse_last_event_id``) instead of starting a new run.
 """
 
 import asyncio
 import json
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional, Tuple
 from fastapi import Request
 from fastapi.responses import StreamingResponse
 from starlette.background import BackgroundTask
 
+from app.config import settings
 from app.core.logging import get_logger
 from app.models.streaming import StreamingEvent, EventType
-from .event_emitter import StreamingEventEmitter
+from .compact import CompactStreamEncoder
+from .event_emitter import EventSubscription, StreamingEventEmitter
 
 
 logger = get_logger(__name__)
 
+_TERMINAL_EVENT_TYPES = (EventType.WORKFLOW_COMPLETED, EventType.WORKFLOW_FAILED)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Split a ``Last-Event-ID`` value into (stream_id, seq); None if it is not one of ours."""
+    if not value:
+        return None
+    stream_id, sep, seq = value.strip().rpartition(":")
+    if not sep or not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
 
 class SSEResponse(StreamingResponse):
     """Custom StreamingResponse for Server-Sent Events."""
@@ -35,9 +53,25 @@ class SSEResponse(StreamingResponse):
 
 
 class SSEHandler:
-    """Handler for Server-Sent Events streaming."""
+    """Handler for Server-Sent Events streaming.
+    
+    Reads the emitter through its own subscription, writes every available
+    event (up to ``stream_batch_max_events``) as one chunk, sends a heartbeat
+    comment when idle and watches for client disconnects in a single task.
+    With a ``compact_encoder`` the stream uses the compact wire format
+    (see ``app.streaming.compact``).
+    """
     
-    def __init__(self, event_emitter: StreamingEventEmitter, request: Request):
+    def __init__(
+        self,
+        event_emitter: StreamingEventEmitter,
+        request: Request,
+        batch_max_events: Optional[int] = None,
+        heartbeat_interval: Optional[float] = None,
+        disconnect_poll_interval: Optional[float] = None,
+        from_seq: Optional[int] = None,
+        compact_encoder: Optional[CompactStreamEncoder] = None,
+    ):
         self.event_emitter = event_emitter
         self.request = request
         self.logger = logger.bind(
@@ -45,73 +79,79 @@ class SSEHandler:
             correlation_id=event_emitter.correlation_id
         )
         self._connected = False
-        self._heartbeat_interval = 30  # seconds
+        self._batch_max_events = batch_max_events or settings.stream_batch_max_events
+        self._heartbeat_interval = heartbeat_interval or settings.stream_heartbeat_seconds
+        self._disconnect_poll_interval = disconnect_poll_interval or settings.stream_disconnect_poll_seconds
+        # Subscribe immediately so events emitted before the response starts are held for us
+        self.subscription: EventSubscription = event_emitter.subscribe(from_seq)
+        self._resumed_from = from_seq
+        # Events the client asked for that are no longer buffered
+        self._missed_events = max(0, self.subscription.cursor - from_seq) if from_seq is not None else 0
+        self._compact = compact_encoder
     
     async def stream_events(self) -> AsyncGenerator[str, None]:
         """Generate SSE formatted events."""
         self._connected = True
         self.logger.info("SSE stream started")
+        watcher = asyncio.create_task(self._watch_disconnect())
         
         try:
             # Send initial connection event
-            yield self._format_sse_event("connected", {
+            connected = {
                 "message": "Stream connected",
                 "request_id": self.event_emitter.request_id,
-                "correlation_id": self.event_emitter.correlation_id
-            })
-            
-            # Send any buffered events first
-            buffered_events = self.event_emitter.get_events()
-            for event in buffered_events:
-                if await self._is_client_connected():
-                    yield self._format_sse_event("event", self._event_to_payload(event))
-                else:
-                    break
-            
-            # Stream new events
-            heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+                "correlation_id": self.event_emitter.correlation_id,
+                "stream_id": self.event_emitter.stream_id,
+            }
+            resume_info = {}
+            if self._resumed_from is not None:
+                resume_info = {"resumed_from": self._resumed_from, "missed_events": self._missed_events}
+            if self._compact is not None:
+                yield self._compact.header(
+                    self.event_emitter.stream_id,
+                    self.event_emitter.request_id,
+                    self.event_emitter.correlation_id,
+                    **resume_info,
+                )
+            else:
+                yield self._format_sse_event("connected", {**connected, **resume_info})
             
-            try:
-                while self._connected and await self._is_client_connected():
-                    try:
-                        # Wait for next event with timeout
-                        event = await self.event_emitter.get_next_event(timeout=1.0)
-
-                        if event:
-                            # Send the domain event
-                            yield self._format_sse_event("event", self._event_to_payload(event))
-                            # If we see terminal workflow events, we can end the stream
-                            try:
-                                if getattr(event, "event_type", None) in (
-                                    EventType.WORKFLOW_COMPLETED,
-                                    EventType.WORKFLOW_FAILED,
-                                ):
-                                    break
-                            except Exception:
-                                # Be resilient if enum import/types change
-                                pass
-                        else:
-                            # If streaming has been disabled and no more events, end the stream
-                            if hasattr(self.event_emitter, "is_streaming_enabled") and not self.event_emitter.is_streaming_enabled():
-                                break
-
-                    except asyncio.TimeoutError:
-                        # Continue loop on timeout
-                        continue
-                    except Exception as e:
-                        self.logger.error("Error streaming event", error=str(e))
-                        yield self._format_sse_event("error", {
-                            "message": "Stream error occurred",
-                            "error": str(e)
-                        })
+            while self._connected:
+                batch = await self.subscription.next_batch(
+                    self._batch_max_events, timeout=self._heartbeat_interval
+                )
+                if not batch:
+                    if self.subscription.finished:
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                
+                if self._compact is not None:
+                    frame, terminal = self._compact.encode_batch(self.event_emitter.stream_id, batch)
+                    yield frame
+                    if terminal:
                         break
+                    continue
+                
+                frames = []
+                terminal = False
+                for seq, event in batch:
+                    payload = self._event_to_payload(event)
+                    frames.append(self._format_sse_event(
+                        "event", payload, event_id=f"{self.event_emitter.stream_id}:{seq}"
+                    ))
+                    # Terminal workflow events end the stream
+                    if payload.get("event_type") in _TERMINAL_EVENT_TYPES:
+                        terminal = True
+                        break
+                yield "".join(frames)
+                if terminal:
+                    break
             
-            finally:
-                heartbeat_task.cancel()
-                try:
-                    await heartbeat_task
-                except asyncio.CancelledError:
-                    pass
+            if self.subscription.evicted:
+                yield self._format_sse_event("error", {
+                    "message": "Stream detached: client stopped reading events",
+                })
         
         except Exception as e:
             self.logger.error("SSE stream error", error=str(e))
@@ -121,25 +161,23 @@ class SSEHandler:
             })
         
         finally:
-            self._connected = False
+            watcher.cancel()
+            self.disconnect()
             self.logger.info("SSE stream ended")
-            yield self._format_sse_event("disconnected", {
-                "message": "Stream disconnected"
-            })
+        
+        # Not in ``finally``: a generator closed by the server must not yield again
+        yield self._format_sse_event("disconnected", {
+            "message": "Stream disconnected"
+        })
     
-    async def _heartbeat_loop(self) -> None:
-        """Send periodic heartbeat messages."""
+    async def _watch_disconnect(self) -> None:
+        """Poll the client connection and stop the stream once it is gone."""
         while self._connected:
-            try:
-                await asyncio.sleep(self._heartbeat_interval)
-                if self._connected:
-                    # Heartbeat will be sent by the main loop
-                    pass
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error("Heartbeat error", error=str(e))
-                break
+            await asyncio.sleep(self._disconnect_poll_interval)
+            if not await self._is_client_connected():
+                self.logger.info("SSE client disconnected")
+                self.disconnect()
+                return
     
     async def _is_client_connected(self) -> bool:
         """Check if the client is still connected."""
@@ -151,8 +189,11 @@ class SSEHandler:
         except Exception:
             return False
     
-    def _event_to_payload(self, event: StreamingEvent) -> dict:
+    def _event_to_payload(self, event: Any) -> dict:
         """Convert StreamingEvent to a serializable dict (Pydantic v1/v2 compatible)."""
+        if isinstance(event, dict):
+            # Replayed from the stream store, already serialized
+            return event
         try:
             # Pydantic v2
             return event.model_dump()  # type: ignore[attr-defined]
@@ -178,26 +219,23 @@ class SSEHandler:
         return "\n".join(lines) + "\n"
 
     def disconnect(self) -> None:
-        """Disconnect the SSE stream."""
+        """Disconnect the SSE stream and release its subscription."""
         self._connected = False
-        self.logger.info("SSE stream disconnected by handler")
+        self.subscription.close()
 
 
-def create_sse_response(event_emitter: StreamingEventEmitter, request: Request) -> SSEResponse:
-    """Create an SSE response for streaming events."""
-    handler = SSEHandler(event_emitter, request)
-    
-    # Add cleanup task
-    def cleanup():
-        handler.disconnect()
-        event_emitter.remove_stream(handler)
-    
-    # Add the handler as a stream
-    event_emitter.add_stream(handler)
+def create_sse_response(
+    event_emitter: StreamingEventEmitter,
+    request: Request,
+    from_seq: Optional[int] = None,
+    compact_encoder: Optional[CompactStreamEncoder] = None,
+) -> SSEResponse:
+    """Create an SSE response for streaming events, optionally resuming at ``from_seq``."""
+    handler = SSEHandler(event_emitter, request, from_seq=from_seq, compact_encoder=compact_encoder)
     
     return SSEResponse(
         handler.stream_events(),
-        background=BackgroundTask(cleanup)
+        background=BackgroundTask(handler.disconnect)
     )
 
 
@@ -0,0 +1,156 @@
+"""
+Redis stream mirror of SSE events, so a stream can be resumed on any replica.
+
+When ``stream_redis_url`` is configured, every streaming run is copied to a
+Redis stream ``tgo:ai:stream:<project_id>:<stream_id>`` whose entry ids are
+``0-<seq + 1>``; the mirror is an ordinary emitter subscriber, so it is
+lossless and bounded like any other client. A replica that receives a
+``Last-Event-ID`` for a stream it does not run rebuilds a read-only emitter
+from the Redis stream and serves it with the regular ``SSEHandler``.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.logging import get_logger
+from .event_emitter import StreamingEventEmitter
+
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "tgo:ai:stream:"
+_END_FIELD = "end"
+_EVENT_FIELD = "e"
+_READ_BATCH = 256
+
+
+class RedisStreamStore:
+    """Mirrors emitters into Redis streams and replays them for resumes."""
+
+    def __init__(self, redis_url: str, ttl_seconds: int, maxlen: int):
+        # Imported lazily: only needed when a stream Redis URL is configured
+        import redis.asyncio as redis_asyncio
+
+        self._redis = redis_asyncio.from_url(redis_url, decode_responses=True)
+        self._ttl = max(1, ttl_seconds)
+        self._maxlen = maxlen
+        self._tasks: set = set()
+
+    @staticmethod
+    def _key(project_id: str, stream_id: str) -> str:
+        return f"{KEY_PREFIX}{project_id}:{stream_id}"
+
+    def mirror(self, emitter: StreamingEventEmitter) -> None:
+        """Copy all events of ``emitter`` to Redis until it is closed."""
+        if not emitter.project_id:
+            return
+        # Subscribe now so nothing emitted before the task starts is missed
+        subscription = emitter.subscribe()
+        task = asyncio.create_task(self._mirror(emitter, subscription))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _mirror(self, emitter: StreamingEventEmitter, subscription) -> None:
+        key = self._key(emitter.project_id, emitter.stream_id)
+        log = logger.bind(stream_id=emitter.stream_id)
+        try:
+            await self._redis.hset(f"{key}:meta", mapping={
+                "request_id": emitter.request_id,
+                "correlation_id": emitter.correlation_id,
+            })
+            while True:
+                batch = await subscription.next_batch(_READ_BATCH)
+                pipe = self._redis.pipeline(transaction=False)
+                for seq, event in batch:
+                    payload = event if isinstance(event, dict) else event.model_dump(mode="json")
+                    pipe.xadd(
+                        key,
+                        {_EVENT_FIELD: json.dumps(payload, default=str, ensure_ascii=False)},
+                        id=f"0-{seq + 1}",
+                        maxlen=self._maxlen,
+                        approximate=True,
+                    )
+                finished = subscription.finished
+                if finished:
+                    pipe.xadd(key, {_END_FIELD: "1"}, id=f"0-{emitter.last_seq + 2}")
+                pipe.expire(key, self._ttl)
+                pipe.expire(f"{key}:meta", self._ttl)
+                await pipe.execute()
+                if finished:
+                    return
+        except Exception as e:
+            # Mirroring is best-effort: never hold producers back on a Redis failure
+            log.warning("Stream mirroring to Redis stopped", error=str(e))
+        finally:
+            subscription.close()
+
+    async def attach(self, project_id: str, stream_id: str, from_seq: int) -> Optional[StreamingEventEmitter]:
+        """Build a read-only emitter that replays the stored stream from ``from_seq``."""
+        key = self._key(project_id, stream_id)
+        meta: Dict[str, Any] = await self._redis.hgetall(f"{key}:meta")
+        if not meta:
+            return None
+
+        emitter = StreamingEventEmitter(meta.get("request_id", ""), meta.get("correlation_id", stream_id))
+        emitter.stream_id = stream_id
+        emitter.project_id = project_id
+        emitter._first_seq = emitter._next_seq = from_seq
+        emitter.enable_streaming()
+        task = asyncio.create_task(self._feed(emitter, key, from_seq))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return emitter
+
+    async def _feed(self, emitter: StreamingEventEmitter, key: str, from_seq: int) -> None:
+        last_id = f"0-{from_seq}"
+        block_ms = int(settings.stream_heartbeat_seconds * 1000)
+        try:
+            # Stop once the stream ended or the resuming client went away
+            while not emitter.is_closed() and emitter._subscriptions:
+                response = await self._redis.xread({key: last_id}, count=_READ_BATCH, block=block_ms)
+                if not response:
+                    if not await self._redis.exists(key):
+                        break
+                    continue
+                for entry_id, fields in response[0][1]:
+                    last_id = entry_id
+                    if _END_FIELD in fields:
+                        return
+                    seq = int(entry_id.split("-", 1)[1]) - 1
+                    emitter._append_replayed(seq, json.loads(fields[_EVENT_FIELD]))
+                await emitter.drain()
+        except Exception as e:
+            logger.warning("Stream replay from Redis failed", stream_id=emitter.stream_id, error=str(e))
+        finally:
+            emitter.close()
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._redis.aclose()
+
+
+_stream_store: Optional[RedisStreamStore] = None
+
+
+def get_stream_store() -> Optional[RedisStreamStore]:
+    """The shared Redis stream store, or None when ``stream_redis_url`` is not set."""
+    global _stream_store
+    if _stream_store is None and settings.stream_redis_url:
+        _stream_store = RedisStreamStore(
+            settings.stream_redis_url,
+            ttl_seconds=settings.stream_resume_ttl_seconds,
+            maxlen=settings.stream_buffer_size,
+        )
+    return _stream_store
+
+
+async def close_stream_store() -> None:
+    """Close the shared Redis stream store (application shutdown)."""
+    global _stream_store
+    if _stream_store is not None:
+        await _stream_store.close()
+        _stream_store = None
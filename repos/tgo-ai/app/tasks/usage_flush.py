@@ -0,0 +1,37 @@
+"""Background flush loop for the write-behind usage telemetry buffer.
+
+Every ``usage_flush_interval_seconds`` the buffered tool, collection and agent
+events are persisted by ``usage_telemetry.flush()``. A final flush runs when
+the loop is stopped so a graceful shutdown keeps the last events.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.services.usage_telemetry import usage_telemetry
+
+logger = get_logger("tasks.usage_flush")
+
+
+async def start_usage_flush_loop(stop_event: asyncio.Event) -> None:
+    """Flush usage telemetry periodically until stop_event is set."""
+    if not settings.usage_telemetry_enabled:
+        logger.info("usage-telemetry: disabled via settings; loop not started")
+        return
+
+    interval = max(0.5, float(settings.usage_flush_interval_seconds))
+    logger.info("usage-telemetry: starting flush loop", interval_seconds=interval)
+
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            flushed = await usage_telemetry.flush()
+            if flushed:
+                logger.debug("usage-telemetry: flushed events", count=flushed)
+        except Exception as e:  # pragma: no cover - defensive
+            logger.error("usage-telemetry: flush failed", error=str(e))
@@ -0,0 +1,88 @@
+"""unique agent usage rollup per period
+
+Revision ID: j1k2l3m4n5o6
+Revises: i1j2k3l4m5n6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'j1k2l3m4n5o6'
+down_revision: Union[str, None] = 'i1j2k3l4m5n6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge rows that concurrent flushes created for the same period into the
+    # oldest one before the constraint can be added
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT id,
+                   project_id, agent_id, aggregation_type, period_start,
+                   row_number() OVER (
+                       PARTITION BY project_id, agent_id, aggregation_type, period_start
+                       ORDER BY created_at, id
+                   ) AS rn
+            FROM ai_agent_usage_records
+        ),
+        merged AS (
+            SELECT project_id, agent_id, aggregation_type, period_start,
+                   sum(request_count) AS request_count,
+                   sum(success_count) AS success_count,
+                   sum(failure_count) AS failure_count,
+                   (sum(avg_response_time_ms::bigint * request_count)
+                        / nullif(sum(CASE WHEN avg_response_time_ms IS NOT NULL
+                                          THEN request_count END), 0))::integer
+                       AS avg_response_time_ms,
+                   max(last_request_time) AS last_request_time
+            FROM ai_agent_usage_records
+            GROUP BY project_id, agent_id, aggregation_type, period_start
+            HAVING count(*) > 1
+        )
+        UPDATE ai_agent_usage_records r
+        SET request_count = m.request_count,
+            success_count = m.success_count,
+            failure_count = m.failure_count,
+            avg_response_time_ms = m.avg_response_time_ms,
+            last_request_time = m.last_request_time
+        FROM merged m, ranked k
+        WHERE k.id = r.id
+          AND k.rn = 1
+          AND k.project_id = m.project_id
+          AND k.agent_id = m.agent_id
+          AND k.aggregation_type = m.aggregation_type
+          AND k.period_start = m.period_start
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM ai_agent_usage_records r
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY project_id, agent_id, aggregation_type, period_start
+                       ORDER BY created_at, id
+                   ) AS rn
+            FROM ai_agent_usage_records
+        ) k
+        WHERE k.id = r.id AND k.rn > 1
+        """
+    )
+    op.create_unique_constraint(
+        'uq_ai_agent_usage_records_period',
+        'ai_agent_usage_records',
+        ['project_id', 'agent_id', 'aggregation_type', 'period_start'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'uq_ai_agent_usage_records_period',
+        'ai_agent_usage_records',
+        type_='unique',
+    )
@@ -0,0 +1,170 @@
+"""Test write-behind usage telemetry flushing and rollups."""
+
+import time
+import uuid
+from datetime import timezone
+from typing import Any, List
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.models.usage import AgentUsageRecord, ToolUsageRecord
+from app.services import usage_telemetry as telemetry_module
+from app.services.usage_telemetry import UsageTelemetry
+
+
+class _Result:
+    def __init__(self, ids: List[uuid.UUID]) -> None:
+        self._ids = ids
+
+    def scalars(self) -> "_Result":
+        return self
+
+    def all(self) -> List[uuid.UUID]:
+        return self._ids
+
+
+class _Session:
+    """Stands in for AsyncSessionLocal(); records the statements of a flush."""
+
+    def __init__(self, known_agents: List[uuid.UUID]) -> None:
+        self.known_agents = known_agents
+        self.statements: List[Any] = []
+        self.committed = False
+
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> bool:
+        return False
+
+    async def execute(self, statement: Any, params: Any = None) -> _Result:
+        self.statements.append((statement, params))
+        return _Result(self.known_agents)
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch):
+    agent_id = uuid.uuid4()
+    session = _Session([agent_id])
+    monkeypatch.setattr(telemetry_module, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(settings, "usage_telemetry_enabled", True)
+    session.agent_id = agent_id
+    return session
+
+
+def _statements_on(session: _Session, table_name: str) -> List[Any]:
+    return [
+        (statement, params)
+        for statement, params in session.statements
+        if getattr(getattr(statement, "table", None), "name", None) == table_name
+    ]
+
+
+def _upserts(session: _Session) -> List[dict]:
+    rows = []
+    for statement, _ in _statements_on(session, AgentUsageRecord.__tablename__):
+            compiled = statement.compile(dialect=postgresql.dialect())
+            assert "ON CONFLICT ON CONSTRAINT uq_ai_agent_usage_records_period DO UPDATE" in str(compiled)
+            rows.append(compiled.params)
+    return rows
+
+
+async def test_flush_rolls_agent_events_into_hourly_and_daily_rows(session: _Session) -> None:
+    """Events of one agent in the same hour become one upsert per aggregation."""
+    telemetry = UsageTelemetry(max_buffered=100)
+    project_id = str(uuid.uuid4())
+    agent_id = str(session.agent_id)
+    telemetry.record_agent(project_id=project_id, agent_id=agent_id, duration_ms=100)
+    telemetry.record_agent(project_id=project_id, agent_id=agent_id, duration_ms=300, success=False)
+    telemetry.record_agent(project_id=project_id, agent_id=agent_id, duration_ms=None)
+    # Unknown agents only feed the latency windows
+    telemetry.record_agent(project_id=project_id, agent_id=str(uuid.uuid4()), duration_ms=50)
+
+    assert await telemetry.flush() == 4
+    assert session.committed
+
+    rows = {row["aggregation_type"]: row for row in _upserts(session)}
+    assert set(rows) == {"hourly", "daily"}
+    for aggregation, row in rows.items():
+        assert row["request_count"] == 3
+        assert row["success_count"] == 2
+        assert row["failure_count"] == 1
+        assert row["avg_response_time_ms"] == 200
+        start = row["period_start"].astimezone(timezone.utc)
+        assert (start.minute, start.second) == (0, 0)
+        if aggregation == "daily":
+            assert start.hour == 0
+
+    summary = telemetry.latency_summary(project_id)
+    assert summary["agents"][agent_id]["count"] == 3
+    assert summary["agents"][agent_id]["error_rate"] == round(1 / 3, 4)
+    assert summary["buffered_events"] == 0
+
+
+async def test_flush_bulk_inserts_tool_rows_for_known_agents(session: _Session) -> None:
+    """Tool events are inserted in batches; events of unknown agents are skipped."""
+    telemetry = UsageTelemetry(max_buffered=100)
+    project_id = str(uuid.uuid4())
+    started = time.time()
+    for i in range(3):
+        telemetry.record_tool(
+            project_id=project_id,
+            agent_id=str(session.agent_id),
+            tool_name="search",
+            started_at=started,
+            duration_ms=10 * (i + 1),
+        )
+    telemetry.record_tool(
+        project_id=project_id,
+        agent_id=None,
+        tool_name="search",
+        started_at=started,
+        duration_ms=40,
+        status="error",
+    )
+
+    await telemetry.flush()
+
+    inserts = [params for _, params in _statements_on(session, ToolUsageRecord.__tablename__)]
+    assert len(inserts) == 1
+    assert [row["execution_duration_ms"] for row in inserts[0]] == [10, 20, 30]
+    assert telemetry.latency_summary(project_id)["tools"]["search"]["count"] == 4
+
+
+async def test_flush_drops_idle_latency_windows(session: _Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Windows of tools that stopped being used are evicted at a later flush."""
+    telemetry = UsageTelemetry(max_buffered=100)
+    project_id = str(uuid.uuid4())
+    telemetry.record_tool(project_id=project_id, agent_id=None, tool_name="old", started_at=time.time(), duration_ms=5)
+    await telemetry.flush()
+    assert "old" in telemetry.latency_summary(project_id)["tools"]
+
+    monkeypatch.setattr(settings, "usage_latency_window_idle_seconds", 0.01)
+    time.sleep(0.02)
+    telemetry.record_tool(project_id=project_id, agent_id=None, tool_name="new", started_at=time.time(), duration_ms=5)
+    await telemetry.flush()
+    assert list(telemetry.latency_summary(project_id)["tools"]) == ["new"]
+
+    # Pruned even when nothing new was buffered
+    time.sleep(0.02)
+    assert await telemetry.flush() == 0
+    assert telemetry.latency_summary(project_id)["tools"] == {}
+
+
+async def test_failed_flush_drops_the_batch(session: _Session) -> None:
+    """A database error drops the batch instead of raising into the caller."""
+
+    async def fail(statement: Any, params: Any = None) -> None:
+        raise RuntimeError("database unavailable")
+
+    session.execute = fail
+    telemetry = UsageTelemetry(max_buffered=100)
+    telemetry.record_agent(project_id=str(uuid.uuid4()), agent_id=str(session.agent_id), duration_ms=10)
+
+    assert await telemetry.flush() == 1
+    assert telemetry.buffered == 0
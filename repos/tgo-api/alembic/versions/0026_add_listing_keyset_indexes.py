@@ -0,0 +1,52 @@
+"""add composite indexes for keyset pagination of listings
+
+Revision ID: 0026_listing_keyset_indexes
+Revises: 0025_rm_device_control_model
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0026_listing_keyset_indexes'
+down_revision: Union[str, None] = '0025_rm_device_control_model'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Visitor listing: (project_id, sort key, id) lets keyset pages seek directly
+    op.create_index(
+        'ix_api_visitors_project_created_at_id',
+        'api_visitors',
+        ['project_id', 'created_at', 'id'],
+    )
+    op.create_index(
+        'ix_api_visitors_project_last_visit_time_id',
+        'api_visitors',
+        ['project_id', 'last_visit_time', 'id'],
+    )
+
+    # Waiting conversations: newest waiting entries per project
+    op.create_index(
+        'ix_api_visitor_waiting_queue_project_status_created_at_id',
+        'api_visitor_waiting_queue',
+        ['project_id', 'status', 'created_at', 'id'],
+    )
+
+    # Latest session per visitor (GROUP BY visitor_id, max(created_at))
+    op.create_index(
+        'ix_api_visitor_sessions_visitor_id_created_at',
+        'api_visitor_sessions',
+        ['visitor_id', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_api_visitor_sessions_visitor_id_created_at', table_name='api_visitor_sessions')
+    op.drop_index('ix_api_visitor_waiting_queue_project_status_created_at_id', table_name='api_visitor_waiting_queue')
+    op.drop_index('ix_api_visitors_project_last_visit_time_id', table_name='api_visitors')
+    op.drop_index('ix_api_visitors_project_created_at_id', table_name='api_visitors')
@@ -750,33 +750,21 @@ async def chat_file_upload(
     date_dir = time.strftime("%Y-%m-%d")
     rel_path = f"chat/{project_id}/{channel_type}/{channel_id}/{date_dir}/{fname}"
 
-    # 5) Read file into memory buffer and validate size
-    from io import BytesIO
-    buffer = BytesIO()
-    total = 0
-    try:
-        while True:
-            chunk = await file.read(1024 * 1024)
-            if not chunk:
-                break
-            total += len(chunk)
-            if total > max_bytes:
-                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
-            buffer.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File read failed: {e}")
-    
-    buffer.seek(0)
-
-    # 6) Upload via storage backend
-    from app.services.storage import get_storage
+    # 5) Stream upload to storage backend (size enforced and hashed on the fly)
+    from app.services.storage import UploadTooLargeError, get_storage, iter_upload_chunks
     storage = get_storage()
     try:
-        file_url = await storage.upload(buffer, rel_path, mime)
+        stored = await storage.upload_stream(iter_upload_chunks(file), rel_path, mime, max_size=max_bytes)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"File storage failed: {e}")
+    file_url = stored.url
+    total = stored.size
+    logger.info(
+        "Chat file stored",
+        extra={"file_path": rel_path, "file_size": total, "sha256": stored.sha256},
+    )
 
     # 7) Persist metadata
     chat_file = ChatFile(
@@ -25,7 +25,7 @@ from app.models import (
     ClearanceUserType,
 )
 from app.utils.manual_service_tag import MANUAL_SERVICE_TAG_ID
-from app.schemas.base import PaginationMetadata
+from app.schemas.base import CursorPaginationMetadata
 from app.schemas.wukongim import (
     ChannelInfo,
     WuKongIMChannelMessageSyncRequest,
@@ -42,10 +42,31 @@ from app.api.v1.endpoints.channels import _build_enriched_visitor_payload
 from app.services.wukongim_client import wukongim_client
 from app.utils.encoding import build_visitor_channel_id, parse_visitor_channel_id
 from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
+from app.utils.pagination import (
+    TOTAL_MODE_ESTIMATE,
+    InvalidCursorError,
+    KeysetPage,
+    SortKey,
+    count_total,
+    estimate_count,
+    paginate_query,
+    validate_total_mode,
+)
 
 logger = get_logger("api.conversations")
 router = APIRouter()
 
+CURSOR_QUERY_DESCRIPTION = "分页游标（上一页 pagination.next_cursor），传入时忽略 offset"
+TOTAL_MODE_QUERY_DESCRIPTION = "总数计算方式：'exact'（精确 COUNT）或 'estimate'（查询计划估算，大数据量下开销更低）"
+
+
+def _paginate(query, keys: List[SortKey], values_of, limit: int, offset: int, cursor: Optional[str], sort: str) -> KeysetPage:
+    """Fetch one page by keyset cursor or offset, mapping bad cursors to 400."""
+    try:
+        return paginate_query(query, keys, values_of, limit=limit, offset=offset, cursor=cursor, sort=sort)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 
 async def _build_channels_for_conversations(
     db: Session,
@@ -199,7 +220,7 @@ class WuKongIMConversationPaginatedResponse(BaseModel):
         default_factory=list,
         description="List of conversations"
     )
-    pagination: PaginationMetadata = Field(..., description="Pagination metadata")
+    pagination: CursorPaginationMetadata = Field(..., description="Pagination metadata")
 
 
 class WuKongIMConversationWithChannelsPaginatedResponse(BaseModel):
@@ -213,7 +234,7 @@ class WuKongIMConversationWithChannelsPaginatedResponse(BaseModel):
         default_factory=list,
         description="List of channel information for each conversation",
     )
-    pagination: PaginationMetadata = Field(..., description="Pagination metadata")
+    pagination: CursorPaginationMetadata = Field(..., description="Pagination metadata")
 
 
 @router.post(
@@ -359,6 +380,8 @@ async def sync_all_conversations(
     ),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_QUERY_DESCRIPTION),
+    total_mode: str = Query(default="exact", description=TOTAL_MODE_QUERY_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: Staff = Depends(get_current_active_user),
 ) -> WuKongIMConversationPaginatedResponse:
@@ -370,6 +393,8 @@ async def sync_all_conversations(
     
     如果当前用户是 admin 角色，则返回项目下所有的会话。
     """
+    validate_total_mode(total_mode)
+
     # Check if current user is admin
     is_admin = current_user.role == StaffRole.ADMIN.value
     
@@ -415,12 +440,15 @@ async def sync_all_conversations(
         latest_sessions_query = latest_sessions_query.filter(VisitorSession.status == SessionStatus.CLOSED.value)
 
     # Total count of visitors after applying filters
-    total_count = latest_sessions_query.distinct(latest_session_subquery.c.visitor_id).count()
+    if total_mode == TOTAL_MODE_ESTIMATE:
+        total_count = estimate_count(db, latest_sessions_query)
+    else:
+        total_count = latest_sessions_query.distinct(latest_session_subquery.c.visitor_id).count()
     if total_count == 0:
         logger.debug(f"No sessions found for staff {current_user.username}")
         return WuKongIMConversationPaginatedResponse(
             conversations=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=0,
                 limit=limit,
                 offset=offset,
@@ -430,26 +458,35 @@ async def sync_all_conversations(
         )
     
     # 3) Get paginated visitor_ids ordered by latest session created time (newest first)
-    paginated_visitor_ids = (
-        latest_sessions_query
-        .order_by(latest_session_subquery.c.latest_created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    # latest_created_at is an aggregate of the GROUP BY subquery, so the cursor cannot
+    # seek an index: every page still aggregates and sorts all of the staff's sessions.
+    page = _paginate(
+        latest_sessions_query,
+        [
+            SortKey(latest_session_subquery.c.latest_created_at, descending=True),
+            SortKey(latest_session_subquery.c.visitor_id, descending=True),
+        ],
+        lambda row: [row[1], row[0]],
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        sort="latest_created_at:desc",
     )
+    offset = page.offset
     
-    visitor_ids = [row[0] for row in paginated_visitor_ids]
+    visitor_ids = [row[0] for row in page.items]
     
     if not visitor_ids:
         logger.debug("No valid visitor IDs found after pagination")
         return WuKongIMConversationPaginatedResponse(
             conversations=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=False,
-                has_prev=offset > 0,
+                has_prev=page.has_prev,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             )
         )
     
@@ -500,17 +537,19 @@ async def sync_all_conversations(
         )
         
         # 6. Build pagination metadata
-        has_next = (offset + limit) < total_count
-        has_prev = offset > 0
+        has_next = page.has_next
+        has_prev = page.has_prev
         
         return WuKongIMConversationPaginatedResponse(
             conversations=conversations,
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=has_next,
                 has_prev=has_prev,
+                next_cursor=page.next_cursor,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             )
         )
         
@@ -532,6 +571,8 @@ async def sync_waiting_conversations(
     msg_count: int = Query(default=20, ge=1, le=100, description="每个会话返回的最近消息数量"),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_QUERY_DESCRIPTION),
+    total_mode: str = Query(default="exact", description=TOTAL_MODE_QUERY_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: Staff = Depends(require_permission("visitors:read")),
 ) -> WuKongIMConversationPaginatedResponse:
@@ -541,22 +582,22 @@ async def sync_waiting_conversations(
     此接口获取当前项目中所有状态为 WAITING 的访客的 WuKongIM 会话信息，
     包括最近的消息记录。用于客服人员查看待接入访客的对话内容。
     """
-    # 1. Get total count of waiting entries
-    total_count = (
-        db.query(VisitorWaitingQueue)
-        .filter(
-            VisitorWaitingQueue.project_id == current_user.project_id,
-            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-            VisitorWaitingQueue.visitor_id.isnot(None),
-        )
-        .count()
+    validate_total_mode(total_mode)
+
+    waiting_query = db.query(VisitorWaitingQueue).filter(
+        VisitorWaitingQueue.project_id == current_user.project_id,
+        VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
+        VisitorWaitingQueue.visitor_id.isnot(None),
     )
+
+    # 1. Get total count of waiting entries
+    total_count = count_total(db, waiting_query, total_mode)
     
     if total_count == 0:
         logger.debug("No waiting visitors found")
         return WuKongIMConversationPaginatedResponse(
             conversations=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=0,
                 limit=limit,
                 offset=offset,
@@ -566,29 +607,32 @@ async def sync_waiting_conversations(
         )
     
     # 2. Query paginated waiting visitors from queue (ordered by created_at desc, newest first)
-    waiting_entries = (
-        db.query(VisitorWaitingQueue)
-        .filter(
-            VisitorWaitingQueue.project_id == current_user.project_id,
-            VisitorWaitingQueue.status == WaitingStatus.WAITING.value,
-            VisitorWaitingQueue.visitor_id.isnot(None),
-        )
-        .order_by(VisitorWaitingQueue.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    page = _paginate(
+        waiting_query,
+        [
+            SortKey(VisitorWaitingQueue.created_at, descending=True),
+            SortKey(VisitorWaitingQueue.id, descending=True),
+        ],
+        lambda entry: [entry.created_at, entry.id],
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        sort="created_at:desc",
     )
+    offset = page.offset
+    waiting_entries = page.items
     
     if not waiting_entries:
         logger.debug("No waiting visitors found after pagination")
         return WuKongIMConversationPaginatedResponse(
             conversations=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=False,
-                has_prev=offset > 0,
+                has_prev=page.has_prev,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             )
         )
     
@@ -637,17 +681,19 @@ async def sync_waiting_conversations(
         )
         
         # 6. Build pagination metadata
-        has_next = (offset + limit) < total_count
-        has_prev = offset > 0
+        has_next = page.has_next
+        has_prev = page.has_prev
         
         return WuKongIMConversationPaginatedResponse(
             conversations=conversations,
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=has_next,
                 has_prev=has_prev,
+                next_cursor=page.next_cursor,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             )
         )
         
@@ -675,10 +721,14 @@ async def sync_recent_conversations_by_visitor_tags(
     msg_count: int = Query(default=1, ge=1, le=100, description="每个会话返回的最近消息数量（默认 1）"),
     limit: int = Query(default=20, ge=1, le=100, description="每页返回的会话数量"),
     offset: int = Query(default=0, ge=0, description="跳过的会话数量"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_QUERY_DESCRIPTION),
+    total_mode: str = Query(default="exact", description=TOTAL_MODE_QUERY_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: Staff = Depends(require_permission("visitors:read")),
     user_language: UserLanguage = Depends(get_user_language),
 ) -> WuKongIMConversationWithChannelsPaginatedResponse:
+    validate_total_mode(total_mode)
+
     # Admin sees all sessions in project; others see only their own sessions
     is_admin = current_user.role == StaffRole.ADMIN.value
 
@@ -727,12 +777,16 @@ async def sync_recent_conversations_by_visitor_tags(
 
     latest_session_subquery = subquery_base.group_by(VisitorSession.visitor_id).subquery()
 
-    total_count = db.query(latest_session_subquery.c.visitor_id).count()
+    visitor_ids_query = db.query(
+        latest_session_subquery.c.visitor_id,
+        latest_session_subquery.c.latest_created_at,
+    )
+    total_count = count_total(db, visitor_ids_query, total_mode)
     if total_count == 0:
         return WuKongIMConversationWithChannelsPaginatedResponse(
             conversations=[],
             channels=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=0,
                 limit=limit,
                 offset=offset,
@@ -741,24 +795,31 @@ async def sync_recent_conversations_by_visitor_tags(
             ),
         )
 
-    paginated_visitor_ids = (
-        db.query(latest_session_subquery.c.visitor_id)
-        .order_by(latest_session_subquery.c.latest_created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    page = _paginate(
+        visitor_ids_query,
+        [
+            SortKey(latest_session_subquery.c.latest_created_at, descending=True),
+            SortKey(latest_session_subquery.c.visitor_id, descending=True),
+        ],
+        lambda row: [row[1], row[0]],
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        sort="latest_created_at:desc",
     )
-    visitor_ids = [row[0] for row in paginated_visitor_ids]
+    offset = page.offset
+    visitor_ids = [row[0] for row in page.items]
     if not visitor_ids:
         return WuKongIMConversationWithChannelsPaginatedResponse(
             conversations=[],
             channels=[],
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=False,
-                has_prev=offset > 0,
+                has_prev=page.has_prev,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             ),
         )
 
@@ -792,18 +853,20 @@ async def sync_recent_conversations_by_visitor_tags(
             conv for conv in conversations if (conv.channel_type != CHANNEL_TYPE_CUSTOMER_SERVICE) or (conv.channel_id in valid_channel_ids)
         ]
 
-        has_next = (offset + limit) < total_count
-        has_prev = offset > 0
+        has_next = page.has_next
+        has_prev = page.has_prev
 
         return WuKongIMConversationWithChannelsPaginatedResponse(
             conversations=filtered_conversations,
             channels=channel_infos,
-            pagination=PaginationMetadata(
+            pagination=CursorPaginationMetadata(
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_next=has_next,
                 has_prev=has_prev,
+                next_cursor=page.next_cursor,
+                total_is_estimate=total_mode == TOTAL_MODE_ESTIMATE,
             ),
         )
     except Exception as e:
@@ -28,6 +28,14 @@ from app.services.visitor_notifications import notify_visitor_profile_updated
 from app.utils.intent import localize_visitor_response_intent
 from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE, MEMBER_TYPE_VISITOR
 from app.utils.request import get_client_ip, get_client_language
+from app.utils.pagination import (
+    TOTAL_MODE_ESTIMATE,
+    InvalidCursorError,
+    SortKey,
+    count_total,
+    paginate_query,
+    validate_total_mode,
+)
 from app.services.geoip_service import geoip_service
 import app.services.visitor_service as visitor_service
 from app.utils.encoding import (
@@ -89,6 +97,50 @@ logger = get_logger("endpoints.visitors")
 router = APIRouter()
 
 
+def _visitor_sort_keys(sort_by: str, sort_order: str) -> List[SortKey]:
+    """Keyset sort keys for visitor listings (Visitor.id breaks ties).
+
+    The last_offline_time keys are CASE expressions, which no index covers:
+    paging by cursor stays stable but each page still sorts the filtered set.
+    """
+    if sort_by == "last_offline_time":
+        online_time = case(
+            (Visitor.is_online == True, Visitor.created_at),
+            else_=Visitor.last_offline_time
+        )
+        if sort_order == "desc":
+            # 1. Online visitors first (is_online=True -> 0, False -> 1, so asc puts True first)
+            # 2. If online, sort by created_at desc
+            # 3. If offline, sort by last_offline_time desc (most recently offline first)
+            # 4. NULL last_offline_time values go last
+            return [
+                SortKey(case((Visitor.is_online == True, 0), else_=1)),
+                SortKey(online_time, descending=True, nulls_last=True),
+                SortKey(Visitor.id, descending=True),
+            ]
+        # Opposite of desc: offline first, then by oldest offline time
+        return [
+            SortKey(case((Visitor.is_online == True, 1), else_=0)),
+            SortKey(online_time, nulls_last=False),
+            SortKey(Visitor.id),
+        ]
+
+    sort_attr = Visitor.last_visit_time if sort_by == "last_visit_time" else Visitor.created_at
+    descending = sort_order != "asc"
+    return [SortKey(sort_attr, descending=descending), SortKey(Visitor.id, descending=descending)]
+
+
+def _visitor_sort_values(visitor: Visitor, sort_by: str, sort_order: str) -> list:
+    """Sort key values of a visitor row, matching `_visitor_sort_keys`."""
+    if sort_by == "last_offline_time":
+        online_time = visitor.created_at if visitor.is_online else visitor.last_offline_time
+        if sort_order == "desc":
+            return [0 if visitor.is_online else 1, online_time, visitor.id]
+        return [1 if visitor.is_online else 0, online_time, visitor.id]
+    sort_value = visitor.last_visit_time if sort_by == "last_visit_time" else visitor.created_at
+    return [sort_value, visitor.id]
+
+
 @router.get("", response_model=VisitorListResponse)
 async def list_visitors(
     request: Request,
@@ -102,6 +154,8 @@ async def list_visitors(
     sort_order: str = Query("desc", description="Sort order: 'asc' or 'desc'"),
     offset: int = Query(0, ge=0, description="Number of visitors to skip"),
     limit: int = Query(20, ge=1, le=100, description="Number of visitors to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's `pagination.next_cursor`; when set, `offset` is ignored"),
+    total_mode: str = Query("exact", description="How to compute `pagination.total`: 'exact' (COUNT) or 'estimate' (planner estimate, cheap on large projects)"),
     db: Session = Depends(get_db),
     current_user: Staff = Depends(require_permission("visitors:list")),
     user_language: UserLanguage = Depends(get_user_language),
@@ -111,7 +165,14 @@ async def list_visitors(
 
     Retrieve a paginated list of visitors with optional filtering by platform,
     online status, tags, and search query. Requires visitors:list permission.
+
+    Pass `pagination.next_cursor` back as `cursor` to page by keyset, which
+    costs the same for every page when sorting by `created_at` or
+    `last_visit_time`. `last_offline_time` sorts on a computed key, so deep
+    pages cost as much as with `offset`; the cursor only keeps pages stable.
+    `offset` is kept for compatibility.
     """
+    validate_total_mode(total_mode)
     logger.info(f"User {current_user.username} listing visitors (tag_ids={tag_ids}, recent_online_minutes={recent_online_minutes}, service_status={service_status})")
 
     # Build query
@@ -171,50 +232,22 @@ async def list_visitors(
         )
 
     # Get total count
-    total = query.count()
-
-    # Apply sorting
-    if sort_by == "last_offline_time":
-        if sort_order == "desc":
-            # 1. Online visitors first (is_online=True -> 0, False -> 1, so asc puts True first)
-            # 2. If online, sort by created_at desc
-            # 3. If offline, sort by last_offline_time desc (most recently offline first)
-            # 4. NULL last_offline_time values go last
-            query = query.order_by(
-                case(
-                    (Visitor.is_online == True, 0),
-                    else_=1
-                ).asc(),
-                case(
-                    (Visitor.is_online == True, Visitor.created_at),
-                    else_=Visitor.last_offline_time
-                ).desc().nulls_last()
-            )
-        else:
-            # Opposite of desc: offline first, then by oldest offline time
-            query = query.order_by(
-                case(
-                    (Visitor.is_online == True, 1),
-                    else_=0
-                ).asc(),
-                case(
-                    (Visitor.is_online == True, Visitor.created_at),
-                    else_=Visitor.last_offline_time
-                ).asc().nulls_first()
-            )
-    else:
-        if sort_by == "last_visit_time":
-            sort_attr = Visitor.last_visit_time
-        else:
-            sort_attr = Visitor.created_at
+    total = count_total(db, query, total_mode)
 
-        if sort_order == "asc":
-            query = query.order_by(sort_attr.asc())
-        else:
-            query = query.order_by(sort_attr.desc())
-
-    # Apply pagination
-    visitors = query.offset(offset).limit(limit).all()
+    # Apply sorting and pagination (keyset order; Visitor.id makes it total)
+    try:
+        page = paginate_query(
+            query,
+            _visitor_sort_keys(sort_by, sort_order),
+            lambda v: _visitor_sort_values(v, sort_by, sort_order),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            sort=f"{sort_by}:{sort_order}",
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    visitors = page.items
 
     # Convert to response models
     accept_language = request.headers.get("Accept-Language")
@@ -235,9 +268,11 @@ async def list_visitors(
         pagination={
             "total": total,
             "limit": limit,
-            "offset": offset,
-            "has_next": offset + limit < total,
-            "has_prev": offset > 0,
+            "offset": page.offset,
+            "has_next": page.has_next,
+            "has_prev": page.has_prev,
+            "next_cursor": page.next_cursor,
+            "total_is_estimate": total_mode == TOTAL_MODE_ESTIMATE,
         }
     )
 
@@ -16,6 +16,7 @@ from app.models import Platform, Staff, Visitor, ChannelMember
 from app.models.staff import StaffStatus
 from app.services.ai_client import AIServiceClient
 from app.services.wukongim_client import WuKongIMClient
+from app.services.visitor_presence import presence_store, presence_writer
 from app.services.visitor_notifications import notify_visitor_profile_updated
 from app.utils.const import MEMBER_TYPE_VISITOR, CHANNEL_TYPE_CUSTOMER_SERVICE
 from app.utils.encoding import parse_visitor_channel_id
@@ -345,6 +346,7 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
     staff_updates = 0
     channel_events: List[Dict[str, Any]] = []
     visitors_to_notify: Dict[str, Visitor] = {}
+    visitor_events: List[Tuple[UUID, bool, Dict[str, Any]]] = []
 
     for entry in events:
         uid_raw = _extract_uid(entry)
@@ -392,81 +394,102 @@ async def _handle_user_online_status(events_payload: Any, db: Session) -> None:
                 dirty = True
                 staff_updates += 1
         elif is_visitor:
-            visitor = (
-                db.query(Visitor)
-                .filter(Visitor.id == uid, Visitor.deleted_at.is_(None))
-                .first()
-            )
-            if not visitor:
-                logger.debug("Visitor not found for online status update", extra={"visitor_id": uid_str})
-                continue
-
-            record_changed = False
-            if visitor.is_online != is_online:
-                visitor.is_online = is_online
-                record_changed = True
+            visitor_events.append((uid, is_online, entry))
 
+    # Visitors: apply to the presence store and buffer the DB write; only
+    # actual transitions fan out presence events and profile notifications.
+    transitions: Dict[UUID, Tuple[bool, Dict[str, Any]]] = {}
+    for uid, is_online, entry in visitor_events:
+        try:
             if is_online:
-                visitor.last_visit_time = now
-                record_changed = True
+                # None: the visitor was not online before
+                transition = await presence_store.set_online(str(uid)) is None
             else:
-                visitor.last_offline_time = now
-                record_changed = True
-
-            if record_changed:
-                dirty = True
-                visitor_updates += 1
-                visitors_to_notify[str(visitor.id)] = visitor
-                memberships = (
-                    db.query(ChannelMember.channel_id, ChannelMember.channel_type)
-                    .filter(
-                        ChannelMember.member_id == visitor.id,
-                        ChannelMember.member_type == MEMBER_TYPE_VISITOR,
-                        ChannelMember.deleted_at.is_(None),
-                    )
-                    .all()
+                # True: the visitor was online before
+                transition = await presence_store.set_offline(str(uid)) is True
+        except Exception as exc:
+            logger.warning("Failed to update visitor presence store: %s", exc)
+            transition = True
+        presence_writer.record(uid, is_online, now)
+        visitor_updates += 1
+        if transition:
+            transitions[uid] = (is_online, entry)
+
+    if transitions:
+        visitors = (
+            db.query(Visitor)
+            .filter(Visitor.id.in_(list(transitions.keys())), Visitor.deleted_at.is_(None))
+            .all()
+        )
+        visitors_to_notify = {str(visitor.id): visitor for visitor in visitors}
+        missing = [str(uid) for uid in transitions if str(uid) not in visitors_to_notify]
+        if missing:
+            logger.debug("Visitors not found for online status update", extra={"visitor_ids": missing})
+            try:
+                await presence_store.discard(missing)
+            except Exception:
+                pass
+
+        memberships_by_visitor: Dict[UUID, List[Tuple[str, int]]] = {}
+        if visitors:
+            memberships = (
+                db.query(ChannelMember.member_id, ChannelMember.channel_id, ChannelMember.channel_type)
+                .filter(
+                    ChannelMember.member_id.in_([visitor.id for visitor in visitors]),
+                    ChannelMember.member_type == MEMBER_TYPE_VISITOR,
+                    ChannelMember.deleted_at.is_(None),
                 )
-
-                if memberships:
-                    event_type = "visitor.online" if is_online else "visitor.offline"
-                    event_payload = {
-                        "visitor_id": str(visitor.id),
-                        "status": "online" if is_online else "offline",
-                        "is_online": is_online,
-                        "timestamp": now.isoformat() + "Z",
-                        "device_flag": entry.get("device_flag"),
-                        "connection_id": entry.get("connection_id"),
-                        "device_online_count": entry.get("device_online_count"),
-                        "user_total_online_devices": entry.get("user_total_online_devices"),
+                .all()
+            )
+            for member_id, channel_id, channel_type in memberships:
+                memberships_by_visitor.setdefault(member_id, []).append((channel_id, channel_type))
+
+        for visitor in visitors:
+            is_online, entry = transitions[visitor.id]
+            event_type = "visitor.online" if is_online else "visitor.offline"
+            event_payload = {
+                "visitor_id": str(visitor.id),
+                "status": "online" if is_online else "offline",
+                "is_online": is_online,
+                "timestamp": now.isoformat() + "Z",
+                "device_flag": entry.get("device_flag"),
+                "connection_id": entry.get("connection_id"),
+                "device_online_count": entry.get("device_online_count"),
+                "user_total_online_devices": entry.get("user_total_online_devices"),
+            }
+            for channel_id, channel_type in memberships_by_visitor.get(visitor.id, []):
+                payload_with_channel = {
+                    **event_payload,
+                    "channel_id": channel_id,
+                    "channel_type": channel_type,
+                }
+                client_msg_no = f"presence-{visitor.id}-{uuid.uuid4().hex}"
+                channel_events.append(
+                    {
+                        "channel_id": channel_id,
+                        "channel_type": channel_type,
+                        "event_type": event_type,
+                        "data": payload_with_channel,
+                        "client_msg_no": client_msg_no,
+                        "from_uid": str(visitor.id),
                     }
-                    for channel_id, channel_type in memberships:
-                        payload_with_channel = {
-                            **event_payload,
-                            "channel_id": channel_id,
-                            "channel_type": channel_type,
-                        }
-                        client_msg_no = f"presence-{visitor.id}-{uuid.uuid4().hex}"
-                        channel_events.append(
-                            {
-                                "channel_id": channel_id,
-                                "channel_type": channel_type,
-                                "event_type": event_type,
-                                "data": payload_with_channel,
-                                "client_msg_no": client_msg_no,
-                                "from_uid": str(visitor.id),
-                            }
-                        )
-
-    if not dirty:
+                )
+
+    if not dirty and not visitor_updates:
         logger.debug("WuKongIM user.onlinestatus processed with no state changes")
         return
 
-    try:
-        db.commit()
-    except Exception as exc:
-        db.rollback()
-        logger.error("Failed to commit WuKongIM user.onlinestatus updates: %s", exc)
-        return
+    if dirty:
+        try:
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.error("Failed to commit WuKongIM user.onlinestatus updates: %s", exc)
+            return
+
+    if transitions:
+        # Clients re-read the visitor on these events; write the state first
+        await presence_writer.flush()
 
     for evt in channel_events:
         try:
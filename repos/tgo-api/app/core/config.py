@@ -134,6 +134,15 @@ class Settings(BaseSettings):
         default=None,
         description="API key for AI service authentication (if required)"
     )
+    AI_SERVICE_STREAM_RESUME_ATTEMPTS: int = Field(
+        default=3,
+        ge=0,
+        description="Reconnect attempts (with Last-Event-ID) when an AI service stream drops mid-run"
+    )
+    AI_SERVICE_STREAM_COMPACT: bool = Field(
+        default=False,
+        description="Request the compact (batched, terse) SSE format for supervisor streams"
+    )
 
     # Workflow Service settings
     WORKFLOW_SERVICE_URL: str = Field(
@@ -239,8 +248,18 @@ class Settings(BaseSettings):
         gt=0,
     )
     SESSION_TIMEOUT_BATCH_SIZE: int = Field(
-        default=50,
-        description="Number of timed-out sessions to process per batch",
+        default=500,
+        description="Number of timed-out sessions closed per UPDATE batch",
+        gt=0,
+    )
+    SESSION_TIMEOUT_MAX_PER_RUN: int = Field(
+        default=20000,
+        description="Maximum number of timed-out sessions closed per check run",
+        gt=0,
+    )
+    SESSION_TIMEOUT_NOTIFY_CONCURRENCY: int = Field(
+        default=20,
+        description="Maximum concurrent WuKongIM notifications when closing timed-out sessions",
         gt=0,
     )
 
@@ -366,6 +385,15 @@ class Settings(BaseSettings):
         default=True,
         description="Enable IP geolocation lookup (requires GEOIP_DATABASE_PATH)"
     )
+    GEOIP_PRELOAD: bool = Field(
+        default=True,
+        description="Load the whole GeoIP database into memory and warm it up at startup"
+    )
+    GEOIP_CACHE_SIZE: int = Field(
+        default=10000,
+        description="Max number of IP -> location results kept in the in-process LRU cache (0 disables)",
+        ge=0
+    )
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = Field(
@@ -406,6 +434,26 @@ class Settings(BaseSettings):
         description="Number of visitors to check per batch in online status sync",
         gt=0,
     )
+    VISITOR_ONLINE_SYNC_MAX_PER_RUN: int = Field(
+        default=1000,
+        description="Maximum number of stale visitors re-checked with WuKongIM per sync run",
+        gt=0,
+    )
+    VISITOR_PRESENCE_TTL_SECONDS: int = Field(
+        default=600,
+        description="Seconds without an online event or successful check before a visitor's presence is re-checked",
+        gt=0,
+    )
+    VISITOR_PRESENCE_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=2.0,
+        description="Interval in seconds for flushing buffered visitor online state to the database",
+        gt=0,
+    )
+    VISITOR_PRESENCE_FLUSH_BATCH_SIZE: int = Field(
+        default=500,
+        description="Number of buffered visitor online state updates written per statement batch",
+        gt=0,
+    )
 
     # Unknown Platform Fallback
     UNKNOWN_PLATFORM_ID: str = Field(
@@ -482,6 +530,11 @@ class Settings(BaseSettings):
         default="local",
         description="Storage type: local, oss, minio",
     )
+    STORAGE_MULTIPART_PART_SIZE_MB: int = Field(
+        default=8,
+        description="Part size in MB for streaming multipart uploads to OSS/MinIO (max memory buffered per upload)",
+        ge=5,
+    )
     
     # Aliyun OSS Settings
     OSS_ENDPOINT: Optional[str] = Field(
@@ -181,6 +181,16 @@ def create_app(
             # best-effort; don't block startup
             pass
 
+        # Load GeoIP database into memory and warm it up (best-effort)
+        if settings.GEOIP_ENABLED and settings.GEOIP_PRELOAD:
+            try:
+                import asyncio
+                from app.services.geoip_service import geoip_service
+                await asyncio.to_thread(geoip_service.warm_up)
+            except Exception:
+                # best-effort; don't block startup
+                pass
+
         startup_log("🗄️  Connecting to database...")
 
         # Start background sync monitor
@@ -223,6 +233,14 @@ def create_app(
             # best-effort; don't block startup
             pass
 
+        # Start visitor presence write-behind flusher (best-effort)
+        try:
+            from app.services.visitor_presence import start_presence_writer
+            await start_presence_writer()
+        except Exception:
+            # best-effort; don't block startup
+            pass
+
         # Start periodic visitor online status sync task (best-effort)
         try:
             from app.tasks.sync_visitor_online_status import start_visitor_online_sync_task
@@ -298,6 +316,13 @@ def create_app(
         except Exception:
             pass
 
+        # Stop visitor presence write-behind flusher, flushing pending updates (best-effort)
+        try:
+            from app.services.visitor_presence import stop_presence_writer
+            await stop_presence_writer()
+        except Exception:
+            pass
+
         # Stop periodic auto AI fallback task (best-effort)
         try:
             from app.tasks.auto_fallback_to_ai import stop_auto_fallback_to_ai_task
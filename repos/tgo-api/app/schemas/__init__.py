@@ -57,6 +57,7 @@ from app.schemas.email_schema import (
 from app.schemas.base import (
     BaseSchema,
     BulkOperationResponse,
+    CursorPaginationMetadata,
     ErrorDetail,
     ErrorResponse,
     HealthCheckResponse,
@@ -245,6 +246,7 @@ __all__ = [
     "SoftDeleteMixin",
     "PaginationParams",
     "PaginationMetadata",
+    "CursorPaginationMetadata",
     "PaginatedResponse",
     "ErrorDetail",
     "ErrorResponse",
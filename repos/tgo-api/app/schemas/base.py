@@ -59,6 +59,19 @@ class PaginationMetadata(BaseModel):
     has_prev: bool = Field(..., description="Whether there are previous items")
 
 
+class CursorPaginationMetadata(PaginationMetadata):
+    """Pagination metadata for listings that also support keyset cursors."""
+
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor for the next page; pass it back as `cursor` (null on the last page)"
+    )
+    total_is_estimate: bool = Field(
+        False,
+        description="Whether `total` is a planner estimate rather than an exact count"
+    )
+
+
 class PaginatedResponse(BaseModel):
     """Generic paginated response."""
     
@@ -8,7 +8,13 @@ from pydantic import EmailStr, Field, field_validator
 
 from app.core.config import settings
 from app.models.platform import PlatformType
-from app.schemas.base import BaseSchema, PaginatedResponse, SoftDeleteMixin, TimestampMixin
+from app.schemas.base import (
+    BaseSchema,
+    CursorPaginationMetadata,
+    PaginatedResponse,
+    SoftDeleteMixin,
+    TimestampMixin,
+)
 from app.schemas.tag import TagResponse
 from app.schemas.platform_schema import PlatformAISettings
 
@@ -454,6 +460,7 @@ class VisitorListResponse(PaginatedResponse):
     """Schema for visitor list response."""
 
     data: list[VisitorResponse] = Field(..., description="List of visitors")
+    pagination: CursorPaginationMetadata = Field(..., description="Pagination metadata")
 
 
 class VisitorAvatarUploadResponse(BaseSchema):
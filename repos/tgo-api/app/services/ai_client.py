@@ -1,5 +1,6 @@
 """AI service client for proxying requests to external AI service."""
 
+import asyncio
 import json
 from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 from uuid import uuid4, UUID
@@ -15,6 +16,9 @@ from app.core.logging import get_logger
 
 logger = get_logger("ai_client")
 
+# Domain events after which the supervisor stream is complete
+_TERMINAL_STREAM_EVENTS = ("workflow_completed", "workflow_failed")
+
 
 class AIServiceClient:
     """Client for communicating with the external AI service."""
@@ -315,6 +319,9 @@ class AIServiceClient:
             payload["system_message"] = system_message
         if expected_output is not None:
             payload["expected_output"] = expected_output
+        if settings.AI_SERVICE_STREAM_COMPACT:
+            # Terse batched frames; expanded back to regular events below
+            payload["stream_format"] = "compact"
 
         url = f"{self.base_url}/api/v1/agents/run"
         request_id = str(uuid4())
@@ -328,65 +335,162 @@ class AIServiceClient:
             extra={"request_id": request_id},
         )
 
-        try:
-            async with httpx.AsyncClient(timeout=None) as client:
-                async with client.stream(
-                    "POST",
-                    url,
-                    headers=headers,
-                    json=self._to_jsonable(payload),
-                    params={"project_id": project_id},
-                ) as response:
-                    if response.status_code != 200:
-                        try:
-                            error_data = await response.json()
-                        except Exception:
-                            error_body = await response.aread()
-                            error_data = {"error": error_body.decode("utf-8", errors="ignore")}
-                        logger.warning(
-                            "AI service stream error: %s",
-                            response.status_code,
-                            extra={"request_id": request_id, "detail": error_data},
-                        )
-                        raise HTTPException(status_code=response.status_code, detail=error_data)
-
-                    event_name: Optional[str] = None
-                    data_lines: List[str] = []
-
-                    async for line in response.aiter_lines():
-                        if not line:
-                            if not data_lines:
-                                event_name = None
-                                continue
-                            data_text = '\n'.join(data_lines)
-                            try:
-                                parsed = json.loads(data_text)
-                            except json.JSONDecodeError:
-                                parsed = data_text
-                            yield (event_name or "message", parsed)
+        # Every domain event carries an SSE id; if the connection drops mid-run we
+        # reconnect with Last-Event-ID and the AI service continues the same run.
+        last_event_id: Optional[str] = None
+        compact_header: Optional[Dict[str, Any]] = None
+        attempt = 0
+        while True:
+            request_headers = dict(headers)
+            if last_event_id:
+                request_headers["Last-Event-ID"] = last_event_id
+            finished = False
+            try:
+                async for event_name, parsed, event_id in self._stream_sse_events(
+                    url, request_headers, payload, project_id, request_id
+                ):
+                    if event_id:
+                        last_event_id = event_id
+                        attempt = 0
+                    if event_name == "h" and isinstance(parsed, dict):
+                        # Compact run header: decoding tables, in place of "connected"
+                        compact_header = parsed
+                        event_name, parsed = "connected", {
+                            "message": "Stream connected",
+                            "request_id": parsed.get("rid"),
+                            "correlation_id": parsed.get("cid"),
+                            "stream_id": parsed.get("sid"),
+                        }
+                    if event_name == "connected" and "Last-Event-ID" in request_headers:
+                        # Already delivered on the first connection
+                        continue
+                    if compact_header is not None and isinstance(parsed, list):
+                        events = [("event", item) for item in self._expand_compact_items(compact_header, parsed)]
+                    else:
+                        events = [(event_name, parsed)]
+                    for name, data in events:
+                        if name == "disconnected" or (
+                            isinstance(data, dict) and data.get("event_type") in _TERMINAL_STREAM_EVENTS
+                        ):
+                            finished = True
+                        yield (name, data)
+                if finished or last_event_id is None:
+                    return
+                error: Exception = RuntimeError("stream ended before the run finished")
+            except httpx.TimeoutException as exc:
+                if last_event_id is None:
+                    logger.error("AI service stream timeout: %s", url, extra={"request_id": request_id})
+                    raise HTTPException(status_code=504, detail="AI service stream timed out")
+                error = exc
+            except httpx.RequestError as exc:
+                if last_event_id is None:
+                    logger.error("AI service stream request error: %s", exc, extra={"request_id": request_id})
+                    raise HTTPException(status_code=502, detail="Failed to connect to AI service")
+                error = exc
+
+            attempt += 1
+            if attempt > settings.AI_SERVICE_STREAM_RESUME_ATTEMPTS:
+                logger.error(
+                    "AI service stream interrupted, giving up: %s",
+                    error,
+                    extra={"request_id": request_id, "last_event_id": last_event_id},
+                )
+                raise HTTPException(status_code=502, detail="AI service stream interrupted")
+            logger.warning(
+                "AI service stream interrupted, resuming (attempt %s): %s",
+                attempt,
+                error,
+                extra={"request_id": request_id, "last_event_id": last_event_id},
+            )
+            await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 5.0))
+
+    async def _stream_sse_events(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        project_id: str,
+        request_id: str,
+    ) -> AsyncGenerator[Tuple[str, Any, Optional[str]], None]:
+        """POST to a streaming endpoint and yield (event name, parsed data, event id) per SSE."""
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with client.stream(
+                "POST",
+                url,
+                headers=headers,
+                json=self._to_jsonable(payload),
+                params={"project_id": project_id},
+            ) as response:
+                if response.status_code != 200:
+                    try:
+                        error_data = await response.json()
+                    except Exception:
+                        error_body = await response.aread()
+                        error_data = {"error": error_body.decode("utf-8", errors="ignore")}
+                    logger.warning(
+                        "AI service stream error: %s",
+                        response.status_code,
+                        extra={"request_id": request_id, "detail": error_data},
+                    )
+                    raise HTTPException(status_code=response.status_code, detail=error_data)
+
+                event_name: Optional[str] = None
+                event_id: Optional[str] = None
+                data_lines: List[str] = []
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        if not data_lines:
                             event_name = None
-                            data_lines = []
+                            event_id = None
                             continue
-                        if line.startswith(":"):
-                            continue
-                        if line.startswith("event:"):
-                            event_name = line.split(":", 1)[1].strip()
-                        elif line.startswith("data:"):
-                            data_lines.append(line.split(":", 1)[1].strip())
-
-                    if data_lines:
-                        data_text = '\n'.join(data_lines)
-                        try:
-                            parsed = json.loads(data_text)
-                        except json.JSONDecodeError:
-                            parsed = data_text
-                        yield (event_name or "message", parsed)
-        except httpx.TimeoutException:
-            logger.error("AI service stream timeout: %s", url, extra={"request_id": request_id})
-            raise HTTPException(status_code=504, detail="AI service stream timed out")
-        except httpx.RequestError as exc:
-            logger.error("AI service stream request error: %s", exc, extra={"request_id": request_id})
-            raise HTTPException(status_code=502, detail="Failed to connect to AI service")
+                        yield (event_name or "message", self._parse_sse_data(data_lines), event_id)
+                        event_name = None
+                        event_id = None
+                        data_lines = []
+                        continue
+                    if line.startswith(":"):
+                        continue
+                    if line.startswith("event:"):
+                        event_name = line.split(":", 1)[1].strip()
+                    elif line.startswith("id:"):
+                        event_id = line.split(":", 1)[1].strip()
+                    elif line.startswith("data:"):
+                        data_lines.append(line.split(":", 1)[1].strip())
+
+                if data_lines:
+                    yield (event_name or "message", self._parse_sse_data(data_lines), event_id)
+
+    @staticmethod
+    def _expand_compact_items(header: Dict[str, Any], items: List[Any]) -> List[Dict[str, Any]]:
+        """Expand compact stream items into regular event dicts using the run header tables."""
+        codes: Dict[str, str] = header.get("codes") or {}
+        deltas: Dict[str, Dict[str, str]] = header.get("deltas") or {}
+        events: List[Dict[str, Any]] = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            code = item.get("t")
+            fields = deltas.get(code)
+            if fields is not None:
+                data = {name: item[key] for key, name in fields.items() if key in item}
+            else:
+                data = item.get("d") or {}
+            events.append({
+                "event_type": codes.get(code, code),
+                "data": data,
+                "severity": item.get("s", "info"),
+                "metadata": item.get("m") or {},
+            })
+        return events
+
+    @staticmethod
+    def _parse_sse_data(data_lines: List[str]) -> Any:
+        data_text = '\n'.join(data_lines)
+        try:
+            return json.loads(data_text)
+        except json.JSONDecodeError:
+            return data_text
 
     async def cancel_supervisor_run(
         self,
@@ -7,9 +7,11 @@ Supports two providers:
 See: https://github.com/lionsoul2014/ip2region
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Iterable, Optional
 import os
+import threading
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -20,6 +22,7 @@ logger = get_logger("services.geoip")
 try:
     import geoip2.database
     import geoip2.errors
+    import maxminddb
     GEOIP2_AVAILABLE = True
 except ImportError:
     GEOIP2_AVAILABLE = False
@@ -65,6 +68,12 @@ class GeoIPService:
         self._initialized = False
         self._init_error: Optional[str] = None
         self._provider: Optional[str] = None
+        # LRU cache of recent IP -> GeoLocation results (lookups repeat constantly)
+        self._cache: "OrderedDict[str, GeoLocation]" = OrderedDict()
+        self._cache_size = settings.GEOIP_CACHE_SIZE
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
     
     def _ensure_initialized(self) -> bool:
         """Lazy initialization of the GeoIP database reader."""
@@ -153,19 +162,27 @@ class GeoIPService:
         
         return True
     
-    def _load_ip2region_db(self, db_path: str, version: int, version_name: str) -> bool:
-        """Load a single ip2region database file."""
+    def _load_ip2region_db(self, db_path: str, version: "xdb_util.Version", version_name: str) -> bool:
+        """Load a single ip2region database file.
+
+        With GEOIP_PRELOAD the whole xdb is read into memory, so searches never
+        touch the disk and the searcher is safe to share between threads.
+        """
         try:
-            # Load entire xdb into memory for best performance and thread-safety
-            # Note: load_content_from_file is in util module, not searcher
-            searcher = xdb_searcher.new_with_file_only(xdb_util.Version(version), db_path)
+            if settings.GEOIP_PRELOAD:
+                content = xdb_util.load_content_from_file(db_path)
+                searcher = xdb_searcher.new_with_buffer(version, content)
+            else:
+                vector_index = xdb_util.load_vector_index_from_file(db_path)
+                searcher = xdb_searcher.new_with_vector_index(version, db_path, vector_index)
             
-            if version == xdb_util.IPv4:
+            if version is xdb_util.IPv4:
                 self._ip2region_searcher_v4 = searcher
             else:
                 self._ip2region_searcher_v6 = searcher
             
-            logger.info(f"ip2region {version_name} database loaded from {db_path}")
+            mode = "memory" if settings.GEOIP_PRELOAD else "vector index"
+            logger.info(f"ip2region {version_name} database loaded from {db_path} ({mode})")
             return True
         except Exception as e:
             logger.warning(f"Failed to load ip2region {version_name} database from {db_path}: {e}")
@@ -179,7 +196,9 @@ class GeoIPService:
             return False
         
         try:
-            self._geoip2_reader = geoip2.database.Reader(db_path)
+            # MODE_MEMORY reads the whole mmdb up front; MODE_MMAP lets the OS page it in
+            mode = maxminddb.MODE_MEMORY if settings.GEOIP_PRELOAD else maxminddb.MODE_MMAP
+            self._geoip2_reader = geoip2.database.Reader(db_path, mode=mode)
             logger.info(f"GeoIP2 database loaded successfully from {db_path}")
             return True
         except Exception as e:
@@ -191,6 +210,8 @@ class GeoIPService:
         """
         Look up geolocation data for an IP address.
         
+        Results are served from an in-process LRU cache when possible.
+        
         Args:
             ip_address: The IP address to look up (IPv4 or IPv6)
             
@@ -207,6 +228,35 @@ class GeoIPService:
         if self._is_private_ip(ip_address):
             return GeoLocation()
         
+        cached = self._cache_get(ip_address)
+        if cached is not None:
+            return cached
+        
+        location = self._lookup_uncached(ip_address)
+        self._cache_put(ip_address, location)
+        return location
+    
+    def lookup_many(self, ip_addresses: Iterable[Optional[str]]) -> Dict[str, GeoLocation]:
+        """
+        Look up geolocation data for many IP addresses at once.
+        
+        Intended for bulk visitor imports and backfills. Duplicate addresses
+        are resolved once.
+        
+        Args:
+            ip_addresses: IP addresses to look up (empty values are skipped)
+            
+        Returns:
+            Mapping of IP address to GeoLocation
+        """
+        results: Dict[str, GeoLocation] = {}
+        for ip_address in ip_addresses:
+            if ip_address and ip_address not in results:
+                results[ip_address] = self.lookup(ip_address)
+        return results
+    
+    def _lookup_uncached(self, ip_address: str) -> GeoLocation:
+        """Look up an IP address directly against the configured provider."""
         if self._provider == "ip2region":
             has_searcher = self._ip2region_searcher_v4 or self._ip2region_searcher_v6
             if has_searcher:
@@ -216,6 +266,64 @@ class GeoIPService:
         
         return GeoLocation()
     
+    def _cache_get(self, ip_address: str) -> Optional[GeoLocation]:
+        """Get a cached result and mark it as recently used."""
+        if not self._cache_size:
+            return None
+        with self._cache_lock:
+            location = self._cache.get(ip_address)
+            if location is None:
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(ip_address)
+            self._cache_hits += 1
+            return location
+    
+    def _cache_put(self, ip_address: str, location: GeoLocation) -> None:
+        """Store a result, evicting the least recently used entries."""
+        if not self._cache_size:
+            return
+        with self._cache_lock:
+            self._cache[ip_address] = location
+            self._cache.move_to_end(ip_address)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+    
+    def clear_cache(self) -> None:
+        """Drop all cached results and reset hit metrics."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+    
+    @property
+    def cache_stats(self) -> Dict[str, float]:
+        """Get LRU cache metrics (size, hits, misses, hit ratio)."""
+        with self._cache_lock:
+            total = self._cache_hits + self._cache_misses
+            return {
+                "size": len(self._cache),
+                "max_size": self._cache_size,
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_ratio": (self._cache_hits / total) if total else 0.0,
+            }
+    
+    def warm_up(self) -> bool:
+        """Load the database and run probe lookups so the first request is fast.
+        
+        Returns:
+            True if GeoIP lookup is available
+        """
+        if not self._ensure_initialized():
+            return False
+        
+        for probe_ip in ("1.1.1.1", "8.8.8.8", "114.114.114.114", "2001:4860:4860::8888"):
+            self._lookup_uncached(probe_ip)
+        
+        logger.info(f"GeoIP service warmed up: {self.status}")
+        return True
+    
     def _is_ipv6(self, ip_address: str) -> bool:
         """Check if an IP address is IPv6."""
         return ":" in ip_address
@@ -382,6 +490,7 @@ class GeoIPService:
         if self._ip2region_searcher_v6:
             self._ip2region_searcher_v6.close()
             self._ip2region_searcher_v6 = None
+        self.clear_cache()
     
     @property
     def is_available(self) -> bool:
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from typing import Optional
+from uuid import UUID
 
 from sqlalchemy.orm import Session
 
@@ -101,7 +102,7 @@ async def close_visitor_session(
         }
     )
     
-    # 4. Remove staff from WuKongIM channel and ChannelMember table
+    # 4. Remove staff from ChannelMember table
     if session.staff_id:
         # Remove from ChannelMember table (soft delete)
         channel_member = db.query(ChannelMember).filter(
@@ -115,21 +116,64 @@ async def close_visitor_session(
             channel_member.deleted_at = datetime.utcnow()
             db.flush()
             logger.info(f"Removed staff {session.staff_id} from ChannelMember table for channel {channel_id}")
-        
-        # Remove from WuKongIM channel (async, non-blocking)
+    
+    # 5-6. Remove staff from the WuKongIM channel, send the closed message and
+    # delete the staff conversation (async, non-blocking)
+    await notify_session_closed(
+        session_id=session.id,
+        visitor_id=session.visitor_id,
+        staff_id=session.staff_id,
+        closed_by_staff=closed_by_staff,
+        send_notification=send_notification,
+    )
+    
+    # 7. Trigger queue processing - staff has freed up a slot
+    if session.staff_id and session.project_id:
         try:
-            staff_uid = f"{session.staff_id}-staff"
+            await trigger_queue_for_staff(session.staff_id, session.project_id)
+        except Exception as e:
+            logger.error(f"Failed to trigger queue processing: {e}")
+            # Don't fail if trigger fails
+    
+    return session
+
+
+async def notify_session_closed(
+    session_id: UUID,
+    visitor_id: UUID,
+    staff_id: Optional[UUID],
+    closed_by_staff: Optional[Staff] = None,
+    send_notification: bool = True,
+) -> None:
+    """
+    发送会话关闭后的 WuKongIM 通知（失败只记录日志，不抛出异常）。
+    
+    - 将客服从访客频道订阅者中移除
+    - 发送会话关闭系统消息
+    - 删除客服的最近会话
+    
+    Args:
+        session_id: 会话 ID（用于日志）
+        visitor_id: 访客 ID
+        staff_id: 会话所属客服 ID（可选）
+        closed_by_staff: 关闭会话的客服（可选）
+        send_notification: 是否发送系统通知消息
+    """
+    channel_id = build_visitor_channel_id(visitor_id)
+    
+    if staff_id:
+        try:
+            staff_uid = f"{staff_id}-staff"
             await wukongim_client.remove_channel_subscribers(
                 channel_id=channel_id,
                 channel_type=CHANNEL_TYPE_CUSTOMER_SERVICE,
                 subscribers=[staff_uid],
             )
-            logger.info(f"Removed staff {session.staff_id} from WuKongIM channel {channel_id}")
+            logger.info(f"Removed staff {staff_id} from WuKongIM channel {channel_id}")
         except Exception as e:
             logger.warning(f"Failed to remove staff from WuKongIM channel: {e}")
             # Don't fail if removal fails - it's not critical
     
-    # 5. Send session closed system message (async, non-blocking)
     if send_notification:
         try:
             staff_uid = None
@@ -146,31 +190,20 @@ async def close_visitor_session(
                 staff_uid=staff_uid,
                 staff_name=staff_name,
             )
-            logger.info(f"Sent session closed message for session {session.id}")
+            logger.info(f"Sent session closed message for session {session_id}")
         except Exception as e:
             logger.error(f"Failed to send session closed message: {e}")
             # Don't fail if notification fails
     
-    # 6. Delete the conversation from staff's WuKongIM (async, non-blocking)
-    if session.staff_id:
+    if staff_id:
         try:
-            staff_uid = f"{session.staff_id}-staff"
+            staff_uid = f"{staff_id}-staff"
             await wukongim_client.delete_conversation(
                 uid=staff_uid,
                 channel_id=channel_id,
                 channel_type=CHANNEL_TYPE_CUSTOMER_SERVICE,
             )
-            logger.info(f"Deleted conversation for staff {session.staff_id}, session {session.id}")
+            logger.info(f"Deleted conversation for staff {staff_id}, session {session_id}")
         except Exception as e:
             logger.warning(f"Failed to delete conversation from WuKongIM: {e}")
             # Don't fail if deletion fails - it's not critical
-    
-    # 7. Trigger queue processing - staff has freed up a slot
-    if session.staff_id and session.project_id:
-        try:
-            await trigger_queue_for_staff(session.staff_id, session.project_id)
-        except Exception as e:
-            logger.error(f"Failed to trigger queue processing: {e}")
-            # Don't fail if trigger fails
-    
-    return session
@@ -5,7 +5,12 @@ Currently only supports local storage, OSS can be added later.
 """
 
 from app.core.config import settings
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import (
+    StorageBackend,
+    StreamUploadResult,
+    UploadTooLargeError,
+    iter_upload_chunks,
+)
 from app.services.storage.local import LocalStorageBackend
 
 
@@ -23,6 +28,7 @@ def get_storage_backend() -> StorageBackend:
             access_key_id=settings.OSS_ACCESS_KEY_ID,
             access_key_secret=settings.OSS_ACCESS_KEY_SECRET,
             bucket_url=settings.OSS_BUCKET_URL,
+            part_size=settings.STORAGE_MULTIPART_PART_SIZE_MB * 1024 * 1024,
         )
     elif storage_type == "minio":
         from app.services.storage.minio import MinIOBackend
@@ -33,6 +39,7 @@ def get_storage_backend() -> StorageBackend:
             bucket_name=settings.MINIO_BUCKET_NAME,
             upload_url=settings.MINIO_UPLOAD_URL,
             download_url=settings.MINIO_DOWNLOAD_URL,
+            part_size=settings.STORAGE_MULTIPART_PART_SIZE_MB * 1024 * 1024,
         )
     
     # Default to local storage
@@ -56,7 +63,10 @@ def get_storage() -> StorageBackend:
 
 __all__ = [
     "StorageBackend",
+    "StreamUploadResult",
+    "UploadTooLargeError",
     "LocalStorageBackend",
+    "iter_upload_chunks",
     "get_storage_backend",
     "get_storage",
 ]
@@ -1,7 +1,8 @@
 """Aliyun OSS storage backend."""
 
 import asyncio
-from typing import BinaryIO, Any
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Any, Optional
 from urllib.parse import urlparse
 
 try:
@@ -9,7 +10,12 @@ try:
 except ImportError:
     oss2 = None
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import (
+    DEFAULT_PART_SIZE,
+    StorageBackend,
+    StreamUploadResult,
+    UploadDigest,
+)
 
 
 class AliyunOSSBackend(StorageBackend):
@@ -22,6 +28,7 @@ class AliyunOSSBackend(StorageBackend):
         access_key_id: str,
         access_key_secret: str,
         bucket_url: str = None,
+        part_size: int = DEFAULT_PART_SIZE,
     ):
         """
         Initialize Aliyun OSS backend.
@@ -32,6 +39,7 @@ class AliyunOSSBackend(StorageBackend):
             access_key_id: OSS access key ID
             access_key_secret: OSS access key secret
             bucket_url: Base URL for generating public URLs (can be a custom domain)
+            part_size: Multipart part size for streaming uploads
         """
         if oss2 is None:
             raise ImportError(
@@ -45,6 +53,8 @@ class AliyunOSSBackend(StorageBackend):
         # bucket_url should be something like https://bucket-name.oss-cn-hangzhou.aliyuncs.com
         # or a custom domain like https://cdn.example.com
         self.bucket_url = (bucket_url or f"https://{bucket_name}.{endpoint}").rstrip("/")
+        # OSS requires parts of at least 100KB (except the last one)
+        self.part_size = max(part_size, 100 * 1024)
 
     async def upload(self, file: BinaryIO, path: str, content_type: str) -> str:
         """Upload file to Aliyun OSS."""
@@ -56,6 +66,69 @@ class AliyunOSSBackend(StorageBackend):
         )
         return self.get_public_url(path)
 
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str,
+        content_type: str,
+        max_size: Optional[int] = None,
+    ) -> StreamUploadResult:
+        """Stream chunks to Aliyun OSS using multipart upload.
+        
+        At most one part is buffered in memory. Files smaller than one part
+        are sent with a single put_object.
+        """
+        loop = asyncio.get_event_loop()
+        key = path.lstrip("/")
+        headers = {"Content-Type": content_type}
+        digest = UploadDigest(max_size)
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        parts: list = []
+
+        async def flush_part() -> None:
+            body = bytes(buffer)
+            buffer.clear()
+            part_number = len(parts) + 1
+            result = await loop.run_in_executor(
+                None, partial(self.bucket.upload_part, key, upload_id, part_number, body)
+            )
+            parts.append(oss2.models.PartInfo(part_number, result.etag))
+
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        result = await loop.run_in_executor(
+                            None, partial(self.bucket.init_multipart_upload, key, headers=headers)
+                        )
+                        upload_id = result.upload_id
+                    await flush_part()
+
+            if upload_id is None:
+                await loop.run_in_executor(
+                    None, partial(self.bucket.put_object, key, bytes(buffer), headers=headers)
+                )
+            else:
+                if buffer:
+                    await flush_part()
+                await loop.run_in_executor(
+                    None, partial(self.bucket.complete_multipart_upload, key, upload_id, parts)
+                )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await loop.run_in_executor(
+                        None, partial(self.bucket.abort_multipart_upload, key, upload_id)
+                    )
+                except Exception:
+                    pass
+            raise
+
+        return digest.result(self.get_public_url(path))
+
     async def delete(self, path: str) -> bool:
         """Delete file from Aliyun OSS."""
         loop = asyncio.get_event_loop()
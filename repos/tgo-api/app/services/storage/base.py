@@ -1,7 +1,67 @@
 """Storage backend abstraction for file storage."""
 
+import hashlib
+import tempfile
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Optional
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional
+
+# Default multipart part size for streaming uploads (S3 requires >= 5MB)
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a streamed upload exceeds its size limit."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"Upload exceeds maximum size of {max_size} bytes")
+
+
+@dataclass
+class StreamUploadResult:
+    """Result of a streaming upload."""
+
+    url: str
+    size: int
+    sha256: str
+    md5: str
+
+
+class UploadDigest:
+    """Track size and hashes of a stream incrementally, enforcing a size limit."""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._md5 = hashlib.md5()
+
+    def update(self, chunk: bytes) -> None:
+        """Account for a chunk; raises UploadTooLargeError once over the limit."""
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise UploadTooLargeError(self.max_size)
+        self._sha256.update(chunk)
+        self._md5.update(chunk)
+
+    def result(self, url: str) -> StreamUploadResult:
+        """Build the upload result for the final URL."""
+        return StreamUploadResult(
+            url=url,
+            size=self.size,
+            sha256=self._sha256.hexdigest(),
+            md5=self._md5.hexdigest(),
+        )
+
+
+async def iter_upload_chunks(file, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+    """Yield chunks from an async file-like object (e.g. FastAPI UploadFile)."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
 
 
 class StorageBackend(ABC):
@@ -22,6 +82,41 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str,
+        content_type: str,
+        max_size: Optional[int] = None,
+    ) -> StreamUploadResult:
+        """
+        Upload a file from an async stream of chunks without buffering it whole.
+        
+        Size is enforced and hashes are computed as chunks arrive. Backends
+        override this with a native streaming/multipart implementation; the
+        default spools to a temporary file (on disk past 1MB) and calls upload().
+        
+        Args:
+            chunks: Async iterator of file content chunks
+            path: Relative path to store the file
+            content_type: MIME type of the file
+            max_size: Maximum allowed size in bytes (None for no limit)
+            
+        Returns:
+            StreamUploadResult with public URL, size and hashes
+            
+        Raises:
+            UploadTooLargeError: If the stream exceeds max_size
+        """
+        digest = UploadDigest(max_size)
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            async for chunk in chunks:
+                digest.update(chunk)
+                spool.write(chunk)
+            spool.seek(0)
+            url = await self.upload(spool, path, content_type)
+        return digest.result(url)
+
     @abstractmethod
     async def delete(self, path: str) -> bool:
         """
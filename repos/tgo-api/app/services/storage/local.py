@@ -1,12 +1,13 @@
 """Local file system storage backend."""
 
+import asyncio
 import os
 import shutil
 from pathlib import Path
-from typing import BinaryIO, Any
+from typing import AsyncIterator, BinaryIO, Any, Optional
 from urllib.parse import urlparse
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import StorageBackend, StreamUploadResult, UploadDigest
 
 
 class LocalStorageBackend(StorageBackend):
@@ -39,6 +40,41 @@ class LocalStorageBackend(StorageBackend):
         
         return self.get_public_url(path)
 
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str,
+        content_type: str,
+        max_size: Optional[int] = None,
+    ) -> StreamUploadResult:
+        """Stream chunks to a temporary file, then move it into place.
+
+        File system calls run in a worker thread so slow disks do not block
+        the event loop.
+        """
+        full_path = self.base_path / path.lstrip("/")
+        await asyncio.to_thread(full_path.parent.mkdir, parents=True, exist_ok=True)
+        part_path = full_path.with_name(full_path.name + ".part")
+        
+        digest = UploadDigest(max_size)
+        try:
+            f = await asyncio.to_thread(open, part_path, "wb")
+            try:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, part_path, full_path)
+        except BaseException:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
+        
+        return digest.result(self.get_public_url(path))
+
     async def delete(self, path: str) -> bool:
         """Delete file from local storage."""
         full_path = self.base_path / path.lstrip("/")
@@ -1,7 +1,8 @@
 """MinIO/S3 storage backend."""
 
 import asyncio
-from typing import BinaryIO, Any, Optional
+from functools import partial
+from typing import AsyncIterator, BinaryIO, Any, Optional
 from urllib.parse import urlparse
 
 try:
@@ -11,7 +12,12 @@ except ImportError:
     boto3 = None
     ClientError = Exception
 
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import (
+    DEFAULT_PART_SIZE,
+    StorageBackend,
+    StreamUploadResult,
+    UploadDigest,
+)
 
 
 class MinIOBackend(StorageBackend):
@@ -26,6 +32,7 @@ class MinIOBackend(StorageBackend):
         upload_url: Optional[str] = None,
         download_url: Optional[str] = None,
         region_name: str = "us-east-1",
+        part_size: int = DEFAULT_PART_SIZE,
     ):
         """
         Initialize MinIO/S3 backend.
@@ -38,6 +45,7 @@ class MinIOBackend(StorageBackend):
             upload_url: Optional internal URL for uploads
             download_url: Optional public URL for downloads (CDN or custom domain)
             region_name: S3 region name (default us-east-1)
+            part_size: Multipart part size for streaming uploads (>= 5MB)
         """
         if boto3 is None:
             raise ImportError(
@@ -48,6 +56,7 @@ class MinIOBackend(StorageBackend):
         self.bucket_name = bucket_name
         self.download_url = (download_url or endpoint_url).rstrip("/")
         self.upload_url = (upload_url or endpoint_url).rstrip("/")
+        self.part_size = max(part_size, 5 * 1024 * 1024)
         
         # Initialize boto3 client
         self.s3 = boto3.client(
@@ -74,6 +83,101 @@ class MinIOBackend(StorageBackend):
         )
         return self.get_public_url(path)
 
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str,
+        content_type: str,
+        max_size: Optional[int] = None,
+    ) -> StreamUploadResult:
+        """Stream chunks to MinIO/S3 using multipart upload.
+        
+        At most one part is buffered in memory. Files smaller than one part
+        are sent with a single put_object.
+        """
+        loop = asyncio.get_event_loop()
+        clean_path = path.lstrip("/")
+        digest = UploadDigest(max_size)
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        parts: list = []
+
+        async def flush_part() -> None:
+            body = bytes(buffer)
+            buffer.clear()
+            response = await loop.run_in_executor(
+                None,
+                partial(
+                    self.s3.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=clean_path,
+                    UploadId=upload_id,
+                    PartNumber=len(parts) + 1,
+                    Body=body,
+                ),
+            )
+            parts.append({"PartNumber": len(parts) + 1, "ETag": response["ETag"]})
+
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                buffer.extend(chunk)
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        response = await loop.run_in_executor(
+                            None,
+                            partial(
+                                self.s3.create_multipart_upload,
+                                Bucket=self.bucket_name,
+                                Key=clean_path,
+                                ContentType=content_type,
+                            ),
+                        )
+                        upload_id = response["UploadId"]
+                    await flush_part()
+
+            if upload_id is None:
+                await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.s3.put_object,
+                        Bucket=self.bucket_name,
+                        Key=clean_path,
+                        Body=bytes(buffer),
+                        ContentType=content_type,
+                    ),
+                )
+            else:
+                if buffer:
+                    await flush_part()
+                await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.s3.complete_multipart_upload,
+                        Bucket=self.bucket_name,
+                        Key=clean_path,
+                        UploadId=upload_id,
+                        MultipartUpload={"Parts": parts},
+                    ),
+                )
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await loop.run_in_executor(
+                        None,
+                        partial(
+                            self.s3.abort_multipart_upload,
+                            Bucket=self.bucket_name,
+                            Key=clean_path,
+                            UploadId=upload_id,
+                        ),
+                    )
+                except Exception:
+                    pass
+            raise
+
+        return digest.result(self.get_public_url(path))
+
     async def delete(self, path: str) -> bool:
         """Delete file from MinIO/S3."""
         loop = asyncio.get_event_loop()
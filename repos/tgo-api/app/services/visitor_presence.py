@@ -0,0 +1,314 @@
+"""Visitor presence state and write-behind persistence.
+
+Online state is applied from WuKongIM ``user.onlinestatus`` webhook events to a
+presence store instead of being written to Postgres event by event:
+
+- The store keeps one entry per online visitor, scored by the time of its last
+  heartbeat (an online event or a successful reconciliation check). Visitors
+  whose heartbeat is older than ``VISITOR_PRESENCE_TTL_SECONDS`` are "stale"
+  and are the only ones the periodic reconciliation asks WuKongIM about.
+- ``is_online``/``last_visit_time``/``last_offline_time`` changes are buffered
+  (latest state per visitor wins) and flushed to Postgres in batches.
+
+If REDIS_URL is configured, presence lives in a Redis sorted set shared by all
+processes. Otherwise an in-memory store is used (single-process only).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import get_logger
+
+logger = get_logger("services.visitor_presence")
+
+REDIS_KEY_PREFIX = "tgo:presence:"
+ONLINE_VISITORS_KEY = f"{REDIS_KEY_PREFIX}visitors:online"
+SEEDED_KEY = f"{REDIS_KEY_PREFIX}visitors:seeded"
+SEEDING_LOCK_KEY = f"{REDIS_KEY_PREFIX}visitors:seeding"
+SEEDING_LOCK_TTL_SECONDS = 300
+
+
+class InMemoryPresenceStore:
+    """In-memory presence store (single-process only)."""
+
+    def __init__(self) -> None:
+        self._online: Dict[str, float] = {}
+        self._seeded = False
+        self._lock = asyncio.Lock()
+
+    async def set_online(self, visitor_id: str) -> Optional[bool]:
+        """Record an online heartbeat; returns True if the visitor was already online."""
+        async with self._lock:
+            previous = visitor_id in self._online
+            self._online[visitor_id] = time.time()
+            return True if previous else None
+
+    async def set_offline(self, visitor_id: str) -> Optional[bool]:
+        """Remove a visitor; returns True if the visitor was online."""
+        async with self._lock:
+            return True if self._online.pop(visitor_id, None) is not None else None
+
+    async def touch(self, visitor_ids: Iterable[str]) -> None:
+        """Refresh the heartbeat of visitors confirmed online."""
+        async with self._lock:
+            now = time.time()
+            for visitor_id in visitor_ids:
+                if visitor_id in self._online:
+                    self._online[visitor_id] = now
+
+    async def discard(self, visitor_ids: Iterable[str]) -> None:
+        async with self._lock:
+            for visitor_id in visitor_ids:
+                self._online.pop(visitor_id, None)
+
+    async def stale_visitors(self, older_than: float, limit: int) -> List[str]:
+        """Return up to ``limit`` online visitors whose last heartbeat is before ``older_than``."""
+        async with self._lock:
+            stale = sorted(
+                (ts, visitor_id) for visitor_id, ts in self._online.items() if ts < older_than
+            )
+            return [visitor_id for _, visitor_id in stale[:limit]]
+
+    async def seed(self, visitor_ids: Callable[[], Iterable[str]]) -> int:
+        """Load visitors marked online in the database once, as stale entries."""
+        async with self._lock:
+            if self._seeded:
+                return 0
+            count = 0
+            for visitor_id in await asyncio.to_thread(lambda: list(visitor_ids())):
+                self._online.setdefault(visitor_id, 0.0)
+                count += 1
+            self._seeded = True
+            return count
+
+
+class RedisPresenceStore:
+    """Redis-backed presence store for multi-process deployments."""
+
+    def __init__(self, redis_url: str) -> None:
+        self._redis_url = redis_url
+        self._redis: Any = None
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(
+                    self._redis_url,
+                    encoding="utf-8",
+                    decode_responses=True,
+                )
+                logger.info("Redis connection established for visitor_presence")
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis: {e}")
+                raise
+        return self._redis
+
+    async def set_online(self, visitor_id: str) -> Optional[bool]:
+        redis = await self._get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zscore(ONLINE_VISITORS_KEY, visitor_id)
+            pipe.zadd(ONLINE_VISITORS_KEY, {visitor_id: time.time()})
+            previous, _ = await pipe.execute()
+        return True if previous is not None else None
+
+    async def set_offline(self, visitor_id: str) -> Optional[bool]:
+        redis = await self._get_redis()
+        removed = await redis.zrem(ONLINE_VISITORS_KEY, visitor_id)
+        return True if removed else None
+
+    async def touch(self, visitor_ids: Iterable[str]) -> None:
+        ids = list(visitor_ids)
+        if not ids:
+            return
+        redis = await self._get_redis()
+        now = time.time()
+        # XX: only refresh visitors still present (an offline event may have raced us)
+        await redis.zadd(ONLINE_VISITORS_KEY, {visitor_id: now for visitor_id in ids}, xx=True)
+
+    async def discard(self, visitor_ids: Iterable[str]) -> None:
+        ids = list(visitor_ids)
+        if not ids:
+            return
+        redis = await self._get_redis()
+        await redis.zrem(ONLINE_VISITORS_KEY, *ids)
+
+    async def stale_visitors(self, older_than: float, limit: int) -> List[str]:
+        redis = await self._get_redis()
+        return await redis.zrangebyscore(
+            ONLINE_VISITORS_KEY, "-inf", f"({older_than}", start=0, num=limit
+        )
+
+    async def seed(self, visitor_ids: Callable[[], Iterable[str]]) -> int:
+        redis = await self._get_redis()
+        # The marker is lost (and seeding redone) if Redis is flushed
+        if await redis.exists(SEEDED_KEY):
+            return 0
+        # Only one process seeds at a time. The lock expires if its holder dies,
+        # and the marker is set only once the writes succeeded, so a failed seed
+        # is retried on a later run (ZADD NX keeps re-seeding harmless).
+        if not await redis.set(SEEDING_LOCK_KEY, "1", nx=True, ex=SEEDING_LOCK_TTL_SECONDS):
+            return 0
+        try:
+            count = 0
+            chunk: Dict[str, float] = {}
+            for visitor_id in await asyncio.to_thread(lambda: list(visitor_ids())):
+                chunk[visitor_id] = 0.0
+                if len(chunk) >= 1000:
+                    count += await redis.zadd(ONLINE_VISITORS_KEY, chunk, nx=True)
+                    chunk = {}
+            if chunk:
+                count += await redis.zadd(ONLINE_VISITORS_KEY, chunk, nx=True)
+            await redis.set(SEEDED_KEY, "1")
+            return count
+        finally:
+            await redis.delete(SEEDING_LOCK_KEY)
+
+
+def _create_store() -> InMemoryPresenceStore | RedisPresenceStore:
+    """Create the appropriate presence store based on configuration."""
+    redis_url = settings.REDIS_URL
+    if redis_url:
+        logger.info("Using Redis-backed visitor presence store")
+        return RedisPresenceStore(redis_url)
+    logger.warning(
+        "REDIS_URL not configured, using in-memory visitor presence store. "
+        "Presence will NOT be shared across processes!"
+    )
+    return InMemoryPresenceStore()
+
+
+@dataclass
+class PresenceUpdate:
+    is_online: bool
+    at: datetime
+
+
+_FLUSH_SQL = text(
+    """
+    UPDATE api_visitors
+    SET is_online = :is_online,
+        last_visit_time = CASE WHEN :is_online THEN :at ELSE last_visit_time END,
+        last_offline_time = CASE WHEN :is_online THEN last_offline_time ELSE :at END,
+        updated_at = now()
+    WHERE id = :visitor_id
+      AND deleted_at IS NULL
+    """
+)
+
+
+class PresenceWriteBehind:
+    """Coalescing write-behind buffer for visitor online state.
+
+    Updates are keyed by visitor so repeated events between flushes cost a
+    single row update. Each flush writes the whole buffer with one batched
+    ``executemany`` per chunk, in a worker thread.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int) -> None:
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._pending: Dict[UUID, PresenceUpdate] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def record(self, visitor_id: UUID, is_online: bool, at: Optional[datetime] = None) -> None:
+        """Buffer the latest online state of a visitor."""
+        at = at or datetime.utcnow()
+        current = self._pending.get(visitor_id)
+        if current is None or current.at <= at:
+            self._pending[visitor_id] = PresenceUpdate(is_online=is_online, at=at)
+        if len(self._pending) >= self._batch_size and not self._flush_lock.locked():
+            asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Write all buffered updates to the database; returns rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            params = [
+                {"visitor_id": str(visitor_id), "is_online": update.is_online, "at": update.at}
+                for visitor_id, update in pending.items()
+            ]
+            try:
+                await asyncio.to_thread(self._write, params)
+            except Exception as e:
+                logger.error(f"Failed to flush visitor presence updates: {e}")
+                # Re-queue, keeping anything newer that arrived during the flush
+                for visitor_id, update in pending.items():
+                    current = self._pending.get(visitor_id)
+                    if current is None or current.at < update.at:
+                        self._pending[visitor_id] = update
+                return 0
+            logger.debug(f"Flushed {len(params)} visitor presence updates")
+            return len(params)
+
+    def _write(self, params: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            for i in range(0, len(params), self._batch_size):
+                db.execute(_FLUSH_SQL, params[i : i + self._batch_size])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in visitor presence flush loop: {e}")
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Visitor presence write-behind started (interval={self._flush_interval}s)"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global instances - store uses Redis if configured, otherwise in-memory
+presence_store = _create_store()
+presence_writer = PresenceWriteBehind(
+    flush_interval=settings.VISITOR_PRESENCE_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.VISITOR_PRESENCE_FLUSH_BATCH_SIZE,
+)
+
+
+async def start_presence_writer() -> None:
+    """Start the background write-behind flush loop."""
+    presence_writer.start()
+
+
+async def stop_presence_writer() -> None:
+    """Stop the flush loop and write out anything still buffered."""
+    await presence_writer.stop()
@@ -1,20 +1,33 @@
-"""Periodic task to close timed-out sessions."""
+"""Periodic task to close timed-out sessions.
+
+Expired sessions are found and closed in set-based batches: one statement per
+batch selects sessions whose last activity is older than their project's
+timeout (``VisitorAssignmentRule.auto_close_hours`` or
+``SESSION_DEFAULT_TIMEOUT_HOURS``), closes them with ``UPDATE ... RETURNING``
+and marks their visitors closed. WuKongIM notifications for the closed
+sessions are then sent concurrently, bounded by
+``SESSION_TIMEOUT_NOTIFY_CONCURRENCY``.
+"""
 
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, Dict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
 from uuid import UUID
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.logging import get_logger
-from app.models import VisitorSession, SessionStatus, VisitorAssignmentRule
-from app.services.session_service import close_visitor_session
+from app.models import SessionStatus, VisitorServiceStatus
+from app.services.queue_trigger_service import trigger_queue_for_project
+from app.services.session_service import notify_session_closed
+from app.services.wukongim_client import wukongim_client
+from app.utils.const import CHANNEL_TYPE_CUSTOMER_SERVICE
+from app.utils.encoding import build_visitor_channel_id
 
 logger = get_logger("tasks.close_timeout_sessions")
 
@@ -22,127 +35,207 @@ logger = get_logger("tasks.close_timeout_sessions")
 _task: Optional[asyncio.Task] = None
 _processing_lock = asyncio.Lock()
 
+# Select a batch of expired open sessions (per-project timeout joined in),
+# lock them, close them and mark their visitors closed in one statement.
+_CLOSE_EXPIRED_SQL = text(
+    """
+    WITH expired AS (
+        SELECT s.id,
+               COALESCE(NULLIF(r.auto_close_hours, 0), :default_hours) AS timeout_hours
+        FROM api_visitor_sessions s
+        LEFT JOIN api_visitor_assignment_rules r ON r.project_id = s.project_id
+        WHERE s.status = :open_status
+          AND COALESCE(s.last_message_at, s.updated_at)
+              < :now - make_interval(hours => COALESCE(NULLIF(r.auto_close_hours, 0), :default_hours))
+        ORDER BY COALESCE(s.last_message_at, s.updated_at)
+        LIMIT :batch_size
+        FOR UPDATE OF s SKIP LOCKED
+    ),
+    closed AS (
+        UPDATE api_visitor_sessions s
+        SET status = :closed_status,
+            closed_at = :now,
+            duration_seconds = CAST(EXTRACT(EPOCH FROM (:now - s.created_at)) AS INTEGER),
+            updated_at = :now
+        FROM expired
+        WHERE s.id = expired.id
+        RETURNING s.id, s.visitor_id, s.staff_id, s.project_id, expired.timeout_hours
+    ),
+    visitors AS (
+        UPDATE api_visitors v
+        SET service_status = :visitor_closed_status,
+            updated_at = :now
+        FROM closed
+        WHERE v.id = closed.visitor_id
+    )
+    SELECT id, visitor_id, staff_id, project_id, timeout_hours FROM closed
+    """
+)
+
+_REMOVE_STAFF_MEMBER_SQL = text(
+    """
+    UPDATE api_channel_members
+    SET deleted_at = :now
+    WHERE channel_id = :channel_id
+      AND member_id = :staff_id
+      AND member_type = 'staff'
+      AND deleted_at IS NULL
+    """
+)
 
-def _get_project_timeout_hours(db: Session, project_id: UUID, cache: Dict[UUID, int]) -> int:
+_UPDATE_LAST_MESSAGE_SQL = text(
     """
-    Get session timeout hours for a project.
-    
-    Uses VisitorAssignmentRule.auto_close_hours if configured,
-    otherwise falls back to settings.SESSION_DEFAULT_TIMEOUT_HOURS.
-    
-    Results are cached to avoid repeated database queries.
+    UPDATE api_visitor_sessions
+    SET last_message_seq = :last_message_seq,
+        last_message_at = COALESCE(:last_message_at, last_message_at)
+    WHERE id = :session_id
     """
-    if project_id in cache:
-        return cache[project_id]
-    
-    rule = db.query(VisitorAssignmentRule).filter(
-        VisitorAssignmentRule.project_id == project_id
-    ).first()
-    
-    if rule and rule.auto_close_hours:
-        timeout_hours = rule.auto_close_hours
-    else:
-        timeout_hours = settings.SESSION_DEFAULT_TIMEOUT_HOURS
-    
-    cache[project_id] = timeout_hours
-    return timeout_hours
+)
+
+
+def _close_expired_batch(db: Session, batch_size: int) -> List[Any]:
+    """Close one batch of expired sessions and return the closed rows."""
+    now = datetime.utcnow()
+    rows = db.execute(
+        _CLOSE_EXPIRED_SQL,
+        {
+            "now": now,
+            "default_hours": settings.SESSION_DEFAULT_TIMEOUT_HOURS,
+            "open_status": SessionStatus.OPEN.value,
+            "closed_status": SessionStatus.CLOSED.value,
+            "visitor_closed_status": VisitorServiceStatus.CLOSED.value,
+            "batch_size": batch_size,
+        },
+    ).all()
+
+    staff_members = [
+        {
+            "now": now,
+            "channel_id": build_visitor_channel_id(row.visitor_id),
+            "staff_id": row.staff_id,
+        }
+        for row in rows
+        if row.staff_id
+    ]
+    if staff_members:
+        db.execute(_REMOVE_STAFF_MEMBER_SQL, staff_members)
+
+    db.commit()
+    return rows
+
+
+async def _notify_closed_session(row: Any, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+    """Send WuKongIM notifications for one closed session.
+
+    Returns the channel's last message info to record on the session, if any.
+    """
+    async with semaphore:
+        last_message_update = None
+        try:
+            last_message = await wukongim_client.get_channel_last_message(
+                channel_id=build_visitor_channel_id(row.visitor_id),
+                channel_type=CHANNEL_TYPE_CUSTOMER_SERVICE,
+            )
+            if last_message:
+                last_message_update = {
+                    "session_id": row.id,
+                    "last_message_seq": last_message.message_seq,
+                    # WuKongIM timestamp is in seconds
+                    "last_message_at": (
+                        datetime.fromtimestamp(last_message.timestamp)
+                        if last_message.timestamp
+                        else None
+                    ),
+                }
+        except Exception as e:
+            logger.warning(f"Failed to get channel last message: {e}")
+
+        await notify_session_closed(
+            session_id=row.id,
+            visitor_id=row.visitor_id,
+            staff_id=row.staff_id,
+            closed_by_staff=None,  # System closure
+            send_notification=True,
+        )
+        return last_message_update
 
 
 async def _process_timeout_sessions() -> int:
     """
-    Process and close timed-out sessions.
-    
+    Close all timed-out sessions, batch by batch.
+
     Returns:
         Number of sessions closed
     """
     db: Session = SessionLocal()
     closed_count = 0
-    timeout_cache: Dict[UUID, int] = {}  # project_id -> timeout_hours
-    
+    project_ids: Set[UUID] = set()
+    semaphore = asyncio.Semaphore(settings.SESSION_TIMEOUT_NOTIFY_CONCURRENCY)
+    batch_size = settings.SESSION_TIMEOUT_BATCH_SIZE
+
     try:
-        # Get the minimum timeout to find potential candidates
-        # (we'll check per-project timeout later)
-        min_timeout_hours = settings.SESSION_DEFAULT_TIMEOUT_HOURS
-        cutoff_time = datetime.utcnow() - timedelta(hours=min_timeout_hours)
-        
-        # Query open sessions that might be timed out
-        # We check last_message_at or updated_at (whichever is later) 
-        # to determine if session is inactive
-        sessions = (
-            db.query(VisitorSession)
-            .filter(
-                VisitorSession.status == SessionStatus.OPEN.value,
-                # Session hasn't been updated recently (based on last activity)
-                VisitorSession.updated_at < cutoff_time,
-            )
-            .options(joinedload(VisitorSession.visitor))
-            .limit(settings.SESSION_TIMEOUT_BATCH_SIZE)
-            .all()
-        )
-        
-        if not sessions:
-            logger.debug("No potentially timed-out sessions found")
-            return 0
-        
-        logger.info(f"Found {len(sessions)} potentially timed-out sessions to check")
-        
-        for session in sessions:
+        while closed_count < settings.SESSION_TIMEOUT_MAX_PER_RUN:
             try:
-                # Get project-specific timeout
-                timeout_hours = _get_project_timeout_hours(
-                    db, session.project_id, timeout_cache
+                rows = _close_expired_batch(
+                    db, min(batch_size, settings.SESSION_TIMEOUT_MAX_PER_RUN - closed_count)
                 )
-                
-                # Calculate the actual cutoff time for this project
-                project_cutoff = datetime.utcnow() - timedelta(hours=timeout_hours)
-                
-                # Determine last activity time
-                last_activity = session.last_message_at or session.updated_at
-                
-                # Check if session is actually timed out
-                if last_activity >= project_cutoff:
-                    logger.debug(
-                        f"Session {session.id} not yet timed out "
-                        f"(last_activity={last_activity}, cutoff={project_cutoff})"
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to close batch of timed-out sessions: {e}")
+                break
+
+            if not rows:
+                break
+
+            closed_count += len(rows)
+            logger.info(
+                f"Closed batch of {len(rows)} timed-out sessions",
+                extra={
+                    "batch_size": len(rows),
+                    "session_ids": [str(row.id) for row in rows[:20]],
+                },
+            )
+
+            results = await asyncio.gather(
+                *[_notify_closed_session(row, semaphore) for row in rows],
+                return_exceptions=True,
+            )
+            last_message_updates = []
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"Failed to notify timed-out session {row.id} closure: {result}",
+                        extra={"session_id": str(row.id), "error": str(result)},
                     )
-                    continue
-                
-                # Close the session
-                logger.info(
-                    f"Closing timed-out session {session.id}",
-                    extra={
-                        "session_id": str(session.id),
-                        "visitor_id": str(session.visitor_id),
-                        "project_id": str(session.project_id),
-                        "last_activity": str(last_activity),
-                        "timeout_hours": timeout_hours,
-                    }
-                )
-                
-                await close_visitor_session(
-                    db=db,
-                    session=session,
-                    closed_by_staff=None,  # System closure
-                    send_notification=True,
-                    auto_commit=True,
-                    reason=f"timeout ({timeout_hours}h inactivity)",
-                )
-                
-                closed_count += 1
-                
-            except ValueError as e:
-                # Session already closed
-                logger.debug(f"Session {session.id} already closed: {e}")
+                elif result:
+                    last_message_updates.append(result)
+                if row.staff_id and row.project_id:
+                    project_ids.add(row.project_id)
+
+            if last_message_updates:
+                try:
+                    db.execute(_UPDATE_LAST_MESSAGE_SQL, last_message_updates)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Failed to record last message info on closed sessions: {e}")
+
+            if len(rows) < batch_size:
+                break
+
+        # Staff have freed up slots - trigger queue processing once per project
+        for project_id in project_ids:
+            try:
+                await trigger_queue_for_project(project_id)
             except Exception as e:
-                logger.error(
-                    f"Failed to close timed-out session {session.id}: {e}",
-                    extra={"session_id": str(session.id), "error": str(e)},
-                )
-                # Continue with other sessions
-        
-        logger.info(f"Closed {closed_count} timed-out sessions")
+                logger.error(f"Failed to trigger queue processing: {e}")
+
+        if closed_count:
+            logger.info(f"Closed {closed_count} timed-out sessions")
+        else:
+            logger.debug("No timed-out sessions found")
         return closed_count
-        
+
     except Exception as e:
         logger.error(f"Error processing timeout sessions: {e}")
         return closed_count
@@ -157,7 +250,7 @@ async def _run_periodic_task():
         f"(interval={settings.SESSION_TIMEOUT_CHECK_INTERVAL_SECONDS}s, "
         f"default_timeout={settings.SESSION_DEFAULT_TIMEOUT_HOURS}h)"
     )
-    
+
     while True:
         try:
             async with _processing_lock:
@@ -166,22 +259,22 @@ async def _run_periodic_task():
                     logger.info(f"Periodic check: closed {closed_count} timed-out sessions")
         except Exception as e:
             logger.error(f"Error in periodic session timeout check: {e}")
-        
+
         await asyncio.sleep(settings.SESSION_TIMEOUT_CHECK_INTERVAL_SECONDS)
 
 
 async def start_session_timeout_task():
     """Start the background session timeout check task."""
     global _task
-    
+
     if not settings.SESSION_TIMEOUT_CHECK_ENABLED:
         logger.info("Session timeout check is disabled")
         return
-    
+
     if _task is not None and not _task.done():
         logger.warning("Session timeout check task is already running")
         return
-    
+
     _task = asyncio.create_task(_run_periodic_task())
     logger.info("Session timeout check task started")
 
@@ -189,16 +282,16 @@ async def start_session_timeout_task():
 async def stop_session_timeout_task():
     """Stop the background session timeout check task."""
     global _task
-    
+
     if _task is None:
         return
-    
+
     _task.cancel()
     try:
         await _task
     except asyncio.CancelledError:
         pass
-    
+
     _task = None
     logger.info("Session timeout check task stopped")
 
@@ -206,9 +299,9 @@ async def stop_session_timeout_task():
 async def trigger_timeout_check() -> int:
     """
     Manually trigger a session timeout check.
-    
+
     Can be called from an API endpoint for immediate processing.
-    
+
     Returns:
         Number of sessions closed
     """
@@ -1,96 +1,112 @@
-"""Periodic task to sync visitor online status with WuKongIM."""
+"""Periodic task to reconcile visitor presence with WuKongIM.
+
+Online state is applied from ``user.onlinestatus`` webhook events (see
+``app.services.visitor_presence``). This task only re-checks visitors whose
+presence heartbeat has gone stale, so its cost per run is bounded by
+``VISITOR_ONLINE_SYNC_MAX_PER_RUN`` rather than the number of online visitors.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
-
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.logging import get_logger
 from app.models import Visitor
+from app.services.visitor_presence import presence_store, presence_writer
 from app.services.wukongim_client import wukongim_client
 
 logger = get_logger("tasks.sync_visitor_online_status")
 
+VISITOR_UID_SUFFIX = "-vtr"
+
 # Global state
 _task: Optional[asyncio.Task] = None
 _processing_lock = asyncio.Lock()
 
 
+def _iter_online_visitor_ids() -> Iterator[str]:
+    """Yield IDs of visitors marked online in the database (IDs only, streamed)."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Visitor.id)
+            .filter(Visitor.is_online == True, Visitor.deleted_at.is_(None))
+            .yield_per(1000)
+        )
+        for (visitor_id,) in rows:
+            yield str(visitor_id)
+    finally:
+        db.close()
+
+
 async def _process_online_status_sync() -> int:
     """
-    Sync visitor online status with WuKongIM.
-    
-    Only checks visitors who are currently marked as online in the database.
-    
+    Reconcile stale visitor presence with WuKongIM.
+
+    On first run the presence store is seeded with the visitors marked online
+    in the database, as stale entries. Afterwards only visitors without a
+    recent heartbeat are checked: those still online get their heartbeat
+    refreshed, the rest are marked offline through the write-behind buffer.
+
     Returns:
         Number of visitors marked offline
     """
-    db: Session = SessionLocal()
     marked_offline_count = 0
-    
+
     try:
-        # 1) Find all visitors currently marked as online in DB
-        online_visitors = (
-            db.query(Visitor)
-            .filter(Visitor.is_online == True)
-            .all()
+        seeded = await presence_store.seed(_iter_online_visitor_ids)
+        if seeded:
+            logger.info(f"Seeded visitor presence with {seeded} visitors marked online in DB")
+
+        older_than = time.time() - settings.VISITOR_PRESENCE_TTL_SECONDS
+        stale_ids = await presence_store.stale_visitors(
+            older_than, settings.VISITOR_ONLINE_SYNC_MAX_PER_RUN
         )
-        
-        if not online_visitors:
+        if not stale_ids:
             return 0
-            
-        logger.debug(f"Found {len(online_visitors)} visitors marked as online in DB")
-        
-        # 2) Batch processing
+
+        logger.debug(f"Re-checking {len(stale_ids)} visitors with stale presence")
+
         batch_size = settings.VISITOR_ONLINE_SYNC_BATCH_SIZE
-        for i in range(0, len(online_visitors), batch_size):
-            batch = online_visitors[i : i + batch_size]
-            
-            # Map visitor ID to UID (WuKongIM uses "{visitor_id}-vtr")
-            uid_to_visitor = {f"{v.id}-vtr": v for v in batch}
-            uids = list(uid_to_visitor.keys())
-            
+        for i in range(0, len(stale_ids), batch_size):
+            batch = stale_ids[i : i + batch_size]
+            uids = [f"{visitor_id}{VISITOR_UID_SUFFIX}" for visitor_id in batch]
+
             try:
-                # 3) Check real online status from WuKongIM
-                # This returns a list of UIDs that are ACTUALLY online
-                actually_online_uids = await wukongim_client.check_user_online_status(uids)
-                actually_online_set = set(actually_online_uids)
-                
-                # 4) Identify visitors who are actually offline
-                any_changes = False
-                for uid, visitor in uid_to_visitor.items():
-                    if uid not in actually_online_set:
-                        # This visitor is marked online in DB but is offline in WuKongIM
-                        visitor.is_online = False
-                        visitor.last_offline_time = datetime.utcnow()
+                actually_online_set = set(await wukongim_client.check_user_online_status(uids))
+
+                still_online = []
+                now = datetime.utcnow()
+                for visitor_id, uid in zip(batch, uids):
+                    if uid in actually_online_set:
+                        still_online.append(visitor_id)
+                        continue
+                    # Marked online but offline in WuKongIM
+                    if await presence_store.set_offline(visitor_id):
+                        presence_writer.record(UUID(visitor_id), False, now)
                         marked_offline_count += 1
-                        any_changes = True
-                        
                         logger.info(
-                            f"Visitor {visitor.id} corrected to offline (sync)",
-                            extra={"visitor_id": str(visitor.id)}
+                            f"Visitor {visitor_id} corrected to offline (sync)",
+                            extra={"visitor_id": visitor_id},
                         )
-                
-                if any_changes:
-                    db.commit()
-                    
+
+                await presence_store.touch(still_online)
+
             except Exception as e:
                 logger.error(f"Error syncing batch of visitor online status: {e}")
                 # Continue with next batch
-                
+
         return marked_offline_count
-        
+
     except Exception as e:
         logger.error(f"Error in visitor online status sync process: {e}")
         return marked_offline_count
-    finally:
-        db.close()
 
 
 async def _run_periodic_task():
@@ -99,7 +115,7 @@ async def _run_periodic_task():
         f"Starting visitor online status sync task "
         f"(interval={settings.VISITOR_ONLINE_SYNC_INTERVAL_SECONDS}s)"
     )
-    
+
     while True:
         try:
             async with _processing_lock:
@@ -108,22 +124,22 @@ async def _run_periodic_task():
                     logger.info(f"Corrected {corrected_count} visitors to offline")
         except Exception as e:
             logger.error(f"Error in periodic online status sync: {e}")
-        
+
         await asyncio.sleep(settings.VISITOR_ONLINE_SYNC_INTERVAL_SECONDS)
 
 
 async def start_visitor_online_sync_task():
     """Start the background visitor online status sync task."""
     global _task
-    
+
     if not settings.VISITOR_ONLINE_SYNC_ENABLED:
         logger.info("Visitor online status sync is disabled")
         return
-    
+
     if _task is not None and not _task.done():
         logger.warning("Visitor online status sync task is already running")
         return
-    
+
     _task = asyncio.create_task(_run_periodic_task())
     logger.info("Visitor online status sync task started")
 
@@ -131,16 +147,16 @@ async def start_visitor_online_sync_task():
 async def stop_visitor_online_sync_task():
     """Stop the background visitor online status sync task."""
     global _task
-    
+
     if _task is None:
         return
-    
+
     _task.cancel()
     try:
         await _task
     except asyncio.CancelledError:
         pass
-    
+
     _task = None
     logger.info("Visitor online status sync task stopped")
 
@@ -148,7 +164,7 @@ async def stop_visitor_online_sync_task():
 async def trigger_online_status_sync() -> int:
     """
     Manually trigger a visitor online status sync.
-    
+
     Returns:
         Number of visitors corrected to offline
     """
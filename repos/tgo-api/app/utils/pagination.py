@@ -0,0 +1,251 @@
+"""Keyset (cursor) pagination and count estimation helpers.
+
+Offset pagination makes the database walk and discard every skipped row, so
+deep pages get slower and slower. Keyset pagination instead remembers the sort
+key values of the last row returned (encoded into an opaque cursor) and asks
+for rows strictly after them, which an index can answer directly.
+
+That only holds when the sort keys are indexed columns. Keys computed per row
+(CASE expressions, aggregates of a GROUP BY subquery) cannot be seeked: the
+database still builds and sorts the whole filtered set for every page, so such
+sorts cost about the same as offset paging. The cursor then only keeps pages
+stable (no rows skipped or repeated while data changes).
+
+An exact ``COUNT(*)`` over a large filtered set has the same problem; the
+planner's row estimate is offered as a cheap alternative.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, false, or_, true
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement
+
+TOTAL_MODE_EXACT = "exact"
+TOTAL_MODE_ESTIMATE = "estimate"
+TOTAL_MODES = (TOTAL_MODE_EXACT, TOTAL_MODE_ESTIMATE)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column/expression of a keyset ordering.
+
+    Attributes:
+        expr: Column or SQL expression to order by
+        descending: Whether this key is sorted descending
+        nulls_last: Where NULLs sort (defaults to PostgreSQL's behaviour:
+            last for ascending, first for descending)
+    """
+
+    expr: Any
+    descending: bool = False
+    nulls_last: Optional[bool] = None
+
+    @property
+    def _nulls_last(self) -> bool:
+        if self.nulls_last is None:
+            return not self.descending
+        return self.nulls_last
+
+    def order_by(self) -> ColumnElement:
+        """Build the ORDER BY clause for this key."""
+        clause = self.expr.desc() if self.descending else self.expr.asc()
+        return clause.nulls_last() if self._nulls_last else clause.nulls_first()
+
+    def equals(self, value: Any) -> ColumnElement:
+        """Rows whose key equals ``value``."""
+        return self.expr.is_(None) if value is None else self.expr == value
+
+    def after(self, value: Any) -> ColumnElement:
+        """Rows whose key sorts strictly after ``value``."""
+        if value is None:
+            # NULLs first: every non-NULL value follows; NULLs last: nothing does
+            return false() if self._nulls_last else self.expr.isnot(None)
+        beyond = self.expr < value if self.descending else self.expr > value
+        if self._nulls_last:
+            return or_(beyond, self.expr.is_(None))
+        return beyond
+
+
+def order_by_keys(keys: Sequence[SortKey]) -> List[ColumnElement]:
+    """Build ORDER BY clauses for a list of sort keys."""
+    return [key.order_by() for key in keys]
+
+
+def keyset_filter(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """Build a predicate selecting rows that sort after the cursor ``values``.
+
+    The last key must be unique (e.g. the primary key) so that the ordering
+    is total and no row is skipped or repeated between pages.
+    """
+    if len(keys) != len(values):
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+
+    clauses = []
+    for i, key in enumerate(keys):
+        prefix = [keys[j].equals(values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, key.after(values[i])) if prefix else key.after(values[i]))
+    return or_(*clauses) if clauses else true()
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any], sort: Optional[str] = None) -> str:
+    """Encode the sort key values of the last row into an opaque cursor.
+
+    Args:
+        values: Sort key values in key order
+        sort: Identifier of the ordering the cursor belongs to, checked on decode
+    """
+    payload = {"v": [_encode_value(v) for v in values], "s": sort}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: Optional[str] = None) -> List[Any]:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or belongs to another ordering
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["v"]]
+    except Exception as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
+    if payload.get("s") != sort:
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+    return values
+
+
+@dataclass
+class KeysetPage:
+    """One page of results fetched by :func:`paginate_query`."""
+
+    items: List[Any]
+    offset: int
+    has_next: bool
+    has_prev: bool
+    next_cursor: Optional[str]
+
+
+def paginate_query(
+    query: Query,
+    keys: Sequence[SortKey],
+    values_of: Callable[[Any], Sequence[Any]],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+) -> KeysetPage:
+    """Order ``query`` by ``keys`` and fetch one page by cursor or offset.
+
+    One extra row is fetched to detect whether a next page exists, so no
+    count is needed for ``has_next``. A ``next_cursor`` is returned in both
+    modes so offset clients can switch to keyset paging at any point.
+
+    Args:
+        query: Filtered query (without ORDER BY/OFFSET/LIMIT)
+        keys: Sort keys; the last one must be unique
+        values_of: Extracts the sort key values from a result row
+        limit: Page size
+        offset: Rows to skip when no cursor is given
+        cursor: Cursor from a previous page (takes precedence over offset)
+        sort: Identifier of the ordering, embedded in and checked against cursors
+
+    Raises:
+        InvalidCursorError: If ``cursor`` is malformed or for another ordering
+    """
+    query = query.order_by(*order_by_keys(keys))
+    if cursor:
+        query = query.filter(keyset_filter(keys, decode_cursor(cursor, sort=sort)))
+        offset = 0
+    elif offset:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(values_of(rows[-1]), sort=sort) if has_next and rows else None
+    return KeysetPage(
+        items=rows,
+        offset=offset,
+        has_next=has_next,
+        has_prev=offset > 0 or bool(cursor),
+        next_cursor=next_cursor,
+    )
+
+
+def validate_total_mode(total_mode: str) -> None:
+    """Reject unknown total_mode values with 400."""
+    if total_mode not in TOTAL_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"total_mode must be one of: {', '.join(TOTAL_MODES)}",
+        )
+
+
+class _ExplainJson(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, keeping its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain_json(element: _ExplainJson, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(db: Session, query: Query) -> int:
+    """Return the planner's row estimate for ``query`` without executing it.
+
+    Falls back to an exact count on databases without ``EXPLAIN (FORMAT JSON)``.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.order_by(None).count()
+
+    # Parameters stay bound: inlined literals would be re-parsed (":name", "%")
+    plan = db.execute(_ExplainJson(query.order_by(None).statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(db: Session, query: Query, total_mode: str) -> int:
+    """Count rows of ``query`` exactly or by planner estimate."""
+    if total_mode == TOTAL_MODE_ESTIMATE:
+        return estimate_count(db, query)
+    return query.order_by(None).count()
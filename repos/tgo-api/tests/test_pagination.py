@@ -0,0 +1,68 @@
+"""Test pagination helpers."""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, declarative_base
+
+from app.utils.pagination import estimate_count, validate_total_mode
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "pagination_test_items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class _PlanSession:
+    """Session stub that records the EXPLAIN statement instead of running it."""
+
+    def __init__(self):
+        self.dialect = postgresql.dialect()
+        self.statements = []
+
+    def get_bind(self):
+        return self
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar(self):
+        return [{"Plan": {"Plan Rows": 42}}]
+
+
+def test_estimate_count_keeps_search_terms_bound():
+    """Search terms with ':' and '%' are passed as parameters, not inlined SQL."""
+    term = "%note:vip 50%%"
+    query = Session().query(Item).filter(Item.name.ilike(term))
+    db = _PlanSession()
+
+    assert estimate_count(db, query) == 42
+
+    compiled = db.statements[0].compile(dialect=db.dialect)
+    sql = str(compiled)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "note:vip" not in sql
+    assert term in compiled.params.values()
+
+
+def test_estimate_count_falls_back_to_exact_count():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([Item(name="note:vip"), Item(name="50%")])
+        db.commit()
+        assert estimate_count(db, db.query(Item).filter(Item.name.like("%:%"))) == 1
+
+
+def test_validate_total_mode():
+    validate_total_mode("exact")
+    validate_total_mode("estimate")
+    with pytest.raises(HTTPException) as exc:
+        validate_total_mode("guess")
+    assert exc.value.status_code == 400
@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter
 
-from app.api.v1 import devices, mcp
+from app.api.v1 import cluster, devices, mcp
 
 router = APIRouter()
 
 router.include_router(devices.router, prefix="/devices", tags=["devices"])
 router.include_router(mcp.router, prefix="/mcp", tags=["mcp"])
+router.include_router(cluster.router, prefix="/cluster", tags=["cluster"])
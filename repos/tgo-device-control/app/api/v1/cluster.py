@@ -0,0 +1,52 @@
+"""Internal endpoints used by other replicas in cluster mode.
+
+A replica that receives a request for a device connected elsewhere forwards
+it here (see ``app.services.device_router``). These requests are served
+locally only and never forwarded again.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.schemas.cluster import ClusterRpcRequest, ClusterRpcResponse
+from app.services.device_router import device_router
+
+router = APIRouter()
+
+
+def _check_token(token: Optional[str]) -> None:
+    if not token or not hmac.compare_digest(token, device_router.token):
+        raise HTTPException(status_code=403, detail="Invalid cluster token")
+
+
+@router.post("/devices/{device_id}/rpc", response_model=ClusterRpcResponse)
+async def forward_device_rpc(
+    device_id: str,
+    request: ClusterRpcRequest,
+    x_cluster_token: Optional[str] = Header(None),
+):
+    """Run a JSON-RPC request forwarded from another replica."""
+    _check_token(x_cluster_token)
+    device_router.metrics.served += 1
+    connected, result = await device_router.request(
+        device_id,
+        request.method,
+        request.params,
+        timeout=request.timeout,
+        forwarded=True,
+    )
+    return ClusterRpcResponse(connected=connected, result=result)
+
+
+@router.post("/devices/{device_id}/disconnect", response_model=ClusterRpcResponse)
+async def forward_device_disconnect(
+    device_id: str,
+    x_cluster_token: Optional[str] = Header(None),
+):
+    """Close a device connection on behalf of another replica."""
+    _check_token(x_cluster_token)
+    device_router.metrics.served += 1
+    connected = await device_router.disconnect(device_id, forwarded=True)
+    return ClusterRpcResponse(connected=connected)
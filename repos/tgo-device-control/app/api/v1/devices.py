@@ -105,12 +105,12 @@ async def disconnect_device(
     db: AsyncSession = Depends(get_async_db),
 ):
     """Force disconnect a device."""
-    from app.services.tcp_connection_manager import tcp_connection_manager
+    from app.services.device_router import device_router
 
     service = DeviceService(db)
     device = await service.get_device(device_id=device_id, project_id=project_id)
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    await tcp_connection_manager.unregister_connection(str(device_id))
+    await device_router.disconnect(str(device_id))
     return {"success": True, "message": "Device disconnected"}
@@ -11,8 +11,8 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException
 
 from app.core.logging import get_logger
+from app.services.device_router import device_router
 from app.services.mcp_server import mcp_proxy
-from app.services.tcp_connection_manager import tcp_connection_manager
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -22,10 +22,10 @@ logger = get_logger(__name__)
 async def list_device_tools(device_id: str):
     """List available MCP tools from a specific device (REST helper).
 
-    This fetches tools directly from the connected device via TCP RPC.
+    This fetches tools from the connected device via TCP RPC (through the
+    owning replica in cluster mode).
     """
-    connection = tcp_connection_manager.get_connection(device_id)
-    if not connection:
+    if not await device_router.is_connected(device_id):
         raise HTTPException(
             status_code=404,
             detail=f"Device {device_id} is not connected",
@@ -43,11 +43,11 @@ async def call_device_tool(
 ):
     """Call a tool on a specific device (REST helper).
 
-    This forwards the tool call directly to the connected device via TCP RPC.
+    This forwards the tool call to the connected device via TCP RPC (through
+    the owning replica in cluster mode).
     No name mapping or argument transformation is performed.
     """
-    connection = tcp_connection_manager.get_connection(device_id)
-    if not connection:
+    if not await device_router.is_connected(device_id):
         raise HTTPException(
             status_code=404,
             detail=f"Device {device_id} is not connected",
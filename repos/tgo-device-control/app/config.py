@@ -106,6 +106,36 @@ class Settings(BaseSettings):
         description="Timeout in seconds for TCP RPC requests",
     )
 
+    # Cluster Configuration (multiple replicas behind one TCP/HTTP endpoint)
+    CLUSTER_ENABLED: bool = Field(
+        default=False,
+        description="Track device ownership in Redis and forward requests between replicas",
+    )
+    CLUSTER_NODE_ID: Optional[str] = Field(
+        default=None,
+        description="Unique replica ID (defaults to hostname-pid)",
+    )
+    CLUSTER_ADVERTISE_URL: Optional[str] = Field(
+        default=None,
+        description="HTTP base URL other replicas use to reach this one (defaults to http://hostname:PORT)",
+    )
+    CLUSTER_SECRET: Optional[str] = Field(
+        default=None,
+        description="Shared token for inter-replica requests (defaults to SECRET_KEY)",
+    )
+    CLUSTER_LEASE_TTL: int = Field(
+        default=30,
+        description="Device ownership lease TTL in seconds",
+    )
+    CLUSTER_LEASE_RENEW_INTERVAL: int = Field(
+        default=10,
+        description="Interval in seconds between device lease renewals",
+    )
+    CLUSTER_FORWARD_MAX_CONNECTIONS: int = Field(
+        default=100,
+        description="Max keep-alive HTTP connections kept open to other replicas",
+    )
+
     @property
     def is_development(self) -> bool:
         return self.ENVIRONMENT.lower() in ("development", "dev", "local")
@@ -19,6 +19,8 @@ setup_logging()
 async def lifespan(application: FastAPI):
     """Application lifespan manager."""
     # Startup logic
+    from app.services.device_presence import device_presence
+    from app.services.device_router import device_router
     from app.services.tcp_connection_manager import tcp_connection_manager
     from app.services.tcp_rpc_server import tcp_rpc_server
 
@@ -37,6 +39,10 @@ async def lifespan(application: FastAPI):
     startup_log(f"[DEBUG]   ENVIRONMENT: {settings.ENVIRONMENT}")
     startup_log(f"[DEBUG]   DEBUG: {settings.DEBUG}")
     startup_log(f"[DEBUG]   LOG_LEVEL: {settings.LOG_LEVEL}")
+    startup_log(f"[DEBUG]   CLUSTER_ENABLED: {settings.CLUSTER_ENABLED}")
+    if device_presence.enabled:
+        startup_log(f"[DEBUG]   CLUSTER_NODE_ID: {device_presence.node_id}")
+        startup_log(f"[DEBUG]   CLUSTER_ADVERTISE_URL: {device_presence.advertise_url}")
 
     # Initialize TCP connection manager
     startup_log("[DEBUG] Initializing TCP connection manager...")
@@ -63,6 +69,7 @@ async def lifespan(application: FastAPI):
     startup_log("Shutting down Device Control Service...")
     await tcp_rpc_server.stop()
     await tcp_connection_manager.shutdown()
+    await device_router.close()
 
 
 app = FastAPI(
@@ -96,6 +103,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    from app.services.device_presence import device_presence
+    from app.services.device_router import device_router
     from app.services.tcp_connection_manager import tcp_connection_manager
     from app.services.tcp_rpc_server import tcp_rpc_server
 
@@ -107,7 +116,7 @@ async def health_check():
     else:
         tcp_server_status = "not_started"
 
-    return {
+    result = {
         "status": "healthy",
         "connected_devices": tcp_connection_manager.get_connected_count(),
         "tcp_server": {
@@ -116,6 +125,13 @@ async def health_check():
             "port": settings.TCP_RPC_PORT,
         },
     }
+    if device_presence.enabled:
+        result["cluster"] = {
+            "node_id": device_presence.node_id,
+            "url": device_presence.advertise_url,
+            "forwarding": device_router.metrics.snapshot(),
+        }
+    return result
 
 
 # ------------------------------------------------------------------ #
@@ -0,0 +1,20 @@
+"""Inter-replica (cluster mode) Pydantic schemas."""
+
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ClusterRpcRequest(BaseModel):
+    """JSON-RPC request forwarded from another replica."""
+
+    method: str = Field(..., description="RPC method name")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Method parameters")
+    timeout: Optional[int] = Field(None, description="Device request timeout in seconds")
+
+
+class ClusterRpcResponse(BaseModel):
+    """Result of a forwarded request."""
+
+    connected: bool = Field(..., description="Whether the device is connected to this replica")
+    result: Optional[Dict[str, Any]] = Field(None, description="Device result, None on timeout/error")
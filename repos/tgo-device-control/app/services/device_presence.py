@@ -0,0 +1,162 @@
+"""Redis-backed device ownership leases for cluster mode.
+
+Each replica holds the TCP connections of the devices that connected to it.
+In cluster mode every connected device has an owner lease in Redis
+(``dc:device_owner:{device_id}`` -> node ID) that the owning replica keeps
+renewing, and every replica advertises the URL other replicas use to reach
+it (``dc:node:{node_id}``). A replica that crashes stops renewing, so its
+leases expire and the devices can reconnect anywhere.
+"""
+
+import os
+import socket
+from typing import List, Optional, Sequence, Tuple
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("services.device_presence")
+
+# Delete a lease only if this node still owns it
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extend owned leases, re-create expired ones and report leases taken over
+# by another node (the device reconnected elsewhere)
+_RENEW_LUA = """
+local lost = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+    elseif not owner then
+        redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+    else
+        table.insert(lost, key)
+    end
+end
+return lost
+"""
+
+
+class DevicePresence:
+    """Device -> owner replica leases stored in Redis."""
+
+    OWNER_PREFIX = "dc:device_owner:"
+    NODE_PREFIX = "dc:node:"
+    RENEW_BATCH_SIZE = 500
+
+    def __init__(self):
+        self.enabled = settings.CLUSTER_ENABLED
+        self.node_id = (
+            settings.CLUSTER_NODE_ID or f"{socket.gethostname()}-{os.getpid()}"
+        )
+        self.advertise_url = (
+            settings.CLUSTER_ADVERTISE_URL
+            or f"http://{socket.gethostname()}:{settings.PORT}"
+        ).rstrip("/")
+        self.redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._release_script = self.redis.register_script(_RELEASE_LUA)
+        self._renew_script = self.redis.register_script(_RENEW_LUA)
+
+    @property
+    def _lease_ms(self) -> int:
+        return settings.CLUSTER_LEASE_TTL * 1000
+
+    async def announce(self) -> None:
+        """Publish (or refresh) this node's advertised URL."""
+        await self.redis.set(
+            f"{self.NODE_PREFIX}{self.node_id}",
+            self.advertise_url,
+            px=self._lease_ms,
+        )
+
+    async def claim(self, device_id: str) -> None:
+        """Take ownership of a device that just connected to this node.
+
+        The most recent connection wins, matching the local manager which
+        replaces an existing connection for the same device.
+
+        Args:
+            device_id: Device identifier.
+        """
+        try:
+            await self.redis.set(
+                f"{self.OWNER_PREFIX}{device_id}", self.node_id, px=self._lease_ms
+            )
+        except Exception as e:
+            logger.warning(f"Failed to claim device lease {device_id}: {e}")
+
+    async def release(self, device_id: str) -> None:
+        """Drop this node's lease on a device, if it still holds it.
+
+        Args:
+            device_id: Device identifier.
+        """
+        try:
+            await self._release_script(
+                keys=[f"{self.OWNER_PREFIX}{device_id}"], args=[self.node_id]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to release device lease {device_id}: {e}")
+
+    async def renew(self, device_ids: Sequence[str]) -> List[str]:
+        """Renew the leases of all locally connected devices.
+
+        Args:
+            device_ids: Devices connected to this node.
+
+        Returns:
+            Devices whose lease is now held by another node.
+        """
+        await self.announce()
+        lost: List[str] = []
+        for start in range(0, len(device_ids), self.RENEW_BATCH_SIZE):
+            batch = device_ids[start:start + self.RENEW_BATCH_SIZE]
+            keys = [f"{self.OWNER_PREFIX}{device_id}" for device_id in batch]
+            taken = await self._renew_script(
+                keys=keys, args=[self.node_id, self._lease_ms]
+            )
+            lost.extend(key[len(self.OWNER_PREFIX):] for key in taken or [])
+        return lost
+
+    async def lookup(self, device_id: str) -> Optional[Tuple[str, str]]:
+        """Find the node that holds a device's connection.
+
+        Args:
+            device_id: Device identifier.
+
+        Returns:
+            ``(node_id, url)`` of the owning node, or None if the device is
+            not connected to any live node.
+        """
+        node_id = await self.redis.get(f"{self.OWNER_PREFIX}{device_id}")
+        if not node_id:
+            return None
+        url = await self.redis.get(f"{self.NODE_PREFIX}{node_id}")
+        if not url:
+            return None
+        return node_id, url
+
+    async def withdraw(self, device_ids: Sequence[str]) -> None:
+        """Release all leases and remove this node's address on shutdown.
+
+        Args:
+            device_ids: Devices still connected to this node.
+        """
+        for device_id in device_ids:
+            await self.release(device_id)
+        try:
+            await self.redis.delete(f"{self.NODE_PREFIX}{self.node_id}")
+        except Exception as e:
+            logger.warning(f"Failed to remove node address {self.node_id}: {e}")
+
+
+# Global singleton
+device_presence = DevicePresence()
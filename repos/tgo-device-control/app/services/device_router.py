@@ -0,0 +1,233 @@
+"""Device request routing across replicas.
+
+Requests for a device connected to this replica go straight to its TCP
+connection. In cluster mode, requests for a device connected to another
+replica are forwarded to that replica's internal endpoint
+(``POST /v1/cluster/devices/{device_id}/rpc``) over a pooled keep-alive
+HTTP client, so each pair of replicas reuses a few long-lived connections
+instead of opening one per call. Forwarded requests are never forwarded
+again, which bounds every call to at most one hop.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.services.device_presence import device_presence
+from app.services.tcp_connection_manager import tcp_connection_manager
+
+logger = get_logger("services.device_router")
+
+CLUSTER_TOKEN_HEADER = "X-Cluster-Token"
+
+
+@dataclass
+class ForwardMetrics:
+    """Counters and latency samples for inter-replica forwarding."""
+
+    forwarded: int = 0  # hops sent to other replicas
+    served: int = 0  # hops received from other replicas
+    failed: int = 0  # forwards that got no answer from the owner
+    stale: int = 0  # owner answered that the device is no longer connected
+    by_node: Dict[str, int] = field(default_factory=dict)
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    def record(self, node_id: str, elapsed_ms: float) -> None:
+        """Record one forwarded request.
+
+        Args:
+            node_id: Target node ID.
+            elapsed_ms: Round-trip time in milliseconds.
+        """
+        self.forwarded += 1
+        self.by_node[node_id] = self.by_node.get(node_id, 0) + 1
+        self.latencies_ms.append(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dict."""
+        samples = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            "forwarded": self.forwarded,
+            "served": self.served,
+            "failed": self.failed,
+            "stale": self.stale,
+            "by_node": dict(self.by_node),
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(samples[-1], 2) if samples else None,
+            },
+        }
+
+
+class DeviceRouter:
+    """Routes JSON-RPC requests to the replica holding a device connection."""
+
+    def __init__(self) -> None:
+        self.metrics = ForwardMetrics()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def token(self) -> str:
+        return settings.CLUSTER_SECRET or settings.SECRET_KEY
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limit = settings.CLUSTER_FORWARD_MAX_CONNECTIONS
+            self._client = httpx.AsyncClient(
+                headers={CLUSTER_TOKEN_HEADER: self.token},
+                limits=httpx.Limits(
+                    max_connections=limit, max_keepalive_connections=limit
+                ),
+            )
+        return self._client
+
+    async def request(
+        self,
+        device_id: str,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+        forwarded: bool = False,
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Send a JSON-RPC request to a device, wherever it is connected.
+
+        Args:
+            device_id: Target device identifier.
+            method: RPC method name.
+            params: Optional method parameters.
+            timeout: Optional timeout in seconds.
+            forwarded: True when the request came from another replica.
+
+        Returns:
+            ``(connected, result)``; ``result`` is None on timeout/error.
+        """
+        connection = tcp_connection_manager.get_connection(device_id)
+        if connection:
+            if method == "tools/list":
+                # Goes through list_tools so the cached tool list is refreshed
+                tools = await connection.list_tools(timeout)
+                return True, ({"tools": tools} if tools is not None else None)
+            return True, await connection.send_request(method, params, timeout)
+
+        if forwarded or not device_presence.enabled:
+            return False, None
+
+        return await self._forward(
+            device_id,
+            "rpc",
+            {"method": method, "params": params or {}, "timeout": timeout},
+            (timeout or settings.TCP_RPC_TIMEOUT) + 5,
+        )
+
+    async def is_connected(self, device_id: str) -> bool:
+        """Check whether a device is connected to this or any live replica.
+
+        Args:
+            device_id: Device identifier.
+
+        Returns:
+            True if the device is connected.
+        """
+        if tcp_connection_manager.get_connection(device_id):
+            return True
+        if not device_presence.enabled:
+            return False
+        try:
+            return await device_presence.lookup(device_id) is not None
+        except Exception as e:
+            logger.warning(f"Failed to look up owner of device {device_id}: {e}")
+            return False
+
+    async def disconnect(self, device_id: str, forwarded: bool = False) -> bool:
+        """Close a device connection, on whichever replica holds it.
+
+        Args:
+            device_id: Device identifier.
+            forwarded: True when the request came from another replica.
+
+        Returns:
+            True if a connection was found and closed.
+        """
+        if tcp_connection_manager.get_connection(device_id):
+            await tcp_connection_manager.unregister_connection(device_id)
+            return True
+        if forwarded or not device_presence.enabled:
+            return False
+        connected, _ = await self._forward(device_id, "disconnect", {}, 10)
+        return connected
+
+    async def _forward(
+        self,
+        device_id: str,
+        action: str,
+        payload: Dict[str, Any],
+        timeout: float,
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Forward a request to the replica that owns the device.
+
+        Args:
+            device_id: Target device identifier.
+            action: Internal endpoint name (``rpc`` or ``disconnect``).
+            payload: Request body.
+            timeout: HTTP timeout in seconds.
+
+        Returns:
+            ``(connected, result)`` as reported by the owning replica.
+        """
+        try:
+            owner = await device_presence.lookup(device_id)
+        except Exception as e:
+            logger.warning(f"Failed to look up owner of device {device_id}: {e}")
+            return False, None
+        if owner is None:
+            return False, None
+
+        node_id, url = owner
+        if node_id == device_presence.node_id:
+            # Lease left over from a connection this node already dropped
+            return False, None
+
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().post(
+                f"{url}/v1/cluster/devices/{device_id}/{action}",
+                json=payload,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            body = response.json()
+        except Exception as e:
+            self.metrics.failed += 1
+            logger.error(
+                f"Forward to node {node_id} failed: device={device_id}, "
+                f"action={action}: {e}"
+            )
+            return True, None
+
+        self.metrics.record(node_id, (time.perf_counter() - started) * 1000)
+        if not body.get("connected"):
+            self.metrics.stale += 1
+            return False, None
+        return True, body.get("result")
+
+    async def close(self) -> None:
+        """Close the inter-replica HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global singleton
+device_router = DeviceRouter()
@@ -7,13 +7,15 @@ definitions come from the devices themselves via TCP RPC ``tools/list``,
 and all tool calls are forwarded as-is via ``tools/call``.
 
 The ``device_id`` is resolved from the URL path (``/mcp/{device_id}``).
+In cluster mode the device may be connected to another replica; requests
+are then routed there by ``device_router``.
 """
 
 from typing import Any, Dict, List, Optional
 
 from app.config import settings
 from app.core.logging import get_logger
-from app.services.tcp_connection_manager import tcp_connection_manager
+from app.services.device_router import device_router
 
 logger = get_logger("services.mcp_server")
 
@@ -50,12 +52,12 @@ class MCPProxy:
         Returns:
             ``{"tools": [...]}`` with raw tool definitions from the device.
         """
-        connection = tcp_connection_manager.get_connection(device_id)
-        if not connection:
+        connected, result = await device_router.request(device_id, "tools/list")
+        if not connected:
             logger.warning(f"list_tools: device {device_id} not connected")
             return {"tools": []}
 
-        raw_tools = await connection.list_tools()
+        raw_tools = result.get("tools") if result else None
         return {"tools": raw_tools or []}
 
     async def handle_call_tool(
@@ -73,8 +75,10 @@ class MCPProxy:
         name: str = params.get("name", "")
         arguments: Dict[str, Any] = params.get("arguments", {})
 
-        connection = tcp_connection_manager.get_connection(device_id)
-        if not connection:
+        connected, result = await device_router.request(
+            device_id, "tools/call", {"name": name, "arguments": arguments}
+        )
+        if not connected:
             return {
                 "content": [
                     {
@@ -85,7 +89,6 @@ class MCPProxy:
                 "isError": True,
             }
 
-        result = await connection.call_tool(name, arguments)
         if result is None:
             return {
                 "content": [
@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from app.config import settings
 from app.core.logging import get_logger
+from app.services.device_presence import device_presence
 
 logger = get_logger("services.tcp_connection_manager")
 
@@ -189,6 +190,7 @@ class TcpConnectionManager:
         self._connections: Dict[str, TcpDeviceConnection] = {}
         self._lock = asyncio.Lock()
         self._heartbeat_task: Optional[asyncio.Task[None]] = None
+        self._lease_task: Optional[asyncio.Task[None]] = None
         logger.info("TcpConnectionManager initialized")
 
     async def initialize(self) -> None:
@@ -196,18 +198,30 @@ class TcpConnectionManager:
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
         logger.info("TcpConnectionManager heartbeat monitor started")
 
+        if device_presence.enabled:
+            await device_presence.announce()
+            self._lease_task = asyncio.create_task(self._lease_loop())
+            logger.info(
+                f"Cluster mode enabled: node={device_presence.node_id}, "
+                f"url={device_presence.advertise_url}"
+            )
+
     async def shutdown(self) -> None:
         """Shutdown the connection manager and close all connections."""
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            try:
-                await self._heartbeat_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._heartbeat_task, self._lease_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
         for agent_id in list(self._connections.keys()):
             await self.unregister_connection(agent_id)
 
+        if device_presence.enabled:
+            await device_presence.withdraw([])
+
         logger.info("TcpConnectionManager shutdown complete")
 
     async def register_connection(
@@ -259,6 +273,9 @@ class TcpConnectionManager:
 
             self._connections[agent_id] = connection
 
+        if device_presence.enabled:
+            await device_presence.claim(agent_id)
+
         logger.info(f"TCP device registered: {name} ({agent_id})")
         return connection
 
@@ -272,6 +289,8 @@ class TcpConnectionManager:
             connection = self._connections.pop(agent_id, None)
 
         if connection:
+            if device_presence.enabled:
+                await device_presence.release(agent_id)
             logger.info(
                 f"TCP device unregistered: {connection.name} ({agent_id})"
             )
@@ -362,6 +381,29 @@ class TcpConnectionManager:
             except Exception as e:
                 logger.error(f"TCP heartbeat loop error: {e}")
 
+    async def _lease_loop(self) -> None:
+        """Background task to renew the Redis ownership leases (cluster mode).
+
+        A device whose lease was taken over by another node has reconnected
+        there, so the stale local connection is closed.
+        """
+        while True:
+            try:
+                await asyncio.sleep(settings.CLUSTER_LEASE_RENEW_INTERVAL)
+
+                lost = await device_presence.renew(list(self._connections.keys()))
+                for agent_id in lost:
+                    logger.warning(
+                        f"TCP device {agent_id} is now owned by another node, "
+                        f"closing local connection"
+                    )
+                    await self.unregister_connection(agent_id)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Device lease renewal error: {e}")
+
 
 # Global singleton instance
 tcp_connection_manager = TcpConnectionManager()
@@ -25,6 +25,7 @@ from app.core.logging import get_logger
 from app.models.device import DeviceStatus
 from app.schemas.tcp_rpc import JsonRpcErrorCode
 from app.services.bind_code_service import bind_code_service
+from app.services.device_presence import device_presence
 from app.services.device_service import DeviceService
 from app.services.tcp_connection_manager import tcp_connection_manager
 
@@ -381,6 +382,17 @@ class TcpRpcServer:
         Args:
             device_id: Device ID to update.
         """
+        if device_presence.enabled:
+            # The device may already have reconnected to another node
+            try:
+                owner = await device_presence.lookup(device_id)
+            except Exception as e:
+                logger.warning(f"Failed to look up owner of device {device_id}: {e}")
+                owner = None
+            if owner and owner[0] != device_presence.node_id:
+                logger.debug(f"Device {device_id} is connected to node {owner[0]}")
+                return
+
         try:
             import uuid as uuid_module
             async with AsyncSessionLocal() as db:
@@ -15,12 +15,13 @@ import hashlib
 import json
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
+from app.api.token_cache import access_token_cache, make_token_key
 from app.core.config import settings
 
 try:
@@ -111,45 +112,11 @@ def feishu_decrypt_message(encrypt_b64: str, encrypt_key: str) -> Optional[str]:
 
 
 # --- Feishu tenant access token ----------------------------------------------------
-_token_cache: Dict[str, tuple] = {}  # app_id -> (token, expires_at)
-
-
-async def feishu_get_tenant_access_token(
+async def _feishu_fetch_tenant_access_token(
     app_id: str,
     app_secret: str,
     timeout: Optional[int] = None,
-) -> str:
-    """Get Feishu tenant_access_token for API calls.
-
-    Caches token in memory and Redis if available.
-
-    Docs: https://open.feishu.cn/document/server-docs/authentication-management/access-token/tenant_access_token_internal
-    """
-    import time
-
-    cache_key = f"feishu:tenant_token:{app_id}"
-    now = time.time()
-
-    # Check memory cache
-    if app_id in _token_cache:
-        token, expires_at = _token_cache[app_id]
-        if expires_at > now + 60:  # 1 minute buffer
-            return token
-
-    # Check Redis cache
-    redis = await get_redis_client()
-    if redis:
-        try:
-            cached = await redis.get(cache_key)
-            if cached:
-                data = json.loads(cached)
-                if data.get("expires_at", 0) > now + 60:
-                    _token_cache[app_id] = (data["token"], data["expires_at"])
-                    return data["token"]
-        except Exception as e:
-            logging.warning("[FEISHU] Redis get failed: %s", e)
-
-    # Fetch new token from Feishu API
+) -> Tuple[str, int]:
     url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
     payload = {
         "app_id": app_id,
@@ -164,25 +131,27 @@ async def feishu_get_tenant_access_token(
         if data.get("code") != 0:
             raise RuntimeError(f"Feishu get tenant_access_token failed: {data}")
 
-        token = data["tenant_access_token"]
-        expire = data.get("expire", 7200)  # Default 2 hours
-        expires_at = now + expire
-
-        # Cache in memory
-        _token_cache[app_id] = (token, expires_at)
-
-        # Cache in Redis
-        if redis:
-            try:
-                await redis.setex(
-                    cache_key,
-                    expire - 60,  # Expire slightly earlier
-                    json.dumps({"token": token, "expires_at": expires_at}),
-                )
-            except Exception as e:
-                logging.warning("[FEISHU] Redis set failed: %s", e)
-
-        return token
+        return data["tenant_access_token"], int(data.get("expire") or 7200)  # Default 2 hours
+
+
+async def feishu_get_tenant_access_token(
+    app_id: str,
+    app_secret: str,
+    timeout: Optional[int] = None,
+    force_refresh: bool = False,
+) -> str:
+    """Get Feishu tenant_access_token for API calls.
+
+    Cached in memory and Redis (if available) via the shared access-token cache,
+    and refreshed shortly before expiry.
+
+    Docs: https://open.feishu.cn/document/server-docs/authentication-management/access-token/tenant_access_token_internal
+    """
+    return await access_token_cache.get_token(
+        make_token_key("feishu", app_id, app_secret),
+        lambda: _feishu_fetch_tenant_access_token(app_id, app_secret, timeout),
+        force_refresh=force_refresh,
+    )
 
 
 # --- Feishu Reply Message API ------------------------------------------------------
@@ -0,0 +1,146 @@
+"""Shared access-token cache for platform API clients.
+
+Vendor access tokens (WeCom ``gettoken``, Feishu ``tenant_access_token``) are
+valid for about two hours and their endpoints are rate limited, so they are
+cached instead of being fetched for every outbound message:
+
+- In-process cache first, then Redis (shared across processes) if configured
+- Single-flight: concurrent callers for the same credentials share one fetch
+- Proactive refresh: within ``refresh_before_seconds`` of expiry the cached
+  token is still returned while a background refresh replaces it
+- ``force_refresh`` / ``invalidate`` for tokens rejected by the vendor
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Fetches a new token; returns (token, expires_in_seconds)
+TokenFetcher = Callable[[], Awaitable[Tuple[str, int]]]
+
+REDIS_KEY_PREFIX = "tgo:platform:token:"
+
+
+def make_token_key(provider: str, app_id: str, app_secret: str) -> str:
+    """Cache key for a credential pair; the secret is hashed so rotating it yields a new key."""
+    digest = hashlib.sha256(app_secret.encode("utf-8")).hexdigest()[:16]
+    return f"{provider}:{app_id}:{digest}"
+
+
+async def _default_redis_getter() -> Any:
+    # Imported lazily: wecom_utils imports this module
+    from app.api.wecom_utils import get_redis_client
+
+    return await get_redis_client()
+
+
+@dataclass
+class _CachedToken:
+    token: str
+    expires_at: float
+
+
+class AccessTokenCache:
+    """Expiry-aware, single-flight access-token cache (memory + Redis)."""
+
+    def __init__(
+        self,
+        refresh_before_seconds: int = 300,
+        min_remaining_seconds: int = 30,
+        redis_getter: Callable[[], Awaitable[Any]] = _default_redis_getter,
+    ) -> None:
+        self._refresh_before = refresh_before_seconds
+        self._min_remaining = min_remaining_seconds
+        self._redis_getter = redis_getter
+        self._tokens: Dict[str, _CachedToken] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_token(self, key: str, fetch: TokenFetcher, *, force_refresh: bool = False) -> str:
+        """Return a valid token for ``key``, fetching it with ``fetch`` only when needed."""
+        if not force_refresh:
+            cached = self._tokens.get(key)
+            now = time.time()
+            if cached and now < cached.expires_at - self._refresh_before:
+                return cached.token
+            if cached and now < cached.expires_at - self._min_remaining:
+                # Still usable: hand it out and refresh ahead of expiry
+                self._refresh(key, fetch, force=False).add_done_callback(self._log_background_error)
+                return cached.token
+        return await asyncio.shield(self._refresh(key, fetch, force=force_refresh))
+
+    async def invalidate(self, key: str) -> None:
+        """Drop a token (e.g. after the vendor rejected it) from memory and Redis."""
+        self._tokens.pop(key, None)
+        redis = await self._redis()
+        if redis:
+            try:
+                await redis.delete(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                logging.warning("[TOKEN] Redis delete failed for %s: %s", key, e)
+
+    def _refresh(self, key: str, fetch: TokenFetcher, force: bool) -> asyncio.Task:
+        """Start (or join) the single in-flight load for ``key``."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._load(key, fetch, force))
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if self._inflight.get(key) is t:
+                    self._inflight.pop(key, None)
+
+            task.add_done_callback(_done)
+        return task
+
+    async def _load(self, key: str, fetch: TokenFetcher, force: bool) -> str:
+        redis = await self._redis()
+        redis_key = REDIS_KEY_PREFIX + key
+
+        if redis and not force:
+            # Another process may have refreshed it already
+            try:
+                raw = await redis.get(redis_key)
+                if raw:
+                    data = json.loads(raw)
+                    if data.get("expires_at", 0) > time.time() + self._refresh_before:
+                        self._tokens[key] = _CachedToken(data["token"], float(data["expires_at"]))
+                        return data["token"]
+            except Exception as e:
+                logging.warning("[TOKEN] Redis get failed for %s: %s", key, e)
+
+        token, expires_in = await fetch()
+        expires_in = int(expires_in or 7200)
+        expires_at = time.time() + expires_in
+        self._tokens[key] = _CachedToken(token, expires_at)
+
+        if redis:
+            try:
+                await redis.set(
+                    redis_key,
+                    json.dumps({"token": token, "expires_at": expires_at}),
+                    ex=max(1, expires_in - self._min_remaining),
+                )
+            except Exception as e:
+                logging.warning("[TOKEN] Redis set failed for %s: %s", key, e)
+        return token
+
+    async def _redis(self) -> Optional[Any]:
+        try:
+            return await self._redis_getter()
+        except Exception as e:  # pragma: no cover - protective catch
+            logging.warning("[TOKEN] Redis unavailable: %s", e)
+            return None
+
+    @staticmethod
+    def _log_background_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning("[TOKEN] Background token refresh failed: %s", task.exception())
+
+
+# Shared by all platform API clients in this process
+access_token_cache = AccessTokenCache()
@@ -1,11 +1,37 @@
 from __future__ import annotations
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from app.api.schemas import ErrorResponse
+from app.infra.smtp_pool import smtp_pools
 
 router = APIRouter()
 
+# app.state attribute -> metrics key for listeners backed by the inbox worker engine
+_INBOX_LISTENERS = {
+    "email_listener": "email",
+    "wecom_listener": "wecom",
+    "wukongim_listener": "wukongim",
+    "feishu_listener": "feishu",
+    "dingtalk_listener": "dingtalk",
+}
+
 
 @router.get("/health", responses={500: {"model": ErrorResponse}})
 async def health() -> dict:
     return {"status": "ok"}
 
+
+@router.get("/health/inbox", responses={500: {"model": ErrorResponse}})
+async def inbox_metrics(request: Request) -> dict:
+    """Inbox queue depth, lag and processing counters per listener and platform."""
+    listeners: dict[str, dict] = {}
+    for attr, name in _INBOX_LISTENERS.items():
+        listener = getattr(request.app.state, attr, None)
+        if listener is not None and hasattr(listener, "inbox_metrics"):
+            listeners[name] = listener.inbox_metrics()
+    return {"status": "ok", "listeners": listeners}
+
+
+@router.get("/health/smtp", responses={500: {"model": ErrorResponse}})
+async def smtp_metrics() -> dict:
+    """Outbound SMTP pool usage, queue depth and send latency per email platform."""
+    return {"status": "ok", "pools": smtp_pools.metrics()}
@@ -236,6 +236,7 @@ async def send_message(req_body: SendMessageRequest, request: Request, db: Async
                 to_addr=target_email,
                 from_addr=smtp_username,
                 subject="",
+                platform_id=platform.id,
             )
             await adapter.send_final({"text": content_text})
             logging.info("[SEND] client_msg_no=%s email sent to %s", client_msg_no, target_email)
@@ -11,6 +11,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.api.token_cache import access_token_cache, make_token_key
 from app.core.config import settings
 from app.db.models import WeComInbox
 
@@ -41,11 +42,15 @@ async def get_redis_client():
 
 
 # --- WeCom token and API wrappers --------------------------------------------------
-async def wecom_get_access_token(corp_id: str, app_secret: str, timeout: Optional[int] = None) -> str:
-    """Fetch WeCom access_token.
+# errcodes meaning the access_token itself is invalid or expired
+WECOM_TOKEN_ERRCODES = {40001, 40014, 42001}
 
-    Raises RuntimeError if WeCom returns an error.
-    """
+
+class WeComTokenError(RuntimeError):
+    """Raised when WeCom rejects the access_token; refresh it and retry."""
+
+
+async def _wecom_fetch_access_token(corp_id: str, app_secret: str, timeout: Optional[int] = None) -> Tuple[str, int]:
     url = "https://qyapi.weixin.qq.com/cgi-bin/gettoken"
     params = {"corpid": corp_id, "corpsecret": app_secret}
     async with httpx.AsyncClient(timeout=timeout or settings.request_timeout_seconds) as client:
@@ -54,7 +59,32 @@ async def wecom_get_access_token(corp_id: str, app_secret: str, timeout: Optiona
         data = resp.json()
         if data.get("errcode") != 0:
             raise RuntimeError(f"WeCom gettoken failed: {data}")
-        return data["access_token"]
+        return data["access_token"], int(data.get("expires_in") or 7200)
+
+
+async def wecom_get_access_token(
+    corp_id: str,
+    app_secret: str,
+    timeout: Optional[int] = None,
+    force_refresh: bool = False,
+) -> str:
+    """Get WeCom access_token, cached in memory and Redis until shortly before expiry.
+
+    Raises RuntimeError if WeCom returns an error.
+    """
+    return await access_token_cache.get_token(
+        make_token_key("wecom", corp_id, app_secret),
+        lambda: _wecom_fetch_access_token(corp_id, app_secret, timeout),
+        force_refresh=force_refresh,
+    )
+
+
+def _raise_for_wecom_error(data: dict, action: str) -> None:
+    errcode = data.get("errcode")
+    if errcode in WECOM_TOKEN_ERRCODES:
+        raise WeComTokenError(f"WeCom {action} failed: {data}")
+    if errcode != 0:
+        raise RuntimeError(f"WeCom {action} failed: {data}")
 
 
 async def wecom_upload_temp_media(access_token: str, file_bytes: bytes, media_type: str = "image", filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
@@ -207,8 +237,7 @@ async def wecom_kf_send_msg(
         resp = await client.post(url, json=payload)
         resp.raise_for_status()
         data = resp.json()
-        if data.get("errcode") != 0:
-            raise RuntimeError(f"WeCom KF send_msg failed: {data}")
+        _raise_for_wecom_error(data, "KF send_msg")
         return data
 
 
@@ -334,8 +363,7 @@ async def wecom_send_app_message(
         resp = await client.post(url, content=json.dumps(payload, ensure_ascii=False).encode("utf-8"))
         resp.raise_for_status()
         data = resp.json()
-        if data.get("errcode") != 0:
-            raise RuntimeError(f"WeCom app send message failed: {data}")
+        _raise_for_wecom_error(data, "app send message")
         return data
 
 
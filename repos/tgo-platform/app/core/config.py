@@ -20,6 +20,19 @@ class Settings(BaseSettings):
     sse_backpressure_limit: int = 1000
     request_timeout_seconds: int = 120
 
+    # Inbox consumers: concurrent conversations per platform and worker lease duration
+    inbox_worker_concurrency: int = 8
+    inbox_lease_seconds: int = 300
+
+    # Email listener: mailboxes connecting/fetching at the same time (IDLE waits excluded)
+    imap_max_active_sessions: int = 20
+
+    # Outbound SMTP: keep-alive connections and send queue per SMTP account
+    smtp_pool_max_connections: int = 2
+    smtp_pool_idle_seconds: int = 60
+    smtp_send_queue_size: int = 100
+    smtp_send_batch_size: int = 10
+
     # Redis (optional) for caching
     redis_url: str | None = None  # e.g. redis://127.0.0.1:6379/0
     visitor_cache_ttl_seconds: int = 24 * 60 * 60
@@ -76,11 +76,14 @@ class EmailInbox(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Worker lease: a "processing" row whose lease expired can be claimed again
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         UniqueConstraint("platform_id", "message_id", name="uq_email_inbox_platform_message"),
         Index("ix_email_inbox_platform_status", "platform_id", "status"),
         Index("ix_email_inbox_status_fetched", "status", "fetched_at"),
+        Index("ix_email_inbox_platform_from_address_status", "platform_id", "from_address", "status"),
     )
 
 
@@ -126,11 +129,14 @@ class WeComInbox(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Worker lease: a "processing" row whose lease expired can be claimed again
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         UniqueConstraint("platform_id", "message_id", name="uq_wecom_inbox_platform_message"),
         Index("ix_wecom_inbox_platform_status", "platform_id", "status"),
         Index("ix_wecom_inbox_status_fetched", "status", "fetched_at"),
+        Index("ix_wecom_inbox_platform_from_user_status", "platform_id", "from_user", "status"),
     )
 
 
@@ -167,12 +173,15 @@ class WuKongIMInbox(Base):
 
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Worker lease: a "processing" row whose lease expired can be claimed again
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     __table_args__ = (
         UniqueConstraint("platform_id", "message_id", name="uq_wukongim_inbox_platform_message"),
         Index("ix_wukongim_inbox_platform_status_fetched", "platform_id", "status", "fetched_at"),
         Index("ix_wukongim_inbox_platform_client_msg_no", "platform_id", "client_msg_no"),
+        Index("ix_wukongim_inbox_platform_from_uid_status", "platform_id", "from_uid", "status"),
     )
 
 
@@ -220,11 +229,14 @@ class FeishuInbox(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Worker lease: a "processing" row whose lease expired can be claimed again
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         UniqueConstraint("platform_id", "message_id", name="uq_feishu_inbox_platform_message"),
         Index("ix_feishu_inbox_platform_status", "platform_id", "status"),
         Index("ix_feishu_inbox_status_fetched", "status", "fetched_at"),
+        Index("ix_feishu_inbox_platform_from_user_status", "platform_id", "from_user", "status"),
     )
 
 
@@ -276,11 +288,14 @@ class DingTalkInbox(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Worker lease: a "processing" row whose lease expired can be claimed again
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
         UniqueConstraint("platform_id", "message_id", name="uq_dingtalk_inbox_platform_message"),
         Index("ix_dingtalk_inbox_platform_status", "platform_id", "status"),
         Index("ix_dingtalk_inbox_status_fetched", "status", "fetched_at"),
+        Index("ix_dingtalk_inbox_platform_from_user_status", "platform_id", "from_user", "status"),
     )
 
 
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 import logging
-import smtplib
 from email.message import EmailMessage
-from typing import Optional
-import asyncio
+from typing import Any
 
 from app.domain.entities import StreamEvent
 from app.domain.services.adapters.base import BasePlatformAdapter
+from app.infra.smtp_pool import SmtpAccount, smtp_pools
 
 
 class EmailAdapter(BasePlatformAdapter):
@@ -30,6 +29,7 @@ class EmailAdapter(BasePlatformAdapter):
         to_addr: str | None = None,
         from_addr: str | None = None,
         subject: str | None = None,
+        platform_id: Any = None,
     ) -> None:
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
@@ -39,6 +39,7 @@ class EmailAdapter(BasePlatformAdapter):
         self.to_addr = to_addr or smtp_username
         self.from_addr = from_addr or smtp_username
         self.subject = subject or ""
+        self.platform_id = platform_id
 
     async def send_incremental(self, ev: StreamEvent) -> None:  # pragma: no cover - not used
         # Email adapter does not support streaming output; ignore incremental events
@@ -72,61 +73,16 @@ class EmailAdapter(BasePlatformAdapter):
         # Avoid dumping full message content in stdout; keep debug concise
         logging.debug("Preparing to send email via SMTP host=%s port=%s tls=%s to=%s", self.smtp_host, self.smtp_port, self.smtp_use_tls, self.to_addr)
 
-        # Robust connection with retries and proper TLS/SSL handling
-        attempts = 2
-        last_err: Exception | None = None
-        for attempt in range(1, attempts + 1):
-            client: smtplib.SMTP | smtplib.SMTP_SSL | None = None
-            try:
-                # Use implicit SSL for port 465 regardless of smtp_use_tls flag
-                if self.smtp_port == 465:
-                    client = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=30)
-                else:
-                    client = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
-                    client.ehlo()
-                    if self.smtp_use_tls:
-                        # STARTTLS if requested and supported
-                        try:
-                            if client.has_extn("starttls"):
-                                client.starttls()
-                                client.ehlo()
-                            else:
-                                logging.warning("SMTP server does not advertise STARTTLS; continuing without TLS")
-                        except Exception as e:
-                            logging.warning("STARTTLS negotiation failed: %s", e)
-                            raise
-
-                # Authenticate if credentials provided
-                if self.smtp_username and self.smtp_password:
-                    try:
-                        client.login(self.smtp_username, self.smtp_password)
-                    except smtplib.SMTPAuthenticationError as e:
-                        logging.error("SMTP authentication failed: code=%s msg=%s", getattr(e, 'smtp_code', None), getattr(e, 'smtp_error', None))
-                        raise
-
-                # Send email
-                client.send_message(msg)
-                logging.info("Email sent to %s with subject '%s'", self.to_addr, self.subject)
-                # Cleanup and return on success
-                try:
-                    client.quit()
-                except Exception as e:
-                    logging.debug("SMTP quit raised but ignored: %s", e)
-                return
-            except Exception as e:
-                last_err = e
-                logging.warning("Attempt %d/%d to send email failed: %s", attempt, attempts, e)
-                # Ensure socket closed before retry
-                try:
-                    if client:
-                        client.close()
-                except Exception:
-                    pass
-                if attempt < attempts:
-                    await asyncio.sleep(1.5)
-
-        # If we reached here, all attempts failed
-        raise RuntimeError(f"Failed to send email after {attempts} attempts: {last_err}")
+        # Pooled keep-alive connection per SMTP account (reconnects and retries once on failure)
+        pool = smtp_pools.get(SmtpAccount(
+            host=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_username,
+            password=self.smtp_password,
+            use_tls=self.smtp_use_tls,
+        ), platform_id=self.platform_id)
+        await pool.send(msg)
+        logging.info("Email sent to %s with subject '%s'", self.to_addr, self.subject)
 
     def _markdown_to_html(self, markdown_text: str) -> str:
         """Convert Markdown to HTML using markdown2 if available; fallback to minimal formatting."""
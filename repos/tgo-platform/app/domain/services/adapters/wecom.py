@@ -9,6 +9,7 @@ from app.domain.services.adapters.base import BasePlatformAdapter
 from app.core.config import settings
 
 from app.api.wecom_utils import (
+    WeComTokenError,
     wecom_get_access_token,
     wecom_kf_send_msg,
     wecom_send_app_message,
@@ -45,8 +46,10 @@ class WeComAdapter(BasePlatformAdapter):
         self.external_userid = external_userid
         self.http_timeout = http_timeout or settings.request_timeout_seconds
 
-    async def _get_access_token(self) -> str:
-        return await wecom_get_access_token(self.corp_id, self.app_secret, timeout=self.http_timeout)
+    async def _get_access_token(self, force_refresh: bool = False) -> str:
+        return await wecom_get_access_token(
+            self.corp_id, self.app_secret, timeout=self.http_timeout, force_refresh=force_refresh
+        )
 
     async def send_incremental(self, ev: StreamEvent) -> None:  # pragma: no cover - not used
         # WeCom adapter does not support streaming output; ignore incremental events
@@ -58,8 +61,13 @@ class WeComAdapter(BasePlatformAdapter):
             # Nothing to send
             return
 
-        access_token = await self._get_access_token()
+        try:
+            await self._send_text(await self._get_access_token(), text)
+        except WeComTokenError:
+            # Cached token was revoked or expired early: refresh once and retry
+            await self._send_text(await self._get_access_token(force_refresh=True), text)
 
+    async def _send_text(self, access_token: str, text: str) -> None:
         if self.is_from_colleague:
             # Send via standard app message API to internal colleague (touser = UserID)
             await wecom_send_app_message(
@@ -80,6 +80,7 @@ async def select_adapter_for_target(msg: NormalizedMessage, platform: Platform)
             to_addr=to_addr,
             from_addr=from_addr,
             subject=subject,
+            platform_id=platform.id,
         )
     if ptype == "wecom":
         cfg = platform.config or {}
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import String, and_, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+
+# Processes one claimed inbox record; returns the AI reply text (if any).
+RecordHandler = Callable[[AsyncSession, Any], Awaitable["str | None"]]
+
+
+@dataclass
+class InboxPlatformMetrics:
+    """Per-platform counters and the last observed queue depth/lag."""
+
+    queue_depth: int = 0
+    oldest_pending_age_seconds: float = 0.0
+    in_flight: int = 0
+    claimed_total: int = 0
+    completed_total: int = 0
+    failed_total: int = 0
+    processing_seconds_total: float = 0.0
+    last_run_at: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        finished = self.completed_total + self.failed_total
+        return {
+            "queue_depth": self.queue_depth,
+            "oldest_pending_age_seconds": round(self.oldest_pending_age_seconds, 3),
+            "in_flight": self.in_flight,
+            "claimed_total": self.claimed_total,
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+            "avg_processing_seconds": round(self.processing_seconds_total / finished, 3) if finished else None,
+            "last_run_at": self.last_run_at,
+        }
+
+
+@dataclass
+class _Claimed:
+    id: Any
+    conversation: str
+    fetched_at: datetime
+
+
+class InboxWorkerEngine:
+    """Shared consumer engine for ``pt_*_inbox`` tables.
+
+    - Claims work with one ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)``
+      that sets ``status='processing'`` and a lease (``lease_expires_at``). Rows whose
+      lease expired (e.g. the worker crashed) are claimable again.
+    - Keeps strict ordering per (platform, conversation): a conversation is skipped
+      while another worker holds a live lease on it or while an earlier message is
+      waiting for its retry backoff, and all of its claimed rows run sequentially.
+    - Runs different conversations concurrently, up to the per-platform concurrency.
+    - Tracks queue depth, lag of the oldest pending row and processing counters.
+
+    The inbox model must have ``id``, ``platform_id``, ``status``, ``fetched_at``,
+    ``processed_at``, ``retry_count``, ``error_message``, ``ai_reply`` and
+    ``lease_expires_at`` columns, plus the column identifying the conversation.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: async_sessionmaker[AsyncSession],
+        model: Any,
+        conversation_column: str,
+        *,
+        lease_seconds: int | None = None,
+    ) -> None:
+        self._name = name
+        self._session_factory = session_factory
+        self._model = model
+        self._table = model.__table__
+        self._conversation_column = conversation_column
+        self._lease = timedelta(seconds=lease_seconds or settings.inbox_lease_seconds)
+        self._metrics: dict[uuid.UUID, InboxPlatformMetrics] = {}
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Snapshot of per-platform metrics, keyed by platform id."""
+        return {str(pid): m.to_dict() for pid, m in self._metrics.items()}
+
+    def _platform_metrics(self, platform_id: uuid.UUID) -> InboxPlatformMetrics:
+        metrics = self._metrics.get(platform_id)
+        if metrics is None:
+            metrics = self._metrics[platform_id] = InboxPlatformMetrics()
+        return metrics
+
+    # ---- Claiming ----
+    def _retryable(self, t: Any, max_retries: int) -> Any:
+        return and_(t.c.status == "failed", t.c.retry_count < max_retries)
+
+    def _backoff_elapsed(self, t: Any, now: Any) -> Any:
+        # Exponential backoff in seconds: 2 ** retry_count (min 1s)
+        return or_(
+            t.c.processed_at.is_(None),
+            t.c.processed_at <= now - func.make_interval(0, 0, 0, 0, 0, 0, func.power(2, t.c.retry_count)),
+        )
+
+    async def _claim(
+        self,
+        session: AsyncSession,
+        platform_id: uuid.UUID,
+        limit: int,
+        max_retries: int,
+    ) -> list[_Claimed]:
+        t = self._table
+        other = t.alias("other")
+        conv = t.c[self._conversation_column]
+        now = func.now()
+
+        eligible = or_(
+            t.c.status == "pending",
+            and_(self._retryable(t, max_retries), self._backoff_elapsed(t, now)),
+            and_(
+                t.c.status == "processing",
+                or_(t.c.lease_expires_at.is_(None), t.c.lease_expires_at < now),
+            ),
+        )
+        # Another worker is processing this conversation, or an earlier message
+        # of it is still waiting for its retry backoff
+        blocked = exists().where(
+            other.c.platform_id == t.c.platform_id,
+            other.c[self._conversation_column] == conv,
+            other.c.id != t.c.id,
+            or_(
+                and_(other.c.status == "processing", other.c.lease_expires_at >= now),
+                and_(
+                    other.c.fetched_at < t.c.fetched_at,
+                    self._retryable(other, max_retries),
+                    ~self._backoff_elapsed(other, now),
+                ),
+            ),
+        )
+        # Serialize concurrent claims of the same conversation (held until commit)
+        conversation_lock = func.pg_try_advisory_xact_lock(
+            func.hashtext(t.name),
+            func.hashtext(func.concat(t.c.platform_id.cast(String), ":", conv)),
+        )
+
+        candidates = (
+            select(t.c.id)
+            .where(t.c.platform_id == platform_id, eligible, ~blocked, conversation_lock)
+            .order_by(t.c.fetched_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=t)
+        )
+        stmt = (
+            update(t)
+            .where(t.c.id.in_(candidates.scalar_subquery()))
+            .values(
+                status="processing",
+                error_message=None,
+                lease_expires_at=now + func.make_interval(0, 0, 0, 0, 0, 0, self._lease.total_seconds()),
+            )
+            .returning(t.c.id, conv, t.c.fetched_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await session.execute(stmt)).all()
+        await session.commit()
+        return [_Claimed(id=r[0], conversation=r[1], fetched_at=r[2]) for r in rows]
+
+    async def _refresh_metrics(self, session: AsyncSession, platform_id: uuid.UUID, max_retries: int) -> None:
+        t = self._table
+        row = (
+            await session.execute(
+                select(func.count(), func.min(t.c.fetched_at)).where(
+                    t.c.platform_id == platform_id,
+                    or_(t.c.status == "pending", self._retryable(t, max_retries)),
+                )
+            )
+        ).one()
+        metrics = self._platform_metrics(platform_id)
+        metrics.queue_depth = int(row[0] or 0)
+        oldest = row[1]
+        metrics.oldest_pending_age_seconds = (
+            max(0.0, (datetime.now(timezone.utc) - oldest).total_seconds()) if oldest else 0.0
+        )
+
+    # ---- Processing ----
+    async def _release(self, ids: list[Any]) -> None:
+        """Put claimed-but-unprocessed rows back to pending."""
+        if not ids:
+            return
+        t = self._table
+        async with self._session_factory() as session:
+            await session.execute(
+                update(t)
+                .where(t.c.id.in_(ids), t.c.status == "processing")
+                .values(status="pending", lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def _process_one(
+        self,
+        platform_id: uuid.UUID,
+        claimed: _Claimed,
+        handler: RecordHandler,
+    ) -> bool:
+        metrics = self._platform_metrics(platform_id)
+        started = time.monotonic()
+        metrics.in_flight += 1
+        try:
+            async with self._session_factory() as db:
+                record = await db.get(self._model, claimed.id)
+                if record is None or record.status != "processing":
+                    return True
+                # Renew the lease for this record before the (possibly long) handler call
+                record.lease_expires_at = datetime.now(timezone.utc) + self._lease
+                await db.commit()
+
+                try:
+                    reply_text = await handler(db, record)
+                except Exception as e:
+                    print(f"[{self._name}] Processing failed for {platform_id}: {e}")
+                    try:
+                        await db.rollback()
+                        await db.refresh(record)
+                        record.status = "failed"
+                        record.processed_at = datetime.now(timezone.utc)
+                        record.retry_count = int((record.retry_count or 0)) + 1
+                        record.error_message = str(e)[:2000]
+                        record.lease_expires_at = None
+                        await db.commit()
+                    except Exception as e2:
+                        print(f"[{self._name}] Commit failed status failed (ignore): {e2}")
+                        await db.rollback()
+                    metrics.failed_total += 1
+                    return False
+
+                record.ai_reply = reply_text
+                record.status = "completed"
+                record.processed_at = datetime.now(timezone.utc)
+                record.error_message = None
+                record.lease_expires_at = None
+                try:
+                    await db.commit()
+                except Exception as e2:
+                    print(f"[{self._name}] Commit completed status failed (ignore): {e2}")
+                    await db.rollback()
+                metrics.completed_total += 1
+                return True
+        finally:
+            metrics.in_flight -= 1
+            metrics.processing_seconds_total += time.monotonic() - started
+
+    async def _process_conversation(
+        self,
+        platform_id: uuid.UUID,
+        records: list[_Claimed],
+        handler: RecordHandler,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        async with semaphore:
+            for i, claimed in enumerate(records):
+                try:
+                    ok = await self._process_one(platform_id, claimed, handler)
+                except Exception as e:
+                    print(f"[{self._name}] Record {claimed.id} error: {e}")
+                    ok = False
+                if not ok:
+                    # Keep conversation order: later messages wait for the retry
+                    await self._release([r.id for r in records[i + 1:]])
+                    return
+
+    async def run_platform(
+        self,
+        platform_id: uuid.UUID,
+        handler: RecordHandler,
+        *,
+        batch_size: int,
+        max_retries: int,
+        concurrency: int,
+    ) -> int:
+        """Claim and process pending records of one platform until drained.
+
+        Returns:
+            Number of records claimed
+        """
+        metrics = self._platform_metrics(platform_id)
+        metrics.last_run_at = time.time()
+        concurrency = max(1, concurrency)
+        limit = max(batch_size, concurrency)
+        total = 0
+
+        while True:
+            async with self._session_factory() as session:
+                await self._refresh_metrics(session, platform_id, max_retries)
+                claimed = await self._claim(session, platform_id, limit, max_retries)
+            if not claimed:
+                return total
+
+            total += len(claimed)
+            metrics.claimed_total += len(claimed)
+
+            conversations: dict[str, list[_Claimed]] = {}
+            for c in sorted(claimed, key=lambda c: c.fetched_at):
+                conversations.setdefault(c.conversation, []).append(c)
+
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(
+                *[
+                    self._process_conversation(platform_id, records, handler, semaphore)
+                    for records in conversations.values()
+                ]
+            )
+
+            if len(claimed) < limit:
+                return total
@@ -3,7 +3,6 @@ from __future__ import annotations
 import asyncio
 import time
 import uuid
-import imaplib
 import re
 import html as html_module
 from contextlib import suppress
@@ -25,7 +24,9 @@ from app.db.models import Platform, EmailInbox
 from app.domain.entities import NormalizedMessage
 from app.domain.ports import MessageNormalizer, TgoApiClient, SSEManager
 from app.domain.services.dispatcher import process_message
+from app.domain.services.inbox_worker import InboxWorkerEngine
 from app.core.config import settings
+from app.infra.imap_client import AsyncImapMailbox
 from app.infra.visitor_client import VisitorService
 
 
@@ -39,13 +40,16 @@ class EmailPlatformConfig(BaseModel):
     mailbox: str = "INBOX"
 
     # Polling / Fetching
-    poll_interval_seconds: int = 60
+    poll_interval_seconds: int = 60        # Used when the server has no IDLE support (or use_idle is off)
     max_emails_per_poll: int = 10
     fetch_lookback_days: int = 1
+    use_idle: bool = True                  # Wait for new mail with IMAP IDLE when supported
+    idle_refresh_seconds: int = 25 * 60    # Re-issue IDLE (and re-check the mailbox) at least this often
 
     # Processing
     processing_batch_size: int = 10
     max_retry_attempts: int = 3
+    processing_concurrency: int | None = None  # defaults to settings.inbox_worker_concurrency
 
 
 @dataclass
@@ -85,8 +89,10 @@ class EmailChannelListener:
     """
     Multi-tenant Email (IMAP) listener that:
     - Periodically queries DB for all active email platforms (type="email")
-    - Spawns one concurrent polling task per platform
-    - Polls accounts concurrently and processes messages in parallel
+    - Spawns one concurrent asyncio IMAP session per platform (no threads)
+    - Waits for new mail with IMAP IDLE where supported, otherwise polls
+    - Fetches incrementally by UID above a per-mailbox high-water mark
+    - Bounds concurrent mailbox fetches with settings.imap_max_active_sessions
     - Dynamically reloads configuration to add/remove polling tasks without restart
 
     Note: Handles inbound email via IMAP polling. SMTP sending uses per-platform configuration
@@ -110,8 +116,11 @@ class EmailChannelListener:
         self._stop_event = asyncio.Event()
         self._tasks: dict[uuid.UUID, asyncio.Task] = {}
         self._idempotency = TTLIdempotencyStore(ttl_seconds=idempotency_ttl_seconds)
-        # Persistent IMAP connections per platform id
-        self._imap_conns: dict[uuid.UUID, imaplib.IMAP4] = {}
+        # Persistent IMAP sessions and UID high-water marks (uidvalidity, last_uid) per platform id
+        self._imap_conns: dict[uuid.UUID, AsyncImapMailbox] = {}
+        self._uid_marks: dict[uuid.UUID, tuple[int | None, int]] = {}
+        # Limits mailboxes connecting/fetching at the same time (IDLE waits are not counted)
+        self._imap_slots = asyncio.Semaphore(max(1, settings.imap_max_active_sessions))
         # Background tasks
         self._supervisor_task: asyncio.Task | None = None
         self._consumer_task: asyncio.Task | None = None
@@ -121,6 +130,7 @@ class EmailChannelListener:
             redis_url=settings.redis_url,
             cache_ttl_seconds=settings.visitor_cache_ttl_seconds,
         )
+        self._inbox_engine = InboxWorkerEngine("EMAIL", session_factory, EmailInbox, "from_address")
 
     async def start(self) -> None:
         """Start producer (IMAP fetch) supervisor and consumer processing loop."""
@@ -152,6 +162,10 @@ class EmailChannelListener:
     async def stop(self) -> None:
         self._stop_event.set()
 
+    def inbox_metrics(self) -> dict[str, dict[str, Any]]:
+        """Per-platform inbox queue depth/lag and processing counters."""
+        return self._inbox_engine.metrics()
+
     async def _load_active_email_platforms(self) -> list[_PlatformEntry]:
         async with self._session_factory() as session:
             stmt = (
@@ -200,68 +214,45 @@ class EmailChannelListener:
             with suppress(asyncio.CancelledError):
                 await task
 
-    async def _get_imap_conn(self, p: _PlatformEntry):
+    async def _get_imap_conn(self, p: _PlatformEntry) -> AsyncImapMailbox:
         conn = self._imap_conns.get(p.id)
-        try:
-            if conn is not None:
-                try:
-                    typ, _ = await asyncio.to_thread(conn.noop)
-                    if typ != 'OK':
-                        raise Exception('NOOP failed')
-                except Exception:
-                    await self._close_imap_conn(p.id)
-                    conn = None
-            if conn is None:
-                conn = await self._connect_imap(p.cfg)
-                self._imap_conns[p.id] = conn
+        if conn is not None and conn.is_open:
             return conn
-        except Exception as e:
-            print(f"[EMAIL] IMAP connect error for {p.id}: {e}")
-            return None
-
-    async def _connect_imap(self, cfg: EmailPlatformConfig):
-        conn = imaplib.IMAP4_SSL(cfg.imap_host, cfg.imap_port) if cfg.imap_use_ssl else imaplib.IMAP4(cfg.imap_host, cfg.imap_port)
-        # Login
-        print(f"[EMAIL] Connecting to IMAP server", cfg)
-        await asyncio.to_thread(conn.login, cfg.imap_username, cfg.imap_password)
-
-        # Send IMAP ID command for 163.com and other Chinese email providers
-        # This is required to avoid "Unsafe Login" errors
-        # RFC 2971 - IMAP4 ID extension
+        await self._close_imap_conn(p.id)
+        conn = await self._connect_imap(p.cfg)
+        self._imap_conns[p.id] = conn
+        return conn
+
+    async def _connect_imap(self, cfg: EmailPlatformConfig) -> AsyncImapMailbox:
+        conn = AsyncImapMailbox(
+            host=cfg.imap_host,
+            port=cfg.imap_port,
+            username=cfg.imap_username,
+            password=cfg.imap_password,
+            mailbox=cfg.mailbox,
+            use_ssl=cfg.imap_use_ssl,
+            timeout=settings.request_timeout_seconds,
+        )
+        print(f"[EMAIL] Connecting to IMAP server {cfg.imap_host}:{cfg.imap_port} as {cfg.imap_username}")
         try:
-            # Register ID command as an AUTH-phase command
-            imaplib.Commands["ID"] = ('AUTH',)
-            # Build ID arguments tuple and format as required by IMAP protocol
-            args = ("name", cfg.imap_username, "contact", cfg.imap_username, "version", "1.0.0", "vendor", "tgo-platform")
-            # Convert to IMAP format: remove commas and use double quotes
-            id_args = str(args).replace(",", "").replace("'", '"')
-            await asyncio.to_thread(conn._simple_command, 'ID', id_args)
-            print(f"[EMAIL] IMAP ID command sent successfully for {cfg.imap_username}")
-        except Exception as id_err:
-            # ID command failure is non-critical, continue anyway
-            print(f"[EMAIL] Could not send IMAP ID command (non-critical): {id_err}")
-
-        # Select mailbox (read-only for fetching)
-        typ, data = await asyncio.to_thread(conn.select, cfg.mailbox, True)
-        if typ != 'OK':
-            # List available mailboxes for debugging
-            try:
-                list_typ, mailboxes = await asyncio.to_thread(conn.list)
-                if list_typ == 'OK' and mailboxes:
-                    available = [mb.decode() if isinstance(mb, bytes) else str(mb) for mb in mailboxes[:10]]
-                    print(f"[EMAIL] Available mailboxes (first 10): {available}")
-            except Exception as list_err:
-                print(f"[EMAIL] Could not list mailboxes: {list_err}")
-
-            error_msg = data[0].decode() if data and isinstance(data[0], bytes) else str(data)
-            raise Exception(f"Cannot select mailbox '{cfg.mailbox}'. Server response: {error_msg}")
+            # IMAP ID (RFC 2971) is required by 163.com and other Chinese email providers
+            # to avoid "Unsafe Login" errors
+            await conn.connect(client_id={
+                "name": cfg.imap_username,
+                "contact": cfg.imap_username,
+                "version": "1.0.0",
+                "vendor": "tgo-platform",
+            })
+        except Exception:
+            await conn.close()
+            raise
         return conn
 
     async def _close_imap_conn(self, platform_id: uuid.UUID) -> None:
         conn = self._imap_conns.pop(platform_id, None)
         if conn:
             with suppress(Exception):
-                await asyncio.to_thread(conn.logout)
+                await conn.close()
 
     def _decode_header_value(self, value: Optional[str]) -> str:
         if not value:
@@ -329,114 +320,127 @@ class EmailChannelListener:
         return re.sub(r"<[^>]+>", "", s)
 
 
-    async def _mark_seen(self, p: _PlatformEntry, uid: str) -> None:
-        conn = await self._get_imap_conn(p)
-        if not conn:
-            return
-        try:
-            # Select writable mailbox for flag updates
-            typ, _ = await asyncio.to_thread(conn.select, p.cfg.mailbox, False)
-            if typ == 'OK':
-                await asyncio.to_thread(conn.uid, 'store', uid, '+FLAGS', '(\\Seen)')
-        except Exception as e:
-            print(f"[EMAIL] Mark seen failed for {p.id} uid={uid}: {e}")
-
     async def _poll_platform(self, p: _PlatformEntry) -> None:
-        """Polling loop for a single platform. Reuses connection context if implemented."""
+        """Session loop for a single platform: fetch new mail, then IDLE (or sleep) until more arrives."""
+        idle = p.cfg.use_idle
+        failures = 0
         while not self._stop_event.is_set():
             try:
-                raws = await self._fetch_new_emails(p)
-                if raws:
-                    await self._store_raw_batch(p, raws)
+                async with self._imap_slots:
+                    conn = await self._get_imap_conn(p)
+                    drained = await self._sync_mailbox(p, conn)
+                failures = 0
+                if not drained:
+                    # More than max_emails_per_poll waiting: continue right away
+                    continue
+                if idle and conn.supports_idle:
+                    await conn.wait_for_changes(p.cfg.idle_refresh_seconds)
+                    continue
             except asyncio.CancelledError:
                 # Gracefully close IMAP connection and propagate cancellation
                 await self._close_imap_conn(p.id)
                 raise
             except Exception as e:  # pragma: no cover - protective catch
+                failures += 1
                 print(f"[EMAIL] Poller error for {p.id}: {e}")
-            # Backoff between polls per-platform
+                await self._close_imap_conn(p.id)
+                # Back off on repeated connection errors
+                await asyncio.sleep(min(300, max(1, int(p.cfg.poll_interval_seconds)) * min(failures, 5)))
+                continue
+            # No IDLE support: poll
             await asyncio.sleep(max(1, int(p.cfg.poll_interval_seconds)))
 
-    async def _fetch_new_emails(self, p: _PlatformEntry) -> list[dict]:
-        try:
-            conn = await self._get_imap_conn(p)
-            if not conn:
-                return []
-            # Ensure mailbox selected (read-only) for fetching
-            typ, _ = await asyncio.to_thread(conn.select, p.cfg.mailbox, True)
-            if typ != 'OK':
-                print(f"[EMAIL] Select mailbox failed for {p.id}")
-                return []
-
-            # Apply lookback window: only fetch emails SINCE a given date
+    async def _sync_mailbox(self, p: _PlatformEntry, conn: AsyncImapMailbox) -> bool:
+        """Fetch and store unseen mail above the UID high-water mark.
+
+        The first sync of a mailbox (or after UIDVALIDITY changed) searches
+        UNSEEN mail within the lookback window and starts the mark just below
+        the oldest match; later syncs only search UIDs above the mark. Returns
+        False if more mail is waiting than one batch.
+        """
+        uidvalidity, last_uid = self._uid_marks.get(p.id, (None, 0))
+        if uidvalidity is None or uidvalidity != conn.uidvalidity:
             lookback_days = max(0, int(getattr(p.cfg, "fetch_lookback_days", 3) or 3))
-            since_dt = datetime.now(timezone.utc) - timedelta(days=lookback_days)
-            since_date = since_dt.strftime('%d-%b-%Y')
+            since_date = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).strftime('%d-%b-%Y')
             print(f"[EMAIL] IMAP search criteria: UNSEEN SINCE {since_date} (lookback_days={lookback_days})")
-            typ, data = await asyncio.to_thread(conn.uid, 'search', None, 'UNSEEN', 'SINCE', since_date)
-            if typ != 'OK' or not data or not data[0]:
-                return []
-            all_uids = data[0].split()
-            if not all_uids:
-                return []
-
-            total_unread = len(all_uids)
-            # Newest first: reverse UID ordering (UIDs generally increase over time)
-            limit = max(1, int(getattr(p.cfg, "max_emails_per_poll", 10) or 10))
-            uids = (all_uids[::-1])[:limit]
-            print(f"[EMAIL] Unread={total_unread}, processing={len(uids)} (newest first) for platform {p.id}")
-            results: list[dict] = []
-
-            for uid in uids:
-                try:
-                    typ, fetch_data = await asyncio.to_thread(conn.uid, 'fetch', uid, '(RFC822)')
-                    if typ != 'OK' or not fetch_data:
-                        continue
-                    raw_bytes = None
-                    for part in fetch_data:
-                        if isinstance(part, tuple) and isinstance(part[1], (bytes, bytearray)):
-                            raw_bytes = part[1]
-                            break
-                    if not raw_bytes:
-                        continue
-                    msg = message_from_bytes(raw_bytes, policy=policy.default)
-                    message_id = self._decode_header_value(msg.get('Message-ID') or msg.get('Message-Id'))
-                    from_ = self._decode_header_value(msg.get('From'))
-                    subject = self._decode_header_value(msg.get('Subject'))
-                    date = self._decode_header_value(msg.get('Date'))
-                    body_text, body_html = self._extract_text_from_message(msg)
-                    uid_str = uid.decode() if isinstance(uid, bytes) else str(uid)
-                    # Collect raw headers as a dict
-                    headers_dict = {k: str(v) for k, v in msg.items()}
-                    if body_html:
-                        headers_dict["__body_html__"] = body_html
-                    results.append({
-                        "Message-ID": message_id or uid_str,  # fallback to stable UID
-                        "From": from_ or "",
-                        "Subject": subject or "",
-                        "Body": body_text or "",
-                        "Date": date or "",
-                        "imap_uid": uid_str,
-                        "Headers": headers_dict,
-                    })
-                except Exception as e:
-                    print(f"[EMAIL] Fetch/parse failed for {p.id}: {e}")
-                    continue
-
-            return results
-        except Exception as e:
-            print(f"[EMAIL] IMAP fetch error for {p.id}: {e}")
-            return []
+            uids = await conn.search_uids('UNSEEN', 'SINCE', since_date)
+            # Start the mark below the oldest in-window message: if it fails to
+            # store, the next "UID n:*" search must not reach mail older than
+            # the lookback window
+            if uids:
+                last_uid = uids[0] - 1
+            else:
+                last_uid = conn.uidnext - 1 if conn.uidnext else 0
+        else:
+            # "n:*" always matches the highest UID, so filter below
+            uids = [u for u in await conn.search_uids('UID', f'{last_uid + 1}:*', 'UNSEEN') if u > last_uid]
+
+        limit = max(1, int(getattr(p.cfg, "max_emails_per_poll", 10) or 10))
+        batch = uids[:limit]
+        if batch:
+            print(f"[EMAIL] Unread={len(uids)}, processing={len(batch)} (oldest first) for platform {p.id}")
+            stored = await self._fetch_and_store(p, conn, batch)
+            # Advance the mark over the stored prefix; a failed message is retried next sync
+            for uid in batch:
+                if uid not in stored:
+                    break
+                last_uid = uid
+            self._uid_marks[p.id] = (conn.uidvalidity, last_uid)
+            return len(uids) <= limit or len(stored) < len(batch)
+
+        self._uid_marks[p.id] = (conn.uidvalidity, last_uid)
+        return True
+
+    async def _fetch_and_store(self, p: _PlatformEntry, conn: AsyncImapMailbox, uids: list[int]) -> set[int]:
+        """Fetch messages in one UID FETCH, store them and mark stored ones SEEN; returns stored UIDs."""
+        messages = await conn.fetch_messages(uids)
+        raws: list[dict] = []
+        for uid in uids:
+            raw_bytes = messages.get(uid)
+            if not raw_bytes:
+                continue
+            try:
+                raws.append(self._parse_email(uid, raw_bytes))
+            except Exception as e:
+                print(f"[EMAIL] Fetch/parse failed for {p.id}: {e}")
 
-    async def _store_raw_batch(self, p: _PlatformEntry, raws: list[dict]) -> None:
         # Store messages concurrently; mark SEEN only after successful insert (or detected duplicate by unique constraint)
-        coros = [self._store_single_raw(p, raw) for raw in raws]
-        await asyncio.gather(*coros, return_exceptions=False)
-
-    async def _store_single_raw(self, p: _PlatformEntry, raw: dict) -> None:
+        results = await asyncio.gather(*[self._store_single_raw(p, raw) for raw in raws])
+        stored = {int(raw["imap_uid"]) for raw, ok in zip(raws, results) if ok}
+        if stored:
+            try:
+                await conn.mark_seen(stored)
+            except Exception as e:
+                print(f"[EMAIL] Mark seen failed for {p.id} uids={sorted(stored)}: {e}")
+        return stored
+
+    def _parse_email(self, uid: int, raw_bytes: bytes) -> dict:
+        msg = message_from_bytes(raw_bytes, policy=policy.default)
+        message_id = self._decode_header_value(msg.get('Message-ID') or msg.get('Message-Id'))
+        from_ = self._decode_header_value(msg.get('From'))
+        subject = self._decode_header_value(msg.get('Subject'))
+        date = self._decode_header_value(msg.get('Date'))
+        body_text, body_html = self._extract_text_from_message(msg)
+        uid_str = str(uid)
+        # Collect raw headers as a dict
+        headers_dict = {k: str(v) for k, v in msg.items()}
+        if body_html:
+            headers_dict["__body_html__"] = body_html
+        return {
+            "Message-ID": message_id or uid_str,  # fallback to stable UID
+            "From": from_ or "",
+            "Subject": subject or "",
+            "Body": body_text or "",
+            "Date": date or "",
+            "imap_uid": uid_str,
+            "Headers": headers_dict,
+        }
+
+    async def _store_single_raw(self, p: _PlatformEntry, raw: dict) -> bool:
+        """Insert one email into the inbox; returns True if it is stored (now or previously)."""
         mid = raw.get("Message-ID") or raw.get("imap_uid") or str(uuid.uuid4())
         if await self._idempotency.seen(p.id, mid):
-            return
+            return True
 
         # Extract sender info from From header
         from_header = raw.get("From", "")
@@ -474,22 +478,19 @@ class EmailChannelListener:
                 db.add(rec)
                 await db.commit()
                 await db.refresh(rec)
-                # Only mark idempotent and SEEN when stored successfully
+                # Only mark idempotent (and SEEN, by the caller) when stored successfully
                 await self._idempotency.mark(p.id, mid)
-                uid = raw.get("imap_uid")
-                if uid:
-                    await self._mark_seen(p, uid)
+                return True
             except IntegrityError:
                 # Duplicate (platform_id, message_id) already stored by previous cycle
                 await db.rollback()
                 await self._idempotency.mark(p.id, mid)
-                uid = raw.get("imap_uid")
-                if uid:
-                    await self._mark_seen(p, uid)
+                return True
             except Exception as e:
                 await db.rollback()
                 print(f"[EMAIL] Store raw email failed for {p.id}: {e}")
                 # Do not mark SEEN so it can be retried in a future cycle
+                return False
 
 
     async def _consumer_loop(self) -> None:
@@ -497,127 +498,89 @@ class EmailChannelListener:
         while not self._stop_event.is_set():
             try:
                 platforms = await self._load_active_email_platforms()
-                for p in platforms:
-                    try:
-                        await self._process_pending_for_platform(p)
-                    except Exception as e:
-                        print(f"[EMAIL] Consumer error for platform {p.id}: {e}")
+                # Platforms are processed concurrently so one busy account does not hold up the others
+                results = await asyncio.gather(
+                    *[self._process_pending_for_platform(p) for p in platforms],
+                    return_exceptions=True,
+                )
+                for p, result in zip(platforms, results):
+                    if isinstance(result, Exception):
+                        print(f"[EMAIL] Consumer error for platform {p.id}: {result}")
             except Exception as e:
                 print(f"[EMAIL] Consumer supervisor error: {e}")
             await asyncio.sleep(2)
 
     async def _process_pending_for_platform(self, p: _PlatformEntry) -> None:
-        """Process a batch of pending (and eligible failed) emails for a single platform."""
+        """Process pending (and eligible failed) emails for a single platform."""
         batch_size = max(1, int(getattr(p.cfg, "processing_batch_size", 10) or 10))
         max_retries = max(0, int(getattr(p.cfg, "max_retry_attempts", 3) or 3))
+        concurrency = max(1, int(p.cfg.processing_concurrency or settings.inbox_worker_concurrency))
+
+        # Claim pending (and eligible failed) records; different conversations are
+        # processed concurrently, messages of one conversation strictly in order
+        await self._inbox_engine.run_platform(
+            p.id,
+            lambda db, rec: self._process_record(db, p, rec),
+            batch_size=batch_size,
+            max_retries=max_retries,
+            concurrency=concurrency,
+        )
 
-        async with self._session_factory() as db:
-            # Fetch pending first
-            pending = (await db.execute(
-                select(EmailInbox)
-                .where(EmailInbox.platform_id == p.id, EmailInbox.status == "pending")
-                .order_by(EmailInbox.fetched_at.asc())
-                .limit(batch_size)
-            )).scalars().all()
-
-            remaining = batch_size - len(pending)
-            candidates: list[EmailInbox] = list(pending)
-
-            if remaining > 0:
-                # Consider failed with backoff and retry allowance
-                failed = (await db.execute(
-                    select(EmailInbox)
-                    .where(EmailInbox.platform_id == p.id, EmailInbox.status == "failed", EmailInbox.retry_count < max_retries)
-                    .order_by(EmailInbox.processed_at.asc().nullsfirst())
-                    .limit(batch_size * 3)
-                )).scalars().all()
-                now = datetime.now(timezone.utc)
-                for rec in failed:
-                    # Exponential backoff in seconds: 2 ** retry_count (min 1s)
-                    delay = max(1, 2 ** int(rec.retry_count or 0))
-                    if not rec.processed_at or (now - rec.processed_at).total_seconds() >= delay:
-                        candidates.append(rec)
-                        if len(candidates) >= batch_size:
-                            break
-
-            if not candidates:
-                return
-
-            for rec in candidates:
-                # Mark as processing
-                rec.status = "processing"
-                rec.error_message = None
-                await db.commit()
+    async def _process_record(self, db: AsyncSession, p: _PlatformEntry, rec: EmailInbox) -> str | None:
+        """Process one claimed email; returns the AI reply text."""
+        # Prepare mapped raw payload
+        from_addr = rec.from_address
+        sender_name = rec.from_name or (from_addr.split("@")[0] if "@" in from_addr else from_addr)
 
-                try:
-                    # Prepare mapped raw payload
-                    from_addr = rec.from_address
-                    sender_name = rec.from_name or (from_addr.split("@")[0] if "@" in from_addr else from_addr)
-
-                    # If we captured HTML body in raw_headers, convert to Markdown for chat
-                    html_body = None
-                    try:
-                        html_body = (rec.raw_headers or {}).get("__body_html__")
-                    except Exception:
-                        html_body = None
-                    content_for_chat = rec.body or ""
-                    if html_body:
-                        try:
-                            md = await self._html_to_markdown_async(str(html_body))
-                            if md:
-                                content_for_chat = md
-                        except Exception:
-                            pass
-
-                    mapped_raw = {
-                        "source": "email",
-                        "from_uid": from_addr,
-                        "content": content_for_chat,
-                        "platform_api_key": p.api_key or "",
-                        "platform_type": "email",
-                        "platform_id": str(p.id),
-                        "extra": {
-                            "project_id": str(p.project_id),
-                            "subject": rec.subject,
-                            "message_id": rec.message_id,
-                            "from_name": sender_name,
-                        },
-                    }
-
-                    # Visitor registration
-                    visitor = None
-                    if p.api_key:
-                        try:
-                            visitor = await self._visitor_service.register_or_get(
-                                platform_api_key=p.api_key,
-                                project_id=str(p.project_id),
-                                platform_type="email",
-                                platform_open_id=from_addr,
-                                nickname=sender_name,
-                            )
-                        except Exception as e:
-                            print(f"[EMAIL] Visitor registration failed for {p.id}: {e}")
-
-                    # Normalize and dispatch
-                    msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
-                    reply_text = await process_message(
-                        msg=msg,
-                        db=db,
-                        tgo_api_client=self._tgo_api_client,
-                        sse_manager=self._sse_manager
-                    )
-
-                    # Success
-                    rec.ai_reply = reply_text
-                    rec.status = "completed"
-                    rec.processed_at = datetime.now(timezone.utc)
-                    rec.error_message = None
-                    await db.commit()
-                except Exception as e:
-                    # Failure with retry increment
-                    print(f"[EMAIL] Processing failed for {p.id}: {e}")
-                    rec.status = "failed"
-                    rec.processed_at = datetime.now(timezone.utc)
-                    rec.retry_count = int((rec.retry_count or 0)) + 1
-                    rec.error_message = str(e)[:2000]
-                    await db.commit()
+        # If we captured HTML body in raw_headers, convert to Markdown for chat
+        html_body = None
+        try:
+            html_body = (rec.raw_headers or {}).get("__body_html__")
+        except Exception:
+            html_body = None
+        content_for_chat = rec.body or ""
+        if html_body:
+            try:
+                md = await self._html_to_markdown_async(str(html_body))
+                if md:
+                    content_for_chat = md
+            except Exception:
+                pass
+
+        mapped_raw = {
+            "source": "email",
+            "from_uid": from_addr,
+            "content": content_for_chat,
+            "platform_api_key": p.api_key or "",
+            "platform_type": "email",
+            "platform_id": str(p.id),
+            "extra": {
+                "project_id": str(p.project_id),
+                "subject": rec.subject,
+                "message_id": rec.message_id,
+                "from_name": sender_name,
+            },
+        }
+
+        # Visitor registration
+        visitor = None
+        if p.api_key:
+            try:
+                visitor = await self._visitor_service.register_or_get(
+                    platform_api_key=p.api_key,
+                    project_id=str(p.project_id),
+                    platform_type="email",
+                    platform_open_id=from_addr,
+                    nickname=sender_name,
+                )
+            except Exception as e:
+                print(f"[EMAIL] Visitor registration failed for {p.id}: {e}")
+
+        # Normalize and dispatch
+        msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
+        return await process_message(
+            msg=msg,
+            db=db,
+            tgo_api_client=self._tgo_api_client,
+            sse_manager=self._sse_manager
+        )
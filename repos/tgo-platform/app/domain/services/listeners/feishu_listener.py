@@ -9,7 +9,6 @@ from __future__ import annotations
 import asyncio
 import uuid
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Any
 
 from pydantic import BaseModel
@@ -21,6 +20,7 @@ from app.db.models import Platform, FeishuInbox
 from app.domain.entities import NormalizedMessage
 from app.domain.ports import MessageNormalizer, TgoApiClient, SSEManager
 from app.domain.services.dispatcher import process_message
+from app.domain.services.inbox_worker import InboxWorkerEngine
 from app.infra.visitor_client import VisitorService
 from app.api.feishu_utils import feishu_get_user_info, feishu_extract_sender_info_from_event
 
@@ -37,6 +37,7 @@ class FeishuPlatformConfig(BaseModel):
     processing_batch_size: int = 10
     max_retry_attempts: int = 3
     consumer_poll_interval_seconds: int = 5
+    processing_concurrency: int | None = None  # defaults to settings.inbox_worker_concurrency
 
 
 @dataclass
@@ -72,6 +73,7 @@ class FeishuChannelListener:
             cache_ttl_seconds=300,
             redis_url=settings.redis_url,
         )
+        self._inbox_engine = InboxWorkerEngine("FEISHU", session_factory, FeishuInbox, "from_user")
 
     async def start(self) -> None:
         if self._consumer_task is None or self._consumer_task.done():
@@ -86,6 +88,10 @@ class FeishuChannelListener:
             except asyncio.CancelledError:
                 pass
 
+    def inbox_metrics(self) -> dict[str, dict[str, Any]]:
+        """Per-platform inbox queue depth/lag and processing counters."""
+        return self._inbox_engine.metrics()
+
     async def _load_active_feishu_platforms(self) -> list[_PlatformEntry]:
         """Load all active Feishu Bot platforms."""
         async with self._session_factory() as session:
@@ -113,11 +119,14 @@ class FeishuChannelListener:
         while not self._stop_event.is_set():
             try:
                 platforms = await self._load_active_feishu_platforms()
-                for p in platforms:
-                    try:
-                        await self._process_pending_for_platform(p)
-                    except Exception as e:
-                        print(f"[FEISHU] Consumer error for platform {p.id}: {e}")
+                # Platforms are processed concurrently so one busy account does not hold up the others
+                results = await asyncio.gather(
+                    *[self._process_pending_for_platform(p) for p in platforms],
+                    return_exceptions=True,
+                )
+                for p, result in zip(platforms, results):
+                    if isinstance(result, Exception):
+                        print(f"[FEISHU] Consumer error for platform {p.id}: {result}")
                 # Sleep using first platform's interval or default
                 interval = platforms[0].cfg.consumer_poll_interval_seconds if platforms else 5
                 await asyncio.sleep(max(1, int(interval)))
@@ -125,64 +134,6 @@ class FeishuChannelListener:
                 print(f"[FEISHU] Consumer supervisor error: {e}")
                 await asyncio.sleep(5)
 
-    async def _select_candidates(
-        self,
-        session: AsyncSession,
-        platform: _PlatformEntry,
-        batch_size: int,
-        max_retries: int,
-    ) -> list[FeishuInbox]:
-        """Select a batch of candidate records to process for the given platform."""
-        # Pending first
-        pending = (
-            await session.execute(
-                select(FeishuInbox)
-                .where(FeishuInbox.platform_id == platform.id, FeishuInbox.status == "pending")
-                .order_by(FeishuInbox.fetched_at.asc())
-                .with_for_update(skip_locked=True)
-                .limit(batch_size)
-            )
-        ).scalars().all()
-
-        remaining = batch_size - len(pending)
-        candidates: list[FeishuInbox] = list(pending)
-
-        if remaining > 0:
-            failed = (
-                await session.execute(
-                    select(FeishuInbox)
-                    .where(
-                        FeishuInbox.platform_id == platform.id,
-                        FeishuInbox.status == "failed",
-                        FeishuInbox.retry_count < max_retries,
-                    )
-                    .order_by(FeishuInbox.processed_at.asc().nullsfirst())
-                    .with_for_update(skip_locked=True)
-                    .limit(batch_size * 3)
-                )
-            ).scalars().all()
-            now = datetime.now(timezone.utc)
-            for record in failed:
-                delay = max(1, 2 ** int(record.retry_count or 0))
-                if not record.processed_at or (now - record.processed_at).total_seconds() >= delay:
-                    candidates.append(record)
-                    if len(candidates) >= batch_size:
-                        break
-
-        return candidates
-
-    async def _claim_record(self, session: AsyncSession, record: FeishuInbox) -> bool:
-        """Attempt to mark a record as processing. Returns True if claimed successfully."""
-        try:
-            record.status = "processing"
-            record.error_message = None
-            await session.commit()
-            return True
-        except Exception as e:
-            print(f"[FEISHU] Claiming record failed (skip): {e}")
-            await session.rollback()
-            return False
-
     def _build_mapped_message(self, platform: _PlatformEntry, record: FeishuInbox) -> dict[str, Any]:
         """Build the NormalizedMessage-like raw dict for downstream normalization."""
         raw_payload = record.raw_payload or {}
@@ -296,66 +247,35 @@ class FeishuChannelListener:
         except Exception:
             pass
 
-    async def _finalize_success(self, session: AsyncSession, record: FeishuInbox, reply_text: str | None) -> None:
-        """Mark record as completed with optional reply text."""
-        record.ai_reply = reply_text
-        record.status = "completed"
-        record.processed_at = datetime.now(timezone.utc)
-        record.error_message = None
-        try:
-            await session.commit()
-        except Exception as e2:
-            print(f"[FEISHU] Commit completed status failed (ignore): {e2}")
-            await session.rollback()
-
-    async def _finalize_failure(self, session: AsyncSession, platform: _PlatformEntry, record: FeishuInbox, error: Exception) -> None:
-        """Mark record as failed with retry increment and error message."""
-        print(f"[FEISHU] Processing failed for {platform.id}: {error}")
-        record.status = "failed"
-        record.processed_at = datetime.now(timezone.utc)
-        record.retry_count = int((record.retry_count or 0)) + 1
-        record.error_message = str(error)[:2000]
-        try:
-            await session.commit()
-        except Exception as e2:
-            print(f"[FEISHU] Commit failed status failed (ignore): {e2}")
-            await session.rollback()
-
     async def _process_pending_for_platform(self, p: _PlatformEntry) -> None:
         batch_size = max(1, int(getattr(p.cfg, "processing_batch_size", 10) or 10))
         max_retries = max(0, int(getattr(p.cfg, "max_retry_attempts", 3) or 3))
+        concurrency = max(1, int(p.cfg.processing_concurrency or settings.inbox_worker_concurrency))
+
+        # Claim pending (and eligible failed) records; different conversations are
+        # processed concurrently, messages of one conversation strictly in order
+        await self._inbox_engine.run_platform(
+            p.id,
+            lambda db, rec: self._process_record(db, p, rec),
+            batch_size=batch_size,
+            max_retries=max_retries,
+            concurrency=concurrency,
+        )
 
-        async with self._session_factory() as db:
-            # Select candidate records for this platform (pending + eligible failed)
-            candidates: list[FeishuInbox] = await self._select_candidates(db, p, batch_size, max_retries)
-            if not candidates:
-                return
-
-            for rec in candidates:
-                # Claim record for processing
-                if not await self._claim_record(db, rec):
-                    continue
-
-                try:
-                    # Build mapped message
-                    mapped_raw: dict[str, Any] = self._build_mapped_message(p, rec)
-
-                    # Visitor retrieval/registration with cache-first approach
-                    visitor, display_name, avatar_url = await self._get_or_register_visitor(p, rec)
-                    self._attach_profile_to_extra(mapped_raw, display_name, avatar_url)
-
-                    # Normalize and process
-                    msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
-                    reply_text = await process_message(
-                        msg=msg,
-                        db=db,
-                        tgo_api_client=self._tgo_api_client,
-                        sse_manager=self._sse_manager,
-                    )
-
-                    # Finalize success
-                    await self._finalize_success(db, rec, reply_text)
-                except Exception as e:
-                    # Finalize failure with retry increment
-                    await self._finalize_failure(db, p, rec, e)
-
+    async def _process_record(self, db: AsyncSession, p: _PlatformEntry, rec: FeishuInbox) -> str | None:
+        """Process one claimed record; returns the AI reply text."""
+        # Build mapped message
+        mapped_raw: dict[str, Any] = self._build_mapped_message(p, rec)
+
+        # Visitor retrieval/registration with cache-first approach
+        visitor, display_name, avatar_url = await self._get_or_register_visitor(p, rec)
+        self._attach_profile_to_extra(mapped_raw, display_name, avatar_url)
+
+        # Normalize and process
+        msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
+        return await process_message(
+            msg=msg,
+            db=db,
+            tgo_api_client=self._tgo_api_client,
+            sse_manager=self._sse_manager,
+        )
@@ -4,12 +4,18 @@ This module implements a polling-based approach for Telegram messages:
 - Uses Telegram's getUpdates API (long polling) instead of webhook
 - Suitable for local development or servers without public HTTPS endpoints
 - Automatically deletes webhook when starting and uses polling mode
+- Runs one independent, continuously re-armed long-poll per bot, so an idle
+  bot never delays another bot's updates
+- Decouples polling from processing through bounded per-bot queues; a full
+  queue pauses that bot's polling (backpressure)
 """
 from __future__ import annotations
 
 import asyncio
 import uuid
-from dataclasses import dataclass
+import zlib
+from contextlib import suppress
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
@@ -36,11 +42,15 @@ class TelegramPlatformConfig(BaseModel):
     webhook_secret: str | None = None      # Optional secret_token for webhook verification
 
     # Polling configuration
-    polling_interval_seconds: int = 1      # How often to poll getUpdates
+    polling_interval_seconds: int = 1      # Base retry delay after a failed getUpdates
     polling_timeout_seconds: int = 30      # Long polling timeout (Telegram recommends 30+)
     processing_batch_size: int = 10
     max_retry_attempts: int = 3
 
+    # Processing configuration
+    processing_concurrency: int = 1        # Workers per bot; updates of one chat stay on one worker
+    processing_queue_size: int = 100       # Buffered updates per worker before polling pauses
+
 
 @dataclass
 class _PlatformEntry:
@@ -48,16 +58,38 @@ class _PlatformEntry:
     project_id: uuid.UUID
     api_key: str | None
     cfg: TelegramPlatformConfig
-    last_update_id: int = 0  # Track last processed update_id for this platform
+
+    def fingerprint(self) -> tuple[Any, ...]:
+        """Values whose change requires restarting the bot's poller and workers."""
+        return (self.project_id, self.api_key, self.cfg.model_dump_json())
+
+
+@dataclass
+class _BotRuntime:
+    """Long-poll task, processing queues and workers of one bot."""
+
+    platform: _PlatformEntry
+    fingerprint: tuple[Any, ...]
+    queues: list[asyncio.Queue[dict[str, Any] | None]]
+    poller: asyncio.Task | None = None
+    workers: list[asyncio.Task] = field(default_factory=list)
+    # update_ids queued but not processed yet, and the highest update_id queued
+    in_flight: set[int] = field(default_factory=set)
+    fetched: int = 0
+    # Set whenever the processed watermark advances
+    progress: asyncio.Event = field(default_factory=asyncio.Event)
 
 
 class TelegramChannelListener:
     """Telegram Bot consumer using getUpdates long polling.
 
     This approach:
-    1. Calls Telegram's getUpdates API to fetch new messages
-    2. Processes each message via dispatcher
-    3. Stores to TelegramInbox for audit/retry purposes
+    1. A supervisor periodically reloads active Telegram platforms and starts,
+       restarts (on config change) or stops one runtime per bot
+    2. Each bot's poller re-arms getUpdates as soon as the previous call
+       returns and enqueues updates, sharded by chat, into bounded queues
+    3. Per-bot workers process each message via dispatcher
+    4. Stores to TelegramInbox for audit/retry purposes
     """
 
     def __init__(
@@ -66,33 +98,45 @@ class TelegramChannelListener:
         normalizer: MessageNormalizer,
         tgo_api_client: TgoApiClient,
         sse_manager: SSEManager,
+        refresh_interval_seconds: int = 30,
+        shutdown_timeout_seconds: float = 10.0,
     ) -> None:
         self._session_factory = session_factory
         self._normalizer = normalizer
         self._tgo_api_client = tgo_api_client
         self._sse_manager = sse_manager
+        self._refresh_interval = refresh_interval_seconds
+        self._shutdown_timeout = shutdown_timeout_seconds
         self._stop_event = asyncio.Event()
         self._consumer_task: asyncio.Task | None = None
+        self._bots: dict[uuid.UUID, _BotRuntime] = {}
         self._visitor_service = VisitorService(
             base_url=settings.api_base_url,
             cache_ttl_seconds=300,
             redis_url=settings.redis_url,
         )
-        # Track last_update_id per platform to avoid duplicate processing
+        # Processed watermark per platform: every update_id up to it has been handled,
+        # so getUpdates may confirm (drop) them. Tracked with the bot token it belongs to.
         self._platform_offsets: dict[uuid.UUID, int] = {}
+        self._offset_tokens: dict[uuid.UUID, str] = {}
+        # Bots being drained in the background, by platform id
+        self._stopping: dict[uuid.UUID, asyncio.Task] = {}
 
     async def start(self) -> None:
         if self._consumer_task is None or self._consumer_task.done():
-            self._consumer_task = asyncio.create_task(self._consumer_loop())
+            self._consumer_task = asyncio.create_task(self._consumer_loop(), name="telegram-supervisor-loop")
 
     async def stop(self) -> None:
         self._stop_event.set()
         if self._consumer_task:
-            self._consumer_task.cancel()
+            # Let the supervisor stop bots gracefully (drain queued updates) before cancelling
             try:
-                await self._consumer_task
-            except asyncio.CancelledError:
+                await asyncio.wait_for(asyncio.shield(self._consumer_task), timeout=self._shutdown_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
                 pass
+            self._consumer_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._consumer_task
 
     async def _load_active_telegram_platforms(self) -> list[_PlatformEntry]:
         """Load all active Telegram platforms."""
@@ -110,62 +154,62 @@ class TelegramChannelListener:
                 if not cfg.bot_token:
                     print(f"[TELEGRAM] Skip platform {pid}: missing bot_token")
                     continue
-                # Get last_update_id from memory or start at 0
-                last_id = self._platform_offsets.get(pid, 0)
                 platforms.append(_PlatformEntry(
                     id=pid,
                     project_id=project_id,
                     api_key=api_key,
                     cfg=cfg,
-                    last_update_id=last_id,
                 ))
             except Exception as e:
                 print(f"[TELEGRAM] Skip platform {pid}: invalid config: {e}")
         return platforms
 
-    async def _delete_webhook_if_exists(self, bot_token: str) -> None:
+    async def _delete_webhook_if_exists(self, client: httpx.AsyncClient, bot_token: str) -> None:
         """Delete any existing webhook to enable getUpdates mode."""
         try:
             url = f"{TELEGRAM_API_BASE}/bot{bot_token}/deleteWebhook"
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.post(url)
-                result = resp.json()
-                if result.get("ok"):
-                    print(f"[TELEGRAM] Webhook deleted, switching to polling mode")
+            resp = await client.post(url, timeout=10)
+            result = resp.json()
+            if result.get("ok"):
+                print(f"[TELEGRAM] Webhook deleted, switching to polling mode")
         except Exception as e:
             print(f"[TELEGRAM] Warning: Could not delete webhook: {e}")
 
     async def _get_updates(
         self,
+        client: httpx.AsyncClient,
         bot_token: str,
         offset: int,
         timeout: int = 30,
-    ) -> list[dict[str, Any]]:
-        """Call Telegram getUpdates API with long polling."""
+    ) -> list[dict[str, Any]] | None:
+        """Call Telegram getUpdates API with long polling.
+
+        Returns the updates (empty when the long poll timed out), or None if
+        the call failed and should be retried after a backoff.
+        """
         url = f"{TELEGRAM_API_BASE}/bot{bot_token}/getUpdates"
         params = {
             "offset": offset,
             "timeout": timeout,
             "allowed_updates": ["message", "edited_message"],
         }
-        
+
         try:
-            async with httpx.AsyncClient(timeout=timeout + 10) as client:
-                resp = await client.get(url, params=params)
-                result = resp.json()
-                
-                if result.get("ok"):
-                    return result.get("result", [])
-                else:
-                    error_desc = result.get("description", "Unknown error")
-                    print(f"[TELEGRAM] getUpdates error: {error_desc}")
-                    return []
+            resp = await client.get(url, params=params, timeout=timeout + 10)
+            result = resp.json()
+
+            if result.get("ok"):
+                return result.get("result", [])
+            else:
+                error_desc = result.get("description", "Unknown error")
+                print(f"[TELEGRAM] getUpdates error: {error_desc}")
+                return None
         except httpx.TimeoutException:
             # Normal for long polling when no messages
             return []
         except Exception as e:
             print(f"[TELEGRAM] getUpdates request failed: {e}")
-            return []
+            return None
 
     def _extract_message_data(self, update: dict[str, Any]) -> dict[str, Any] | None:
         """Extract message data from a Telegram Update object."""
@@ -404,62 +448,165 @@ class TelegramChannelListener:
                 print(f"[TELEGRAM] Processing failed: {e}")
                 await db.rollback()
 
-    async def _poll_platform(self, platform: _PlatformEntry) -> int:
-        """Poll a single platform for new messages. Returns new offset."""
-        offset = platform.last_update_id + 1 if platform.last_update_id else 0
-        timeout = platform.cfg.polling_timeout_seconds
-        
-        updates = await self._get_updates(platform.cfg.bot_token, offset, timeout)
-        
-        new_offset = platform.last_update_id
-        for update in updates:
-            update_id = update.get("update_id", 0)
-            if update_id > new_offset:
-                new_offset = update_id
-            
+    # ---- Per-bot runtime ----
+    def _shard(self, update: dict[str, Any], shards: int) -> int:
+        """Pick the worker for an update; all updates of one chat go to the same worker."""
+        if shards <= 1:
+            return 0
+        message = update.get("message") or update.get("edited_message") or {}
+        chat_id = str((message.get("chat") or {}).get("id", ""))
+        return zlib.crc32(chat_id.encode()) % shards
+
+    async def _poll_bot(self, bot: _BotRuntime) -> None:
+        """Long-poll one bot forever, re-arming getUpdates as soon as it returns."""
+        platform = bot.platform
+        cfg = platform.cfg
+        # Offsets belong to a bot token; a new token starts from Telegram's pending updates
+        if self._offset_tokens.get(platform.id) != cfg.bot_token:
+            self._platform_offsets.pop(platform.id, None)
+            self._offset_tokens[platform.id] = cfg.bot_token
+
+        bot.fetched = max(bot.fetched, self._platform_offsets.get(platform.id, 0))
+
+        failures = 0
+        async with httpx.AsyncClient() as client:
+            await self._delete_webhook_if_exists(client, cfg.bot_token)
+            while not self._stop_event.is_set():
+                # Only processed updates are confirmed; queued ones are returned again
+                # (and skipped below) until their worker is done with them
+                last_update_id = self._platform_offsets.get(platform.id, 0)
+                offset = last_update_id + 1 if last_update_id else 0
+                bot.progress.clear()
+                updates = await self._get_updates(client, cfg.bot_token, offset, cfg.polling_timeout_seconds)
+
+                if updates is None:
+                    # Exponential backoff on errors, capped at one minute
+                    failures += 1
+                    await asyncio.sleep(min(60, max(1, cfg.polling_interval_seconds) * 2 ** min(failures - 1, 6)))
+                    continue
+                failures = 0
+
+                fresh = [u for u in updates if u.get("update_id", 0) > bot.fetched]
+                if updates and not fresh:
+                    # Everything returned is still queued: wait for workers instead of spinning
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(bot.progress.wait(), timeout=max(1, cfg.polling_timeout_seconds))
+                    continue
+
+                for update in fresh:
+                    update_id = update.get("update_id", 0)
+                    bot.in_flight.add(update_id)
+                    bot.fetched = max(bot.fetched, update_id)
+                    # Blocks while the worker's queue is full, pausing this bot's polling
+                    await bot.queues[self._shard(update, len(bot.queues))].put(update)
+
+    def _mark_processed(self, bot: _BotRuntime, update_id: int) -> None:
+        """Advance the processed watermark once every earlier queued update is done."""
+        bot.in_flight.discard(update_id)
+        watermark = min(bot.in_flight) - 1 if bot.in_flight else bot.fetched
+        platform_id = bot.platform.id
+        if watermark > self._platform_offsets.get(platform_id, 0):
+            self._platform_offsets[platform_id] = watermark
+            bot.progress.set()
+
+    async def _process_queue(self, bot: _BotRuntime, queue: asyncio.Queue[dict[str, Any] | None]) -> None:
+        """Process queued updates of one bot in order until a stop sentinel arrives."""
+        while True:
+            update = await queue.get()
             try:
-                await self._process_update(platform, update)
+                if update is None:
+                    return
+                await self._process_update(bot.platform, update)
             except Exception as e:
-                print(f"[TELEGRAM] Error processing update {update_id}: {e}")
-        
-        return new_offset
+                print(f"[TELEGRAM] Error processing update {update.get('update_id') if update else None}: {e}")
+            finally:
+                if update is not None:
+                    self._mark_processed(bot, update.get("update_id", 0))
+                queue.task_done()
+
+    def _start_bot(self, platform: _PlatformEntry) -> None:
+        cfg = platform.cfg
+        shards = max(1, cfg.processing_concurrency)
+        bot = _BotRuntime(
+            platform=platform,
+            fingerprint=platform.fingerprint(),
+            queues=[asyncio.Queue(maxsize=max(1, cfg.processing_queue_size)) for _ in range(shards)],
+        )
+        bot.workers = [
+            asyncio.create_task(self._process_queue(bot, q), name=f"telegram-worker-{platform.id}-{i}")
+            for i, q in enumerate(bot.queues)
+        ]
+        bot.poller = asyncio.create_task(self._poll_bot(bot), name=f"telegram-poller-{platform.id}")
+        self._bots[platform.id] = bot
+        print(f"[TELEGRAM] Started poller for platform {platform.id} ({shards} worker(s))")
+
+    async def _stop_bot(self, platform_id: uuid.UUID) -> None:
+        """Stop polling a bot, then let its workers finish the updates already queued."""
+        bot = self._bots.pop(platform_id, None)
+        if bot is not None:
+            await self._drain_bot(bot)
+
+    async def _drain_bot(self, bot: _BotRuntime) -> None:
+        platform_id = bot.platform.id
+        if bot.poller:
+            bot.poller.cancel()
+            with suppress(asyncio.CancelledError):
+                await bot.poller
+        for q in bot.queues:
+            await q.put(None)
+        await asyncio.gather(*bot.workers, return_exceptions=True)
+        print(f"[TELEGRAM] Stopped poller for platform {platform_id}")
+
+    async def _replace_bot(self, bot: _BotRuntime, platform: _PlatformEntry | None) -> None:
+        """Drain a removed or reconfigured bot, then start its new runtime if any."""
+        await self._drain_bot(bot)
+        if platform is not None and not self._stop_event.is_set():
+            self._start_bot(platform)
+
+    async def _reconcile_bots(self, platforms: list[_PlatformEntry]) -> None:
+        """Start new bots, restart bots whose config changed and stop removed ones."""
+        wanted = {p.id: p for p in platforms}
+
+        for pid in list(self._bots):
+            bot = self._bots[pid]
+            platform = wanted.get(pid)
+            if platform is None or platform.fingerprint() != bot.fingerprint:
+                # Drain in the background so a slow bot does not hold up the others;
+                # the new runtime starts once the old one has stopped polling
+                del self._bots[pid]
+                task = asyncio.create_task(self._replace_bot(bot, platform), name=f"telegram-stop-{pid}")
+                self._stopping[pid] = task
+                task.add_done_callback(lambda t, pid=pid: self._stopping.pop(pid, None) if self._stopping.get(pid) is t else None)
+            elif bot.poller and bot.poller.done():
+                # Poller died unexpectedly: restart it with the same queues
+                print(f"[TELEGRAM] Poller for platform {pid} exited, restarting")
+                bot.poller = asyncio.create_task(self._poll_bot(bot), name=f"telegram-poller-{pid}")
+
+        for pid, platform in wanted.items():
+            if pid not in self._bots and pid not in self._stopping:
+                self._start_bot(platform)
 
     async def _consumer_loop(self) -> None:
-        """Main consumer loop - polls all active Telegram platforms."""
+        """Supervisor loop - keeps one long-poll runtime per active Telegram bot."""
         print("[TELEGRAM] Consumer loop started (polling mode)")
-        
-        # Initial load and delete webhooks
-        platforms = await self._load_active_telegram_platforms()
-        for p in platforms:
-            await self._delete_webhook_if_exists(p.cfg.bot_token)
-        
-        while not self._stop_event.is_set():
-            try:
-                platforms = await self._load_active_telegram_platforms()
-                
-                if not platforms:
-                    await asyncio.sleep(5)
-                    continue
-                
-                # Poll each platform concurrently
-                tasks = []
-                for p in platforms:
-                    tasks.append(self._poll_platform(p))
-                
-                if tasks:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    # Update offsets
-                    for i, p in enumerate(platforms):
-                        if isinstance(results[i], int):
-                            self._platform_offsets[p.id] = results[i]
-                
-                # Short sleep between polling cycles
-                interval = platforms[0].cfg.polling_interval_seconds if platforms else 1
-                await asyncio.sleep(max(0.5, interval))
-                
-            except Exception as e:
-                print(f"[TELEGRAM] Consumer loop error: {e}")
-                await asyncio.sleep(5)
-        
-        print("[TELEGRAM] Consumer loop stopped")
+
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    platforms = await self._load_active_telegram_platforms()
+                    await self._reconcile_bots(platforms)
+                except Exception as e:
+                    print(f"[TELEGRAM] Consumer loop error: {e}")
+
+                # Wait for refresh or stop earlier
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self._refresh_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await asyncio.gather(
+                *self._stopping.values(),
+                *[self._stop_bot(pid) for pid in list(self._bots)],
+                return_exceptions=True,
+            )
+            print("[TELEGRAM] Consumer loop stopped")
@@ -4,7 +4,6 @@ import asyncio
 import base64
 import uuid
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Any
 
 from pydantic import BaseModel
@@ -16,6 +15,7 @@ from app.db.models import Platform, WuKongIMInbox
 from app.domain.entities import NormalizedMessage
 from app.domain.ports import MessageNormalizer, TgoApiClient, SSEManager
 from app.domain.services.dispatcher import process_message
+from app.domain.services.inbox_worker import InboxWorkerEngine
 from app.infra.visitor_client import VisitorService
 
 
@@ -27,6 +27,7 @@ class WuKongIMPlatformConfig(BaseModel):
     processing_batch_size: int = 10
     max_retry_attempts: int = 3
     consumer_poll_interval_seconds: int = 5
+    processing_concurrency: int | None = None  # defaults to settings.inbox_worker_concurrency
 
 
 @dataclass
@@ -62,6 +63,7 @@ class WuKongIMChannelListener:
             cache_ttl_seconds=300,
             redis_url=settings.redis_url,
         )
+        self._inbox_engine = InboxWorkerEngine("WUKONGIM", session_factory, WuKongIMInbox, "from_uid")
 
     async def start(self) -> None:
         if self._consumer_task is None or self._consumer_task.done():
@@ -76,6 +78,10 @@ class WuKongIMChannelListener:
             except asyncio.CancelledError:
                 pass
 
+    def inbox_metrics(self) -> dict[str, dict[str, Any]]:
+        """Per-platform inbox queue depth/lag and processing counters."""
+        return self._inbox_engine.metrics()
+
     async def _load_active_platforms(self) -> list[_PlatformEntry]:
         async with self._session_factory() as session:
             rows = (
@@ -97,11 +103,14 @@ class WuKongIMChannelListener:
         while not self._stop_event.is_set():
             try:
                 platforms = await self._load_active_platforms()
-                for p in platforms:
-                    try:
-                        await self._process_pending_for_platform(p)
-                    except Exception as e:
-                        print(f"[WUKONGIM] Consumer error for platform {p.id}: {e}")
+                # Platforms are processed concurrently so one busy account does not hold up the others
+                results = await asyncio.gather(
+                    *[self._process_pending_for_platform(p) for p in platforms],
+                    return_exceptions=True,
+                )
+                for p, result in zip(platforms, results):
+                    if isinstance(result, Exception):
+                        print(f"[WUKONGIM] Consumer error for platform {p.id}: {result}")
                 interval = platforms[0].cfg.consumer_poll_interval_seconds if platforms else 5
                 await asyncio.sleep(max(1, int(interval)))
             except Exception as e:
@@ -111,102 +120,56 @@ class WuKongIMChannelListener:
     async def _process_pending_for_platform(self, p: _PlatformEntry) -> None:
         batch_size = max(1, int(getattr(p.cfg, "processing_batch_size", 10) or 10))
         max_retries = max(0, int(getattr(p.cfg, "max_retry_attempts", 3) or 3))
+        concurrency = max(1, int(p.cfg.processing_concurrency or settings.inbox_worker_concurrency))
+
+        # Claim pending (and eligible failed) records; different conversations are
+        # processed concurrently, messages of one conversation strictly in order
+        await self._inbox_engine.run_platform(
+            p.id,
+            lambda db, rec: self._process_record(db, p, rec),
+            batch_size=batch_size,
+            max_retries=max_retries,
+            concurrency=concurrency,
+        )
 
-        async with self._session_factory() as db:
-            # Fetch pending
-            pending = (
-                await db.execute(
-                    select(WuKongIMInbox)
-                    .where(WuKongIMInbox.platform_id == p.id, WuKongIMInbox.status == "pending")
-                    .order_by(WuKongIMInbox.fetched_at.asc())
-                    .limit(batch_size)
-                )
-            ).scalars().all()
-
-            remaining = batch_size - len(pending)
-            candidates: list[WuKongIMInbox] = list(pending)
-
-            if remaining > 0:
-                # Consider failed with exponential backoff
-                failed = (
-                    await db.execute(
-                        select(WuKongIMInbox)
-                        .where(
-                            WuKongIMInbox.platform_id == p.id,
-                            WuKongIMInbox.status == "failed",
-                            WuKongIMInbox.retry_count < max_retries,
-                        )
-                        .order_by(WuKongIMInbox.processed_at.asc().nullsfirst())
-                        .limit(batch_size * 3)
-                    )
-                ).scalars().all()
-                now = datetime.now(timezone.utc)
-                for rec in failed:
-                    delay = max(1, 2 ** int(rec.retry_count or 0))
-                    if not rec.processed_at or (now - rec.processed_at).total_seconds() >= delay:
-                        candidates.append(rec)
-                        if len(candidates) >= batch_size:
-                            break
-
-            if not candidates:
-                return
-
-            for rec in candidates:
-                rec.status = "processing"
-                rec.error_message = None
-                await db.commit()
-
-                try:
-                    # Use decoded plain content; backward-compat: detect and decode base64 if necessary
-                    content = rec.payload or ""
-                    if content:
-                        try:
-                            decoded_bytes = base64.b64decode(content, validate=True)
-                            reenc = base64.b64encode(decoded_bytes).decode().rstrip("=")
-                            if reenc == (content.strip().rstrip("=")):
-                                content = decoded_bytes.decode("utf-8", errors="replace")
-                        except Exception:
-                            pass
-
-                    # Map to NormalizedMessage (put channel info into extra)
-                    mapped_raw: dict[str, Any] = {
-                        "source": "wukongim",
-                        "from_uid": rec.from_uid,
-                        "content": content,
-                        "platform_api_key": p.api_key or "",
-                        "platform_type": "website",
-                        "platform_id": str(p.id),
-                        "extra": {
-                            "project_id": str(p.project_id),
-                            "channel_id": rec.channel_id,
-                            "channel_type": rec.channel_type,
-                            "message_seq": rec.message_seq,
-                            "timestamp": rec.timestamp,
-                            "client_msg_no": rec.client_msg_no,
-                            "message_id": rec.message_id,
-                        },
-                    }
-
-                    # WuKongIM: no visitor registration; from_uid is the visitor id
-
-                    msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
-                    reply_text = await process_message(
-                        msg=msg,
-                        db=db,
-                        tgo_api_client=self._tgo_api_client,
-                        sse_manager=self._sse_manager,
-                    )
-
-                    rec.ai_reply = reply_text
-                    rec.status = "completed"
-                    rec.processed_at = datetime.now(timezone.utc)
-                    rec.error_message = None
-                    await db.commit()
-                except Exception as e:
-                    print(f"[WUKONGIM] Processing failed for {p.id}: {e}")
-                    rec.status = "failed"
-                    rec.processed_at = datetime.now(timezone.utc)
-                    rec.retry_count = int((rec.retry_count or 0)) + 1
-                    rec.error_message = str(e)[:2000]
-                    await db.commit()
+    async def _process_record(self, db: AsyncSession, p: _PlatformEntry, rec: WuKongIMInbox) -> str | None:
+        """Process one claimed record; returns the AI reply text."""
+        # Use decoded plain content; backward-compat: detect and decode base64 if necessary
+        content = rec.payload or ""
+        if content:
+            try:
+                decoded_bytes = base64.b64decode(content, validate=True)
+                reenc = base64.b64encode(decoded_bytes).decode().rstrip("=")
+                if reenc == (content.strip().rstrip("=")):
+                    content = decoded_bytes.decode("utf-8", errors="replace")
+            except Exception:
+                pass
 
+        # Map to NormalizedMessage (put channel info into extra)
+        mapped_raw: dict[str, Any] = {
+            "source": "wukongim",
+            "from_uid": rec.from_uid,
+            "content": content,
+            "platform_api_key": p.api_key or "",
+            "platform_type": "website",
+            "platform_id": str(p.id),
+            "extra": {
+                "project_id": str(p.project_id),
+                "channel_id": rec.channel_id,
+                "channel_type": rec.channel_type,
+                "message_seq": rec.message_seq,
+                "timestamp": rec.timestamp,
+                "client_msg_no": rec.client_msg_no,
+                "message_id": rec.message_id,
+            },
+        }
+
+        # WuKongIM: no visitor registration; from_uid is the visitor id
+
+        msg: NormalizedMessage = await self._normalizer.normalize(mapped_raw)
+        return await process_message(
+            msg=msg,
+            db=db,
+            tgo_api_client=self._tgo_api_client,
+            sse_manager=self._sse_manager,
+        )
@@ -0,0 +1,207 @@
+"""Asyncio-native IMAP mailbox session (aioimaplib).
+
+One ``AsyncImapMailbox`` is a logged-in connection with a mailbox selected
+read-write. It supports UID-based incremental search, batched fetch with
+``BODY.PEEK[]`` (fetching does not set ``\\Seen``), flag updates and waiting
+for changes with IMAP IDLE (RFC 2177) when the server advertises it.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Iterable, Optional
+
+import aioimaplib
+
+_UIDVALIDITY_RE = re.compile(rb"\[UIDVALIDITY (\d+)\]")
+_UIDNEXT_RE = re.compile(rb"\[UIDNEXT (\d+)\]")
+_FETCH_UID_RE = re.compile(rb"UID (\d+)")
+
+# Re-issue IDLE before servers drop it (RFC 2177 recommends < 29 minutes)
+MAX_IDLE_SECONDS = 29 * 60
+
+
+class ImapError(RuntimeError):
+    """Raised when the IMAP server rejects a command."""
+
+
+def _quote_mailbox(name: str) -> str:
+    if name.startswith('"') or not re.search(r'[\s"\\(){}%*]', name):
+        return name
+    return '"' + name.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _compress_uids(uids: Iterable[int]) -> str:
+    """Build an IMAP sequence set, e.g. [1, 2, 3, 7] -> '1:3,7'."""
+    ranges: list[str] = []
+    start = prev = None
+    for uid in sorted(set(uids)):
+        if start is None:
+            start = prev = uid
+        elif uid == prev + 1:
+            prev = uid
+        else:
+            ranges.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = uid
+    if start is not None:
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+    return ",".join(ranges)
+
+
+class AsyncImapMailbox:
+    """A logged-in IMAP connection with one mailbox selected."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        mailbox: str = "INBOX",
+        use_ssl: bool = True,
+        timeout: float = 60,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._username = username
+        self._password = password
+        self._mailbox = mailbox
+        self._use_ssl = use_ssl
+        self._timeout = timeout
+        self._client: Optional[aioimaplib.IMAP4] = None
+        self._lost = False
+        self.uidvalidity: Optional[int] = None
+        self.uidnext: Optional[int] = None
+
+    @property
+    def supports_idle(self) -> bool:
+        return bool(self._client and self._client.has_capability("IDLE"))
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            self._client is not None
+            and not self._lost
+            and self._client.protocol is not None
+            and self._client.protocol.state == aioimaplib.SELECTED
+        )
+
+    def _on_connection_lost(self, exc: Optional[Exception]) -> None:
+        self._lost = True
+
+    async def connect(self, client_id: Optional[dict[str, str]] = None) -> None:
+        """Connect, log in, send IMAP ID (if given) and select the mailbox read-write."""
+        cls = aioimaplib.IMAP4_SSL if self._use_ssl else aioimaplib.IMAP4
+        self._client = cls(
+            host=self._host,
+            port=self._port,
+            timeout=self._timeout,
+            conn_lost_cb=self._on_connection_lost,
+        )
+        await self._client.wait_hello_from_server()
+
+        resp = await self._client.login(self._username, self._password)
+        if resp.result != "OK":
+            raise ImapError(f"IMAP login failed: {self._decode_lines(resp.lines)}")
+
+        if client_id:
+            # RFC 2971; some providers (e.g. 163.com) refuse "unsafe" logins without it
+            try:
+                await self._client.id(**client_id)
+            except Exception:
+                pass
+
+        resp = await self._client.select(_quote_mailbox(self._mailbox))
+        if resp.result != "OK":
+            raise ImapError(
+                f"Cannot select mailbox '{self._mailbox}'. Server response: {self._decode_lines(resp.lines)}"
+            )
+        for line in resp.lines:
+            if isinstance(line, (bytes, bytearray)):
+                if m := _UIDVALIDITY_RE.search(line):
+                    self.uidvalidity = int(m.group(1))
+                if m := _UIDNEXT_RE.search(line):
+                    self.uidnext = int(m.group(1))
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            if not self._lost:
+                await asyncio.wait_for(client.logout(), timeout=10)
+        except Exception:
+            pass
+
+    # ---- Commands ----
+    async def search_uids(self, *criteria: str) -> list[int]:
+        """UID SEARCH; returns matching UIDs in ascending order."""
+        resp = await self._client.uid_search(*criteria, charset=None)
+        if resp.result != "OK":
+            raise ImapError(f"IMAP UID SEARCH failed: {self._decode_lines(resp.lines)}")
+        uids: set[int] = set()
+        for line in resp.lines[:-1]:
+            if isinstance(line, (bytes, bytearray)):
+                uids.update(int(tok) for tok in line.split() if tok.isdigit())
+        return sorted(uids)
+
+    async def fetch_messages(self, uids: Iterable[int]) -> dict[int, bytes]:
+        """Fetch full RFC822 messages by UID without setting ``\\Seen``."""
+        uid_set = _compress_uids(uids)
+        if not uid_set:
+            return {}
+        resp = await self._client.uid("fetch", uid_set, "(UID BODY.PEEK[])")
+        if resp.result != "OK":
+            raise ImapError(f"IMAP UID FETCH failed: {self._decode_lines(resp.lines)}")
+
+        messages: dict[int, bytes] = {}
+        lines = resp.lines
+        for i, line in enumerate(lines):
+            if not isinstance(line, bytearray):
+                continue
+            # The UID item may come before the literal or after it
+            for neighbour in (lines[i - 1] if i > 0 else b"", lines[i + 1] if i + 1 < len(lines) else b""):
+                m = _FETCH_UID_RE.search(bytes(neighbour))
+                if m:
+                    messages[int(m.group(1))] = bytes(line)
+                    break
+        return messages
+
+    async def mark_seen(self, uids: Iterable[int]) -> None:
+        uid_set = _compress_uids(uids)
+        if not uid_set:
+            return
+        resp = await self._client.uid("store", uid_set, "+FLAGS.SILENT", "(\\Seen)")
+        if resp.result != "OK":
+            raise ImapError(f"IMAP UID STORE failed: {self._decode_lines(resp.lines)}")
+
+    async def noop(self) -> None:
+        resp = await self._client.noop()
+        if resp.result != "OK":
+            raise ImapError("IMAP NOOP failed")
+
+    async def wait_for_changes(self, timeout: float) -> bool:
+        """Block in IDLE until the server pushes an update or ``timeout`` elapses.
+
+        Returns True if the server reported changes (e.g. ``EXISTS``).
+        """
+        timeout = max(1.0, min(timeout, MAX_IDLE_SECONDS))
+        idle = await self._client.idle_start(timeout=timeout)
+        changed = False
+        try:
+            pushed = await self._client.wait_server_push(timeout=timeout + 5)
+            changed = pushed != aioimaplib.STOP_WAIT_SERVER_PUSH
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if self._client.has_pending_idle():
+                self._client.idle_done()
+            await asyncio.wait_for(idle, timeout=30)
+        return changed
+
+    @staticmethod
+    def _decode_lines(lines: list) -> str:
+        return " ".join(
+            line.decode(errors="replace") if isinstance(line, (bytes, bytearray)) else str(line)
+            for line in lines
+        )
@@ -0,0 +1,333 @@
+"""Pooled SMTP delivery for outbound email.
+
+Each email platform gets one ``SmtpPool`` for its SMTP account (host, port,
+username, password, TLS); when the platform's SMTP settings change, the old
+pool finishes its queued messages and is closed:
+
+- A bounded send queue; ``send()`` waits for room when the queue is full
+- Up to ``max_connections`` workers, each owning one keep-alive SMTP
+  connection (blocking smtplib, run in a worker thread per send batch)
+- Workers take a batch of queued messages and send them over the same
+  connection; an idle connection is health-checked with NOOP before reuse
+  and closed after ``idle_seconds`` without work
+- A broken connection is replaced and the message retried once
+- Counters for send latency, queue depth and connection usage
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import smtplib
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Any
+
+from app.core.config import settings
+
+# Message-level rejections: the connection is still usable and a retry would fail again
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+@dataclass(frozen=True)
+class SmtpAccount:
+    host: str
+    port: int
+    username: str
+    password: str = field(repr=False)
+    use_tls: bool = True
+
+    def key(self) -> tuple[Any, ...]:
+        digest = hashlib.sha256((self.password or "").encode("utf-8")).hexdigest()[:16]
+        return (self.host, self.port, self.username, digest, self.use_tls)
+
+    def fingerprint(self) -> str:
+        """Stable label for the account that does not reveal its credentials."""
+        return hashlib.sha256(repr(self.key()).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class SmtpPoolMetrics:
+    sent_total: int = 0
+    failed_total: int = 0
+    batches_total: int = 0
+    connections_opened_total: int = 0
+    reconnects_total: int = 0
+    open_connections: int = 0
+    busy_connections: int = 0
+    send_seconds_total: float = 0.0
+    send_seconds_max: float = 0.0
+
+    def observe(self, seconds: float, ok: bool) -> None:
+        if ok:
+            self.sent_total += 1
+        else:
+            self.failed_total += 1
+        self.send_seconds_total += seconds
+        self.send_seconds_max = max(self.send_seconds_max, seconds)
+
+
+@dataclass
+class _SendRequest:
+    message: EmailMessage
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class SmtpPool:
+    """Keep-alive SMTP connections and a bounded send queue for one account."""
+
+    def __init__(
+        self,
+        account: SmtpAccount,
+        max_connections: int | None = None,
+        queue_size: int | None = None,
+        batch_size: int | None = None,
+        idle_seconds: float | None = None,
+        noop_after_seconds: float = 30.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.account = account
+        self._max_connections = max(1, max_connections or settings.smtp_pool_max_connections)
+        self._batch_size = max(1, batch_size or settings.smtp_send_batch_size)
+        self._idle_seconds = idle_seconds or settings.smtp_pool_idle_seconds
+        self._noop_after = noop_after_seconds
+        self._timeout = timeout
+        self._queue: asyncio.Queue[_SendRequest] = asyncio.Queue(
+            maxsize=max(1, queue_size or settings.smtp_send_queue_size)
+        )
+        self._workers: set[asyncio.Task] = set()
+        self._idle_workers = 0
+        self._metrics = SmtpPoolMetrics()
+        self._closed = False
+
+    async def send(self, message: EmailMessage) -> None:
+        """Queue a message and wait until it has been handed to the SMTP server."""
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_SendRequest(message, future, time.monotonic()))
+        if self._closed:
+            # Closed while waiting for room in the queue: no worker will pick it up
+            self._fail_queued()
+        else:
+            self._ensure_worker()
+        await future
+
+    def metrics(self) -> dict[str, Any]:
+        m = self._metrics
+        finished = m.sent_total + m.failed_total
+        return {
+            "queue_depth": self._queue.qsize(),
+            "workers": len(self._workers),
+            "max_connections": self._max_connections,
+            "open_connections": m.open_connections,
+            "busy_connections": m.busy_connections,
+            "connections_opened_total": m.connections_opened_total,
+            "reconnects_total": m.reconnects_total,
+            "sent_total": m.sent_total,
+            "failed_total": m.failed_total,
+            "batches_total": m.batches_total,
+            "avg_send_seconds": round(m.send_seconds_total / finished, 3) if finished else None,
+            "max_send_seconds": round(m.send_seconds_max, 3),
+        }
+
+    async def close(self, drain: bool = False) -> None:
+        """Stop the workers; with ``drain``, first send the messages already queued."""
+        self._closed = True
+        if drain and self._workers:
+            await self._queue.join()
+        for task in list(self._workers):
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        while not self._queue.empty():
+            req = self._queue.get_nowait()
+            self._queue.task_done()
+            if not req.future.done():
+                req.future.set_exception(RuntimeError("SMTP pool is closed"))
+
+    # ---- Workers ----
+    def _ensure_worker(self) -> None:
+        if self._idle_workers > 0 or len(self._workers) >= self._max_connections:
+            return
+        task = asyncio.create_task(self._worker(), name=f"smtp-worker-{self.account.host}")
+        self._workers.add(task)
+        task.add_done_callback(self._workers.discard)
+
+    async def _worker(self) -> None:
+        client: smtplib.SMTP | None = None
+        last_used = 0.0
+        try:
+            while True:
+                self._idle_workers += 1
+                try:
+                    first = await asyncio.wait_for(self._queue.get(), timeout=self._idle_seconds)
+                except asyncio.TimeoutError:
+                    if self._queue.empty():
+                        # Idle: give the connection back to the server and exit
+                        return
+                    first = self._queue.get_nowait()
+                finally:
+                    self._idle_workers -= 1
+
+                batch = [first]
+                while len(batch) < self._batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                self._metrics.busy_connections += 1
+                self._metrics.batches_total += 1
+                try:
+                    check = client is not None and time.monotonic() - last_used > self._noop_after
+                    client, results = await asyncio.to_thread(self._send_batch, client, check, batch)
+                finally:
+                    self._metrics.busy_connections -= 1
+                    last_used = time.monotonic()
+                    for _ in batch:
+                        self._queue.task_done()
+
+                now = time.monotonic()
+                for req, error in zip(batch, results):
+                    self._metrics.observe(now - req.enqueued_at, error is None)
+                    if req.future.done():
+                        continue
+                    if error is None:
+                        req.future.set_result(None)
+                    else:
+                        req.future.set_exception(error)
+        finally:
+            if client is not None:
+                await asyncio.to_thread(self._quit, client)
+
+    # ---- Blocking SMTP (worker thread) ----
+    def _connect(self) -> smtplib.SMTP:
+        acc = self.account
+        # Use implicit SSL for port 465 regardless of use_tls flag
+        if acc.port == 465:
+            client: smtplib.SMTP = smtplib.SMTP_SSL(acc.host, acc.port, timeout=self._timeout)
+        else:
+            client = smtplib.SMTP(acc.host, acc.port, timeout=self._timeout)
+            client.ehlo()
+            if acc.use_tls:
+                # STARTTLS if requested and supported
+                if client.has_extn("starttls"):
+                    client.starttls()
+                    client.ehlo()
+                else:
+                    logging.warning("SMTP server does not advertise STARTTLS; continuing without TLS")
+
+        # Authenticate if credentials provided
+        if acc.username and acc.password:
+            try:
+                client.login(acc.username, acc.password)
+            except smtplib.SMTPAuthenticationError as e:
+                logging.error("SMTP authentication failed: code=%s msg=%s", getattr(e, 'smtp_code', None), getattr(e, 'smtp_error', None))
+                client.close()
+                raise
+        self._metrics.open_connections += 1
+        self._metrics.connections_opened_total += 1
+        return client
+
+    def _quit(self, client: smtplib.SMTP) -> None:
+        try:
+            client.quit()
+        except Exception:
+            try:
+                client.close()
+            except Exception:
+                pass
+        self._metrics.open_connections -= 1
+
+    def _healthy(self, client: smtplib.SMTP) -> bool:
+        try:
+            return client.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _send_batch(
+        self,
+        client: smtplib.SMTP | None,
+        health_check: bool,
+        batch: list[_SendRequest],
+    ) -> tuple[smtplib.SMTP | None, list[Exception | None]]:
+        """Send a batch over one connection; returns the (possibly new) connection and per-message errors."""
+        if client is not None and health_check and not self._healthy(client):
+            self._quit(client)
+            client = None
+            self._metrics.reconnects_total += 1
+
+        results: list[Exception | None] = []
+        for req in batch:
+            error: Exception | None = None
+            for attempt in (1, 2):
+                try:
+                    if client is None:
+                        client = self._connect()
+                    client.send_message(req.message)
+                    error = None
+                    break
+                except _MESSAGE_ERRORS as e:
+                    error = e
+                    try:
+                        client.rset()
+                    except Exception:
+                        pass
+                    break
+                except Exception as e:
+                    error = e
+                    logging.warning("Attempt %d/2 to send email failed: %s", attempt, e)
+                    # Connection is broken: replace it before retrying
+                    if client is not None:
+                        self._quit(client)
+                        client = None
+                        self._metrics.reconnects_total += 1
+                    if attempt == 1:
+                        time.sleep(1.5)
+            if error is not None:
+                error = RuntimeError(f"Failed to send email: {error}")
+            results.append(error)
+        return client, results
+
+
+class SmtpPoolRegistry:
+    """One SmtpPool per email platform, created on first use.
+
+    Pools are keyed and labelled by platform id (or, without one, by an
+    account fingerprint), never by username.
+    """
+
+    def __init__(self) -> None:
+        self._pools: dict[str, SmtpPool] = {}
+        self._retiring: set[asyncio.Task] = set()
+
+    def get(self, account: SmtpAccount, platform_id: Any = None) -> SmtpPool:
+        key = f"platform:{platform_id}" if platform_id is not None else f"account:{account.fingerprint()}"
+        pool = self._pools.get(key)
+        if pool is not None and pool.account.key() != account.key():
+            # SMTP settings changed: the old connections authenticate with stale credentials
+            logging.info("SMTP settings of %s changed; replacing its connection pool", key)
+            self._retire(pool)
+            pool = None
+        if pool is None:
+            pool = self._pools[key] = SmtpPool(account)
+        return pool
+
+    def _retire(self, pool: SmtpPool) -> None:
+        task = asyncio.create_task(pool.close(drain=True))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        return {key: pool.metrics() for key, pool in self._pools.items()}
+
+    async def close(self) -> None:
+        await asyncio.gather(*(pool.close() for pool in self._pools.values()), return_exceptions=True)
+        self._pools.clear()
+        await asyncio.gather(*self._retiring, return_exceptions=True)
+
+
+# Shared by all EmailAdapter instances in this process
+smtp_pools = SmtpPoolRegistry()
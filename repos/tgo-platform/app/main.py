@@ -19,6 +19,7 @@ from app.api.v1 import platforms as platforms_v1
 from app.api.v1 import callbacks as callbacks_v1
 from app.infra.http import HttpxTgoApiClient
 from app.infra.sse import DefaultSSEManager
+from app.infra.smtp_pool import smtp_pools
 from app.db.base import SessionLocal
 from app.domain.services.normalizer import normalizer
 from app.domain.services.listeners import EmailChannelListener
@@ -133,6 +134,7 @@ async def lifespan(app: FastAPI):
             await app.state.telegram_listener_task
         with suppress(asyncio.CancelledError):
             await app.state.slack_listener_task
+        await smtp_pools.close()
         await app.state.tgo_api_client.aclose()
 
 app = FastAPI(lifespan=lifespan, docs_url="/v1/docs", redoc_url="/v1/redoc")
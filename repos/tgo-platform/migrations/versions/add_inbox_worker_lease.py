@@ -0,0 +1,44 @@
+"""Add worker lease column and conversation index to inbox tables
+
+Revision ID: add_inbox_worker_lease
+Revises: add_slack_inbox
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_inbox_worker_lease'
+down_revision = 'add_slack_inbox'
+branch_labels = None
+depends_on = None
+
+# (table, short name, conversation column)
+INBOX_TABLES = [
+    ('pt_email_inbox', 'email', 'from_address'),
+    ('pt_wecom_inbox', 'wecom', 'from_user'),
+    ('pt_wukongim_inbox', 'wukongim', 'from_uid'),
+    ('pt_feishu_inbox', 'feishu', 'from_user'),
+    ('pt_dingtalk_inbox', 'dingtalk', 'from_user'),
+]
+
+
+def upgrade() -> None:
+    for table, short, column in INBOX_TABLES:
+        # Lease for rows claimed by a worker; expired leases can be claimed again
+        op.add_column(table, sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+        # Per-conversation ordering checks
+        op.create_index(
+            f'ix_{short}_inbox_platform_{column}_status',
+            table,
+            ['platform_id', column, 'status'],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    for table, short, column in INBOX_TABLES:
+        op.drop_index(f'ix_{short}_inbox_platform_{column}_status', table_name=table)
+        op.drop_column(table, 'lease_expires_at')
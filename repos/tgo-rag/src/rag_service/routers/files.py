@@ -2,6 +2,8 @@
 File management endpoints.
 """
 
+import asyncio
+import hashlib
 import os
 import mimetypes
 from pathlib import Path
@@ -32,6 +34,57 @@ router = APIRouter()
 logger = get_logger(__name__)
 settings = get_settings()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a streamed upload exceeds the maximum file size."""
+
+
+async def _save_upload_stream(file: UploadFile, storage_path: str, max_size: int) -> tuple[int, str]:
+    """
+    Stream an uploaded file to disk chunk by chunk.
+
+    The size limit is enforced and the SHA-256 computed while streaming, so
+    memory use does not grow with file size. A partial file is removed on error.
+
+    Returns:
+        Tuple of (file size in bytes, SHA-256 hex digest)
+
+    Raises:
+        UploadTooLargeError: If the file exceeds max_size
+    """
+    size = 0
+    sha256 = hashlib.sha256()
+
+    def write_chunk(chunk: bytes) -> None:
+        sha256.update(chunk)
+        buffer.write(chunk)
+
+    # File I/O and hashing run in a worker thread to keep the event loop free
+    buffer = await asyncio.to_thread(open, storage_path, "wb")
+    try:
+        try:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(
+                        f"File size exceeds maximum allowed size {max_size}"
+                    )
+                await asyncio.to_thread(write_chunk, chunk)
+        finally:
+            await asyncio.to_thread(buffer.close)
+    except BaseException:
+        try:
+            await asyncio.to_thread(os.remove, storage_path)
+        except OSError:
+            pass
+        raise
+    return size, sha256.hexdigest()
+
 
 @router.get(
     "",
@@ -181,13 +234,11 @@ async def upload_file(
     storage_filename = f"{file_id}{file_extension}"
     storage_path = os.path.join(settings.upload_dir, storage_filename)
     
-    # Save file to disk
+    # Stream file to disk
     try:
-        with open(storage_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        file_size = len(content)
+        file_size, file_sha256 = await _save_upload_stream(file, storage_path, settings.max_file_size)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
@@ -206,7 +257,7 @@ async def upload_file(
         content_type=file.content_type,
         storage_provider="local",
         storage_path=storage_path,
-        storage_metadata={"original_path": storage_path},
+        storage_metadata={"original_path": storage_path, "sha256": file_sha256},
         status="pending",
         language=language,
         description=description,
@@ -492,19 +543,6 @@ async def upload_files_batch(
                 ))
                 continue
 
-            # Check file size
-            content = await file.read()
-            file_size = len(content)
-            total_size += file_size
-
-            if file_size > settings.max_file_size:
-                failed_uploads.append(FileUploadError(
-                    filename=file.filename,
-                    error_code="FILE_TOO_LARGE",
-                    error_message=f"File size {file_size} bytes exceeds maximum {settings.max_file_size} bytes"
-                ))
-                continue
-
             # Check content type
             if file.content_type not in settings.allowed_file_types:
                 failed_uploads.append(FileUploadError(
@@ -518,11 +556,19 @@ async def upload_files_batch(
             file_id = uuid4()
             storage_path = os.path.join(settings.upload_dir, str(file_id))
 
-            # Save file to storage
+            # Stream file to storage, checking size on the fly
             try:
                 os.makedirs(os.path.dirname(storage_path), exist_ok=True)
-                with open(storage_path, "wb") as f:
-                    f.write(content)
+                file_size, file_sha256 = await _save_upload_stream(
+                    file, storage_path, settings.max_file_size
+                )
+            except UploadTooLargeError:
+                failed_uploads.append(FileUploadError(
+                    filename=file.filename,
+                    error_code="FILE_TOO_LARGE",
+                    error_message=f"File size exceeds maximum {settings.max_file_size} bytes"
+                ))
+                continue
             except Exception as e:
                 failed_uploads.append(FileUploadError(
                     filename=file.filename,
@@ -530,6 +576,7 @@ async def upload_files_batch(
                     error_message=f"Failed to save file: {str(e)}"
                 ))
                 continue
+            total_size += file_size
 
             # Create file record
             file_record = FileModel(
@@ -541,7 +588,7 @@ async def upload_files_batch(
                 content_type=file.content_type,
                 storage_provider="local",
                 storage_path=storage_path,
-                storage_metadata={"original_path": storage_path},
+                storage_metadata={"original_path": storage_path, "sha256": file_sha256},
                 status="pending",
                 language=language,
                 description=description,
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, update
 from sqlalchemy.orm import selectinload
 from app.database import get_db
-from app.models.execution import WorkflowExecution, NodeExecution
+from app.models.execution import WorkflowExecution
 import asyncio
 import traceback
 from app.schemas.execution import (
@@ -15,10 +15,14 @@ from app.schemas.execution import (
     WorkflowStartedData,
     NodeStartedEvent,
     NodeStartedData,
+    NodeDeltaEvent,
+    NodeDeltaData,
     NodeFinishedEvent,
     NodeFinishedData,
     WorkflowFinishedEvent,
-    WorkflowFinishedData
+    WorkflowFinishedData,
+    WorkflowEventRequest,
+    WorkflowEventResponse
 )
 from celery_app.celery import celery_app
 from datetime import datetime
@@ -26,7 +30,11 @@ import time
 import json
 from celery_app.tasks import execute_workflow_task
 from app.engine.executor import WorkflowExecutor
-from app.services.workflow_service import WorkflowService
+from app.engine.plan import CompiledWorkflow
+from app.services.plan_cache import plan_cache
+from app.services.execution_log import NodeExecutionLog
+from app.services.fast_path import fast_path
+from app.services.trigger_dispatcher import TriggerEvent, trigger_dispatcher
 from app.core.logging import logger
 from typing import List
 import uuid
@@ -60,7 +68,7 @@ async def _run_stream_execution(
     project_id: str,
     execution_id: str,
     inputs: dict,
-    workflow_definition: dict,
+    plan: CompiledWorkflow,
     started_at: datetime,
     db: AsyncSession
 ):
@@ -81,7 +89,7 @@ async def _run_stream_execution(
     )
     yield f"data: {started_event.model_dump_json()}\n\n"
 
-    executor = WorkflowExecutor(workflow_definition, project_id=project_id)
+    executor = WorkflowExecutor(plan=plan, project_id=project_id)
     queue = asyncio.Queue()
 
     # Re-defining callbacks to use the queue
@@ -102,24 +110,19 @@ async def _run_stream_execution(
         )
         await queue.put(f"data: {event.model_dump_json()}\n\n")
 
-    async def q_on_node_complete(node_id, node_type, status, input, output, error, duration):
-        # Save to DB
-        node_exec_id = str(uuid.uuid4())
-        node_exec = NodeExecution(
-            id=node_exec_id,
-            execution_id=execution_id,
-            project_id=project_id,
-            node_id=node_id,
-            node_type=node_type,
-            status=status,
-            input=input,
-            output=output,
-            error=error,
-            duration=duration,
-            started_at=datetime.utcnow()
+    async def q_on_node_delta(node_id, node_type, delta):
+        event = NodeDeltaEvent(
+            workflow_run_id=execution_id,
+            task_id=task_id,
+            data=NodeDeltaData(node_id=node_id, node_type=node_type, delta=delta)
         )
-        db.add(node_exec)
-        await db.commit()
+        await queue.put(f"data: {event.model_dump_json()}\n\n")
+
+    node_log = NodeExecutionLog(execution_id, project_id)
+
+    async def q_on_node_complete(node_id, node_type, status, input, output, error, duration, cached):
+        # Buffered; written in batches off the execution path
+        node_exec_id = node_log.record(node_id, node_type, status, input, output, error, duration, cached)
 
         event = NodeFinishedEvent(
             workflow_run_id=execution_id,
@@ -133,6 +136,7 @@ async def _run_stream_execution(
                 status="succeeded" if status == "completed" else "failed",
                 error=error,
                 elapsed_time=duration / 1000.0,
+                cached=cached,
                 finished_at=int(time.time())
             )
         )
@@ -147,12 +151,18 @@ async def _run_stream_execution(
         async def run_executor():
             nonlocal final_output, status, error_msg
             try:
-                final_output = await executor.run(inputs, on_node_start=q_on_node_start, on_node_complete=q_on_node_complete)
+                final_output = await executor.run(
+                    inputs,
+                    on_node_start=q_on_node_start,
+                    on_node_complete=q_on_node_complete,
+                    on_node_delta=q_on_node_delta
+                )
             except Exception as e:
                 status = "failed"
                 error_msg = str(e)
                 logger.error(f"Workflow stream execution error: {traceback.format_exc()}")
             finally:
+                await node_log.close()
                 await queue.put(None) # Signal end
 
         executor_task = asyncio.create_task(run_executor())
@@ -204,30 +214,18 @@ async def _run_sync_execution(
     project_id: str,
     execution_id: str,
     inputs: dict,
-    workflow_definition: dict,
+    plan: CompiledWorkflow,
     started_at: datetime,
     db: AsyncSession
 ):
     perf_start = time.time()
-    executor = WorkflowExecutor(workflow_definition, project_id=project_id)
+    executor = WorkflowExecutor(plan=plan, project_id=project_id)
     
-    # 定义同步模式下的回调（保存到 DB）
-    async def sync_on_node_complete(node_id, node_type, status, input, output, error, duration):
-        node_exec = NodeExecution(
-            id=str(uuid.uuid4()),
-            execution_id=execution_id,
-            project_id=project_id,
-            node_id=node_id,
-            node_type=node_type,
-            status=status,
-            input=input,
-            output=output,
-            error=error,
-            duration=duration,
-            started_at=datetime.utcnow()
-        )
-        db.add(node_exec)
-        await db.commit()
+    node_log = NodeExecutionLog(execution_id, project_id)
+
+    # 定义同步模式下的回调（缓冲后批量写入 DB）
+    async def sync_on_node_complete(node_id, node_type, status, input, output, error, duration, cached):
+        node_log.record(node_id, node_type, status, input, output, error, duration, cached)
 
     success = True
     final_output = None
@@ -238,6 +236,8 @@ async def _run_sync_execution(
         success = False
         error_msg = str(e)
         logger.error(f"Workflow sync execution error: {traceback.format_exc()}")
+    finally:
+        await node_log.close()
 
     perf_duration = time.time() - perf_start
     end_time_dt = datetime.utcnow()
@@ -278,7 +278,9 @@ async def _run_sync_execution(
        Executes the workflow immediately and returns the final output. Ideal for short-lived tasks.
     
     2. **Asynchronous Mode (`async=True`)**:
-       Creates an execution record and triggers a background Celery task. Returns the execution record immediately.
+       Creates an execution record and returns it immediately. Small workflows that usually finish
+       within the fast-path latency budget run in the API process; others (and any run when the
+       in-process slots are full) are executed by a background Celery task.
     
     3. **Streaming Mode (`stream=True`)**:
        Returns a Server-Sent Events (SSE) stream, pushing real-time events as the workflow progresses.
@@ -289,6 +291,9 @@ async def _run_sync_execution(
     
     - **workflow_started**: Workflow execution initialized.
     - **node_started**: A specific node has started executing.
+    - **node_delta**: The next chunk of an LLM or agent node's output while it is generating
+      (disable per node with `"stream": false` in the node data). The full text is still
+      in the node's `node_finished` outputs.
     - **node_finished**: A specific node has finished (success or failure).
     - **workflow_finished**: Entire workflow has finished.
     """,
@@ -341,6 +346,7 @@ async def _run_sync_execution(
                     "example": (
                         "data: {\"event\": \"workflow_started\", \"workflow_run_id\": \"uuid-1\", \"task_id\": \"stream-uuid-1\", \"data\": {\"id\": \"uuid-1\", \"workflow_id\": \"wf-1\", \"inputs\": {}, \"created_at\": 1735790000}}\n\n"
                         "data: {\"event\": \"node_started\", \"workflow_run_id\": \"uuid-1\", \"task_id\": \"stream-uuid-1\", \"data\": {\"id\": \"node-exec-1\", \"node_id\": \"node-1\", \"node_type\": \"llm\", \"title\": \"AI Chat\", \"index\": 1, \"created_at\": 1735790001}}\n\n"
+                        "data: {\"event\": \"node_delta\", \"workflow_run_id\": \"uuid-1\", \"task_id\": \"stream-uuid-1\", \"data\": {\"node_id\": \"node-1\", \"node_type\": \"llm\", \"delta\": \"Hel\"}}\n\n"
                         "data: {\"event\": \"node_finished\", \"workflow_run_id\": \"uuid-1\", \"task_id\": \"stream-uuid-1\", \"data\": {\"id\": \"node-exec-1\", \"node_id\": \"node-1\", \"node_type\": \"llm\", \"inputs\": {}, \"outputs\": {\"text\": \"Hello\"}, \"status\": \"succeeded\", \"error\": null, \"elapsed_time\": 0.5, \"finished_at\": 1735790002}}\n\n"
                         "data: {\"event\": \"workflow_finished\", \"workflow_run_id\": \"uuid-1\", \"task_id\": \"stream-uuid-1\", \"data\": {\"id\": \"uuid-1\", \"workflow_id\": \"wf-1\", \"status\": \"succeeded\", \"outputs\": {\"result\": \"Hello\"}, \"error\": null, \"elapsed_time\": 0.6, \"total_steps\": 1, \"finished_at\": 1735790002}}\n\n"
                     )
@@ -357,8 +363,11 @@ async def execute_workflow(
     db: AsyncSession = Depends(get_db)
 ):
     # 1. Verify workflow exists and belongs to project
-    workflow = await WorkflowService.get_by_id(db, workflow_id, project_id)
-    if not workflow:
+    try:
+        plan = await plan_cache.get_plan(db, workflow_id, project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not plan:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
     if request.stream:
@@ -366,7 +375,7 @@ async def execute_workflow(
         db_execution = await _create_execution_record(db, workflow_id, project_id, request.inputs, status="running")
         return StreamingResponse(
             _run_stream_execution(
-                workflow_id, project_id, db_execution.id, request.inputs, workflow.definition, db_execution.started_at, db
+                workflow_id, project_id, db_execution.id, request.inputs, plan, db_execution.started_at, db
             ),
             media_type="text/event-stream",
             headers={
@@ -379,8 +388,13 @@ async def execute_workflow(
         # --- 2. 异步执行模式 (Celery) ---
         db_execution = await _create_execution_record(db, workflow_id, project_id, request.inputs, status="pending")
         
-        # Trigger Celery task
-        execute_workflow_task.delay(db_execution.id, workflow_id, request.inputs, project_id=project_id)
+        # Short workflows run in process; Celery for long runs or when the fast path is full
+        if not fast_path.try_submit(plan, db_execution.id, request.inputs, project_id):
+            execute_workflow_task.apply_async(
+                args=(db_execution.id, workflow_id, request.inputs),
+                kwargs={"project_id": project_id},
+                task_id=db_execution.id
+            )
         
         # Re-query with eager loading to avoid lazy loading issues
         stmt = (
@@ -394,9 +408,28 @@ async def execute_workflow(
         # --- 3. 同步执行模式 (默认) ---
         db_execution = await _create_execution_record(db, workflow_id, project_id, request.inputs, status="running")
         return await _run_sync_execution(
-            workflow_id, project_id, db_execution.id, request.inputs, workflow.definition, db_execution.started_at, db
+            workflow_id, project_id, db_execution.id, request.inputs, plan, db_execution.started_at, db
         )
 
+@router.post(
+    "/events",
+    response_model=WorkflowEventResponse,
+    summary="Trigger Workflows by Event",
+    description="""
+    Start every active workflow of the project whose event, webhook or timer trigger node
+    subscribes to the event, as asynchronous executions. Producers that can reach Redis may
+    instead add the event to the trigger stream (WORKFLOW_TRIGGER_STREAM), which is consumed in batches.
+    """
+)
+async def trigger_event(
+    request: WorkflowEventRequest,
+    project_id: str = Query(..., description="Project ID")
+):
+    execution_ids = await trigger_dispatcher.dispatch(
+        [TriggerEvent(project_id, request.trigger, request.name, request.data)]
+    )
+    return WorkflowEventResponse(execution_ids=execution_ids)
+
 @router.get("/executions/{execution_id}", response_model=WorkflowExecutionSchema)
 async def get_execution_status(
     execution_id: str,
@@ -460,8 +493,9 @@ async def cancel_execution(
     execution.completed_at = completed_at
     await db.commit()
     
-    # Terminate Celery task if it's running
-    celery_app.control.revoke(execution_id, terminate=True)
+    # Stop the run: in process, or terminate the Celery task
+    if not fast_path.cancel(execution_id):
+        celery_app.control.revoke(execution_id, terminate=True)
     
     return WorkflowExecutionCancelResponse(
         id=execution_id,
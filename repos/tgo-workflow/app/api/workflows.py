@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.services.workflow_service import WorkflowService
 from app.services.validation_service import ValidationService
+from app.services.plan_cache import plan_cache
+from app.services.trigger_dispatcher import trigger_dispatcher
 from app.schemas.workflow import (
     WorkflowCreate, WorkflowUpdate, WorkflowInDB, WorkflowSummary, 
     WorkflowValidationResponse, WorkflowValidateRequest, WorkflowDuplicateRequest,
@@ -122,6 +124,8 @@ async def update_workflow(
     workflow = await WorkflowService.update(db, workflow_id, project_id, workflow_in)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    # The trigger node or status of an active workflow may have changed
+    await trigger_dispatcher.notify(workflow_id, workflow)
     return workflow
 
 @router.delete("/{workflow_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -133,6 +137,7 @@ async def delete_workflow(
     success = await WorkflowService.delete(db, workflow_id, project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    await trigger_dispatcher.notify(workflow_id)
 
 @router.post("/{workflow_id}/duplicate", response_model=WorkflowInDB)
 async def duplicate_workflow(
@@ -191,6 +196,9 @@ async def publish_workflow(
         )
         
     updated_workflow = await WorkflowService.publish(db, workflow_id, project_id)
+    # Compile the published version now so executions start from a cached plan
+    await plan_cache.compile(updated_workflow)
+    await trigger_dispatcher.notify(workflow_id, updated_workflow)
     return updated_workflow
 
 @router.get("/{workflow_id}/variables", response_model=WorkflowVariablesResponse)
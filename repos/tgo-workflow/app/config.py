@@ -25,6 +25,34 @@ class Settings(BaseSettings):
     
     # Integrations
     AI_SERVICE_URL: str = "http://localhost:8000"
+
+    # Engine
+    WORKFLOW_MAX_CONCURRENCY: int = 8  # Nodes of one workflow run executing at the same time
+    WORKFLOW_PLAN_CACHE_SIZE: int = 512  # Compiled workflow plans kept in process
+    WORKFLOW_PLAN_CACHE_TTL: int = 86400  # Seconds compiled plans are shared via Redis (0 disables)
+    WORKFLOW_FAST_PATH_MAX_CONCURRENT: int = 32  # Async executions run in the API process at once (0 disables)
+    WORKFLOW_FAST_PATH_MAX_NODES: int = 20  # Larger workflows always go to Celery
+    WORKFLOW_FAST_PATH_BUDGET_MS: int = 1000  # Workflows observed to run longer go to Celery
+
+    # Node execution log
+    WORKFLOW_NODE_LOG_BATCH_SIZE: int = 50  # Node results buffered before a batch insert
+    WORKFLOW_NODE_LOG_FLUSH_INTERVAL: float = 2.0  # Max seconds a node result stays buffered
+    WORKFLOW_NODE_LOG_SAMPLE_RATE: float = 1.0  # Fraction of runs storing successful node inputs/outputs
+    WORKFLOW_NODE_LOG_MAX_PAYLOAD_BYTES: int = 65536  # Larger node inputs/outputs are truncated (0 = no limit)
+    WORKFLOW_NODE_LOG_COMPRESS_MIN_BYTES: int = 0  # Node outputs of at least this size are stored compressed (0 = never)
+
+    # Node memoization (nodes with "memoize": true)
+    WORKFLOW_NODE_MEMO_TTL: int = 300  # Default seconds a memoized node result is reused
+    WORKFLOW_NODE_MEMO_SIZE: int = 2048  # Memoized node results kept in process
+    WORKFLOW_NODE_MEMO_SHARED: bool = True  # Share memoized results between processes via Redis
+
+    # Trigger dispatch (event/webhook/timer triggered workflows)
+    WORKFLOW_TRIGGER_DISPATCH_ENABLED: bool = True  # Consume the platform event stream in the API process
+    WORKFLOW_TRIGGER_STREAM: str = "tgo:wf:events"  # Redis stream of platform events
+    WORKFLOW_TRIGGER_GROUP: str = "tgo-workflow"  # Consumer group shared by the API processes
+    WORKFLOW_TRIGGER_BATCH_SIZE: int = 100  # Events read and dispatched together
+    WORKFLOW_TRIGGER_REFRESH_INTERVAL: int = 300  # Seconds between full reloads of the trigger index
+    WORKFLOW_TRIGGER_CLAIM_IDLE_MS: int = 60000  # Unacknowledged events of a stopped consumer are taken over after this
     
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
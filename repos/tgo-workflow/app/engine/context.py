@@ -1,10 +1,28 @@
-import re
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+from collections.abc import Mapping
+
+from app.engine.template import compile_template, compile_value
 
 class ExecutionContext:
-    def __init__(self, initial_inputs: Optional[Dict[str, Any]] = None, project_id: Optional[str] = None):
+    def __init__(
+        self,
+        initial_inputs: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        on_delta: Optional[Callable[[str, str], Awaitable[None]]] = None,
+    ):
         self.data: Dict[str, Any] = initial_inputs or {}
         self.project_id = project_id
+        # Set for streaming executions: receives (node_id, delta) of partial node output
+        self.on_delta = on_delta
+        # reference_key -> {var_name: value}, kept in step with data
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+        for path, value in self.data.items():
+            self._index(path, value)
+
+    def _index(self, path: str, value: Any):
+        reference_key, sep, var_name = path.partition(".")
+        if sep:
+            self._namespaces.setdefault(reference_key, {})[var_name] = value
 
     def get_variable(self, path: str) -> Any:
         """
@@ -18,6 +36,7 @@ class ExecutionContext:
         Set variable value
         """
         self.data[f"{reference_key}.{var_name}"] = value
+        self._namespaces.setdefault(reference_key, {})[var_name] = value
 
     def set_node_outputs(self, reference_key: str, outputs: Dict[str, Any]):
         """
@@ -26,29 +45,59 @@ class ExecutionContext:
         for key, value in outputs.items():
             self.set_variable(reference_key, key, value)
 
-    def resolve_template(self, template: str) -> str:
+    @property
+    def streaming(self) -> bool:
+        return self.on_delta is not None
+
+    async def emit_delta(self, node_id: str, delta: str):
         """
-        Resolve {{reference_key.var_name}} in a string
+        Forward a chunk of a node's output (e.g. LLM tokens) while the node is still running
         """
-        if not template or not isinstance(template, str):
-            return template
+        if self.on_delta is not None and delta:
+            await self.on_delta(node_id, delta)
 
-        def replace(match):
-            path = match.group(1).strip()
-            val = self.get_variable(path)
-            return str(val) if val is not None else match.group(0)
+    @property
+    def names(self) -> "Mapping[str, Any]":
+        """
+        Read-only view of variables by reference key, e.g. names['start_1']['user_input'],
+        for expression evaluation without copying the context
+        """
+        return _ContextNames(self)
 
-        return re.sub(r"\{\{([^}]+)\}\}", replace, template)
+    def resolve_template(self, template: str, typed: bool = False) -> Any:
+        """
+        Resolve {{reference_key.var_name}} in a string.
+        With typed=True a template that is a single reference returns the value itself.
+        """
+        if not template or not isinstance(template, str) or "{{" not in template:
+            return template
+        return compile_template(template).resolve(self.data, typed)
 
-    def resolve_variables(self, value: Any) -> Any:
+    def resolve_variables(self, value: Any, typed: bool = False) -> Any:
         """
         Recursively resolve variables in dicts, lists, or strings
         """
-        if isinstance(value, str):
-            return self.resolve_template(value)
-        elif isinstance(value, list):
-            return [self.resolve_variables(item) for item in value]
-        elif isinstance(value, dict):
-            return {k: self.resolve_variables(v) for k, v in value.items()}
-        return value
+        return compile_value(value).resolve(self.data, typed)
+
+    def resolve_compiled(self, compiled: Any, typed: bool = False) -> Any:
+        """
+        Resolve a value compiled with app.engine.template.compile_value
+        """
+        return compiled.resolve(self.data, typed)
+
+class _ContextNames(Mapping):
+    def __init__(self, context: ExecutionContext):
+        self._context = context
+
+    def __getitem__(self, name: str) -> Any:
+        namespace = self._context._namespaces.get(name)
+        if namespace is not None:
+            return namespace
+        return self._context.data[name]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._context._namespaces
+        yield from (k for k in self._context.data if "." not in k)
 
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
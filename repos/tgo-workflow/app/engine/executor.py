@@ -1,128 +1,203 @@
-from typing import Any, Dict, List, Optional
+from typing import AbstractSet, Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
+import asyncio
 import time
 
+from app.config import settings
 from app.engine.context import ExecutionContext
-from app.engine.graph import WorkflowGraph
-from app.engine.nodes.registry import get_executor_class
-import app.engine.nodes # Import to trigger registration
+from app.engine.nodes.base import BaseNodeExecutor
+from app.engine.plan import CompiledWorkflow, compile_workflow
+from app.services.node_cache import node_cache
 from app.core.logging import logger
 
 class WorkflowExecutor:
-    def __init__(self, workflow_definition: Dict[str, Any], project_id: Optional[str] = None):
-        self.graph = WorkflowGraph(
-            nodes=workflow_definition.get("nodes", []),
-            edges=workflow_definition.get("edges", [])
-        )
+    def __init__(
+        self,
+        workflow_definition: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        plan: Optional[CompiledWorkflow] = None,
+    ):
+        # A cached plan skips compiling the definition on every run
+        self.plan = plan or compile_workflow(workflow_definition or {})
+        self.graph = self.plan.graph
         self.execution_results = {} # node_id -> output
         self.project_id = project_id
+        self.max_concurrency = max(1, max_concurrency or settings.WORKFLOW_MAX_CONCURRENCY)
 
-    async def run(self, inputs: Dict[str, Any], on_node_start=None, on_node_complete=None) -> Dict[str, Any]:
+    async def run(self, inputs: Dict[str, Any], on_node_start=None, on_node_complete=None, on_node_delta=None) -> Dict[str, Any]:
         """
         Run the workflow with given inputs.
+
+        Nodes are scheduled as a DAG: a node becomes ready once every in-edge
+        from a node reachable from the trigger is resolved and at least one of
+        them was taken. Edges not selected by a branching handle, and edges
+        leaving failed or skipped nodes, are pruned. Ready nodes run
+        concurrently, at most max_concurrency at a time.
+
+        Callbacks are awaited one at a time by the scheduler (so they may share
+        a DB session): on_node_start in dispatch order, ready nodes taken in
+        topological order; on_node_complete in completion order, nodes that
+        finish together reported in topological order.
+
         on_node_start: callback(node_id, node_type, node_data, index)
-        on_node_complete: callback(node_id, node_type, status, input, output, error, duration)
+        on_node_complete: callback(node_id, node_type, status, input, output, error, duration, cached)
+            where cached tells that a memoized result was reused instead of running the node
+        on_node_delta: callback(node_id, node_type, delta) for partial output of streaming
+            nodes (LLM tokens); awaited from the running node's task, not by the scheduler
         """
-        # 1. Initialize context
-        # Find trigger nodes
-        trigger_types = {"input", "timer", "webhook", "event"}
-        trigger_node = next((n for n in self.graph.nodes.values() if n["type"] in trigger_types), None)
-        
-        if not trigger_node:
-            # Fallback to any node with 0 in-degree if no explicit trigger node found
-            in_degree = {n_id: len(parents) for n_id, parents in self.graph.rev_adj.items()}
-            start_node_id = next((node_id for node_id, degree in in_degree.items() if degree == 0), None)
-            if start_node_id:
-                trigger_node = self.graph.get_node(start_node_id)
-        
-        if not trigger_node:
+        plan = self.plan
+
+        # 1. Initialize context from the trigger node
+        if not plan.trigger_id:
             raise ValueError("No entry point (trigger node) found in workflow")
-            
+        trigger_node = self.graph.get_node(plan.trigger_id)
+
         ref_key = trigger_node["data"].get("reference_key", trigger_node["type"])
         mapped_inputs = {f"{ref_key}.{k}": v for k, v in inputs.items()}
-        
+
         # Use provided project_id or extract from inputs
         project_id = self.project_id or inputs.get("project_id")
-        context = ExecutionContext(mapped_inputs, project_id=project_id)
-        
-        # 2. Get execution order
-        topo_order = self.graph.get_topo_sort()
-        if not topo_order:
+        on_delta = None
+        if on_node_delta:
+            async def on_delta(node_id: str, delta: str):
+                await on_node_delta(node_id=node_id, node_type=self.graph.get_node(node_id)["type"], delta=delta)
+        context = ExecutionContext(mapped_inputs, project_id=project_id, on_delta=on_delta)
+        # Memoized results are scoped to a stored workflow version
+        memo_scope = (plan.workflow_id, plan.version) if plan.workflow_id else None
+
+        # 2. Execution order
+        if not plan.topo_order:
             return None
-            
-        # 3. Execute nodes in order
-        executed_nodes = set()
+        order = plan.rank
+
+        def rank(node_id: str) -> int:
+            return order.get(node_id, len(order))
+
+        # 3. Track unresolved in-edges
+        pending_edges = dict(plan.in_edges)
+        taken: Set[str] = set() # Nodes with at least one taken in-edge
+        ready: List[str] = [trigger_node["id"]]
+
+        def resolve_out_edges(node_id: str, selected: Optional[AbstractSet[str]]) -> None:
+            """Mark edges to `selected` targets as taken and all other out-edges as pruned."""
+            stack = [(node_id, selected)]
+            while stack:
+                source_id, targets = stack.pop()
+                for target in self.graph.adj[source_id]:
+                    if target not in pending_edges:
+                        continue
+                    if targets is not None and target in targets:
+                        taken.add(target)
+                    pending_edges[target] -= 1
+                    if pending_edges[target] == 0:
+                        if target in taken:
+                            ready.append(target)
+                        else:
+                            # Every in-edge was pruned: skip the node and its subtree
+                            stack.append((target, None))
+
+        # 4. Dispatch ready nodes as their dependencies finish
+        running: Dict[asyncio.Task, str] = {}
         node_index = 1
-        
-        # Simple execution loop following edges
-        curr_node_ids = [n["id"] for n in self.graph.nodes.values() if n["id"] == trigger_node["id"]]
-        
         final_output = None
-        
-        while curr_node_ids:
-            next_node_ids = []
-            for node_id in curr_node_ids:
-                if node_id in executed_nodes:
-                    continue
-                    
-                node = self.graph.get_node(node_id)
-
-                if on_node_start:
-                    await on_node_start(
-                        node_id=node_id,
-                        node_type=node["type"],
-                        node_data=node.get("data", {}),
-                        index=node_index
-                    )
-                node_index += 1
-
-                executor_cls = get_executor_class(node["type"])
-                
-                if not executor_cls:
-                    logger.warning(f"No executor found for node type: {node['type']}")
+
+        try:
+            while ready or running:
+                ready.sort(key=rank)
+                while ready and len(running) < self.max_concurrency:
+                    node_id = ready.pop(0)
+                    node = self.graph.get_node(node_id)
+
+                    if on_node_start:
+                        await on_node_start(
+                            node_id=node_id,
+                            node_type=node["type"],
+                            node_data=node.get("data", {}),
+                            index=node_index
+                        )
+                    node_index += 1
+
+                    node_executor = plan.executors.get(node_id)
+
+                    if not node_executor:
+                        logger.warning(f"No executor found for node type: {node['type']}")
+                        resolve_out_edges(node_id, None)
+                        continue
+
+                    task = asyncio.create_task(self._execute_node(node_executor, context, memo_scope))
+                    running[task] = node_id
+
+                if not running:
                     continue
-                
-                executor = executor_cls(node_id, node)
-                
-                start_time = time.time()
-                status = "completed"
-                error = None
-                outputs = {}
-                next_handle = None
-                
-                try:
-                    outputs, next_handle = await executor.execute_with_timeout(context)
-                    context.set_node_outputs(executor.reference_key, outputs)
-                    
-                    if node["type"] == "answer":
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: rank(running[t])):
+                    node_id = running.pop(task)
+                    node = self.graph.get_node(node_id)
+                    status, outputs, next_handle, error, duration, cached = task.result()
+
+                    if status == "completed" and node["type"] == "answer":
                         final_output = outputs.get("result")
-                        
-                except Exception as e:
-                    status = "failed"
-                    error = str(e)
-                    logger.error(f"Error executing node {node_id}: {e}")
-                
-                duration = int((time.time() - start_time) * 1000)
-                
-                if on_node_complete:
-                    await on_node_complete(
-                        node_id=node_id,
-                        node_type=node["type"],
-                        status=status,
-                        input=node["data"], # Simplified
-                        output=outputs,
-                        error=error,
-                        duration=duration
-                    )
-                
-                executed_nodes.add(node_id)
-                
-                if status == "completed":
-                    # Get next nodes based on handle (for branching)
-                    targets = self.graph.get_next_nodes(node_id, next_handle)
-                    next_node_ids.extend(targets)
-            
-            curr_node_ids = list(set(next_node_ids)) # De-duplicate
-            
+
+                    if on_node_complete:
+                        await on_node_complete(
+                            node_id=node_id,
+                            node_type=node["type"],
+                            status=status,
+                            input=node["data"], # Simplified
+                            output=outputs,
+                            error=error,
+                            duration=duration,
+                            cached=cached
+                        )
+
+                    if status == "completed":
+                        # Get next nodes based on handle (for branching)
+                        resolve_out_edges(node_id, plan.next_nodes(node_id, next_handle))
+                    else:
+                        resolve_out_edges(node_id, None)
+        finally:
+            for task in running:
+                task.cancel()
+
         return final_output
 
+    @staticmethod
+    async def _execute_node(
+        executor: BaseNodeExecutor,
+        context: ExecutionContext,
+        memo_scope: Optional[Tuple[str, int]] = None,
+    ) -> Tuple[str, Dict[str, Any], Optional[str], Optional[str], int, bool]:
+        """Run one node; returns (status, outputs, next_handle, error, duration_ms, cached)."""
+        start_time = time.time()
+        status = "completed"
+        error = None
+        outputs = {}
+        next_handle = None
+        cached = False
+
+        try:
+            memo_key = None
+            ttl = executor.memo_ttl if memo_scope else 0
+            if ttl > 0:
+                memo_inputs = executor.memo_inputs(context)
+                if memo_inputs is not None:
+                    memo_key = node_cache.key(*memo_scope, executor.node_id, memo_inputs)
+
+            hit = await node_cache.get(memo_key) if memo_key else None
+            if hit is not None:
+                outputs, next_handle = hit["outputs"], hit["handle"]
+                cached = True
+            else:
+                outputs, next_handle = await executor.execute_with_timeout(context)
+                if memo_key and executor.memo_cacheable(outputs):
+                    await node_cache.put(memo_key, {"outputs": outputs, "handle": next_handle}, ttl)
+            context.set_node_outputs(executor.reference_key, outputs)
+        except Exception as e:
+            status = "failed"
+            error = str(e)
+            logger.error(f"Error executing node {executor.node_id}: {e}")
+
+        duration = int((time.time() - start_time) * 1000)
+        return status, outputs, next_handle, error, duration, cached
@@ -34,6 +34,19 @@ class WorkflowGraph:
         
         return result
 
+    def get_reachable(self, start_id: str) -> Set[str]:
+        """
+        Get IDs of all nodes reachable from start_id (including start_id)
+        """
+        seen = {start_id}
+        stack = [start_id]
+        while stack:
+            for neighbor in self.adj.get(stack.pop(), []):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return seen
+
     def get_next_nodes(self, node_id: str, handle_id: Optional[str] = None) -> List[str]:
         """
         Get next nodes after a node execution, optionally filtered by handle (for condition/classifier)
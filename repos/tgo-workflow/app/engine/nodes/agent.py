@@ -9,12 +9,8 @@ from app.core.logging import logger
 class AgentNodeExecutor(BaseNodeExecutor):
     async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
         agent_id = self.config.get("agent_id")
-        input_mapping = self.config.get("input_mapping", {})
-        
         # Resolve inputs using mapping
-        resolved_inputs = {}
-        for key, template in input_mapping.items():
-            resolved_inputs[key] = context.resolve_variables(template)
+        resolved_inputs = self.resolve_config(context, "input_mapping", {})
             
         # AI service /api/v1/agents/run expects:
         # { "agent_ids": [agent_id], "message": "...", "project_id": "..." }
@@ -34,6 +30,10 @@ class AgentNodeExecutor(BaseNodeExecutor):
         active_project_id = context.project_id or "00000000-0000-0000-0000-000000000000"
         
         try:
+            on_delta = self.delta_sink(context)
+            if on_delta is not None:
+                return {"text": await self._run_streaming(active_project_id, payload, on_delta)}, None
+
             data = await AIClient.run_agent(active_project_id, payload)
             # SupervisorRunResponse: content
             return {"text": data.get("content", "")}, None
@@ -42,3 +42,32 @@ class AgentNodeExecutor(BaseNodeExecutor):
             logger.error(f"Agent execution failed: {e}")
             raise
 
+
+    @staticmethod
+    async def _run_streaming(project_id: str, payload: Dict[str, Any], on_delta) -> str:
+        """
+        Stream the agent run, forwarding final-answer content deltas; returns the full content
+        """
+        parts = []
+        final_content = None
+        async for event, data in AIClient.run_agent_stream(project_id, payload):
+            if event == "error":
+                raise Exception(f"Agent stream failed: {data.get('message') or data.get('error')}")
+            if event != "event":
+                continue
+
+            event_type = data.get("event_type")
+            event_data = data.get("data") or {}
+            if event_type == "team_run_content":
+                content = event_data.get("content")
+                if content and not event_data.get("is_intermediate"):
+                    parts.append(content)
+                    await on_delta(content)
+            elif event_type == "team_run_completed":
+                final_content = event_data.get("content")
+            elif event_type == "workflow_failed":
+                raise Exception(f"Agent run failed: {event_data.get('error_message')}")
+            elif event_type == "workflow_completed":
+                break
+
+        return final_content if final_content is not None else "".join(parts)
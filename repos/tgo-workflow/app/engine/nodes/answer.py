@@ -14,15 +14,13 @@ class AnswerNodeExecutor(BaseNodeExecutor):
             if var_path:
                 result = context.get_variable(var_path)
         elif output_type == "template":
-            template = self.config.get("output_template", "")
-            result = context.resolve_template(template)
+            result = self.resolve_config(context, "output_template", "")
         elif output_type == "structured":
-            structure = self.config.get("output_structure", [])
+            # Whole-value references keep their type, e.g. {"value": "{{api_1.body}}"}
+            structure = self.resolve_config(context, "output_structure", [], typed=True)
             result = {}
             for field in structure:
-                key = field["key"]
-                value_template = field["value"]
-                result[key] = context.resolve_variables(value_template)
+                result[field["key"]] = field["value"]
                 
         return {"result": result}, None
 
@@ -6,31 +6,64 @@ from app.engine.context import ExecutionContext
 from app.core.logging import logger
 from app.integrations.http_client import get_http_client
 from app.engine.nodes.registry import register_node
+from app.engine.template import compile_json_template
+
+def _compile_json_body(body: Any) -> Any:
+    if isinstance(body, str):
+        return compile_json_template(body)
+    return None
 
 @register_node("api")
 class APINodeExecutor(BaseNodeExecutor):
-    async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
-        method = self.config.get("method", "GET").upper()
-        url = context.resolve_template(self.config.get("url", ""))
-        
-        headers = {h["key"]: context.resolve_template(h["value"]) for h in self.config.get("headers", [])}
-        params = {p["key"]: context.resolve_template(p["value"]) for p in self.config.get("params", [])}
-        
+    def memo_inputs(self, context: ExecutionContext) -> Any:
+        # Only GET requests are treated as free of side effects
+        if self.config.get("method", "GET").upper() != "GET":
+            return None
+        json_data, data = self._resolve_body(context)
+        return {
+            "url": self.resolve_config(context, "url", ""),
+            "headers": self.resolve_config(context, "headers", []),
+            "params": self.resolve_config(context, "params", []),
+            "json": json_data,
+            "data": data,
+        }
+
+    def memo_cacheable(self, outputs: Dict[str, Any]) -> bool:
+        # Error responses are often transient; the next run asks again
+        return outputs.get("status_code", 200) < 400
+
+    def _resolve_body(self, context: ExecutionContext) -> Tuple[Any, Any]:
+        """Resolve the request body; returns (json_data, data)."""
         body_type = self.config.get("body_type", "none")
         data = None
         json_data = None
-        
+
         if body_type == "json":
-            json_body = context.resolve_template(self.config.get("body", "{}"))
-            try:
-                json_data = json.loads(json_body)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON body: {e}")
-                json_data = {}
+            # Parsed once per node; only the parts containing templates are rebuilt per run
+            compiled_body = self.compiled("body", "{}", compiler=_compile_json_body)
+            if compiled_body is not None:
+                json_data = context.resolve_compiled(compiled_body)
+            else:
+                json_body = self.resolve_config(context, "body", "{}")
+                try:
+                    json_data = json.loads(json_body)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse JSON body: {e}")
+                    json_data = {}
         elif body_type == "x-www-form-urlencoded":
-            data = {item["key"]: context.resolve_template(item["value"]) for item in self.config.get("form_url_encoded", [])}
+            data = {item["key"]: item["value"] for item in self.resolve_config(context, "form_url_encoded", [])}
         elif body_type == "raw":
-            data = context.resolve_template(self.config.get("body", ""))
+            data = self.resolve_config(context, "body", "")
+        return json_data, data
+
+    async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
+        method = self.config.get("method", "GET").upper()
+        url = self.resolve_config(context, "url", "")
+        
+        headers = {h["key"]: h["value"] for h in self.resolve_config(context, "headers", [])}
+        params = {p["key"]: p["value"] for p in self.resolve_config(context, "params", [])}
+        
+        json_data, data = self._resolve_body(context)
 
         client = await get_http_client()
         response = await client.request(
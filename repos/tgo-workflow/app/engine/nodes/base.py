@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 import asyncio
+from app.config import settings
 from app.engine.context import ExecutionContext
+from app.engine.template import compile_value
 
 class BaseNodeExecutor(ABC):
     DEFAULT_TIMEOUT = 60 # Default 60 seconds
@@ -11,6 +13,56 @@ class BaseNodeExecutor(ABC):
         self.node_data = node_data
         self.config = node_data.get("data", {})
         self.reference_key = self.config.get("reference_key")
+        self._compiled: Dict[Any, Any] = {}
+
+    def compiled(self, key: str, default: Any = None, compiler: Callable[[Any], Any] = compile_value) -> Any:
+        """
+        config[key] compiled once per node; executors are reused across runs of a workflow plan
+        """
+        cache_key = (key, compiler)
+        if cache_key not in self._compiled:
+            self._compiled[cache_key] = compiler(self.config.get(key, default))
+        return self._compiled[cache_key]
+
+    def delta_sink(self, context: ExecutionContext) -> Optional[Callable[[str], Awaitable[None]]]:
+        """
+        Callback for streaming partial output, or None when the run is not streamed
+        or the node disables it with "stream": false
+        """
+        if not context.streaming or self.config.get("stream") is False:
+            return None
+
+        async def emit(delta: str):
+            await context.emit_delta(self.node_id, delta)
+        return emit
+
+    def resolve_config(self, context: ExecutionContext, key: str, default: Any = None, typed: bool = False) -> Any:
+        """
+        Resolve the templates in config[key] against the context
+        """
+        return context.resolve_compiled(self.compiled(key, default), typed)
+
+    @property
+    def memo_ttl(self) -> int:
+        """
+        Seconds a result is memoized; 0 unless the node opts in with "memoize": true
+        """
+        if not self.config.get("memoize"):
+            return 0
+        return int(self.config.get("memoize_ttl") or settings.WORKFLOW_NODE_MEMO_TTL)
+
+    def memo_inputs(self, context: ExecutionContext) -> Any:
+        """
+        Resolved inputs that fully determine this run's result, for node types
+        that are deterministic given their config; None when it must not be memoized
+        """
+        return None
+
+    def memo_cacheable(self, outputs: Dict[str, Any]) -> bool:
+        """
+        Whether a memoized node's outputs may be stored for later runs
+        """
+        return True
 
     @abstractmethod
     async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
@@ -8,8 +8,11 @@ from app.engine.nodes.registry import register_node
 
 @register_node("classifier")
 class ClassifierNodeExecutor(BaseNodeExecutor):
+    def memo_inputs(self, context: ExecutionContext) -> Any:
+        return self.resolve_config(context, "input_variable", "")
+
     async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
-        input_text = context.resolve_template(self.config.get("input_variable", ""))
+        input_text = self.resolve_config(context, "input_variable", "")
         categories = self.config.get("categories", [])
         
         if not categories:
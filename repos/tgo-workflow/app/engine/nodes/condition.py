@@ -8,6 +8,12 @@ from app.engine.nodes.registry import register_node
 
 @register_node("condition")
 class ConditionNodeExecutor(BaseNodeExecutor):
+    def memo_inputs(self, context: ExecutionContext) -> Any:
+        # Only the LLM evaluation is worth memoizing
+        if self.config.get("condition_type", "variable") != "llm":
+            return None
+        return self.resolve_config(context, "llm_prompt", "")
+
     async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
         condition_type = self.config.get("condition_type", "variable")
         result = False
@@ -15,7 +21,7 @@ class ConditionNodeExecutor(BaseNodeExecutor):
         if condition_type == "variable":
             var_val = context.get_variable(self.config.get("variable", ""))
             operator = self.config.get("operator", "equals")
-            compare_val = context.resolve_variables(self.config.get("compare_value"))
+            compare_val = self.resolve_config(context, "compare_value")
             
             if operator == "equals":
                 result = str(var_val) == str(compare_val)
@@ -33,26 +39,25 @@ class ConditionNodeExecutor(BaseNodeExecutor):
                 result = bool(var_val)
                 
         elif condition_type == "expression":
-            expression = self.config.get("expression", "")
-            resolved_expr = context.resolve_template(expression)
+            resolved_expr = self.resolve_config(context, "expression", "")
             try:
-                # Use simple_eval instead of eval for safety
-                result = simple_eval(resolved_expr, names=context.data)
+                # Use simple_eval instead of eval for safety; names are looked up lazily,
+                # e.g. input['val'] or input.val
+                result = simple_eval(resolved_expr, names=context.names)
             except Exception as e:
                 logger.error(f"Error evaluating expression '{resolved_expr}': {e}")
                 result = False
                 
         elif condition_type == "llm":
-            prompt = self.config.get("llm_prompt", "")
+            prompt = self.resolve_config(context, "llm_prompt", "")
             model = self.config.get("model_id", "gpt-4o")
             provider = self.config.get("provider_id", "openai")
             
-            # Resolve prompt with variables
             full_prompt = f"Given the context, determine if this condition is true: {prompt}. Return only 'true' or 'false'."
             response = await LLMProvider.chat_completion(
                 provider_id=provider,
                 model=model,
-                user_prompt=context.resolve_template(full_prompt),
+                user_prompt=full_prompt,
                 project_id=context.project_id
             )
             result = "true" in response.lower()
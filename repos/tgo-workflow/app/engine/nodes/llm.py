@@ -7,8 +7,8 @@ from app.engine.nodes.registry import register_node
 @register_node("llm")
 class LLMNodeExecutor(BaseNodeExecutor):
     async def execute(self, context: ExecutionContext) -> Tuple[Dict[str, Any], Optional[str]]:
-        user_prompt = context.resolve_template(self.config.get("user_prompt", ""))
-        system_prompt = context.resolve_template(self.config.get("system_prompt", ""))
+        user_prompt = self.resolve_config(context, "user_prompt", "")
+        system_prompt = self.resolve_config(context, "system_prompt", "")
         
         provider = self.config.get("provider_id", "openai")
         model = self.config.get("model_id", "gpt-4o")
@@ -27,7 +27,8 @@ class LLMNodeExecutor(BaseNodeExecutor):
             project_id=context.project_id,
             tool_ids=tool_ids,
             collection_ids=collection_ids,
-            max_tool_rounds=max_tool_rounds
+            max_tool_rounds=max_tool_rounds,
+            on_delta=self.delta_sink(context)
         )
         
         return {"text": response}, None
@@ -12,12 +12,8 @@ class ToolNodeExecutor(BaseNodeExecutor):
         if not tool_id:
             return {}, "Missing tool_id in node configuration"
             
-        input_mapping = self.config.get("input_mapping", {})
-        
-        # Resolve inputs using mapping
-        resolved_inputs = {}
-        for key, template in input_mapping.items():
-            resolved_inputs[key] = context.resolve_variables(template)
+        # Resolve inputs using mapping; whole-value references keep their type
+        resolved_inputs = self.resolve_config(context, "input_mapping", {}, typed=True)
             
         active_project_id = context.project_id or "00000000-0000-0000-0000-000000000000"
         
@@ -0,0 +1,135 @@
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from app.engine.template import compile_value
+from app.engine.graph import WorkflowGraph
+from app.engine.nodes.base import BaseNodeExecutor
+from app.engine.nodes.registry import get_executor_class
+import app.engine.nodes # Import to trigger registration
+
+TRIGGER_TYPES = {"input", "timer", "webhook", "event"}
+
+_NO_TARGETS: FrozenSet[str] = frozenset()
+
+class CompiledWorkflow:
+    """
+    Execution plan of one workflow version.
+
+    Holds everything WorkflowExecutor derives from a definition (graph, topological
+    ranks, trigger node, in-edge counts, branch targets, executor classes and the
+    variable slots of each node's templates) so it is computed once per version
+    instead of once per run.
+    """
+
+    def __init__(
+        self,
+        definition: Dict[str, Any],
+        topo_order: List[str],
+        trigger_id: Optional[str],
+        template_slots: Dict[str, Tuple[str, ...]],
+        workflow_id: Optional[str] = None,
+        version: Optional[int] = None,
+        graph: Optional[WorkflowGraph] = None,
+    ):
+        self.workflow_id = workflow_id
+        self.version = version
+        self.definition = definition
+        self.graph = graph or WorkflowGraph(
+            nodes=definition.get("nodes", []),
+            edges=definition.get("edges", [])
+        )
+        self.topo_order = topo_order
+        self.rank = {node_id: i for i, node_id in enumerate(topo_order)}
+        self.trigger_id = trigger_id
+        self.template_slots = template_slots
+
+        # Parents the trigger cannot reach never run, so they are not counted
+        self.reachable: Set[str] = self.graph.get_reachable(trigger_id) if trigger_id else set()
+        self.in_edges = {
+            node_id: sum(1 for parent in self.graph.rev_adj[node_id] if parent in self.reachable)
+            for node_id in self.reachable
+        }
+        self.executor_classes = {
+            node_id: get_executor_class(node["type"]) for node_id, node in self.graph.nodes.items()
+        }
+        # Executors only read their config, so one instance per node serves every run
+        # and keeps its compiled templates
+        self.executors: Dict[str, BaseNodeExecutor] = {
+            node_id: cls(node_id, self.graph.nodes[node_id])
+            for node_id, cls in self.executor_classes.items() if cls
+        }
+        self.successors = {node_id: frozenset(targets) for node_id, targets in self.graph.adj.items()}
+        self.branches: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        for node_id, edges in self.graph.out_edges.items():
+            handles: Dict[str, Set[str]] = {}
+            for edge in edges:
+                if edge.get("sourceHandle"):
+                    handles.setdefault(edge["sourceHandle"], set()).add(edge["target"])
+            self.branches[node_id] = {handle: frozenset(targets) for handle, targets in handles.items()}
+
+    def next_nodes(self, node_id: str, handle_id: Optional[str] = None) -> FrozenSet[str]:
+        """
+        Targets taken after a node completes, optionally filtered by handle (same as WorkflowGraph.get_next_nodes)
+        """
+        if handle_id:
+            return self.branches[node_id].get(handle_id, _NO_TARGETS)
+        return self.successors[node_id]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "version": self.version,
+            "definition": self.definition,
+            "topo_order": self.topo_order,
+            "trigger_id": self.trigger_id,
+            "template_slots": {node_id: list(slots) for node_id, slots in self.template_slots.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompiledWorkflow":
+        return cls(
+            definition=data["definition"],
+            topo_order=data["topo_order"],
+            trigger_id=data["trigger_id"],
+            template_slots={node_id: tuple(slots) for node_id, slots in data["template_slots"].items()},
+            workflow_id=data.get("workflow_id"),
+            version=data.get("version"),
+        )
+
+def _find_trigger(graph: WorkflowGraph) -> Optional[str]:
+    trigger_node = next((n for n in graph.nodes.values() if n["type"] in TRIGGER_TYPES), None)
+    if trigger_node:
+        return trigger_node["id"]
+    # Fallback to any node with 0 in-degree if no explicit trigger node found
+    return next((node_id for node_id, parents in graph.rev_adj.items() if not parents), None)
+
+def compile_workflow(
+    definition: Dict[str, Any],
+    workflow_id: Optional[str] = None,
+    version: Optional[int] = None,
+) -> CompiledWorkflow:
+    """
+    Compile a workflow definition into an execution plan.
+    Raises ValueError for cyclic graphs: nodes on or behind a cycle could never run.
+    """
+    graph = WorkflowGraph(
+        nodes=definition.get("nodes", []),
+        edges=definition.get("edges", [])
+    )
+    topo_order = graph.get_topo_sort()
+    if len(topo_order) < len(graph.nodes):
+        unordered = sorted(set(graph.nodes) - set(topo_order))
+        raise ValueError(f"Workflow contains circular dependencies (nodes: {', '.join(unordered)})")
+    # Pre-parses every template string of each node config
+    template_slots = {
+        node_id: compile_value(node.get("data", {})).slots for node_id, node in graph.nodes.items()
+    }
+
+    return CompiledWorkflow(
+        definition=definition,
+        topo_order=topo_order,
+        trigger_id=_find_trigger(graph),
+        template_slots=template_slots,
+        workflow_id=workflow_id,
+        version=version,
+        graph=graph,
+    )
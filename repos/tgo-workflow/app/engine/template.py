@@ -0,0 +1,161 @@
+"""
+Compiled {{reference_key.var_name}} templates.
+
+A template string is parsed once into literal and slot segments; resolving it
+is then a list join with one dict lookup per slot. Node configs (dicts/lists)
+compile into resolvers that only rebuild the parts containing templates and
+return template-free subtrees as-is instead of copying them.
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+_TEMPLATE_PATTERN = re.compile(r"\{\{([^}]+)\}\}")
+
+# Marks a bare (unquoted) slot of a JSON template after it has been quoted for parsing
+_JSON_SLOT_MARK = "\x00slot:"
+
+class Template:
+    """A template string compiled into literal and slot segments"""
+
+    __slots__ = ("source", "segments", "slots", "whole_path")
+
+    def __init__(self, source: str):
+        self.source = source
+        # (raw text, variable path) pairs; path is None for literal text
+        segments: List[Tuple[str, Optional[str]]] = []
+        pos = 0
+        for match in _TEMPLATE_PATTERN.finditer(source):
+            if match.start() > pos:
+                segments.append((source[pos:match.start()], None))
+            segments.append((match.group(0), match.group(1).strip()))
+            pos = match.end()
+        if pos < len(source):
+            segments.append((source[pos:], None))
+        self.segments = tuple(segments)
+        self.slots = tuple(dict.fromkeys(path for _, path in segments if path is not None))
+        # Set when the whole template is a single reference like "{{llm_1.text}}"
+        self.whole_path = segments[0][1] if len(segments) == 1 else None
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """Substitute every slot with str(value); unresolved slots are kept verbatim"""
+        if not self.slots:
+            return self.source
+        parts = []
+        for raw, path in self.segments:
+            if path is None:
+                parts.append(raw)
+            else:
+                val = data.get(path)
+                parts.append(str(val) if val is not None else raw)
+        return "".join(parts)
+
+    def resolve(self, data: Dict[str, Any], typed: bool = False) -> Any:
+        """Like render, but with typed=True a whole-value reference returns the value itself"""
+        if typed and self.whole_path is not None:
+            val = data.get(self.whole_path)
+            return val if val is not None else self.source
+        return self.render(data)
+
+class _Static:
+    __slots__ = ("value",)
+    slots: Tuple[str, ...] = ()
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def resolve(self, data: Dict[str, Any], typed: bool = False) -> Any:
+        return self.value
+
+class _Slot:
+    """A bare slot of a JSON template: always substituted with the typed value"""
+    __slots__ = ("template", "slots")
+
+    def __init__(self, template: Template):
+        self.template = template
+        self.slots = template.slots
+
+    def resolve(self, data: Dict[str, Any], typed: bool = False) -> Any:
+        return self.template.resolve(data, typed=True)
+
+class _CompiledDict:
+    __slots__ = ("items", "slots")
+
+    def __init__(self, items: List[Tuple[Any, Any]]):
+        self.items = items
+        self.slots = tuple(dict.fromkeys(s for k, v in items for s in k.slots + v.slots))
+
+    def resolve(self, data: Dict[str, Any], typed: bool = False) -> Dict[Any, Any]:
+        return {k.resolve(data): v.resolve(data, typed) for k, v in self.items}
+
+class _CompiledList:
+    __slots__ = ("items", "slots")
+
+    def __init__(self, items: List[Any]):
+        self.items = items
+        self.slots = tuple(dict.fromkeys(s for item in items for s in item.slots))
+
+    def resolve(self, data: Dict[str, Any], typed: bool = False) -> List[Any]:
+        return [item.resolve(data, typed) for item in self.items]
+
+@lru_cache(maxsize=4096)
+def compile_template(template: str) -> Template:
+    return Template(template)
+
+def compile_value(value: Any, _json_slots: bool = False) -> Any:
+    """
+    Compile the templates in a config value (str, dict, list or scalar) into a
+    resolver with resolve(data, typed) and the referenced variable paths in .slots
+    """
+    if isinstance(value, str):
+        if _json_slots and value.startswith(_JSON_SLOT_MARK):
+            return _Slot(compile_template(value[len(_JSON_SLOT_MARK):]))
+        if "{{" in value:
+            return compile_template(value)
+        return _Static(value)
+    if isinstance(value, dict):
+        items = [(compile_value(k, _json_slots), compile_value(v, _json_slots)) for k, v in value.items()]
+        if all(isinstance(k, _Static) and isinstance(v, _Static) for k, v in items):
+            return _Static(value)
+        return _CompiledDict(items)
+    if isinstance(value, list):
+        items = [compile_value(item, _json_slots) for item in value]
+        if all(isinstance(item, _Static) for item in items):
+            return _Static(value)
+        return _CompiledList(items)
+    return _Static(value)
+
+def compile_json_template(template: str) -> Optional[Any]:
+    """
+    Compile a JSON document containing templates (e.g. an API request body).
+
+    Slots inside JSON strings are rendered as text; bare slots such as
+    {"count": {{input.count}}} are substituted with the typed value, so the
+    result is always valid JSON data. Returns None when the template is not
+    JSON once its bare slots are quoted (e.g. it builds the structure itself).
+    """
+    parts = []
+    in_string = False
+    escaped = False
+    pos = 0
+    for match in _TEMPLATE_PATTERN.finditer(template):
+        for ch in template[pos:match.start()]:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = in_string
+            elif ch == '"':
+                in_string = not in_string
+        parts.append(template[pos:match.start()])
+        if in_string:
+            parts.append(match.group(0))
+        else:
+            parts.append(json.dumps(_JSON_SLOT_MARK + match.group(0)))
+        pos = match.end()
+    parts.append(template[pos:])
+    try:
+        document = json.loads("".join(parts))
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return compile_value(document, _json_slots=True)
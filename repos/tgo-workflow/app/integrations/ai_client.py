@@ -1,5 +1,6 @@
 import httpx
-from typing import Optional, List, Dict, Any
+import json
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from app.config import settings
 from app.core.logging import logger
 from app.integrations.http_client import HttpClient
@@ -35,6 +36,79 @@ class AIClient:
             logger.error(f"AI Service chat completions failed: {e}")
             raise
 
+    @staticmethod
+    async def chat_completions_stream(
+        project_id: str,
+        payload: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Call AI service chat completions endpoint with stream=true.
+        Yields each chunk (OpenAI chat.completion.chunk or TGO-AI tool_call/tool_result events).
+        """
+        url = f"{settings.AI_SERVICE_URL}/api/v1/chat/completions"
+        async for _, data in AIClient._stream_sse(url, project_id, {**payload, "stream": True}, timeout=60.0):
+            if data == "[DONE]":
+                return
+            yield json.loads(data)
+
+    @staticmethod
+    async def run_agent_stream(
+        project_id: str,
+        payload: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Call AI service agents run endpoint with stream=true.
+        Yields (event, data); domain events are ("event", StreamingEvent JSON).
+        """
+        url = f"{settings.AI_SERVICE_URL}/api/v1/agents/run"
+        async for event, data in AIClient._stream_sse(url, project_id, {**payload, "stream": True}, timeout=120.0):
+            yield event, json.loads(data)
+            if event == "disconnected":
+                return
+
+    @staticmethod
+    async def _stream_sse(
+        url: str,
+        project_id: str,
+        payload: Dict[str, Any],
+        timeout: float
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        POST and yield (event name, data) of each SSE message.
+        The read timeout applies between chunks, not to the whole stream.
+        """
+        try:
+            client = await HttpClient.get_client()
+            async with client.stream(
+                "POST",
+                url,
+                json=payload,
+                params={"project_id": project_id},
+                headers={"Accept": "text/event-stream"},
+                timeout=httpx.Timeout(timeout, connect=10.0)
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    logger.error(f"AI Service stream error: {response.status_code} - {body.decode(errors='replace')}")
+                    raise Exception(f"AI Service stream failed with status {response.status_code}")
+
+                event = "message"
+                data_lines: List[str] = []
+                async for line in response.aiter_lines():
+                    if not line:
+                        if data_lines:
+                            yield event, "\n".join(data_lines)
+                        event, data_lines = "message", []
+                    elif line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data_lines.append(line[5:].lstrip())
+                if data_lines:
+                    yield event, "\n".join(data_lines)
+        except Exception as e:
+            logger.error(f"AI Service stream failed: {e}")
+            raise
+
     @staticmethod
     async def run_agent(
         project_id: str,
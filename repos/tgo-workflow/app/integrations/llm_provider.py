@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable
 from app.config import settings
 from app.core.logging import logger
 from app.integrations.ai_client import AIClient
@@ -15,8 +15,13 @@ class LLMProvider:
         project_id: Optional[str] = None,
         tool_ids: Optional[List[str]] = None,
         collection_ids: Optional[List[str]] = None,
-        max_tool_rounds: int = 5
+        max_tool_rounds: int = 5,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> str:
+        """
+        Run a chat completion through the AI service and return the full response text.
+        With on_delta the completion is streamed and each content delta is passed to it as it arrives.
+        """
         logger.info(f"LLM Chat Completion via AI Service: provider_id={provider_id} model={model}")
         
         # Use a default project_id if not provided
@@ -33,7 +38,7 @@ class LLMProvider:
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "stream": False,
+            "stream": on_delta is not None,
             "max_tool_rounds": max_tool_rounds
         }
 
@@ -43,6 +48,8 @@ class LLMProvider:
             payload["collection_ids"] = collection_ids
         
         try:
+            if on_delta is not None:
+                return await LLMProvider._stream_completion(active_project_id, payload, on_delta)
             data = await AIClient.chat_completions(active_project_id, payload)
             # OpenAI compatible response format: choices[0].message.content
             return data["choices"][0]["message"]["content"]
@@ -51,3 +58,23 @@ class LLMProvider:
             logger.error(f"LLM Chat Completion failed: {e}")
             raise
 
+
+    @staticmethod
+    async def _stream_completion(
+        project_id: str,
+        payload: Dict[str, Any],
+        on_delta: Callable[[str], Awaitable[None]]
+    ) -> str:
+        parts: List[str] = []
+        async for chunk in AIClient.chat_completions_stream(project_id, payload):
+            if chunk.get("error"):
+                raise Exception(f"LLM stream failed: {chunk['error'].get('message')}")
+            if chunk.get("object") != "chat.completion.chunk":
+                # TGO-AI tool_call / tool_result progress events
+                continue
+            for choice in chunk.get("choices") or []:
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    parts.append(content)
+                    await on_delta(content)
+        return "".join(parts)
@@ -4,13 +4,23 @@ from contextlib import asynccontextmanager
 from app.config import settings
 from app.api import workflows, executions
 from app.integrations.http_client import HttpClient
+from app.services.plan_cache import plan_cache
+from app.services.node_cache import node_cache
+from app.services.fast_path import fast_path
+from app.services.trigger_dispatcher import trigger_dispatcher
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    if settings.WORKFLOW_TRIGGER_DISPATCH_ENABLED:
+        trigger_dispatcher.start()
     yield
     # Shutdown
+    await trigger_dispatcher.stop()
+    await fast_path.shutdown()
     await HttpClient.close_client()
+    await plan_cache.close()
+    await node_cache.close()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -1,10 +1,12 @@
-from sqlalchemy import String, JSON, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import String, JSON, Integer, DateTime, ForeignKey, Text, LargeBinary, Boolean, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 from typing import Optional, List
 from app.database import Base
+import json
 import uuid
+import zlib
 
 class WorkflowExecution(Base):
     __tablename__ = "wf_workflow_executions"
@@ -34,11 +36,19 @@ class NodeExecution(Base):
     status: Mapped[str] = mapped_column(String, default="pending")
     input: Mapped[Optional[dict]] = mapped_column(JSON)
     output: Mapped[Optional[dict]] = mapped_column(JSON)
+    output_compressed: Mapped[Optional[bytes]] = mapped_column(LargeBinary)  # zlib-compressed JSON of large outputs
     error: Mapped[Optional[str]] = mapped_column(Text)
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     duration: Mapped[Optional[int]] = mapped_column(Integer)
+    cached: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())  # Memoized result reused
 
     # Relationships
     workflow_execution: Mapped["WorkflowExecution"] = relationship(back_populates="node_executions")
 
+    @property
+    def output_data(self) -> Optional[dict]:
+        """Node output, decompressed if it was stored compressed"""
+        if self.output_compressed is not None:
+            return json.loads(zlib.decompress(self.output_compressed))
+        return self.output
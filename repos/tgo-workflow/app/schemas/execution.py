@@ -1,4 +1,4 @@
-from pydantic import BaseModel, JsonValue, Field
+from pydantic import AliasChoices, BaseModel, JsonValue, Field
 from typing import List, Optional, Dict, Literal
 from datetime import datetime
 from enum import Enum
@@ -15,6 +15,7 @@ class ExecutionStatus(str, Enum):
 class SSEEventType(str, Enum):
     WORKFLOW_STARTED = "workflow_started"
     NODE_STARTED = "node_started"
+    NODE_DELTA = "node_delta"
     NODE_FINISHED = "node_finished"
     WORKFLOW_FINISHED = "workflow_finished"
 
@@ -46,6 +47,15 @@ class NodeStartedEvent(SSEEventBase):
     event: Literal["node_started"] = Field("node_started")
     data: NodeStartedData
 
+class NodeDeltaData(BaseModel):
+    node_id: str = Field(..., description="Node ID in workflow")
+    node_type: str = Field(..., description="Node type")
+    delta: str = Field(..., description="Next chunk of the node's text output (e.g. LLM tokens)")
+
+class NodeDeltaEvent(SSEEventBase):
+    event: Literal["node_delta"] = Field("node_delta")
+    data: NodeDeltaData
+
 class NodeFinishedData(BaseModel):
     id: str = Field(..., description="Node execution record ID")
     node_id: str = Field(..., description="Node ID in workflow")
@@ -55,6 +65,7 @@ class NodeFinishedData(BaseModel):
     status: str = Field(..., description="Execution status (succeeded | failed)")
     error: Optional[str] = Field(None, description="Execution error message")
     elapsed_time: float = Field(..., description="Execution duration in seconds")
+    cached: bool = Field(False, description="Whether a memoized result was reused instead of running the node")
     finished_at: int = Field(..., description="Completion timestamp")
 
 class NodeFinishedEvent(SSEEventBase):
@@ -88,9 +99,14 @@ class NodeExecutionBase(BaseModel):
     started_at: datetime = Field(..., description="Node execution start time")
     completed_at: Optional[datetime] = Field(None, description="Node execution completion time")
     duration: Optional[int] = Field(None, description="Execution duration in milliseconds")
+    cached: bool = Field(False, description="Whether a memoized result was reused instead of running the node")
 
 class NodeExecution(NodeExecutionBase):
     id: str = Field(..., description="Unique identifier for the node execution record")
+    # Read from the ORM's output_data so compressed outputs are returned decompressed
+    output: Optional[JsonValue] = Field(
+        None, validation_alias=AliasChoices("output_data", "output"), description="Output results for the node"
+    )
     execution_id: str = Field(..., description="The ID of the parent workflow execution record")
 
     class Config:
@@ -138,3 +154,11 @@ class WorkflowExecutionCancelResponse(BaseModel):
     id: str = Field(..., description="Execution ID")
     status: ExecutionStatus = Field(..., description="Current status")
     cancelled_at: datetime = Field(..., description="Cancellation time")
+
+class WorkflowEventRequest(BaseModel):
+    trigger: Literal["event", "webhook", "timer"] = Field("event", description="Trigger node type the event is for")
+    name: str = Field(..., description="Event type (event), path (webhook) or cron expression (timer) workflows subscribe to")
+    data: Optional[JsonValue] = Field(None, description="Event payload passed to the trigger node")
+
+class WorkflowEventResponse(BaseModel):
+    execution_ids: List[str] = Field(..., description="IDs of the pending executions started for the event")
@@ -5,6 +5,10 @@ class BaseNodeData(BaseModel):
     label: str = Field(..., description="The display name of the node")
     reference_key: str = Field(..., description="The unique reference key of the node, used to identify it in variable references")
 
+class MemoizableNodeData(BaseNodeData):
+    memoize: bool = Field(False, description="Reuse the result of an earlier run with the same resolved inputs")
+    memoize_ttl: Optional[int] = Field(None, description="Seconds a memoized result is reused (defaults to WORKFLOW_NODE_MEMO_TTL)")
+
 class InputVariable(BaseModel):
     name: str = Field(..., description="The name of the variable")
     type: Literal["string", "number", "boolean"] = Field(..., description="The type of the variable")
@@ -72,7 +76,7 @@ class FormField(BaseModel):
     value: str = Field(..., description="Field value")
     type: Literal["text", "file"] = Field("text", description="Field type")
 
-class APINodeData(BaseNodeData):
+class APINodeData(MemoizableNodeData):
     type: Literal["api"] = Field("api", description="Node type: api")
     method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"] = Field(..., description="HTTP method")
     url: str = Field(..., description="Request URL")
@@ -84,7 +88,7 @@ class APINodeData(BaseNodeData):
     form_url_encoded: List[KeyValue] = Field([], description="URL-encoded form data")
     raw_type: Optional[Literal["text", "html", "xml", "javascript"]] = Field(None, description="Raw text type")
 
-class ConditionNodeData(BaseNodeData):
+class ConditionNodeData(MemoizableNodeData):
     type: Literal["condition"] = Field("condition", description="Node type: condition")
     condition_type: Literal["expression", "variable", "llm"] = Field(..., description="Condition evaluation type")
     expression: Optional[str] = Field(None, description="Python expression")
@@ -100,7 +104,7 @@ class Category(BaseModel):
     name: str = Field(..., description="Category name")
     description: str = Field(..., description="Category description")
 
-class ClassifierNodeData(BaseNodeData):
+class ClassifierNodeData(MemoizableNodeData):
     type: Literal["classifier"] = Field("classifier", description="Node type: classifier")
     input_variable: str = Field(..., description="Input variable path to classify")
     provider_id: Optional[str] = Field(None, description="LLM provider ID")
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import random
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.core.logging import logger
+from app.database import AsyncSessionLocal
+from app.models.execution import NodeExecution
+
+RowWriter = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+def encode_payload(value: Any, max_bytes: int, compress_min_bytes: int) -> Tuple[Any, Optional[bytes]]:
+    """
+    Apply the storage policy to a node input/output.
+
+    Returns (json value, compressed bytes). Payloads larger than max_bytes (0 = no
+    limit) are replaced by a truncated preview; payloads of at least
+    compress_min_bytes (0 = never) are returned as zlib-compressed JSON instead.
+    """
+    if value is None or (max_bytes <= 0 and compress_min_bytes <= 0):
+        return value, None
+
+    text = json.dumps(value, default=str, ensure_ascii=False)
+    size = len(text.encode())
+    if max_bytes > 0 and size > max_bytes:
+        value = {"truncated": True, "size": size, "preview": text[:max_bytes]}
+        text = json.dumps(value, ensure_ascii=False)
+        size = len(text.encode())
+    if compress_min_bytes > 0 and size >= compress_min_bytes:
+        return None, zlib.compress(text.encode())
+    return value, None
+
+async def _insert_rows(rows: List[Dict[str, Any]]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(NodeExecution), rows)
+        await db.commit()
+
+class NodeExecutionLog:
+    """
+    Write-behind log of the node results of one workflow run.
+
+    record() only buffers a row, so persistence no longer adds to workflow
+    latency. Buffered rows are inserted in one statement, in the background,
+    once WORKFLOW_NODE_LOG_BATCH_SIZE rows have accumulated or, at the latest,
+    WORKFLOW_NODE_LOG_FLUSH_INTERVAL seconds after the oldest buffered row was
+    recorded; short runs are written once by close(). Writes
+    use their own session, so they never interleave with the caller's.
+    """
+
+    def __init__(self, execution_id: str, project_id: str, writer: Optional[RowWriter] = None):
+        self.execution_id = execution_id
+        self.project_id = project_id
+        self._writer = writer or _insert_rows
+        self._rows: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Sampling is per run so a sampled run keeps every node's payloads
+        self.sampled = random.random() < settings.WORKFLOW_NODE_LOG_SAMPLE_RATE
+
+    def record(
+        self,
+        node_id: str,
+        node_type: str,
+        status: str,
+        input: Any,
+        output: Any,
+        error: Optional[str],
+        duration: Optional[int],
+        cached: bool = False,
+    ) -> str:
+        """
+        Buffer a node result; returns the id of its NodeExecution row
+        """
+        # Failed nodes always keep their payloads for debugging
+        keep_payloads = self.sampled or status != "completed"
+        max_bytes = settings.WORKFLOW_NODE_LOG_MAX_PAYLOAD_BYTES
+        stored_input, _ = encode_payload(input if keep_payloads else None, max_bytes, 0)
+        stored_output, output_compressed = encode_payload(
+            output if keep_payloads else None, max_bytes, settings.WORKFLOW_NODE_LOG_COMPRESS_MIN_BYTES
+        )
+
+        completed_at = datetime.utcnow()
+        row_id = str(uuid.uuid4())
+        self._rows.append({
+            "id": row_id,
+            "execution_id": self.execution_id,
+            "project_id": self.project_id,
+            "node_id": node_id,
+            "node_type": node_type,
+            "status": status,
+            "input": stored_input,
+            "output": stored_output,
+            "output_compressed": output_compressed,
+            "error": error,
+            "duration": duration,
+            "cached": cached,
+            "started_at": completed_at - timedelta(milliseconds=duration or 0),
+            "completed_at": completed_at,
+        })
+
+        if len(self._rows) >= settings.WORKFLOW_NODE_LOG_BATCH_SIZE:
+            self._flush()
+        elif self._timer is None:
+            # Armed by the oldest buffered row, so a slow node cannot hold the rest back
+            self._timer = asyncio.get_running_loop().call_later(
+                settings.WORKFLOW_NODE_LOG_FLUSH_INTERVAL, self._flush
+            )
+        return row_id
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        task = asyncio.create_task(self._write(rows))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await self._writer(rows)
+        except Exception as e:
+            # The run itself is unaffected; only its node log is incomplete
+            logger.error(f"Failed to persist {len(rows)} node executions of {self.execution_id}: {e}")
+
+    async def close(self) -> None:
+        """
+        Write the remaining rows and wait for pending writes (call at run end)
+        """
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.execution import WorkflowExecution
+from app.models.workflow import Workflow
+from celery_app.tasks import async_execute_workflow
+from app.core.logging import logger
+from app.engine.plan import CompiledWorkflow
+
+# Weight of the latest run in a workflow version's duration estimate
+_EWMA_ALPHA = 0.3
+# Completed runs read to seed the estimate of a version without history
+_SAMPLE_SIZE = 20
+# Seconds between sample lookups for a version that still has no completed run
+_SAMPLE_RETRY_SECONDS = 60
+
+class FastPathDispatcher:
+    """
+    Runs short asynchronous executions inside the API process instead of Celery.
+
+    A workflow version qualifies when it has at most WORKFLOW_FAST_PATH_MAX_NODES
+    nodes, is not timer-triggered and its observed duration (moving average of
+    its previous runs) fits WORKFLOW_FAST_PATH_BUDGET_MS. Versions without
+    history go to Celery until a sample exists: the durations of the version's
+    completed runs are loaded in the background, so a version only runs in
+    process once it has been seen to fit the budget. One slow in-process run
+    is enough to route the following runs to Celery. At most
+    WORKFLOW_FAST_PATH_MAX_CONCURRENT runs execute in process at a time;
+    further runs go to Celery instead of queueing.
+    """
+
+    def __init__(self, max_concurrent: int, max_nodes: int, budget_ms: int, max_tracked: int):
+        self._max_concurrent = max_concurrent
+        self._max_nodes = max_nodes
+        self._budget_ms = budget_ms
+        self._max_tracked = max(1, max_tracked)
+        self._durations: "OrderedDict[Tuple[Optional[str], Optional[int]], float]" = OrderedDict()
+        self._running: Dict[str, asyncio.Task] = {}
+        # (workflow_id, version) -> time of the last sample lookup
+        self._sampled: "OrderedDict[Tuple[Optional[str], Optional[int]], float]" = OrderedDict()
+        # Sample lookups in flight; referenced here so they are not garbage collected
+        self._sampling: Set[asyncio.Task] = set()
+
+    @property
+    def active(self) -> int:
+        return len(self._running)
+
+    def estimate_ms(self, plan: CompiledWorkflow) -> Optional[float]:
+        return self._durations.get((plan.workflow_id, plan.version))
+
+    def record_duration(self, plan: CompiledWorkflow, duration_ms: float) -> None:
+        key = (plan.workflow_id, plan.version)
+        previous = self._durations.get(key)
+        estimate = duration_ms if previous is None else previous + _EWMA_ALPHA * (duration_ms - previous)
+        self._durations[key] = estimate
+        self._durations.move_to_end(key)
+        while len(self._durations) > self._max_tracked:
+            self._durations.popitem(last=False)
+
+    def eligible(self, plan: CompiledWorkflow) -> bool:
+        if self._max_concurrent <= 0 or len(plan.graph.nodes) > self._max_nodes:
+            return False
+        trigger = plan.graph.get_node(plan.trigger_id) if plan.trigger_id else None
+        if trigger is None or trigger["type"] == "timer":
+            return False
+        estimate = self.estimate_ms(plan)
+        return estimate is not None and estimate <= self._budget_ms
+
+    def try_submit(self, plan: CompiledWorkflow, execution_id: str, inputs: dict, project_id: str) -> bool:
+        """
+        Start the execution in process if the workflow qualifies and a slot is free.
+        Returns False when the caller should dispatch it to Celery.
+        """
+        if self.estimate_ms(plan) is None:
+            self._request_sample(plan)
+        if not self.eligible(plan) or len(self._running) >= self._max_concurrent:
+            return False
+        task = asyncio.create_task(self._run(plan, execution_id, inputs, project_id))
+        self._running[execution_id] = task
+        task.add_done_callback(lambda _: self._running.pop(execution_id, None))
+        return True
+
+    async def _run(self, plan: CompiledWorkflow, execution_id: str, inputs: dict, project_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await async_execute_workflow(execution_id, plan.workflow_id, inputs, project_id)
+        except Exception as e:
+            logger.error(f"In-process workflow execution failed: {execution_id} error={e}")
+        # Not recorded for cancelled runs
+        self.record_duration(plan, (loop.time() - start) * 1000)
+
+    def _request_sample(self, plan: CompiledWorkflow) -> None:
+        if plan.workflow_id is None:
+            return
+        key = (plan.workflow_id, plan.version)
+        now = time.monotonic()
+        last = self._sampled.get(key)
+        if last is not None and now - last < _SAMPLE_RETRY_SECONDS:
+            return
+        self._sampled[key] = now
+        self._sampled.move_to_end(key)
+        while len(self._sampled) > self._max_tracked:
+            self._sampled.popitem(last=False)
+        task = asyncio.create_task(self._load_sample(plan))
+        self._sampling.add(task)
+        task.add_done_callback(self._sampling.discard)
+
+    async def _load_sample(self, plan: CompiledWorkflow) -> None:
+        """
+        Seed the estimate from the version's completed runs (mostly Celery ones).
+        Runs since the workflow was last updated belong to the current version.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                since = select(Workflow.updated_at).where(Workflow.id == plan.workflow_id).scalar_subquery()
+                result = await db.execute(
+                    select(WorkflowExecution.duration)
+                    .where(
+                        WorkflowExecution.workflow_id == plan.workflow_id,
+                        WorkflowExecution.status == "completed",
+                        WorkflowExecution.duration.is_not(None),
+                        WorkflowExecution.started_at >= since,
+                    )
+                    .order_by(WorkflowExecution.started_at.desc())
+                    .limit(_SAMPLE_SIZE)
+                )
+                durations = result.scalars().all()
+        except Exception as e:
+            logger.warning(f"Failed to load run durations of workflow {plan.workflow_id}: {e}")
+            return
+        if self.estimate_ms(plan) is None:
+            # Oldest first, so the latest runs weigh most
+            for duration in reversed(durations):
+                self.record_duration(plan, duration)
+
+    def cancel(self, execution_id: str) -> bool:
+        task = self._running.get(execution_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def shutdown(self) -> None:
+        """
+        Wait for in-process runs (application shutdown)
+        """
+        if self._running:
+            logger.info(f"Waiting for {len(self._running)} in-process workflow executions")
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+fast_path = FastPathDispatcher(
+    max_concurrent=settings.WORKFLOW_FAST_PATH_MAX_CONCURRENT,
+    max_nodes=settings.WORKFLOW_FAST_PATH_MAX_NODES,
+    budget_ms=settings.WORKFLOW_FAST_PATH_BUDGET_MS,
+    max_tracked=settings.WORKFLOW_PLAN_CACHE_SIZE,
+)
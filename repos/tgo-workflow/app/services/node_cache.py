@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.logging import logger
+
+KEY_PREFIX = "tgo:wf:memo:"
+
+class NodeResultCache:
+    """
+    Memoized results of deterministic nodes (see BaseNodeExecutor.memo_inputs).
+
+    Keys combine the workflow id and version, the node id and a hash of the
+    node's resolved inputs; the node config itself is fixed per version, and
+    a new version gets new keys, so entries never need invalidation. Results
+    are kept in a bounded in-process LRU and, when shared, in Redis with the
+    same TTL so other API processes and Celery workers reuse them.
+    """
+
+    def __init__(self, max_size: int, redis_url: Optional[str] = None):
+        # key -> (expires_at, {"outputs": ..., "handle": ...})
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._max_size = max(1, max_size)
+        self._redis_url = redis_url
+        self._redis = None
+        self._redis_loop = None
+
+    @staticmethod
+    def key(workflow_id: str, version: int, node_id: str, inputs: Any) -> str:
+        payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"{workflow_id}:{version}:{node_id}:{digest}"
+
+    def _get_redis(self):
+        """Redis client bound to the running loop (Celery tasks each run in a new loop)"""
+        if not self._redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # Imported lazily: only needed when the Redis layer is enabled
+            import redis.asyncio as redis_asyncio
+
+            self._redis = redis_asyncio.from_url(self._redis_url)
+            self._redis_loop = loop
+        return self._redis
+
+    def _remember(self, key: str, expires_at: float, result: Dict[str, Any]) -> None:
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                return result
+            del self._entries[key]
+
+        redis = self._get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Failed to read node result from Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        self._remember(key, entry["expires_at"], entry["result"])
+        return entry["result"]
+
+    async def put(self, key: str, result: Dict[str, Any], ttl_seconds: int) -> None:
+        if ttl_seconds <= 0:
+            return
+        expires_at = time.time() + ttl_seconds
+        self._remember(key, expires_at, result)
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            entry = json.dumps({"expires_at": expires_at, "result": result}, default=str)
+            await redis.set(KEY_PREFIX + key, entry, ex=ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to store node result in Redis: {e}")
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+node_cache = NodeResultCache(
+    max_size=settings.WORKFLOW_NODE_MEMO_SIZE,
+    redis_url=settings.REDIS_URL if settings.WORKFLOW_NODE_MEMO_SHARED else None,
+)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logging import logger
+from app.engine.plan import CompiledWorkflow, compile_workflow
+from app.models.workflow import Workflow
+from app.services.workflow_service import WorkflowService
+
+KEY_PREFIX = "tgo:wf:plan:"
+
+class WorkflowPlanCache:
+    """
+    Compiled workflow plans keyed by (workflow id, version).
+
+    Plans are kept in a bounded in-process LRU and, when a TTL is set, in Redis
+    so other API processes and Celery workers can skip compiling. A new version
+    gets a new key, so entries never need invalidation.
+    """
+
+    def __init__(self, max_size: int, redis_url: Optional[str] = None, ttl_seconds: int = 0):
+        self._plans: "OrderedDict[Tuple[str, int], CompiledWorkflow]" = OrderedDict()
+        self._max_size = max(1, max_size)
+        self._redis_url = redis_url if ttl_seconds > 0 else None
+        self._ttl = ttl_seconds
+        self._redis = None
+        self._redis_loop = None
+
+    @staticmethod
+    def _key(workflow_id: str, version: int) -> str:
+        return f"{KEY_PREFIX}{workflow_id}:{version}"
+
+    def _get_redis(self):
+        """Redis client bound to the running loop (Celery tasks each run in a new loop)"""
+        if not self._redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # Imported lazily: only needed when the Redis layer is enabled
+            import redis.asyncio as redis_asyncio
+
+            self._redis = redis_asyncio.from_url(self._redis_url)
+            self._redis_loop = loop
+        return self._redis
+
+    def _remember(self, plan: CompiledWorkflow) -> None:
+        key = (plan.workflow_id, plan.version)
+        self._plans[key] = plan
+        self._plans.move_to_end(key)
+        while len(self._plans) > self._max_size:
+            self._plans.popitem(last=False)
+
+    async def get(self, workflow_id: str, version: int) -> Optional[CompiledWorkflow]:
+        plan = self._plans.get((workflow_id, version))
+        if plan is not None:
+            self._plans.move_to_end((workflow_id, version))
+            return plan
+
+        redis = self._get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self._key(workflow_id, version))
+        except Exception as e:
+            logger.warning(f"Failed to read workflow plan from Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        plan = CompiledWorkflow.from_dict(json.loads(raw))
+        self._remember(plan)
+        return plan
+
+    async def put(self, plan: CompiledWorkflow) -> None:
+        self._remember(plan)
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self._key(plan.workflow_id, plan.version), json.dumps(plan.to_dict()), ex=self._ttl)
+        except Exception as e:
+            logger.warning(f"Failed to store workflow plan in Redis: {e}")
+
+    async def compile(self, workflow: Workflow) -> CompiledWorkflow:
+        """
+        Compile a workflow's current version and cache the plan (called at publish time)
+        """
+        plan = compile_workflow(workflow.definition, workflow_id=workflow.id, version=workflow.version)
+        await self.put(plan)
+        return plan
+
+    async def get_plan(self, db: AsyncSession, workflow_id: str, project_id: str) -> Optional[CompiledWorkflow]:
+        """
+        Plan of a workflow's current version; only loads the definition on a cache miss
+        """
+        result = await db.execute(
+            select(Workflow.version).where(Workflow.id == workflow_id, Workflow.project_id == project_id)
+        )
+        version = result.scalar_one_or_none()
+        if version is None:
+            return None
+
+        plan = await self.get(workflow_id, version)
+        if plan is not None:
+            return plan
+
+        workflow = await WorkflowService.get_by_id(db, workflow_id, project_id)
+        if not workflow:
+            return None
+        return await self.compile(workflow)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+plan_cache = WorkflowPlanCache(
+    max_size=settings.WORKFLOW_PLAN_CACHE_SIZE,
+    redis_url=settings.REDIS_URL,
+    ttl_seconds=settings.WORKFLOW_PLAN_CACHE_TTL,
+)
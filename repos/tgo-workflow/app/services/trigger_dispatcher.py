@@ -0,0 +1,374 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.core.logging import logger
+from app.database import AsyncSessionLocal
+from app.engine.plan import TRIGGER_TYPES, CompiledWorkflow
+from app.models.execution import WorkflowExecution
+from app.models.workflow import Workflow
+from app.services.fast_path import fast_path
+from app.services.plan_cache import plan_cache
+from celery_app.tasks import execute_workflow_task
+
+# Trigger node field a workflow subscribes by, per trigger type
+SUBSCRIPTION_FIELDS = {"event": "event_type", "webhook": "path", "timer": "cron_expression"}
+
+# Index key: (project id, trigger type, event type / webhook path / cron expression)
+SubscriptionKey = Tuple[str, str, str]
+
+def get_subscription(definition: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    (trigger type, name) a workflow definition subscribes to, or None when it is
+    started with inputs (input trigger) rather than by an event
+    """
+    # Same trigger node as the compiled plan: the first node of a trigger type
+    trigger = next((n for n in definition.get("nodes", []) if n.get("type") in TRIGGER_TYPES), None)
+    if trigger is None or trigger["type"] not in SUBSCRIPTION_FIELDS:
+        return None
+    name = trigger.get("data", {}).get(SUBSCRIPTION_FIELDS[trigger["type"]]) or ""
+    return trigger["type"], name
+
+class TriggerEvent:
+    """A platform event: starts every active workflow of the project subscribed to (trigger, name)"""
+
+    __slots__ = ("project_id", "trigger", "name", "data")
+
+    def __init__(self, project_id: str, trigger: str, name: str, data: Any = None):
+        self.project_id = project_id
+        self.trigger = trigger
+        self.name = name
+        self.data = data
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, str]) -> "TriggerEvent":
+        """Parse a Redis stream entry: project_id, trigger (default "event"), name and JSON data"""
+        data = fields.get("data")
+        return cls(
+            project_id=fields["project_id"],
+            trigger=fields.get("trigger") or "event",
+            name=fields.get("name") or "",
+            data=json.loads(data) if data else None,
+        )
+
+    def inputs(self) -> Dict[str, Any]:
+        """Run inputs, exposed as variables of the trigger node (e.g. {{event.data}})"""
+        if self.trigger == "event":
+            return {"event_type": self.name, "data": self.data}
+        return self.data if isinstance(self.data, dict) else {"data": self.data}
+
+class TriggerIndex:
+    """Active workflows by subscription key"""
+
+    def __init__(self):
+        self._workflows: Dict[SubscriptionKey, Set[str]] = {}
+        self._keys: Dict[str, SubscriptionKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, workflow_id: str, key: Optional[SubscriptionKey]) -> None:
+        """Subscribe a workflow to key, or unsubscribe it with None"""
+        self.remove(workflow_id)
+        if key is not None:
+            self._workflows.setdefault(key, set()).add(workflow_id)
+            self._keys[workflow_id] = key
+
+    def remove(self, workflow_id: str) -> None:
+        key = self._keys.pop(workflow_id, None)
+        if key is not None:
+            subscribers = self._workflows[key]
+            subscribers.discard(workflow_id)
+            if not subscribers:
+                del self._workflows[key]
+
+    def replace(self, entries: Iterable[Tuple[str, SubscriptionKey]]) -> None:
+        workflows: Dict[SubscriptionKey, Set[str]] = {}
+        keys: Dict[str, SubscriptionKey] = {}
+        for workflow_id, key in entries:
+            workflows.setdefault(key, set()).add(workflow_id)
+            keys[workflow_id] = key
+        self._workflows, self._keys = workflows, keys
+
+    def match(self, project_id: str, trigger: str, name: str) -> List[str]:
+        return sorted(self._workflows.get((project_id, trigger, name), ()))
+
+def subscription_key(workflow: Workflow) -> Optional[SubscriptionKey]:
+    if workflow.status != "active":
+        return None
+    subscription = get_subscription(workflow.definition)
+    return (workflow.project_id, *subscription) if subscription else None
+
+class TriggerDispatcher:
+    """
+    Starts event-triggered workflows.
+
+    Keeps an in-memory index of active workflows by (project, trigger type,
+    event type / webhook path / cron expression), so one event fans out to
+    every subscribed workflow without a per-workflow call from the producer.
+    The index is loaded from the database, updated when a workflow is
+    published, updated or deleted (in every process, via Redis pub/sub) and
+    fully reloaded every WORKFLOW_TRIGGER_REFRESH_INTERVAL seconds.
+
+    Events are consumed from the WORKFLOW_TRIGGER_STREAM Redis stream through
+    a consumer group, so each API process takes a share of them. Each batch of
+    up to WORKFLOW_TRIGGER_BATCH_SIZE events costs one version query, one
+    insert of all its execution records and one XACK; runs then start like
+    async executions (fast path, else Celery). Entries a stopped consumer
+    left unacknowledged are claimed after WORKFLOW_TRIGGER_CLAIM_IDLE_MS.
+    Producers add entries with fields project_id, trigger (default "event"),
+    name and data (JSON), preferably with XADD MAXLEN to bound the stream.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        stream: str,
+        group: str,
+        batch_size: int,
+        refresh_interval: int,
+        claim_idle_ms: int,
+    ):
+        self.index = TriggerIndex()
+        self._redis_url = redis_url
+        self._stream = stream
+        self._group = group
+        self._channel = f"{stream}:index"
+        self._batch_size = max(1, batch_size)
+        self._refresh_interval = refresh_interval
+        self._claim_idle_ms = claim_idle_ms
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+        self._redis = None
+        self._redis_loop = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _get_redis(self):
+        """Redis client bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            import redis.asyncio as redis_asyncio
+
+            self._redis = redis_asyncio.from_url(self._redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    # --- Index ---
+
+    async def load_index(self) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Workflow.id, Workflow.project_id, Workflow.definition).where(Workflow.status == "active")
+            )
+            entries = []
+            for workflow_id, project_id, definition in result:
+                subscription = get_subscription(definition)
+                if subscription:
+                    entries.append((workflow_id, (project_id, *subscription)))
+        self.index.replace(entries)
+        self._loaded_at = time.monotonic()
+        logger.info(f"Trigger index loaded: {len(self.index)} event-triggered workflows")
+
+    async def ensure_index(self) -> None:
+        """Load the index on first use and reload it once it is older than the refresh interval"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._refresh_interval:
+            return
+        async with self._load_lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self._refresh_interval:
+                await self.load_index()
+
+    async def notify(self, workflow_id: str, workflow: Optional[Workflow] = None) -> None:
+        """
+        Re-index a workflow after it was published or updated, or drop it when
+        it was deleted (workflow=None), here and in the other processes
+        """
+        key = subscription_key(workflow) if workflow is not None else None
+        self.index.set(workflow_id, key)
+        try:
+            await self._get_redis().publish(self._channel, json.dumps({"workflow_id": workflow_id, "key": key}))
+        except Exception as e:
+            # Other processes pick the change up at their next full reload
+            logger.warning(f"Failed to publish trigger index update for {workflow_id}: {e}")
+
+    async def _listen_updates(self) -> None:
+        while True:
+            try:
+                pubsub = self._get_redis().pubsub()
+                await pubsub.subscribe(self._channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    update = json.loads(message["data"])
+                    key = update["key"]
+                    self.index.set(update["workflow_id"], tuple(key) if key else None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Trigger index update listener failed, retrying: {e}")
+                await asyncio.sleep(1)
+
+    # --- Dispatch ---
+
+    async def _load_plans(self, db, workflow_ids: List[str]) -> Dict[str, CompiledWorkflow]:
+        """Plans of the workflows that are still active; definitions are only loaded on cache misses"""
+        result = await db.execute(
+            select(Workflow.id, Workflow.version).where(Workflow.id.in_(workflow_ids), Workflow.status == "active")
+        )
+        plans: Dict[str, CompiledWorkflow] = {}
+        missing = []
+        for workflow_id, version in result:
+            plan = await plan_cache.get(workflow_id, version)
+            if plan is None:
+                missing.append(workflow_id)
+            else:
+                plans[workflow_id] = plan
+        if missing:
+            workflows = await db.execute(select(Workflow).where(Workflow.id.in_(missing)))
+            for workflow in workflows.scalars():
+                try:
+                    plans[workflow.id] = await plan_cache.compile(workflow)
+                except ValueError as e:
+                    logger.warning(f"Skipping trigger of workflow {workflow.id}: {e}")
+        return plans
+
+    async def dispatch(self, events: List[TriggerEvent]) -> List[str]:
+        """
+        Start every workflow subscribed to each event; returns the execution ids
+        """
+        await self.ensure_index()
+        runs = [
+            (workflow_id, event)
+            for event in events
+            for workflow_id in self.index.match(event.project_id, event.trigger, event.name)
+        ]
+        if not runs:
+            return []
+
+        async with AsyncSessionLocal() as db:
+            plans = await self._load_plans(db, sorted({workflow_id for workflow_id, _ in runs}))
+            started_at = datetime.utcnow()
+            executions = [
+                WorkflowExecution(
+                    id=str(uuid.uuid4()),
+                    project_id=event.project_id,
+                    workflow_id=workflow_id,
+                    status="pending",
+                    input=event.inputs(),
+                    started_at=started_at,
+                )
+                for workflow_id, event in runs
+                if workflow_id in plans
+            ]
+            db.add_all(executions)
+            await db.commit()
+
+        failed: Dict[str, str] = {}
+        for execution in executions:
+            plan = plans[execution.workflow_id]
+            try:
+                if not fast_path.try_submit(plan, execution.id, execution.input, execution.project_id):
+                    execute_workflow_task.apply_async(
+                        args=(execution.id, execution.workflow_id, execution.input),
+                        kwargs={"project_id": execution.project_id},
+                        task_id=execution.id,
+                    )
+            except Exception as e:
+                # The events are still acknowledged: redelivering them would start
+                # the executions that were submitted a second time
+                logger.error(f"Failed to submit execution {execution.id} of workflow {execution.workflow_id}: {e}")
+                failed[execution.id] = f"Failed to submit execution: {e}"
+        if failed:
+            await self._mark_failed(failed)
+        logger.info(f"Dispatched {len(executions) - len(failed)} workflow executions for {len(events)} events")
+        return [execution.id for execution in executions if execution.id not in failed]
+
+    async def _mark_failed(self, errors: Dict[str, str]) -> None:
+        """Fail executions that were created but could not be submitted"""
+        try:
+            async with AsyncSessionLocal() as db:
+                completed_at = datetime.utcnow()
+                for execution_id, error in errors.items():
+                    await db.execute(
+                        update(WorkflowExecution)
+                        .where(WorkflowExecution.id == execution_id)
+                        .values(status="failed", error=error, completed_at=completed_at)
+                    )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to mark {len(errors)} unsubmitted executions as failed: {e}")
+
+    async def _dispatch_entries(self, entries: List[Tuple[str, Dict[str, str]]]) -> None:
+        events = []
+        for entry_id, fields in entries:
+            try:
+                events.append(TriggerEvent.from_fields(fields))
+            except (KeyError, ValueError) as e:
+                logger.error(f"Dropping malformed trigger event {entry_id}: {e}")
+        if events:
+            await self.dispatch(events)
+        await self._get_redis().xack(self._stream, self._group, *(entry_id for entry_id, _ in entries))
+
+    async def _consume(self) -> None:
+        redis = self._get_redis()
+        try:
+            await redis.xgroup_create(self._stream, self._group, id="$", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        claimed_at = 0.0
+        while True:
+            try:
+                if time.monotonic() - claimed_at >= self._refresh_interval:
+                    # Entries read by a consumer that stopped before acknowledging them
+                    claimed_at = time.monotonic()
+                    _, stale, *_ = await redis.xautoclaim(
+                        self._stream, self._group, self._consumer, self._claim_idle_ms, count=self._batch_size
+                    )
+                    if stale:
+                        await self._dispatch_entries(stale)
+                response = await redis.xreadgroup(
+                    self._group, self._consumer, {self._stream: ">"}, count=self._batch_size, block=1000
+                )
+                for _, entries in response or ():
+                    await self._dispatch_entries(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Unacknowledged entries are claimed again once idle
+                logger.error(f"Trigger event consumer failed, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Start consuming the event stream (application startup)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._listen_updates()), asyncio.create_task(self._consume())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+trigger_dispatcher = TriggerDispatcher(
+    redis_url=settings.REDIS_URL,
+    stream=settings.WORKFLOW_TRIGGER_STREAM,
+    group=settings.WORKFLOW_TRIGGER_GROUP,
+    batch_size=settings.WORKFLOW_TRIGGER_BATCH_SIZE,
+    refresh_interval=settings.WORKFLOW_TRIGGER_REFRESH_INTERVAL,
+    claim_idle_ms=settings.WORKFLOW_TRIGGER_CLAIM_IDLE_MS,
+)
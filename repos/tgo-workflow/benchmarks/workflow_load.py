@@ -0,0 +1,262 @@
+"""
+Load test: executor throughput, scheduling overhead and end-to-end latency.
+
+Generates synthetic workflows and runs them through WorkflowExecutor with many
+runs in flight. LLM and API nodes execute their real code; the shared HTTP
+client is replaced by a mock transport that answers tgo-ai chat completions
+and remote API calls after a configurable latency, so no external service is
+needed.
+
+Shapes:
+  fan_out   input -> WIDTH parallel LLM/API nodes -> answer join
+  chain     DEPTH sequential LLM/API nodes, each referencing the previous one
+  diamond   DEPTH stages of WIDTH parallel nodes joined by an LLM node
+  payload   DEPTH chained API POSTs passing a PAYLOAD_ITEMS JSON document along
+            (the other shapes' API calls return a small document)
+
+Reported per shape: runs/s, p50/p99/mean end-to-end latency, the mocked
+critical path (latency floor), engine CPU time per node and latency above
+the critical path per node.
+
+    python -m benchmarks.workflow_load [--shape all] [--runs 200] [--concurrency 20]
+        [--width 16] [--depth 10] [--payload-items 1000]
+        [--llm-latency-ms 20] [--api-latency-ms 10] [--distinct-inputs 10]
+        [--compile-per-run] [--memoize] [--json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from app.core.logging import logger
+from app.engine import executor as executor_module
+from app.engine.executor import WorkflowExecutor
+from app.engine.plan import compile_workflow
+from app.integrations.http_client import HttpClient
+from app.services.node_cache import NodeResultCache
+
+SHAPES = ("fan_out", "chain", "diamond", "payload")
+
+def _input_node() -> Dict[str, Any]:
+    return {
+        "id": "input",
+        "type": "input",
+        "data": {"reference_key": "input", "input_variables": [{"name": "q", "type": "string"}]},
+    }
+
+def _answer_node(refs: List[str]) -> Dict[str, Any]:
+    template = " ".join(f"{{{{{ref}}}}}" for ref in refs)
+    return {"id": "answer", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": template}}
+
+def _llm_node(node_id: str, prompt: str) -> Dict[str, Any]:
+    return {"id": node_id, "type": "llm", "data": {"reference_key": node_id, "user_prompt": prompt}}
+
+def _api_node(node_id: str, memoize: bool, body: str = None) -> Dict[str, Any]:
+    data = {
+        "reference_key": node_id,
+        "method": "POST" if body else "GET",
+        "url": f"https://api.bench.local/{node_id}",
+        "headers": [{"key": "X-Query", "value": "{{input.q}}"}],
+        "params": [{"key": "q", "value": "{{input.q}}"}],
+        "body_type": "json" if body else "none",
+        "memoize": memoize,
+    }
+    if body:
+        data["body"] = body
+    return {"id": node_id, "type": "api", "data": data}
+
+def _ref(node: Dict[str, Any]) -> str:
+    return f"{node['id']}.text" if node["type"] == "llm" else f"{node['id']}.status_code"
+
+def _worker(node_id: str, index: int, upstream: str, memoize: bool) -> Dict[str, Any]:
+    """Alternate LLM and API nodes"""
+    if index % 2 == 0:
+        return _llm_node(node_id, f"Answer {{{{input.q}}}} using {{{{{upstream}}}}}")
+    return _api_node(node_id, memoize)
+
+def build_fan_out(width: int, depth: int, memoize: bool) -> Dict[str, Any]:
+    workers = [_worker(f"w{i}", i, "input.q", memoize) for i in range(width)]
+    edges = [{"source": "input", "target": w["id"]} for w in workers]
+    edges += [{"source": w["id"], "target": "answer"} for w in workers]
+    return {"nodes": [_input_node(), *workers, _answer_node([_ref(w) for w in workers])], "edges": edges}
+
+def build_chain(width: int, depth: int, memoize: bool) -> Dict[str, Any]:
+    nodes, edges = [_input_node()], []
+    previous, upstream = "input", "input.q"
+    for i in range(depth):
+        node = _worker(f"c{i}", i, upstream, memoize)
+        nodes.append(node)
+        edges.append({"source": previous, "target": node["id"]})
+        previous, upstream = node["id"], _ref(node)
+    nodes.append(_answer_node([upstream]))
+    edges.append({"source": previous, "target": "answer"})
+    return {"nodes": nodes, "edges": edges}
+
+def build_diamond(width: int, depth: int, memoize: bool) -> Dict[str, Any]:
+    nodes, edges = [_input_node()], []
+    previous, upstream = "input", "input.q"
+    for stage in range(depth):
+        branches = [_worker(f"d{stage}_{i}", i, upstream, memoize) for i in range(width)]
+        join = _llm_node(f"j{stage}", "Merge: " + " | ".join(f"{{{{{_ref(b)}}}}}" for b in branches))
+        nodes += [*branches, join]
+        edges += [{"source": previous, "target": b["id"]} for b in branches]
+        edges += [{"source": b["id"], "target": join["id"]} for b in branches]
+        previous, upstream = join["id"], _ref(join)
+    nodes.append(_answer_node([upstream]))
+    edges.append({"source": previous, "target": "answer"})
+    return {"nodes": nodes, "edges": edges}
+
+def build_payload(width: int, depth: int, memoize: bool) -> Dict[str, Any]:
+    nodes, edges = [_input_node()], []
+    previous = None
+    for i in range(depth):
+        # Bare slot: the previous response body is passed on as typed JSON
+        body = f'{{"q": "{{{{input.q}}}}", "previous": {{{{{previous}.body}}}}}}' if previous else '{"q": "{{input.q}}"}'
+        node = _api_node(f"p{i}", memoize=False, body=body)
+        nodes.append(node)
+        edges.append({"source": previous or "input", "target": node["id"]})
+        previous = node["id"]
+    nodes.append(_answer_node([f"{previous}.status_code"]))
+    edges.append({"source": previous, "target": "answer"})
+    return {"nodes": nodes, "edges": edges}
+
+BUILDERS: Dict[str, Callable[[int, int, bool], Dict[str, Any]]] = {
+    "fan_out": build_fan_out,
+    "chain": build_chain,
+    "diamond": build_diamond,
+    "payload": build_payload,
+}
+
+def mock_transport(llm_latency: float, api_latency: float, payload_items: int) -> httpx.MockTransport:
+    """Answers tgo-ai chat completions as LLM calls and everything else as remote API calls"""
+    completion = json.dumps({"choices": [{"message": {"role": "assistant", "content": "mock answer"}}]}).encode()
+    api_body = json.dumps({
+        "items": [{"id": i, "title": f"Item {i}", "tags": ["a", "b"], "price": i * 1.5} for i in range(payload_items)],
+    }).encode()
+    headers = {"content-type": "application/json"}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/chat/completions"):
+            await asyncio.sleep(llm_latency)
+            return httpx.Response(200, content=completion, headers=headers)
+        await asyncio.sleep(api_latency)
+        return httpx.Response(200, content=api_body, headers=headers)
+
+    return httpx.MockTransport(handler)
+
+def critical_path(definition: Dict[str, Any], llm_latency: float, api_latency: float) -> float:
+    """Sum of mocked latencies along the slowest path: the floor of a run's latency"""
+    latency = {"llm": llm_latency, "api": api_latency}
+    plan = compile_workflow(definition)
+    parents: Dict[str, List[str]] = {}
+    for edge in definition["edges"]:
+        parents.setdefault(edge["target"], []).append(edge["source"])
+    finish: Dict[str, float] = {}
+    for node_id in plan.topo_order:
+        node_type = plan.graph.get_node(node_id)["type"]
+        start = max((finish[p] for p in parents.get(node_id, ()) if p in finish), default=0.0)
+        finish[node_id] = start + latency.get(node_type, 0.0)
+    return max(finish.values(), default=0.0)
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def run_shape(shape: str, args: argparse.Namespace) -> Dict[str, Any]:
+    HttpClient._client = httpx.AsyncClient(transport=mock_transport(
+        args.llm_latency_ms / 1000,
+        args.api_latency_ms / 1000,
+        args.payload_items if shape == "payload" else 1,
+    ))
+    definition = BUILDERS[shape](args.width, args.depth, args.memoize)
+    node_count = len(definition["nodes"])
+    plan = compile_workflow(definition, workflow_id=f"bench-{shape}", version=1)
+    floor_ms = critical_path(definition, args.llm_latency_ms / 1000, args.api_latency_ms / 1000) * 1000
+
+    async def run_once(i: int) -> float:
+        run_plan = compile_workflow(definition, workflow_id=plan.workflow_id, version=1) if args.compile_per_run else plan
+        start = time.perf_counter()
+        await WorkflowExecutor(plan=run_plan).run({"q": f"query {i % args.distinct_inputs}"})
+        return (time.perf_counter() - start) * 1000
+
+    for i in range(min(args.concurrency, args.runs)):
+        await run_once(i)  # warm up connection pool, compiled templates and the memo cache
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i: int) -> float:
+        async with semaphore:
+            return await run_once(i)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(bounded(i) for i in range(args.runs))))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    mean_ms = sum(latencies) / len(latencies)
+    return {
+        "shape": shape,
+        "nodes": node_count,
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "runs_per_s": args.runs / wall,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": mean_ms,
+        "critical_path_ms": floor_ms,
+        "cpu_us_per_node": cpu / (args.runs * node_count) * 1e6,
+        "overhead_us_per_node": max(0.0, mean_ms - floor_ms) / node_count * 1000,
+    }
+
+def _print(result: Dict[str, Any]) -> None:
+    print(f"{result['shape']}: {result['nodes']} nodes, {result['runs']} runs, {result['concurrency']} in flight")
+    print(f"  throughput                {result['runs_per_s']:10.1f} runs/s")
+    print(f"  latency p50 / p99 / mean  {result['p50_ms']:8.1f} / {result['p99_ms']:.1f} / {result['mean_ms']:.1f} ms")
+    print(f"  mocked critical path      {result['critical_path_ms']:10.1f} ms")
+    print(f"  engine CPU per node       {result['cpu_us_per_node']:10.1f} us")
+    print(f"  latency over path / node  {result['overhead_us_per_node']:10.1f} us")
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    # Keep memoized results in process; the benchmark must not depend on Redis
+    executor_module.node_cache = NodeResultCache(max_size=65536)
+    shapes = SHAPES if args.shape == "all" else (args.shape,)
+    results = []
+    try:
+        for shape in shapes:
+            result = await run_shape(shape, args)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                _print(result)
+            results.append(result)
+            await HttpClient.close_client()
+    finally:
+        await HttpClient.close_client()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", choices=("all", *SHAPES), default="all")
+    parser.add_argument("--runs", type=int, default=200, help="measured workflow runs per shape")
+    parser.add_argument("--concurrency", type=int, default=20, help="workflow runs in flight")
+    parser.add_argument("--width", type=int, default=16, help="parallel nodes of fan_out/diamond")
+    parser.add_argument("--depth", type=int, default=10, help="sequential nodes/stages of chain/diamond/payload")
+    parser.add_argument("--payload-items", type=int, default=1000, help="items in each API response of the payload shape")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    parser.add_argument("--api-latency-ms", type=float, default=10.0)
+    parser.add_argument("--distinct-inputs", type=int, default=10, help="distinct run inputs (memo cache keys)")
+    parser.add_argument("--compile-per-run", action="store_true", help="compile the workflow on every run instead of once")
+    parser.add_argument("--memoize", action="store_true", help="memoize the API GET nodes")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per shape")
+    args = parser.parse_args()
+    if min(args.runs, args.concurrency, args.width, args.depth, args.distinct_inputs) < 1:
+        parser.error("--runs, --concurrency, --width, --depth and --distinct-inputs must be at least 1")
+
+    logger.setLevel(logging.WARNING)  # node and client info logs would dominate the measurement
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,42 @@
 import asyncio
+from celery.signals import worker_process_shutdown
 from celery_app.celery import celery_app
-from app.database import AsyncSessionLocal
-from app.services.workflow_service import WorkflowService
-from app.models.execution import WorkflowExecution, NodeExecution
+from app.database import AsyncSessionLocal, engine
+from app.services.plan_cache import plan_cache
+from app.services.node_cache import node_cache
+from app.models.execution import WorkflowExecution
+from app.services.execution_log import NodeExecutionLog
 from app.engine.executor import WorkflowExecutor
+from app.integrations.http_client import HttpClient
 from datetime import datetime
 from sqlalchemy import update
 import time
 from app.core.logging import logger
-import asyncio
+
+# One event loop per worker process, reused by every task so DB connections,
+# the HTTP client and cached Redis clients survive between runs
+_worker_loop = None
+
+def run_in_worker_loop(coro):
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs):
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    try:
+        _worker_loop.run_until_complete(HttpClient.close_client())
+        _worker_loop.run_until_complete(plan_cache.close())
+        _worker_loop.run_until_complete(node_cache.close())
+        _worker_loop.run_until_complete(engine.dispose())
+    finally:
+        _worker_loop.close()
+        _worker_loop = None
 
 @celery_app.task(
     name="execute_workflow_task",
@@ -19,7 +47,7 @@ import asyncio
 )
 def execute_workflow_task(self, execution_id: str, workflow_id: str, inputs: dict, project_id: str):
     try:
-        return asyncio.run(async_execute_workflow(execution_id, workflow_id, inputs, project_id))
+        return run_in_worker_loop(async_execute_workflow(execution_id, workflow_id, inputs, project_id))
     except Exception as exc:
         logger.error(f"Task failed, retrying: {exc}")
         raise self.retry(exc=exc)
@@ -27,8 +55,19 @@ def execute_workflow_task(self, execution_id: str, workflow_id: str, inputs: dic
 async def async_execute_workflow(execution_id: str, workflow_id: str, inputs: dict, project_id: str):
     async with AsyncSessionLocal() as db:
         # 1. Fetch workflow and execution
-        workflow = await WorkflowService.get_by_id(db, workflow_id, project_id)
-        if not workflow:
+        try:
+            plan = await plan_cache.get_plan(db, workflow_id, project_id)
+        except ValueError as e:
+            # Not executable (e.g. cyclic graph): retrying cannot help
+            logger.error(f"Workflow {workflow_id} cannot be compiled: {e}")
+            await db.execute(
+                update(WorkflowExecution)
+                .where(WorkflowExecution.id == execution_id, WorkflowExecution.project_id == project_id)
+                .values(status="failed", error=str(e), completed_at=datetime.utcnow())
+            )
+            await db.commit()
+            return
+        if not plan:
             logger.error(f"Workflow {workflow_id} not found for project {project_id}")
             return
             
@@ -40,30 +79,22 @@ async def async_execute_workflow(execution_id: str, workflow_id: str, inputs: di
         )
         await db.commit()
         
-        executor = WorkflowExecutor(workflow.definition, project_id=project_id)
+        executor = WorkflowExecutor(plan=plan, project_id=project_id)
         
+        node_log = NodeExecutionLog(execution_id, project_id)
         start_time = time.time()
         
-        async def on_node_complete(node_id, node_type, status, input, output, error, duration):
-            logger.info(f"Node complete: {node_id} ({node_type}) status={status} duration={duration}ms")
-            node_exec = NodeExecution(
-                execution_id=execution_id,
-                project_id=project_id,
-                node_id=node_id,
-                node_type=node_type,
-                status=status,
-                input=input,
-                output=output,
-                error=error,
-                duration=duration,
-                started_at=datetime.utcnow() # Simplified
-            )
-            db.add(node_exec)
-            await db.commit()
+        async def on_node_complete(node_id, node_type, status, input, output, error, duration, cached):
+            logger.info(f"Node complete: {node_id} ({node_type}) status={status} duration={duration}ms cached={cached}")
+            node_log.record(node_id, node_type, status, input, output, error, duration, cached)
 
         try:
             logger.info(f"Starting workflow execution: {execution_id} for workflow: {workflow_id}")
-            final_output = await executor.run(inputs, on_node_complete=on_node_complete)
+            try:
+                final_output = await executor.run(inputs, on_node_complete=on_node_complete)
+            finally:
+                # Node rows are in place before the run is reported finished
+                await node_log.close()
             
             duration = int((time.time() - start_time) * 1000)
             await db.execute(
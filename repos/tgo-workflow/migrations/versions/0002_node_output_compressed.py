@@ -0,0 +1,24 @@
+"""node output compressed
+
+Revision ID: 0002_node_output_compressed
+Revises: 0001_init
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_node_output_compressed'
+down_revision = '0001_init'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('wf_node_executions', sa.Column('output_compressed', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('wf_node_executions', 'output_compressed')
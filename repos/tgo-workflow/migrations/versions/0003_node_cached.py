@@ -0,0 +1,24 @@
+"""node cached
+
+Revision ID: 0003_node_cached
+Revises: 0002_node_output_compressed
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_node_cached'
+down_revision = '0002_node_output_compressed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('wf_node_executions', sa.Column('cached', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('wf_node_executions', 'cached')
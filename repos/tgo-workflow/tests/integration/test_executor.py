@@ -1,6 +1,9 @@
 import pytest
 from app.engine.executor import WorkflowExecutor
+from app.engine.nodes.base import BaseNodeExecutor
+from app.engine.nodes.registry import register_node
 import asyncio
+import time
 
 @pytest.mark.asyncio
 async def test_workflow_executor_run():
@@ -75,3 +78,226 @@ async def test_workflow_executor_with_condition():
     res = await executor.run({"val": -5})
     assert res == "Negative"
 
+
+@register_node("test_sleep")
+class SleepNodeExecutor(BaseNodeExecutor):
+    """Test-only node: sleeps `delay` seconds and records how many nodes overlap."""
+    active = 0
+    peak = 0
+
+    async def execute(self, context):
+        cls = type(self)
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+        try:
+            await asyncio.sleep(self.config.get("delay", 0.2))
+        finally:
+            cls.active -= 1
+        return {"done": self.node_id}, None
+
+def _fan_out_definition(branches: int, delay: float = 0.2):
+    nodes = [{"id": "input_1", "type": "input", "data": {"reference_key": "input", "input_variables": []}}]
+    edges = []
+    for i in range(branches):
+        nodes.append({"id": f"sleep_{i}", "type": "test_sleep", "data": {"reference_key": f"sleep_{i}", "delay": delay}})
+        edges.append({"source": "input_1", "target": f"sleep_{i}"})
+        edges.append({"source": f"sleep_{i}", "target": "answer_1"})
+    template = ",".join(f"{{{{sleep_{i}.done}}}}" for i in range(branches))
+    nodes.append({"id": "answer_1", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": template}})
+    return {"nodes": nodes, "edges": edges}
+
+@pytest.mark.asyncio
+async def test_workflow_executor_runs_branches_in_parallel_and_joins():
+    SleepNodeExecutor.peak = 0
+    started, completed = [], []
+
+    async def on_start(node_id, node_type, node_data, index):
+        started.append(node_id)
+
+    async def on_complete(node_id, node_type, status, input, output, error, duration, cached):
+        completed.append(node_id)
+
+    executor = WorkflowExecutor(_fan_out_definition(3), max_concurrency=8)
+    t0 = time.monotonic()
+    res = await executor.run({}, on_node_start=on_start, on_node_complete=on_complete)
+    elapsed = time.monotonic() - t0
+
+    # The join waits for every branch, and the branches overlap (critical-path time)
+    assert res == "sleep_0,sleep_1,sleep_2"
+    assert elapsed < 0.5
+    assert SleepNodeExecutor.peak == 3
+    assert started == ["input_1", "sleep_0", "sleep_1", "sleep_2", "answer_1"]
+    assert completed == ["input_1", "sleep_0", "sleep_1", "sleep_2", "answer_1"]
+
+@pytest.mark.asyncio
+async def test_workflow_executor_respects_concurrency_cap():
+    SleepNodeExecutor.peak = 0
+    executor = WorkflowExecutor(_fan_out_definition(4, delay=0.05), max_concurrency=2)
+    res = await executor.run({})
+    assert res == "sleep_0,sleep_1,sleep_2,sleep_3"
+    assert SleepNodeExecutor.peak == 2
+
+@pytest.mark.asyncio
+async def test_workflow_executor_prunes_untaken_branch_before_join():
+    definition = {
+        "nodes": [
+            {"id": "input_1", "type": "input", "data": {"reference_key": "input", "input_variables": []}},
+            {"id": "cond_1", "type": "condition", "data": {"reference_key": "cond", "condition_type": "variable", "variable": "input.flag", "operator": "equals", "compare_value": "yes"}},
+            {"id": "sleep_t", "type": "test_sleep", "data": {"reference_key": "branch", "delay": 0.01}},
+            {"id": "sleep_f", "type": "test_sleep", "data": {"reference_key": "branch", "delay": 0.01}},
+            {"id": "answer_1", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": "{{branch.done}}"}},
+        ],
+        "edges": [
+            {"source": "input_1", "target": "cond_1"},
+            {"source": "cond_1", "target": "sleep_t", "sourceHandle": "true"},
+            {"source": "cond_1", "target": "sleep_f", "sourceHandle": "false"},
+            {"source": "sleep_t", "target": "answer_1"},
+            {"source": "sleep_f", "target": "answer_1"},
+        ],
+    }
+    assert await WorkflowExecutor(definition).run({"flag": "yes"}) == "sleep_t"
+    assert await WorkflowExecutor(definition).run({"flag": "no"}) == "sleep_f"
+
+@register_node("test_stream")
+class StreamNodeExecutor(BaseNodeExecutor):
+    """Test-only node: streams its text in chunks when the run is streamed."""
+
+    async def execute(self, context):
+        chunks = ["Hel", "lo"]
+        on_delta = self.delta_sink(context)
+        if on_delta:
+            for chunk in chunks:
+                await on_delta(chunk)
+        return {"text": "".join(chunks)}, None
+
+@pytest.mark.asyncio
+async def test_workflow_executor_streams_node_deltas():
+    definition = {
+        "nodes": [
+            {"id": "input_1", "type": "input", "data": {"reference_key": "input", "input_variables": []}},
+            {"id": "llm_1", "type": "test_stream", "data": {"reference_key": "llm"}},
+            {"id": "llm_2", "type": "test_stream", "data": {"reference_key": "quiet", "stream": False}},
+            {"id": "answer_1", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": "{{llm.text}}"}},
+        ],
+        "edges": [
+            {"source": "input_1", "target": "llm_1"},
+            {"source": "llm_1", "target": "llm_2"},
+            {"source": "llm_2", "target": "answer_1"},
+        ],
+    }
+    events = []
+
+    async def on_delta(node_id, node_type, delta):
+        events.append(("delta", node_id, delta))
+
+    async def on_complete(node_id, node_type, status, input, output, error, duration, cached):
+        events.append(("complete", node_id, None))
+
+    res = await WorkflowExecutor(definition).run({}, on_node_complete=on_complete, on_node_delta=on_delta)
+    assert res == "Hello"
+    assert events[:4] == [
+        ("complete", "input_1", None),
+        ("delta", "llm_1", "Hel"),
+        ("delta", "llm_1", "lo"),
+        ("complete", "llm_1", None),
+    ]
+    assert not any(kind == "delta" and node_id == "llm_2" for kind, node_id, _ in events)
+    # Non-streamed runs do not stream
+    assert await WorkflowExecutor(definition).run({}) == "Hello"
+
+@register_node("test_lookup")
+class LookupNodeExecutor(BaseNodeExecutor):
+    """Test-only node: deterministic given its resolved "query"; counts real executions."""
+    calls = 0
+
+    def memo_inputs(self, context):
+        return self.resolve_config(context, "query", "")
+
+    async def execute(self, context):
+        LookupNodeExecutor.calls += 1
+        return {"value": self.resolve_config(context, "query", "").upper()}, None
+
+@pytest.mark.asyncio
+async def test_workflow_executor_reuses_memoized_node_results(monkeypatch):
+    from app.engine import executor as executor_module
+    from app.engine.plan import compile_workflow
+    from app.services.node_cache import NodeResultCache
+
+    monkeypatch.setattr(executor_module, "node_cache", NodeResultCache(max_size=16))
+    LookupNodeExecutor.calls = 0
+
+    def definition(memoize):
+        return {
+            "nodes": [
+                {"id": "input_1", "type": "input", "data": {"reference_key": "input", "input_variables": []}},
+                {"id": "lookup_1", "type": "test_lookup", "data": {"reference_key": "lookup", "query": "{{input.q}}", "memoize": memoize}},
+                {"id": "answer_1", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": "{{lookup.value}}"}},
+            ],
+            "edges": [
+                {"source": "input_1", "target": "lookup_1"},
+                {"source": "lookup_1", "target": "answer_1"},
+            ],
+        }
+
+    hits = []
+
+    async def on_complete(node_id, node_type, status, input, output, error, duration, cached):
+        if node_id == "lookup_1":
+            hits.append(cached)
+
+    plan = compile_workflow(definition(True), workflow_id="wf", version=1)
+    for q in ("a", "a", "b"):
+        assert await WorkflowExecutor(plan=plan).run({"q": q}, on_node_complete=on_complete) == q.upper()
+    assert hits == [False, True, False]
+    assert LookupNodeExecutor.calls == 2
+
+    # A new version gets its own entries; nodes without "memoize" always run
+    await WorkflowExecutor(plan=compile_workflow(definition(True), workflow_id="wf", version=2)).run({"q": "a"})
+    await WorkflowExecutor(plan=compile_workflow(definition(False), workflow_id="wf", version=1)).run({"q": "a"})
+    assert LookupNodeExecutor.calls == 4
+
+@pytest.mark.asyncio
+async def test_api_node_memoizes_only_successful_responses_per_body(monkeypatch):
+    import json
+    import httpx
+    from app.engine import executor as executor_module
+    from app.engine.nodes import api as api_module
+    from app.engine.plan import compile_workflow
+    from app.services.node_cache import NodeResultCache
+
+    monkeypatch.setattr(executor_module, "node_cache", NodeResultCache(max_size=16))
+    requests = []
+    statuses = [503, 200, 200, 200]
+
+    def handler(request):
+        requests.append(request.content)
+        return httpx.Response(statuses[len(requests) - 1], json={"n": len(requests)})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(api_module, "get_http_client", get_client)
+
+    plan = compile_workflow({
+        "nodes": [
+            {"id": "input_1", "type": "input", "data": {"reference_key": "input", "input_variables": []}},
+            {"id": "api_1", "type": "api", "data": {
+                "reference_key": "api", "method": "GET", "url": "http://svc/lookup",
+                "body_type": "json", "body": '{"q": "{{input.q}}"}', "memoize": True,
+            }},
+            {"id": "answer_1", "type": "answer", "data": {"reference_key": "answer", "output_type": "template", "output_template": "{{api.status_code}}"}},
+        ],
+        "edges": [
+            {"source": "input_1", "target": "api_1"},
+            {"source": "api_1", "target": "answer_1"},
+        ],
+    }, workflow_id="wf", version=1)
+
+    # The 503 is not reused, the next 200 is; a different body is a different entry
+    for q in ("a", "a", "a", "b"):
+        await WorkflowExecutor(plan=plan).run({"q": q})
+    assert len(requests) == 3
+    assert [json.loads(r) for r in requests] == [{"q": "a"}, {"q": "a"}, {"q": "b"}]
+    await client.aclose()
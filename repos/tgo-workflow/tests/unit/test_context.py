@@ -35,3 +35,34 @@ def test_resolve_variables_recursive():
     assert resolved["b"] == ["List 123", "Plain"]
     assert resolved["c"]["nested"] == "123"
 
+
+def test_resolve_typed_whole_value():
+    ctx = ExecutionContext({"api.body": {"items": [1, 2]}, "input.count": 3})
+
+    assert ctx.resolve_template("{{api.body}}", typed=True) == {"items": [1, 2]}
+    assert ctx.resolve_template("{{ input.count }}", typed=True) == 3
+    assert ctx.resolve_template("n={{input.count}}", typed=True) == "n=3"
+    assert ctx.resolve_template("{{none.var}}", typed=True) == "{{none.var}}"
+    assert ctx.resolve_variables({"a": ["{{input.count}}"]}, typed=True) == {"a": [3]}
+
+def test_resolve_variables_keeps_static_subtrees():
+    ctx = ExecutionContext({"input.q": "hi"})
+    static = {"deep": {"list": [1, 2, 3]}}
+    resolved = ctx.resolve_variables({"static": static, "q": "{{input.q}}"})
+    assert resolved["q"] == "hi"
+    assert resolved["static"] is static
+
+def test_compile_json_template():
+    from app.engine.template import compile_json_template
+
+    ctx = ExecutionContext({"input.count": 3, "input.name": 'Al "Bo"', "api.body": {"x": 1}})
+    body = compile_json_template('{"n": {{input.count}}, "greet": "hi {{input.name}}", "raw": {{api.body}}, "q": "{{input.count}}"}')
+    assert ctx.resolve_compiled(body) == {"n": 3, "greet": 'hi Al "Bo"', "raw": {"x": 1}, "q": "3"}
+    assert compile_json_template('{"a": [{{input.count}}') is None
+
+def test_context_names():
+    ctx = ExecutionContext({"input.val": 10})
+    ctx.set_variable("llm", "text", "ok")
+    assert ctx.names["input"] == {"val": 10}
+    assert ctx.names["llm"]["text"] == "ok"
+    assert "missing" not in ctx.names
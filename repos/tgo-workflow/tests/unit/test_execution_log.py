@@ -0,0 +1,66 @@
+import asyncio
+import json
+import zlib
+import pytest
+from app.config import settings
+from app.services.execution_log import NodeExecutionLog, encode_payload
+
+def test_encode_payload_policies():
+    small = {"text": "ok"}
+    assert encode_payload(small, 0, 0) == (small, None)
+
+    value, compressed = encode_payload({"body": "x" * 500}, 100, 0)
+    assert compressed is None
+    assert value["truncated"] is True and value["size"] > 500 and len(value["preview"]) == 100
+
+    value, compressed = encode_payload({"body": "y" * 500}, 0, 200)
+    assert value is None
+    assert json.loads(zlib.decompress(compressed)) == {"body": "y" * 500}
+
+@pytest.mark.asyncio
+async def test_node_log_batches_rows(monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_NODE_LOG_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "WORKFLOW_NODE_LOG_FLUSH_INTERVAL", 60.0)
+    batches = []
+
+    async def writer(rows):
+        batches.append([row["node_id"] for row in rows])
+
+    log = NodeExecutionLog("exec-1", "proj-1", writer=writer)
+    for node_id in ("a", "b", "c"):
+        log.record(node_id, "llm", "completed", {}, {"text": node_id}, None, 5)
+    await log.close()
+    assert batches == [["a", "b"], ["c"]]
+
+@pytest.mark.asyncio
+async def test_node_log_sampling_keeps_failures(monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_NODE_LOG_SAMPLE_RATE", 0.0)
+    rows = []
+
+    async def writer(batch):
+        rows.extend(batch)
+
+    log = NodeExecutionLog("exec-1", "proj-1", writer=writer)
+    log.record("ok", "api", "completed", {"url": "u"}, {"body": "b"}, None, 5)
+    log.record("bad", "api", "failed", {"url": "u"}, {}, "boom", 5)
+    await log.close()
+    by_node = {row["node_id"]: row for row in rows}
+    assert by_node["ok"]["output"] is None and by_node["ok"]["input"] is None
+    assert by_node["bad"]["input"] == {"url": "u"} and by_node["bad"]["error"] == "boom"
+
+@pytest.mark.asyncio
+async def test_node_log_flushes_after_interval_without_more_records(monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_NODE_LOG_BATCH_SIZE", 50)
+    monkeypatch.setattr(settings, "WORKFLOW_NODE_LOG_FLUSH_INTERVAL", 0.05)
+    batches = []
+
+    async def writer(rows):
+        batches.append([row["node_id"] for row in rows])
+
+    log = NodeExecutionLog("exec-1", "proj-1", writer=writer)
+    log.record("a", "llm", "completed", {}, {"text": "a"}, None, 5)
+    log.record("b", "llm", "completed", {}, {"text": "b"}, None, 5)
+    await asyncio.sleep(0.2)
+    assert batches == [["a", "b"]]
+    await log.close()
+    assert batches == [["a", "b"]]
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.engine.plan import compile_workflow
+from app.services import fast_path as fast_path_module
+from app.services.fast_path import FastPathDispatcher
+
+def _plan(trigger_type="input", extra_nodes=0, version=1):
+    nodes = [{"id": "t", "type": trigger_type, "data": {}}, {"id": "a", "type": "answer", "data": {}}]
+    nodes += [{"id": f"n{i}", "type": "llm", "data": {}} for i in range(extra_nodes)]
+    return compile_workflow({"nodes": nodes, "edges": [{"source": "t", "target": "a"}]}, workflow_id="wf", version=version)
+
+def test_fast_path_eligibility():
+    dispatcher = FastPathDispatcher(max_concurrent=2, max_nodes=5, budget_ms=100, max_tracked=10)
+    # No history yet: Celery until a run has been seen to fit the budget
+    assert not dispatcher.eligible(_plan())
+
+    for plan in (_plan(), _plan(trigger_type="timer"), _plan(extra_nodes=10)):
+        dispatcher.record_duration(plan, 50)
+    assert dispatcher.eligible(_plan())
+    assert not dispatcher.eligible(_plan(trigger_type="timer"))
+    assert not dispatcher.eligible(_plan(extra_nodes=10))
+
+    plan = _plan()
+    dispatcher.record_duration(plan, 1000)
+    assert not dispatcher.eligible(plan)
+    # Other versions keep their own history
+    dispatcher.record_duration(_plan(version=2), 50)
+    assert dispatcher.eligible(_plan(version=2))
+
+@pytest.mark.asyncio
+async def test_fast_path_samples_unknown_versions(monkeypatch):
+    sampled = []
+
+    async def fake_load_sample(self, plan):
+        sampled.append(plan.version)
+        self.record_duration(plan, 10)
+
+    monkeypatch.setattr(FastPathDispatcher, "_load_sample", fake_load_sample)
+    dispatcher = FastPathDispatcher(max_concurrent=2, max_nodes=5, budget_ms=100, max_tracked=10)
+    plan = _plan()
+
+    assert not dispatcher.try_submit(plan, "e1", {}, "p")
+    assert not dispatcher.try_submit(plan, "e2", {}, "p")
+    await asyncio.sleep(0)
+    # One lookup per version, after which it qualifies
+    assert sampled == [1]
+    assert dispatcher.estimate_ms(plan) == 10
+
+@pytest.mark.asyncio
+async def test_fast_path_admission(monkeypatch):
+    release = asyncio.Event()
+    started = []
+
+    async def fake_execute(execution_id, workflow_id, inputs, project_id):
+        started.append(execution_id)
+        await release.wait()
+
+    monkeypatch.setattr(fast_path_module, "async_execute_workflow", fake_execute)
+    dispatcher = FastPathDispatcher(max_concurrent=1, max_nodes=5, budget_ms=1000, max_tracked=10)
+    plan = _plan()
+    dispatcher.record_duration(plan, 10)
+
+    assert dispatcher.try_submit(plan, "e1", {}, "p")
+    assert not dispatcher.try_submit(plan, "e2", {}, "p")  # full: caller falls back to Celery
+    await asyncio.sleep(0)
+    assert started == ["e1"] and dispatcher.active == 1
+
+    release.set()
+    await dispatcher.shutdown()
+    assert dispatcher.active == 0
+    assert dispatcher.estimate_ms(plan) < 10
+    assert dispatcher.try_submit(plan, "e3", {}, "p")
+    await dispatcher.shutdown()
@@ -0,0 +1,32 @@
+import pytest
+from app.services.node_cache import NodeResultCache
+
+def test_key_depends_on_version_node_and_inputs():
+    key = NodeResultCache.key("wf", 1, "node1", {"url": "u", "params": [1]})
+    assert key == NodeResultCache.key("wf", 1, "node1", {"params": [1], "url": "u"})
+    assert key != NodeResultCache.key("wf", 2, "node1", {"url": "u", "params": [1]})
+    assert key != NodeResultCache.key("wf", 1, "node2", {"url": "u", "params": [1]})
+    assert key != NodeResultCache.key("wf", 1, "node1", {"url": "v", "params": [1]})
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.node_cache.time.time", lambda: now[0])
+    cache = NodeResultCache(max_size=2)
+
+    await cache.put("a", {"outputs": {"x": 1}, "handle": None}, ttl_seconds=10)
+    await cache.put("b", {"outputs": {"x": 2}, "handle": None}, ttl_seconds=100)
+    assert (await cache.get("a"))["outputs"] == {"x": 1}
+    await cache.put("c", {"outputs": {"x": 3}, "handle": None}, ttl_seconds=100)
+    # "b" was the least recently used
+    assert await cache.get("b") is None
+
+    now[0] += 11
+    assert await cache.get("a") is None
+    assert await cache.get("c") is not None
+
+@pytest.mark.asyncio
+async def test_put_without_ttl_is_ignored():
+    cache = NodeResultCache(max_size=2)
+    await cache.put("a", {"outputs": {}, "handle": None}, ttl_seconds=0)
+    assert await cache.get("a") is None
@@ -0,0 +1,66 @@
+import pytest
+from app.engine.plan import CompiledWorkflow, compile_workflow
+from app.engine.nodes.answer import AnswerNodeExecutor
+from app.services.plan_cache import WorkflowPlanCache
+
+def _definition():
+    return {
+        "nodes": [
+            {"id": "node1", "type": "input", "data": {"reference_key": "start"}},
+            {"id": "node2", "type": "condition", "data": {"reference_key": "cond", "expression": "{{start.a}} > {{ start.b }}"}},
+            {"id": "node3", "type": "llm", "data": {"reference_key": "llm", "user_prompt": "Hi {{start.a}}"}},
+            {"id": "node4", "type": "answer", "data": {"output_template": "{{llm.text}}"}},
+            {"id": "orphan", "type": "answer", "data": {}},
+        ],
+        "edges": [
+            {"source": "node1", "target": "node2"},
+            {"source": "node2", "target": "node3", "sourceHandle": "true"},
+            {"source": "node2", "target": "node4", "sourceHandle": "false"},
+            {"source": "node3", "target": "node4"},
+        ],
+    }
+
+def test_compile_workflow():
+    plan = compile_workflow(_definition(), workflow_id="wf", version=3)
+    assert plan.trigger_id == "node1"
+    assert plan.topo_order == ["node1", "orphan", "node2", "node3", "node4"]
+    assert plan.reachable == {"node1", "node2", "node3", "node4"}
+    assert plan.in_edges == {"node1": 0, "node2": 1, "node3": 1, "node4": 2}
+    assert plan.executor_classes["node4"] is AnswerNodeExecutor
+    assert plan.next_nodes("node2", "true") == {"node3"}
+    assert plan.next_nodes("node2", "missing") == set()
+    assert plan.next_nodes("node1") == {"node2"}
+    assert plan.template_slots["node2"] == ("start.a", "start.b")
+    assert plan.template_slots["node1"] == ()
+
+def test_plan_round_trip():
+    plan = compile_workflow(_definition(), workflow_id="wf", version=3)
+    restored = CompiledWorkflow.from_dict(plan.to_dict())
+    assert (restored.workflow_id, restored.version) == ("wf", 3)
+    assert restored.topo_order == plan.topo_order
+    assert restored.in_edges == plan.in_edges
+    assert restored.template_slots == plan.template_slots
+
+@pytest.mark.asyncio
+async def test_plan_cache_evicts_least_recently_used():
+    cache = WorkflowPlanCache(max_size=2)
+    for version in (1, 2):
+        await cache.put(compile_workflow(_definition(), workflow_id="wf", version=version))
+    assert await cache.get("wf", 1) is not None
+    await cache.put(compile_workflow(_definition(), workflow_id="wf", version=3))
+    assert await cache.get("wf", 2) is None
+    assert await cache.get("wf", 1) is not None
+    assert await cache.get("wf", 3) is not None
+
+def test_compile_rejects_cycles():
+    definition = _definition()
+    # node5 is only reachable through the node3 <-> node5 cycle
+    definition["nodes"].append({"id": "node5", "type": "llm", "data": {}})
+    definition["nodes"].append({"id": "node6", "type": "answer", "data": {}})
+    definition["edges"] += [
+        {"source": "node3", "target": "node5"},
+        {"source": "node5", "target": "node3"},
+        {"source": "node5", "target": "node6"},
+    ]
+    with pytest.raises(ValueError, match="circular dependencies"):
+        compile_workflow(definition)
@@ -0,0 +1,113 @@
+import pytest
+from app.services.trigger_dispatcher import TriggerEvent, TriggerIndex, get_subscription
+
+def _definition(trigger_type, **data):
+    return {
+        "nodes": [
+            {"id": "t", "type": trigger_type, "data": {"reference_key": "trigger", **data}},
+            {"id": "a", "type": "answer", "data": {}},
+        ],
+        "edges": [{"source": "t", "target": "a"}],
+    }
+
+def test_get_subscription():
+    assert get_subscription(_definition("event", event_type="visitor.created")) == ("event", "visitor.created")
+    assert get_subscription(_definition("webhook", path="orders")) == ("webhook", "orders")
+    assert get_subscription(_definition("timer", cron_expression="0 * * * *")) == ("timer", "0 * * * *")
+    assert get_subscription(_definition("input")) is None
+
+def test_index_matches_by_project_and_event():
+    index = TriggerIndex()
+    index.set("wf1", ("p1", "event", "visitor.created"))
+    index.set("wf2", ("p1", "event", "visitor.created"))
+    index.set("wf3", ("p2", "event", "visitor.created"))
+    assert index.match("p1", "event", "visitor.created") == ["wf1", "wf2"]
+    assert index.match("p1", "event", "other") == []
+
+    # Re-indexing moves a workflow; None unsubscribes it
+    index.set("wf1", ("p1", "event", "other"))
+    index.set("wf2", None)
+    assert index.match("p1", "event", "visitor.created") == []
+    assert index.match("p1", "event", "other") == ["wf1"]
+    assert len(index) == 2
+
+    index.replace([("wf4", ("p1", "timer", "0 * * * *"))])
+    assert len(index) == 1
+    assert index.match("p1", "event", "other") == []
+
+def test_event_from_stream_fields():
+    event = TriggerEvent.from_fields({"project_id": "p1", "name": "visitor.created", "data": '{"id": 7}'})
+    assert (event.trigger, event.name) == ("event", "visitor.created")
+    assert event.inputs() == {"event_type": "visitor.created", "data": {"id": 7}}
+
+    webhook = TriggerEvent.from_fields({"project_id": "p1", "trigger": "webhook", "name": "orders", "data": '{"body": {}}'})
+    assert webhook.inputs() == {"body": {}}
+
+class _Session:
+    """Stands in for AsyncSessionLocal(); records what the dispatcher writes."""
+
+    def __init__(self, added, statements):
+        self.added, self.statements = added, statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add_all(self, rows):
+        self.added.extend(rows)
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        pass
+
+class _Redis:
+    def __init__(self):
+        self.acked = []
+
+    async def xack(self, stream, group, *entry_ids):
+        self.acked.extend(entry_ids)
+
+@pytest.mark.asyncio
+async def test_dispatch_acks_batch_when_a_submit_fails(monkeypatch):
+    from app.services import trigger_dispatcher as module
+
+    added, statements = [], []
+    monkeypatch.setattr(module, "AsyncSessionLocal", lambda: _Session(added, statements))
+    monkeypatch.setattr(module.fast_path, "try_submit", lambda *args: False)
+    submitted = []
+
+    def apply_async(args, kwargs, task_id):
+        if args[1] == "wf2":
+            raise ConnectionError("broker down")
+        submitted.append(task_id)
+
+    monkeypatch.setattr(module.execute_workflow_task, "apply_async", apply_async)
+
+    dispatcher = module.TriggerDispatcher("redis://test", "events", "workflows", 10, 60, 1000)
+    dispatcher._loaded_at = float("inf")
+    dispatcher.index.set("wf1", ("p1", "event", "visitor.created"))
+    dispatcher.index.set("wf2", ("p1", "event", "visitor.created"))
+
+    async def load_plans(db, workflow_ids):
+        return {workflow_id: object() for workflow_id in workflow_ids}
+
+    monkeypatch.setattr(dispatcher, "_load_plans", load_plans)
+    redis = _Redis()
+    monkeypatch.setattr(dispatcher, "_get_redis", lambda: redis)
+
+    fields = {"project_id": "p1", "name": "visitor.created", "data": "{}"}
+    await dispatcher._dispatch_entries([("1-0", fields), ("1-1", fields)])
+
+    by_workflow = {}
+    for execution in added:
+        by_workflow.setdefault(execution.workflow_id, []).append(execution.id)
+    assert sorted(submitted) == sorted(by_workflow["wf1"])
+    assert redis.acked == ["1-0", "1-1"]
+    # The executions that never reached the broker are failed, not left pending
+    failed = {statement.compile().params["id_1"] for statement in statements}
+    assert failed == set(by_workflow["wf2"])
+    assert all(statement.compile().params["status"] == "failed" for statement in statements)